@@ -2,13 +2,64 @@
 Dashboard de Análise de Indicadores de Saúde Municipal
 CMI, CMI-Mil, Nascidos Vivos e Óbitos
 """
-import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import json
-from pathlib import Path
-import numpy as np
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+import streamlit as st
+
+# plotly, pandas e numpy são importados nas funções que os usam (pandas e numpy já chegam com src.armazenamento)
+from src.armazenamento import (
+    MAX_CODIGOS, aquecer_armazenamento, bloco_tem_dados, carregar_indicadores_preparados, carregar_series_mensais,
+    catalogo_de_indicadores, indice_busca_municipios, indice_semelhanca, obter_series, rotulos_municipios,
+    serie_do_bloco, versao_dados_preparados
+)
+from src.series_mensais import serie_mensal
+from src.busca_municipios import buscar
+from src.semelhanca import K_PADRAO, METRICAS, MIN_ANOS_COMUNS, municipios_semelhantes
+from src.exportacao import (
+    FORMATOS, codigos_do_escopo, exportar, formatos_disponiveis, nome_arquivo, validar_exportacao,
+)
+from src.acessos import codificar_estado, decodificar_estado, estados_populares, registrar_acesso
+from src.validacao import carregar_relatorio
+from src.perfil_dashboard import (
+    contar_cache, iniciar_servidor_metricas, instantaneo, medir, perfil_ativo, porta_metricas, registrar_tempo, zerar
+)
+
+# Chave usada nos dicionários do dashboard -> indicador do armazenamento
+INDICADORES_DASHBOARD = {'cmi': 'CMI', 'cmi_mil': 'CMI_MIL', 'nv': 'NV', 'ob': 'OB'}
+
+MAX_FIGURAS_CACHE = 256  # Figuras serializadas mantidas no cache (as menos usadas saem primeiro)
+MAX_PACOTES_CACHE = 64  # Blocos de séries (municípios x período) mantidos no cache
+
+# Gráficos comparativos entre municípios: chave do indicador -> (tipo do indicador, título)
+COMPARACOES = {
+    'cmi': ('CMI', 'Comparação CMI'),
+    'cmi_mil': ('CMI-Mil', 'Comparação CMI-Mil'),
+    'nv': ('Nascidos Vivos', 'Comparação de Nascidos Vivos'),
+    'ob': ('Óbitos', 'Comparação de Óbitos Infantis'),
+}
+
+# Paleta dos municípios nos gráficos comparativos (Set2 + Pastel do Plotly, sem importar plotly.express)
+CORES_MUNICIPIOS = [
+    'rgb(102,194,165)', 'rgb(252,141,98)', 'rgb(141,160,203)', 'rgb(231,138,195)',
+    'rgb(166,216,84)', 'rgb(255,217,47)', 'rgb(229,196,148)', 'rgb(179,179,179)',
+    'rgb(102, 197, 204)', 'rgb(246, 207, 113)', 'rgb(248, 156, 116)', 'rgb(220, 176, 242)',
+    'rgb(135, 197, 95)', 'rgb(158, 185, 243)', 'rgb(254, 136, 177)', 'rgb(201, 219, 116)',
+    'rgb(139, 224, 164)', 'rgb(180, 151, 231)', 'rgb(179, 179, 179)',
+]
+
+# Renderização dos gráficos comparativos conforme o número de municípios
+LIMITE_TRACOS_SVG = 20  # Até aqui: um traço SVG com marcadores por município
+LIMITE_TRACOS_WEBGL = 100  # Até aqui: um traço WebGL (Scattergl) por município; acima: um único traço
+
+MUNICIPIOS_POR_PAGINA = 10  # Painéis por município (gráficos individuais, abas de métricas) exibidos por página
+
+MAX_SEMELHANTES = 20  # Sugestões de municípios semelhantes na sidebar
+
+inicio_script = time.perf_counter()
 
 # Configuração da página
 st.set_page_config(
@@ -18,13 +69,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Diretórios de dados
-BASE_DIR = Path(__file__).parent
-DIR_CMI = BASE_DIR / 'data' / 'output' / 'cmi_app3'
-DIR_CMI_MIL = BASE_DIR / 'data' / 'output' / 'cmi-mil_app3'
-DIR_NV = BASE_DIR / 'data' / 'output' / 'nascidos_vivos'
-DIR_OB = BASE_DIR / 'data' / 'output' / 'obitos'
-
 # CSS personalizado
 st.markdown("""
 <style>
@@ -67,40 +111,126 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)
-def carregar_dados_por_tipo(tipo):
-    """Carrega dados de um tipo específico (CMI, CMI_MIL, NV, OB)"""
-    if tipo == 'CMI':
-        diretorio = DIR_CMI
-    elif tipo == 'CMI_MIL':
-        diretorio = DIR_CMI_MIL
-    elif tipo == 'NV':
-        diretorio = DIR_NV
-    elif tipo == 'OB':
-        diretorio = DIR_OB
-    else:
-        return pd.DataFrame()
-    
-    dados_list = []
-    for arquivo in diretorio.glob('*.json'):
-        with open(arquivo, 'r', encoding='utf-8') as f:
-            dados = json.load(f)
-            dados_list.extend(dados)
-    
-    return pd.DataFrame(dados_list) if dados_list else pd.DataFrame()
+@contar_cache('carregar_dados_indicadores')
+def carregar_dados_indicadores():
+    """
+    {tipo: DataFrame} dos indicadores do dashboard (CMI, CMI_MIL, NV, OB) sem os registros bloqueados na validação,
+    carregados em paralelo. Cada DataFrame vem indexado por código IBGE (int32), ordenado por (Codigo_Municipio, Ano)
+    Ficam no cache do processo (src/armazenamento.py), recarregados só quando os JSONs mudam
+    """
+    return carregar_indicadores_preparados(INDICADORES_DASHBOARD.values())
 
-@st.cache_data(ttl=300)
+@contar_cache('obter_lista_municipios')
 def obter_lista_municipios():
-    """Obtém lista única de municípios com UF"""
-    df_cmi = carregar_dados_por_tipo('CMI')
-    if df_cmi.empty:
-        return []
-    municipios = df_cmi[['Municipio', 'UF']].drop_duplicates()
-    municipios_lista = [f"{row['Municipio']} - {row['UF']}" for _, row in municipios.iterrows()]
-    return sorted(municipios_lista)
+    """Obtém os municípios disponíveis no formato {'MUNICIPIO - UF': codigo IBGE}, ordenados pelo rótulo"""
+    return rotulos_municipios()
+
+def obter_versao_dados():
+    """
+    Versão dos dados: assinatura (nome, tamanho, data de modificação) dos JSONs processados, do dicionário
+    de códigos e do relatório de validação, os mesmos arquivos que recarregam o cache do processo
+    Calculada uma vez por execução do script e usada como chave dos caches de blocos e de figuras
+    """
+    return versao_dados_preparados()
+
+@st.cache_data(max_entries=MAX_PACOTES_CACHE, show_spinner=False)
+def obter_pacote(codigos, anos=None, versao=None):
+    """
+    Bloco alinhado das séries dos municípios (obter_series) em cache por (códigos, período, versão dos dados)
+    anos=None cobre todos os anos com dado nos municípios (usado para montar o filtro de período)
+    """
+    dados_indicadores = carregar_dados_indicadores()
+    return obter_series(dados_indicadores, list(codigos), anos=anos)
+
+def separar_series(bloco, municipios):
+    """Bloco -> {'MUNICIPIO - UF': {'cmi': DataFrame(Ano, Valor), ...}} na ordem do bloco"""
+    return {
+        mun_sel: {chave: serie_do_bloco(bloco, tipo, posicao) for chave, tipo in INDICADORES_DASHBOARD.items()}
+        for posicao, mun_sel in enumerate(municipios)
+    }
 
+@st.cache_data(max_entries=MAX_FIGURAS_CACHE, show_spinner=False)
+def figura_serializada(tipo_grafico, codigos, anos, versao, parametros, _construir):
+    """
+    Figura Plotly serializada em JSON, em cache LRU por
+    (tipo de gráfico, códigos dos municípios, período, versão dos dados, parâmetros do gráfico)
+    _construir só é chamada quando a figura não está no cache
+    """
+    return _construir().to_json()
+
+def spec_grafico(entradas, tipo_grafico, codigos, parametros, construir):
+    """Figura serializada do cache de figuras; constrói e serializa apenas na primeira vez"""
+    return figura_serializada(tipo_grafico, tuple(codigos), entradas['anos'], entradas['versao'], parametros, construir)
+
+def exibir_grafico(entradas, tipo_grafico, codigos, parametros, construir, chave=None):
+    """
+    Exibe um gráfico do cache de figuras
+    chave: key do st.plotly_chart, necessária quando a mesma figura aparece duas vezes na página
+    """
+    import plotly.graph_objects as go
+
+    spec = spec_grafico(entradas, tipo_grafico, codigos, parametros, construir)
+    # A figura foi validada quando construída: recriá-la sem validação custa ~1 ms (contra ~25 ms)
+    st.plotly_chart(go.Figure(json.loads(spec), _validate=False), use_container_width=True, key=chave)
+
+def exibir_linha_nv_ob(entradas, mun_sel, chave, armazem_mensal, titulo, cor, yaxis_title):
+    """Gráfico de NV/OB de um município: série mensal se houver armazenamento mensal (armazem_mensal), senão anual"""
+    codigo = entradas['codigos'][mun_sel]
+    if armazem_mensal is not None:
+        serie = serie_mensal(armazem_mensal, codigo, entradas['anos'])
+        if not serie.empty:
+            exibir_grafico(
+                entradas, 'linha_mensal', [codigo], (chave,),
+                lambda: criar_grafico_mensal(serie, titulo, cor, yaxis_title)
+            )
+            return
+    exibir_grafico(
+        entradas, 'linha', [codigo], (chave,),
+        lambda: criar_grafico_linha(entradas['dados'][mun_sel][chave], titulo, cor, yaxis_title)
+    )
+
+def codigos_de(entradas, dados_dict):
+    """Códigos IBGE dos municípios de um dicionário {'MUNICIPIO - UF': DataFrame}"""
+    return [entradas['codigos'][mun] for mun in dados_dict]
+
+def paginar(municipios, chave):
+    """
+    Municípios da página atual dos painéis individuais
+    Até MUNICIPIOS_POR_PAGINA não há paginação; acima disso exibe um seletor de página (key=chave)
+    """
+    if len(municipios) <= MUNICIPIOS_POR_PAGINA:
+        return municipios
+
+    total_paginas = -(-len(municipios) // MUNICIPIOS_POR_PAGINA)
+    pagina = st.number_input(
+        f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1, step=1, key=chave
+    )
+    inicio = (pagina - 1) * MUNICIPIOS_POR_PAGINA
+    fim = min(inicio + MUNICIPIOS_POR_PAGINA, len(municipios))
+    st.caption(f"Exibindo municípios {inicio + 1}–{fim} de {len(municipios)}")
+    return municipios[inicio:fim]
+
+def argumentos_comparacao(entradas, dados_dict, tipo_indicador, titulo):
+    """Argumentos de exibir_grafico do gráfico comparativo: linhas (SVG/WebGL conforme o tamanho) ou faixa de percentis"""
+    if entradas['resumo_percentis']:
+        return (
+            entradas, 'faixa_percentis', codigos_de(entradas, dados_dict), (tipo_indicador, titulo),
+            lambda: criar_grafico_faixa_percentis(dados_dict, tipo_indicador, titulo)
+        )
+    return (
+        entradas, 'multiplos', codigos_de(entradas, dados_dict), (tipo_indicador, titulo),
+        lambda: criar_grafico_multiplos_municipios(dados_dict, tipo_indicador, titulo)
+    )
+
+def exibir_comparacao_municipios(entradas, dados_dict, tipo_indicador, titulo, chave=None):
+    """Gráfico comparativo entre municípios"""
+    exibir_grafico(*argumentos_comparacao(entradas, dados_dict, tipo_indicador, titulo), chave)
+
+@medir('criar_grafico_linha')
 def criar_grafico_linha(df, titulo, cor='#1f77b4', yaxis_title='Valor'):
     """Cria gráfico de linha padronizado"""
+    import plotly.graph_objects as go
+
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=df['Ano'],
@@ -121,20 +251,67 @@ def criar_grafico_linha(df, titulo, cor='#1f77b4', yaxis_title='Valor'):
     )
     return fig
 
+@medir('criar_grafico_mensal')
+def criar_grafico_mensal(df, titulo, cor='#1f77b4', yaxis_title='Valor'):
+    """Gráfico de linha da série mensal (df com Data e Valor)"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df['Data'],
+        y=df['Valor'],
+        mode='lines',
+        name=titulo,
+        line=dict(color=cor, width=2),
+        hovertemplate='%{x|%m/%Y}: %{y}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title='Mês',
+        yaxis_title=yaxis_title,
+        hovermode='x unified',
+        template='plotly_white',
+        height=400
+    )
+    return fig
+
+@medir('criar_grafico_multiplos_municipios')
 def criar_grafico_multiplos_municipios(dados_dict, tipo_indicador, titulo):
-    """Cria gráfico com múltiplos municípios"""
-    cores = px.colors.qualitative.Set2 + px.colors.qualitative.Pastel
+    """
+    Cria gráfico com múltiplos municípios, com renderização conforme o tamanho da seleção:
+    até LIMITE_TRACOS_SVG, traços SVG com marcadores; até LIMITE_TRACOS_WEBGL, traços WebGL só com linhas;
+    acima disso, todas as linhas em um único traço WebGL separadas por NaN (sem legenda)
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+
+    cores = CORES_MUNICIPIOS
+    com_dados = {municipio: df for municipio, df in dados_dict.items() if not df.empty}
     
     fig = go.Figure()
-    for idx, (municipio, df) in enumerate(dados_dict.items()):
-        if not df.empty:
-            fig.add_trace(go.Scatter(
+    if len(com_dados) > LIMITE_TRACOS_WEBGL:
+        # Um traço só: o navegador desenha centenas de linhas sem criar um objeto por município
+        separador = [np.nan]
+        fig.add_trace(go.Scattergl(
+            x=np.concatenate([np.append(df['Ano'].to_numpy(dtype=float), separador) for df in com_dados.values()]),
+            y=np.concatenate([np.append(df['Valor'].to_numpy(dtype=float), separador) for df in com_dados.values()]),
+            text=np.concatenate([np.repeat(municipio, len(df) + 1) for municipio, df in com_dados.items()]),
+            mode='lines',
+            line=dict(color='rgba(52, 152, 219, 0.35)', width=1),
+            hovertemplate='%{text}<br>%{x}: %{y:.1f}<extra></extra>',
+            showlegend=False
+        ))
+        titulo = f"{titulo} ({len(com_dados)} municípios)"
+    else:
+        webgl = len(com_dados) > LIMITE_TRACOS_SVG
+        for idx, (municipio, df) in enumerate(com_dados.items()):
+            fig.add_trace((go.Scattergl if webgl else go.Scatter)(
                 x=df['Ano'],
                 y=df['Valor'],
-                mode='lines+markers',
+                mode='lines' if webgl else 'lines+markers',
                 name=municipio,
-                line=dict(color=cores[idx % len(cores)], width=2.5),
-                marker=dict(size=7),
+                line=dict(color=cores[idx % len(cores)], width=1.5 if webgl else 2.5),
+                marker=None if webgl else dict(size=7),
                 hovertemplate='%{y:.1f}<extra></extra>'
             ))
     
@@ -142,7 +319,7 @@ def criar_grafico_multiplos_municipios(dados_dict, tipo_indicador, titulo):
         title=titulo,
         xaxis_title='Ano',
         yaxis_title=tipo_indicador,
-        hovermode='x unified',
+        hovermode='closest' if len(com_dados) > LIMITE_TRACOS_SVG else 'x unified',
         template='plotly_white',
         height=500,
         legend=dict(
@@ -154,8 +331,92 @@ def criar_grafico_multiplos_municipios(dados_dict, tipo_indicador, titulo):
     )
     return fig
 
+@medir('criar_grafico_faixa_percentis')
+def criar_grafico_faixa_percentis(dados_dict, tipo_indicador, titulo):
+    """Resumo da seleção ano a ano: mediana e faixa P10–P90 entre os municípios (calculadas no servidor)"""
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    matriz = pd.concat(
+        {municipio: df.set_index('Ano')['Valor'] for municipio, df in dados_dict.items() if not df.empty},
+        axis=1
+    ).sort_index()
+    p10, mediana, p90 = np.nanpercentile(matriz.to_numpy(dtype=float), [10, 50, 90], axis=1)
+    anos = matriz.index.to_numpy()
+    municipios_por_ano = matriz.notna().sum(axis=1).to_numpy()
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=anos, y=p90,
+        mode='lines',
+        name='P90',
+        line=dict(color='rgba(52, 152, 219, 0.4)', width=1),
+        hovertemplate='P90: %{y:.1f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=anos, y=p10,
+        mode='lines',
+        name='P10',
+        fill='tonexty',
+        fillcolor='rgba(52, 152, 219, 0.2)',
+        line=dict(color='rgba(52, 152, 219, 0.4)', width=1),
+        hovertemplate='P10: %{y:.1f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=anos, y=mediana,
+        mode='lines+markers',
+        name='Mediana',
+        line=dict(color='#1f77b4', width=3),
+        marker=dict(size=6),
+        customdata=municipios_por_ano,
+        hovertemplate='Mediana: %{y:.1f} (%{customdata} municípios)<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f"{titulo} - mediana e faixa P10–P90 ({matriz.shape[1]} municípios)",
+        xaxis_title='Ano',
+        yaxis_title=tipo_indicador,
+        hovermode='x unified',
+        template='plotly_white',
+        height=500,
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+    )
+    return fig
+
+@medir('criar_grafico_suavizado')
+def criar_grafico_suavizado(dados_dict, linhas_suavizadas):
+    """Gráfico comparativo de CMI-Mil entre municípios, com ou sem linhas suavizadas"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    
+    for municipio, df in dados_dict.items():
+        fig.add_trace(go.Scatter(
+            x=df['Ano'],
+            y=df['Valor'],
+            mode='lines+markers',
+            name=municipio,
+            line=dict(shape='spline' if linhas_suavizadas else 'linear', width=2),
+            marker=dict(size=8)
+        ))
+    
+    fig.update_layout(
+        title='Comparação CMI-Mil',
+        xaxis_title='Ano',
+        yaxis_title='CMI-Mil',
+        hovermode='x unified',
+        height=500,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+@medir('criar_grafico_comparacao')
 def criar_grafico_comparacao(df1, df2, label1, label2, titulo):
     """Cria gráfico comparativo entre dois indicadores"""
+    import plotly.graph_objects as go
+
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=df1['Ano'], y=df1['Valor'],
@@ -182,6 +443,216 @@ def criar_grafico_comparacao(df1, df2, label1, label2, titulo):
     )
     return fig
 
+@medir('criar_grafico_diferenca')
+def criar_grafico_diferenca(df_merged, nome_municipio):
+    """Barras da diferença CMI - CMI-Mil por ano (verde: CMI maior, vermelho: CMI menor)"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=df_merged['Ano'],
+        y=df_merged['Diferenca'],
+        marker_color=['green' if x >= 0 else 'red' for x in df_merged['Diferenca']],
+        name='Diferença (CMI - CMI-Mil)'
+    ))
+    fig.update_layout(
+        title=f'Diferença Absoluta entre CMI e CMI-Mil - {nome_municipio}',
+        xaxis_title='Ano',
+        yaxis_title='Diferença',
+        template='plotly_white',
+        height=400
+    )
+    return fig
+
+@medir('criar_grafico_correlacao')
+def criar_grafico_correlacao(df_merged, nome_municipio):
+    """Dispersão CMI x CMI-Mil com linha de tendência (regressão linear)"""
+    import numpy as np
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatter(
+        x=df_merged['Valor_CMI'],
+        y=df_merged['Valor_CMI_MIL'],
+        mode='markers',
+        name='',
+        showlegend=False,
+        hovertemplate='CMI=%{x}<br>CMI-Mil=%{y}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f'Correlação: CMI vs CMI-Mil - {nome_municipio}',
+        xaxis_title='CMI',
+        yaxis_title='CMI-Mil'
+    )
+    
+    # Adicionar linha de tendência manual
+    if len(df_merged) > 1:
+        z = np.polyfit(df_merged['Valor_CMI'], df_merged['Valor_CMI_MIL'], 1)
+        p = np.poly1d(z)
+        x_line = np.linspace(df_merged['Valor_CMI'].min(), df_merged['Valor_CMI'].max(), 100)
+        fig.add_trace(go.Scatter(
+            x=x_line, 
+            y=p(x_line), 
+            mode='lines', 
+            name='Tendência',
+            line=dict(color='red', dash='dash')
+        ))
+    
+    fig.update_layout(height=350)
+    return fig
+
+def adicionar_municipios_da_uf(uf, municipios_disponiveis):
+    """Callback: acrescenta à seleção todos os municípios da UF"""
+    if uf is None:
+        return
+    da_uf = [rotulo for rotulo in municipios_disponiveis if rotulo.endswith(f" - {uf}")]
+    selecionados = st.session_state.get("municipios_select", [])
+    st.session_state["municipios_select"] = list(dict.fromkeys(selecionados + da_uf))
+
+def adicionar_municipios(rotulos):
+    """Callback: acrescenta os rótulos à seleção (sugestões de municípios semelhantes)"""
+    selecionados = st.session_state.get("municipios_select", [])
+    st.session_state["municipios_select"] = list(dict.fromkeys(selecionados + list(rotulos)))
+
+def montar_entradas(municipios, codigos, dados, anos, modo, resumo_percentis, versao):
+    """
+    Entradas explícitas das seções: cada seção é um fragmento (st.fragment) que só lê daqui,
+    então seus próprios widgets reexecutam apenas a seção, sem recarregar dados nem a sidebar
+    versao: versão dos dados com que `dados` foi montado (chave do cache de figuras)
+    """
+    return {
+        'municipios': municipios,
+        'codigos': dict(zip(municipios, codigos)),
+        'dados': dados,
+        'anos': anos,
+        'modo': modo,
+        'resumo_percentis': resumo_percentis,
+        'versao': versao,
+    }
+
+def url_exportacao_api(formato, codigos, uf, anos):
+    """
+    URL do GET /exportar da API de consultas (src/api_consultas.py) no endereço de DASHBOARD_API_URL
+    codigos: seleção atual; None exporta a UF `uf` ou, sem ela, o Brasil
+    None quando a API não está configurada ou a seleção passa do limite de códigos da API
+    """
+    endereco = os.environ.get('DASHBOARD_API_URL', '').rstrip('/')
+    if not endereco or (codigos is not None and len(codigos) > MAX_CODIGOS):
+        return None
+    parametros = {'formato': formato}
+    if codigos is not None:
+        parametros['codigos'] = ','.join(str(codigo) for codigo in codigos)
+    elif uf:
+        parametros['uf'] = uf
+    if anos:
+        parametros['inicio'], parametros['fim'] = anos
+    return f"{endereco}/exportar?{urlencode(parametros)}"
+
+def resumo_percentis_padrao(quantidade):
+    """Faixa de percentis no lugar de uma linha por município, padrão para seleções grandes"""
+    return quantidade > LIMITE_TRACOS_WEBGL
+
+def aquecer_estado(codigos, anos, modo):
+    """Pré-calcula os blocos de séries e as figuras comparativas de um estado (códigos, período, modo)"""
+    rotulos = {codigo: rotulo for rotulo, codigo in obter_lista_municipios().items()}
+    codigos = tuple(codigo for codigo in codigos if codigo in rotulos)
+    if not codigos:
+        return
+
+    versao = obter_versao_dados()
+    obter_pacote(codigos, versao=versao)
+    municipios = [rotulos[codigo] for codigo in codigos]
+    dados = separar_series(obter_pacote(codigos, anos, versao), municipios)
+    if len(municipios) < 2 or modo != "Comparativo":
+        return
+
+    resumo = len(municipios) > 2 and resumo_percentis_padrao(len(municipios))
+    entradas = montar_entradas(municipios, codigos, dados, anos, modo, resumo, versao)
+    for chave, (tipo_indicador, titulo) in COMPARACOES.items():
+        dados_dict = {mun: series[chave] for mun, series in dados.items() if not series[chave].empty}
+        if dados_dict:
+            spec_grafico(*argumentos_comparacao(entradas, dados_dict, tipo_indicador, titulo))
+
+    # Gráfico CMI-Mil do topo com o padrão "Linhas Suavizadas" ligado
+    dados_cmi_mil = {mun: series['cmi_mil'] for mun, series in dados.items() if not series['cmi_mil'].empty}
+    if dados_cmi_mil and not resumo and len(dados_cmi_mil) <= LIMITE_TRACOS_SVG:
+        spec_grafico(
+            entradas, 'cmi_mil_suavizado', codigos_de(entradas, dados_cmi_mil), (True,),
+            lambda: criar_grafico_suavizado(dados_cmi_mil, True)
+        )
+
+def aquecer_estados_populares():
+    """
+    Pré-calcula os estados mais acessados (registro de acessos), do mais para o menos popular
+    O armazenamento vem antes; se iniciar_dashboard.py já o aqueceu, essa etapa é imediata
+    """
+    aquecer_armazenamento()
+    for codigos, anos, modo in estados_populares():
+        try:
+            aquecer_estado(codigos, anos, modo)
+        except Exception as erro:
+            print(f"  ⚠️ Aquecimento de {codigos} {anos} falhou: {erro}")
+
+def painel_administracao():
+    """Painel oculto da sidebar (perfil ligado e ?admin=1 na URL): tempo por seção e acertos de cache do processo"""
+    import pandas as pd
+
+    medidas = instantaneo()
+    with st.expander("🛠️ Administração - Perfil", expanded=False):
+        st.caption(f"Acumulado no processo | Prometheus: `http://localhost:{porta_metricas()}/metrics`")
+        secoes = pd.DataFrame([
+            {
+                'Seção': secao,
+                'Chamadas': medida['chamadas'],
+                'Total (s)': round(medida['total_s'], 2),
+                'Média (ms)': round(medida['total_s'] / medida['chamadas'] * 1000, 1),
+                'Máx (ms)': round(medida['max_s'] * 1000, 1),
+                'Última (ms)': round(medida['ultima_s'] * 1000, 1),
+            }
+            for secao, medida in sorted(medidas['secoes'].items(), key=lambda item: -item[1]['total_s'])
+        ])
+        st.dataframe(secoes, use_container_width=True, hide_index=True)
+        caches = pd.DataFrame([
+            {
+                'Função': nome,
+                'Chamadas': contagem['chamadas'],
+                'Acertos': contagem['chamadas'] - contagem['faltas'],
+                'Faltas': contagem['faltas'],
+                'Taxa de acerto': f"{1 - contagem['faltas'] / contagem['chamadas']:.0%}" if contagem['chamadas'] else '-',
+            }
+            for nome, contagem in sorted(medidas['caches'].items())
+        ])
+        st.dataframe(caches, use_container_width=True, hide_index=True)
+        memoria = pd.DataFrame([
+            {
+                'Indicador': tipo,
+                'Registros': medida['registros'],
+                'Original (MB)': round(medida['original_bytes'] / (1024 * 1024), 1),
+                'Compacto (MB)': round(medida['compacto_bytes'] / (1024 * 1024), 1),
+                'Redução': f"{1 - medida['compacto_bytes'] / medida['original_bytes']:.0%}" if medida['original_bytes'] else '-',
+            }
+            for tipo, medida in sorted(medidas['memoria'].items())
+        ])
+        st.dataframe(memoria, use_container_width=True, hide_index=True)
+        if st.button("Zerar métricas", use_container_width=True, key="admin_zerar"):
+            zerar()
+            st.rerun()
+
+@st.cache_resource(show_spinner=False)
+def iniciar_metricas():
+    """Sobe uma única vez por processo o endpoint /metrics (formato Prometheus) do perfil"""
+    return iniciar_servidor_metricas()
+
+@st.cache_resource(show_spinner=False)
+def iniciar_aquecimento():
+    """Dispara uma única vez por processo o pré-cálculo dos estados populares em segundo plano"""
+    thread = threading.Thread(target=aquecer_estados_populares, name="aquecimento", daemon=True)
+    thread.start()
+    return thread
+
+iniciar_aquecimento()
+if perfil_ativo():
+    iniciar_metricas()
+
 # Título principal
 st.markdown('<h1 class="main-header">Análise CMI & CMI-Mil<br><small style="font-size: 0.6em; color: #7f8c8d;">Dashboard para Visualização de Coeficientes de Mortalidade Infantil</small></h1>', unsafe_allow_html=True)
 
@@ -194,19 +665,65 @@ with st.sidebar:
         st.cache_data.clear()
         st.rerun()
     
+    # Status da última validação dos dados (src/validacao.py)
+    relatorio_validacao = carregar_relatorio()
+    if relatorio_validacao and relatorio_validacao['status'] == 'reprovado':
+        total_bloqueados = sum(len(chaves) for chaves in relatorio_validacao['bloqueios'].values())
+        st.warning(f"⚠️ Validação reprovada: {total_bloqueados:,} registros bloqueados")
+    
     st.markdown("---")
     
     # Seleção de municípios (multiselect)
     municipios_disponiveis = obter_lista_municipios()
+    
+    # Estado vindo da URL (link compartilhado): lido uma vez por sessão
+    if "estado_url" not in st.session_state:
+        st.session_state["estado_url"] = decodificar_estado(st.query_params)
+    estado_url = st.session_state["estado_url"]
+    if "admin" not in st.session_state:
+        st.session_state["admin"] = st.query_params.get("admin") == "1"
     if municipios_disponiveis:
+        consulta = st.text_input(
+            "Buscar município",
+            placeholder="Ex: sao paulo, crateus, paulo",
+            help="Busca sem acentos, por início do nome, trecho ou nome parecido",
+            live=True  # sugestões enquanto digita (nova execução após 250 ms sem digitar)
+        )
+        if consulta:
+            # Os já selecionados continuam entre as opções para não sumirem da seleção
+            indice_busca = indice_busca_municipios()
+            selecionados = st.session_state.get("municipios_select", [])
+            opcoes = list(dict.fromkeys(selecionados + buscar(indice_busca, consulta)))
+        else:
+            opcoes = list(municipios_disponiveis)
+        
+        # Valor inicial via session_state (em vez de default=) para que "Adicionar UF" possa alterá-lo
+        if "municipios_select" not in st.session_state:
+            rotulos_por_codigo = {codigo: rotulo for rotulo, codigo in municipios_disponiveis.items()}
+            da_url = [rotulos_por_codigo[c] for c in estado_url['codigos'] if c in rotulos_por_codigo]
+            st.session_state["municipios_select"] = da_url or [next(iter(municipios_disponiveis))]
+        
         municipios_selecionados = st.multiselect(
             "Selecione os Municípios",
-            options=municipios_disponiveis,
-            default=[municipios_disponiveis[0]] if municipios_disponiveis else [],
+            options=opcoes,
             key="municipios_select",
             help="Selecione um ou mais municípios para comparar"
         )
         
+        # Atalho para comparar uma UF inteira (centenas de municípios)
+        ufs_disponiveis = sorted({rotulo.rsplit(' - ', 1)[1] for rotulo in municipios_disponiveis})
+        col_uf, col_botao = st.columns([2, 1], vertical_alignment="bottom")
+        with col_uf:
+            uf_inteira = st.selectbox("Adicionar UF inteira", ufs_disponiveis, index=None, placeholder="UF")
+        with col_botao:
+            st.button(
+                "Adicionar",
+                on_click=adicionar_municipios_da_uf,
+                args=(uf_inteira, municipios_disponiveis),
+                disabled=uf_inteira is None,
+                use_container_width=True
+            )
+        
         if not municipios_selecionados:
             st.warning("⚠️ Selecione pelo menos um município")
             st.stop()
@@ -222,617 +739,733 @@ with st.sidebar:
         modo_visualizacao = st.radio(
             "Modo de Visualização",
             ["Comparativo", "Individual"],
-            index=0,
+            index=1 if estado_url['modo'] == "Individual" else 0,
             help="Comparativo: todos em um gráfico | Individual: gráficos separados"
         )
     else:
         modo_visualizacao = "Individual"
+    
+    # Resumo estatístico no lugar de uma linha por município (padrão para seleções grandes)
+    if len(municipios_selecionados) > 2 and modo_visualizacao == "Comparativo":
+        resumo_percentis = st.checkbox(
+            "Resumir em faixa de percentis",
+            value=resumo_percentis_padrao(len(municipios_selecionados)),
+            help="Mostra a mediana e a faixa P10–P90 entre os municípios selecionados"
+        )
+    else:
+        resumo_percentis = False
 
-# Carregar todos os dados
-df_cmi = carregar_dados_por_tipo('CMI')
-df_cmi_mil = carregar_dados_por_tipo('CMI_MIL')
-df_nv = carregar_dados_por_tipo('NV')
-df_ob = carregar_dados_por_tipo('OB')
-
-# Preparar dados para todos os municípios selecionados
-dados_municipios = {}
-for mun_sel in municipios_selecionados:
-    nome_mun, uf_mun = mun_sel.rsplit(' - ', 1)
-    dados_municipios[mun_sel] = {
-        'cmi': df_cmi[(df_cmi['Municipio'] == nome_mun) & (df_cmi['UF'] == uf_mun)].sort_values('Ano'),
-        'cmi_mil': df_cmi_mil[(df_cmi_mil['Municipio'] == nome_mun) & (df_cmi_mil['UF'] == uf_mun)].sort_values('Ano'),
-        'nv': df_nv[(df_nv['Municipio'] == nome_mun) & (df_nv['UF'] == uf_mun)].sort_values('Ano'),
-        'ob': df_ob[(df_ob['Municipio'] == nome_mun) & (df_ob['UF'] == uf_mun)].sort_values('Ano')
-    }
+# Séries de todos os municípios selecionados em um único bloco alinhado (busca pelo código IBGE)
+codigos_selecionados = tuple(municipios_disponiveis[mun_sel] for mun_sel in municipios_selecionados)
+versao_dados_atual = obter_versao_dados()
+with medir('carga_dados'):
+    bloco = obter_pacote(codigos_selecionados, versao=versao_dados_atual)
 
 # Verificar se há dados para pelo menos um município
-tem_dados = any(
-    not dados['cmi'].empty or not dados['cmi_mil'].empty or 
-    not dados['nv'].empty or not dados['ob'].empty 
-    for dados in dados_municipios.values()
-)
+tem_dados = bloco_tem_dados(bloco)
 
 if not tem_dados:
     st.error("Nenhum dado encontrado para os municípios selecionados")
     st.stop()
 
-# Obter intervalo de anos disponível em todos os dados
-anos_disponiveis = set()
-for dados in dados_municipios.values():
-    for df in [dados['cmi'], dados['cmi_mil'], dados['nv'], dados['ob']]:
-        if not df.empty and 'Ano' in df.columns:
-            anos_disponiveis.update(df['Ano'].unique())
+# Intervalo de anos disponível: o bloco já cobre apenas os anos com dado nos municípios selecionados
+ano_min = int(bloco['anos'][0])
+ano_max = int(bloco['anos'][-1])
 
-if anos_disponiveis:
-    ano_min = int(min(anos_disponiveis))
-    ano_max = int(max(anos_disponiveis))
+# Adicionar filtro de anos na sidebar (após os municípios)
+with st.sidebar:
+    st.markdown("---")
+    st.markdown("### 📅 Filtro de Período")
     
-    # Adicionar filtro de anos na sidebar (após os municípios)
-    with st.sidebar:
-        st.markdown("---")
-        st.markdown("### 📅 Filtro de Período")
-        
-        intervalo_anos = st.slider(
-            "Selecione o período de análise",
-            min_value=ano_min,
-            max_value=ano_max,
-            value=(ano_min, ano_max),
-            step=1,
-            help="Arraste para ajustar o período inicial e final da análise"
+    # Período da URL limitado aos anos disponíveis; sem ele, o intervalo completo
+    if estado_url['anos']:
+        valor_inicial = (
+            min(max(estado_url['anos'][0], ano_min), ano_max),
+            max(min(estado_url['anos'][1], ano_max), ano_min),
         )
-        
-        ano_inicio, ano_fim = intervalo_anos
-        st.caption(f"Período selecionado: **{ano_inicio}** a **{ano_fim}** ({ano_fim - ano_inicio + 1} anos)")
-    
-    # Filtrar dados de acordo com o período selecionado
-    for mun_sel in dados_municipios:
-        dados_municipios[mun_sel]['cmi'] = dados_municipios[mun_sel]['cmi'][
-            (dados_municipios[mun_sel]['cmi']['Ano'] >= ano_inicio) & 
-            (dados_municipios[mun_sel]['cmi']['Ano'] <= ano_fim)
-        ]
-        dados_municipios[mun_sel]['cmi_mil'] = dados_municipios[mun_sel]['cmi_mil'][
-            (dados_municipios[mun_sel]['cmi_mil']['Ano'] >= ano_inicio) & 
-            (dados_municipios[mun_sel]['cmi_mil']['Ano'] <= ano_fim)
-        ]
-        dados_municipios[mun_sel]['nv'] = dados_municipios[mun_sel]['nv'][
-            (dados_municipios[mun_sel]['nv']['Ano'] >= ano_inicio) & 
-            (dados_municipios[mun_sel]['nv']['Ano'] <= ano_fim)
-        ]
-        dados_municipios[mun_sel]['ob'] = dados_municipios[mun_sel]['ob'][
-            (dados_municipios[mun_sel]['ob']['Ano'] >= ano_inicio) & 
-            (dados_municipios[mun_sel]['ob']['Ano'] <= ano_fim)
-        ]
-else:
-    ano_inicio = None
-    ano_fim = None
+    else:
+        valor_inicial = (ano_min, ano_max)
+    
+    intervalo_anos = st.slider(
+        "Selecione o período de análise",
+        min_value=ano_min,
+        max_value=ano_max,
+        value=valor_inicial,
+        step=1,
+        help="Arraste para ajustar o período inicial e final da análise"
+    )
+    
+    ano_inicio, ano_fim = intervalo_anos
+    st.caption(f"Período selecionado: **{ano_inicio}** a **{ano_fim}** ({ano_fim - ano_inicio + 1} anos)")
 
-if not tem_dados:
-    st.error("Nenhum dado encontrado para os municípios selecionados")
-    st.stop()
+# Recortar o bloco no período selecionado e separar as séries de cada município
+with medir('filtro_anos'):
+    bloco = obter_pacote(codigos_selecionados, (ano_inicio, ano_fim), versao_dados_atual)
+with medir('dados_municipios'):
+    dados_municipios = separar_series(bloco, municipios_selecionados)
 
-# ====================================================================================
-# SEÇÃO 1: COEFICIENTE DE MORTALIDADE INFANTIL (CMI)
-# ====================================================================================
-st.markdown('<div class="section-header">Coeficiente de Mortalidade Infantil</div>', unsafe_allow_html=True)
+entradas = montar_entradas(
+    municipios_selecionados, codigos_selecionados, dados_municipios,
+    (ano_inicio, ano_fim), modo_visualizacao, resumo_percentis, versao_dados_atual
+)
+
+# Estado atual na URL (link compartilhável) e no registro de acessos, só quando muda
+estado_atual = (codigos_selecionados, (ano_inicio, ano_fim), modo_visualizacao)
+if st.session_state.get("ultimo_estado") != estado_atual:
+    st.session_state["ultimo_estado"] = estado_atual
+    st.query_params.from_dict(codificar_estado(*estado_atual))
+    registrar_acesso(*estado_atual)
 
-if len(municipios_selecionados) > 1 and modo_visualizacao == "Comparativo":
-    # Modo comparativo - todos os municípios em um gráfico
+@st.fragment
+@medir('sugestao_semelhantes')
+def sugestao_semelhantes(entradas, municipios_disponiveis):
+    """Sidebar: municípios com trajetória de CMI/CMI-Mil mais parecida com a de um município da seleção"""
+    import pandas as pd
+
+    st.markdown("---")
+    st.markdown("### 🔎 Municípios Semelhantes")
+    referencia = st.selectbox("Parecidos com", entradas['municipios'], key="semelhantes_referencia")
+    col_quantidade, col_metrica = st.columns([1, 2])
+    with col_quantidade:
+        quantidade = st.number_input(
+            "Quantos", min_value=1, max_value=MAX_SEMELHANTES, value=K_PADRAO, step=1, key="semelhantes_k"
+        )
+    with col_metrica:
+        metrica = st.selectbox(
+            "Distância",
+            list(METRICAS),
+            format_func=METRICAS.get,
+            key="semelhantes_metrica",
+            help="Euclidiana: séries próximas em nível e forma | Correlação: mesma tendência, em qualquer nível"
+        )
+    
+    semelhantes = municipios_semelhantes(
+        indice_semelhanca(), entradas['codigos'][referencia], int(quantidade), metrica, entradas['anos']
+    )
+    if semelhantes.empty:
+        st.caption(f"Nenhum município com pelo menos {MIN_ANOS_COMUNS} anos de CMI/CMI-Mil em comum no período")
+        return
     
-    # CMI-Mil PRIMEIRO - Largura total com controle de linhas suavizadas
+    rotulos_por_codigo = {codigo: rotulo for rotulo, codigo in municipios_disponiveis.items()}
+    rotulos = [rotulos_por_codigo[codigo] for codigo in semelhantes['Codigo_Municipio']]
+    st.dataframe(
+        pd.DataFrame({'Município': rotulos, 'Distância': semelhantes['Distancia'].round(3)}),
+        use_container_width=True,
+        hide_index=True
+    )
+    novos = [rotulo for rotulo in rotulos if rotulo not in entradas['codigos']]
+    # O callback altera a seleção; o rerun completo redesenha a sidebar e as seções com ela
+    if st.button(
+        "Adicionar à seleção",
+        on_click=adicionar_municipios,
+        args=(novos,),
+        disabled=not novos,
+        use_container_width=True,
+        key="semelhantes_adicionar"
+    ):
+        st.rerun()
+
+with st.sidebar:
+    sugestao_semelhantes(entradas, municipios_disponiveis)
+
+@st.fragment
+def grafico_cmi_mil_topo(entradas, dados_cmi_mil_comp):
+    """Gráfico CMI-Mil de largura total; o controle de linhas suavizadas reexecuta só este fragmento"""
     col_titulo, col_controle = st.columns([3, 1])
     with col_titulo:
         st.markdown("### CMI-Mil - Comparação entre Municípios")
     with col_controle:
         linhas_suavizadas = st.checkbox("Linhas Suavizadas", value=True, key="suavizar_cmi_mil_topo")
     
-    dados_cmi_mil_comp = {mun: dados['cmi_mil'] for mun, dados in dados_municipios.items() if not dados['cmi_mil'].empty}
-    if dados_cmi_mil_comp:
-        # Criar gráfico com ou sem suavização
-        fig = go.Figure()
-        
-        for municipio, df in dados_cmi_mil_comp.items():
-            fig.add_trace(go.Scatter(
-                x=df['Ano'],
-                y=df['Valor'],
-                mode='lines+markers',
-                name=municipio,
-                line=dict(shape='spline' if linhas_suavizadas else 'linear', width=2),
-                marker=dict(size=8)
-            ))
-        
-        fig.update_layout(
-            title='Comparação CMI-Mil',
-            xaxis_title='Ano',
-            yaxis_title='CMI-Mil',
-            hovermode='x unified',
-            height=500,
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    else:
+    if not dados_cmi_mil_comp:
         st.warning("Dados CMI-Mil não disponíveis")
+    elif entradas['resumo_percentis'] or len(dados_cmi_mil_comp) > LIMITE_TRACOS_SVG:
+        # Linhas suavizadas (spline) não existem em WebGL: seleções grandes usam o modo comparativo padrão
+        exibir_comparacao_municipios(entradas, dados_cmi_mil_comp, *COMPARACOES['cmi_mil'], chave='cmi_mil_topo')
+    else:
+        exibir_grafico(
+            entradas, 'cmi_mil_suavizado', codigos_de(entradas, dados_cmi_mil_comp), (linhas_suavizadas,),
+            lambda: criar_grafico_suavizado(dados_cmi_mil_comp, linhas_suavizadas)
+        )
+
+# ====================================================================================
+# SEÇÃO 1: COEFICIENTE DE MORTALIDADE INFANTIL (CMI)
+# ====================================================================================
+@st.fragment
+@medir('secao_cmi')
+def secao_cmi(entradas):
+    """Seção 1: CMI e CMI-Mil (evolução, estatísticas e comparação entre as duas métricas)"""
+    import pandas as pd
+
+    municipios_selecionados = entradas['municipios']
+    dados_municipios = entradas['dados']
+    modo_visualizacao = entradas['modo']
     
-    st.markdown("---")
+    st.markdown('<div class="section-header">Coeficiente de Mortalidade Infantil</div>', unsafe_allow_html=True)
+
+    if len(municipios_selecionados) > 1 and modo_visualizacao == "Comparativo":
+        # Modo comparativo - todos os municípios em um gráfico
     
-    # SEGUNDA LINHA: CMI (esquerda) e CMI-Mil (direita) - Mantém layout individual
-    col1, col2 = st.columns(2)
+        # CMI-Mil PRIMEIRO - Largura total com controle de linhas suavizadas
+        dados_cmi_mil_comp = {mun: dados['cmi_mil'] for mun, dados in dados_municipios.items() if not dados['cmi_mil'].empty}
+        grafico_cmi_mil_topo(entradas, dados_cmi_mil_comp)
     
-    with col1:
-        st.markdown("### CMI - Comparação entre Municípios")
-        dados_cmi_comp = {mun: dados['cmi'] for mun, dados in dados_municipios.items() if not dados['cmi'].empty}
-        if dados_cmi_comp:
-            fig = criar_grafico_multiplos_municipios(dados_cmi_comp, 'CMI', 'Comparação CMI')
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("Dados CMI não disponíveis")
+        st.markdown("---")
     
-    with col2:
-        st.markdown("### CMI-Mil - Comparação entre Municípios")
-        # Mesmo gráfico do topo, mas normal (sem suavização)
-        if dados_cmi_mil_comp:
-            fig_mil = criar_grafico_multiplos_municipios(dados_cmi_mil_comp, 'CMI-Mil', 'Comparação CMI-Mil')
-            st.plotly_chart(fig_mil, use_container_width=True)
-        else:
-            st.warning("Dados CMI-Mil não disponíveis")
+        # SEGUNDA LINHA: CMI (esquerda) e CMI-Mil (direita) - Mantém layout individual
+        col1, col2 = st.columns(2)
     
-    st.markdown("---")
+        with col1:
+            st.markdown("### CMI - Comparação entre Municípios")
+            dados_cmi_comp = {mun: dados['cmi'] for mun, dados in dados_municipios.items() if not dados['cmi'].empty}
+            if dados_cmi_comp:
+                exibir_comparacao_municipios(entradas, dados_cmi_comp, *COMPARACOES['cmi'])
+            else:
+                st.warning("Dados CMI não disponíveis")
     
-    # TERCEIRA LINHA: Estatísticas Comparativas
-# TERCEIRA LINHA: Estatísticas Comparativas
-    st.markdown("### Estatísticas Comparativas")
-    
-    # Preparar dados de estatísticas
-    estatisticas_data = []
-    for mun, dados in dados_municipios.items():
-        if not dados['cmi'].empty:
-            estatisticas_data.append({
-                'Município': mun,
-                'Indicador': 'CMI',
-                'Média': f"{dados['cmi']['Valor'].mean():.1f}",
-                'Mínimo': f"{dados['cmi']['Valor'].min():.1f}",
-                'Máximo': f"{dados['cmi']['Valor'].max():.1f}"
-            })
-        if not dados['cmi_mil'].empty:
-            estatisticas_data.append({
-                'Município': mun,
-                'Indicador': 'CMI-Mil',
-                'Média': f"{dados['cmi_mil']['Valor'].mean():.1f}",
-                'Mínimo': f"{dados['cmi_mil']['Valor'].min():.1f}",
-                'Máximo': f"{dados['cmi_mil']['Valor'].max():.1f}"
-            })
-    
-    if estatisticas_data:
-        df_estatisticas = pd.DataFrame(estatisticas_data)
-        st.dataframe(df_estatisticas, use_container_width=True, hide_index=True, height=400)
-    else:
-        st.info("Nenhuma estatística disponível")
+        with col2:
+            st.markdown("### CMI-Mil - Comparação entre Municípios")
+            # Mesmo gráfico do topo, mas normal (sem suavização)
+            if dados_cmi_mil_comp:
+                exibir_comparacao_municipios(entradas, dados_cmi_mil_comp, *COMPARACOES['cmi_mil'])
+            else:
+                st.warning("Dados CMI-Mil não disponíveis")
+    
+        st.markdown("---")
+    
+            # TERCEIRA LINHA: Estatísticas Comparativas
+        st.markdown("### Estatísticas Comparativas")
+    
+        # Preparar dados de estatísticas
+        estatisticas_data = []
+        for mun, dados in dados_municipios.items():
+            if not dados['cmi'].empty:
+                estatisticas_data.append({
+                    'Município': mun,
+                    'Indicador': 'CMI',
+                    'Média': f"{dados['cmi']['Valor'].mean():.1f}",
+                    'Mínimo': f"{dados['cmi']['Valor'].min():.1f}",
+                    'Máximo': f"{dados['cmi']['Valor'].max():.1f}"
+                })
+            if not dados['cmi_mil'].empty:
+                estatisticas_data.append({
+                    'Município': mun,
+                    'Indicador': 'CMI-Mil',
+                    'Média': f"{dados['cmi_mil']['Valor'].mean():.1f}",
+                    'Mínimo': f"{dados['cmi_mil']['Valor'].min():.1f}",
+                    'Máximo': f"{dados['cmi_mil']['Valor'].max():.1f}"
+                })
+    
+        if estatisticas_data:
+            df_estatisticas = pd.DataFrame(estatisticas_data)
+            st.dataframe(df_estatisticas, use_container_width=True, hide_index=True, height=400)
+        else:
+            st.info("Nenhuma estatística disponível")
 
-else:
-    # Modo individual - um município por vez ou apenas um selecionado
-    for mun_sel in municipios_selecionados:
-        nome_municipio, uf = mun_sel.rsplit(' - ', 1)
-        dados_mun = dados_municipios[mun_sel]
+    else:
+        # Modo individual - um município por vez ou apenas um selecionado
+        for mun_sel in paginar(municipios_selecionados, 'pagina_cmi'):
+            nome_municipio, uf = mun_sel.rsplit(' - ', 1)
+            dados_mun = dados_municipios[mun_sel]
         
-        if len(municipios_selecionados) > 1:
-            st.markdown(f"### {nome_municipio} - {uf}")
+            if len(municipios_selecionados) > 1:
+                st.markdown(f"### {nome_municipio} - {uf}")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            if not dados_mun['cmi'].empty:
-                st.plotly_chart(
-                    criar_grafico_linha(dados_mun['cmi'], f"CMI - {nome_municipio}", '#e74c3c', 'CMI'),
-                    use_container_width=True
-                )
+            with col1:
+                if not dados_mun['cmi'].empty:
+                    exibir_grafico(
+                        entradas, 'linha', [entradas['codigos'][mun_sel]], ('cmi',),
+                        lambda: criar_grafico_linha(dados_mun['cmi'], f"CMI - {nome_municipio}", '#e74c3c', 'CMI')
+                    )
                 
-                col_a, col_b, col_c = st.columns(3)
-                col_a.metric("Média", f"{dados_mun['cmi']['Valor'].mean():.1f}")
-                col_b.metric("Mínimo", f"{dados_mun['cmi']['Valor'].min():.1f}")
-                col_c.metric("Máximo", f"{dados_mun['cmi']['Valor'].max():.1f}")
-            else:
-                st.warning("Dados CMI não disponíveis")
+                    col_a, col_b, col_c = st.columns(3)
+                    col_a.metric("Média", f"{dados_mun['cmi']['Valor'].mean():.1f}")
+                    col_b.metric("Mínimo", f"{dados_mun['cmi']['Valor'].min():.1f}")
+                    col_c.metric("Máximo", f"{dados_mun['cmi']['Valor'].max():.1f}")
+                else:
+                    st.warning("Dados CMI não disponíveis")
         
-        with col2:
-            if not dados_mun['cmi_mil'].empty:
-                st.plotly_chart(
-                    criar_grafico_linha(dados_mun['cmi_mil'], f"CMI-Mil - {nome_municipio}", '#3498db', 'CMI-Mil'),
-                    use_container_width=True
-                )
+            with col2:
+                if not dados_mun['cmi_mil'].empty:
+                    exibir_grafico(
+                        entradas, 'linha', [entradas['codigos'][mun_sel]], ('cmi_mil',),
+                        lambda: criar_grafico_linha(dados_mun['cmi_mil'], f"CMI-Mil - {nome_municipio}", '#3498db', 'CMI-Mil')
+                    )
                 
-                col_a, col_b, col_c = st.columns(3)
-                col_a.metric("Média", f"{dados_mun['cmi_mil']['Valor'].mean():.1f}")
-                col_b.metric("Mínimo", f"{dados_mun['cmi_mil']['Valor'].min():.1f}")
-                col_c.metric("Máximo", f"{dados_mun['cmi_mil']['Valor'].max():.1f}")
-            else:
-                st.warning("Dados CMI-Mil não disponíveis")
+                    col_a, col_b, col_c = st.columns(3)
+                    col_a.metric("Média", f"{dados_mun['cmi_mil']['Valor'].mean():.1f}")
+                    col_b.metric("Mínimo", f"{dados_mun['cmi_mil']['Valor'].min():.1f}")
+                    col_c.metric("Máximo", f"{dados_mun['cmi_mil']['Valor'].max():.1f}")
+                else:
+                    st.warning("Dados CMI-Mil não disponíveis")
         
-        if len(municipios_selecionados) > 1:
-            st.markdown("---")
+            if len(municipios_selecionados) > 1:
+                st.markdown("---")
 
-# Comparação CMI vs CMI-MIL
-st.markdown("---")
-st.markdown("### Comparação CMI vs CMI-Mil")
+    # Comparação CMI vs CMI-MIL
+    st.markdown("---")
+    st.markdown("### Comparação CMI vs CMI-Mil")
 
-if len(municipios_selecionados) > 1 and modo_visualizacao == "Comparativo":
-    # Mostrar comparações lado a lado para cada município
-    for mun_sel in municipios_selecionados:
-        nome_municipio, uf = mun_sel.rsplit(' - ', 1)
-        dados_mun = dados_municipios[mun_sel]
-        
-        if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
-            st.markdown(f"#### {nome_municipio} - {uf}")
-            st.plotly_chart(
-                criar_grafico_comparacao(dados_mun['cmi'], dados_mun['cmi_mil'], 'CMI', 'CMI-Mil', 
-                                        f'CMI vs CMI-Mil - {nome_municipio}'),
-                use_container_width=True
-            )
-else:
-    # Modo individual
-    for mun_sel in municipios_selecionados:
-        nome_municipio, uf = mun_sel.rsplit(' - ', 1)
-        dados_mun = dados_municipios[mun_sel]
+    if len(municipios_selecionados) > 1 and modo_visualizacao == "Comparativo":
+        # Mostrar comparações lado a lado para cada município
+        for mun_sel in paginar(municipios_selecionados, 'pagina_cmi_vs_mil'):
+            nome_municipio, uf = mun_sel.rsplit(' - ', 1)
+            dados_mun = dados_municipios[mun_sel]
         
-        if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
-            if len(municipios_selecionados) > 1:
+            if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
                 st.markdown(f"#### {nome_municipio} - {uf}")
+                exibir_grafico(
+                    entradas, 'comparacao', [entradas['codigos'][mun_sel]], ('CMI vs CMI-Mil',),
+                    lambda: criar_grafico_comparacao(dados_mun['cmi'], dados_mun['cmi_mil'], 'CMI', 'CMI-Mil',
+                                                     f'CMI vs CMI-Mil - {nome_municipio}')
+                )
+    else:
+        # Modo individual
+        for mun_sel in paginar(municipios_selecionados, 'pagina_cmi_vs_mil'):
+            nome_municipio, uf = mun_sel.rsplit(' - ', 1)
+            dados_mun = dados_municipios[mun_sel]
+        
+            if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
+                if len(municipios_selecionados) > 1:
+                    st.markdown(f"#### {nome_municipio} - {uf}")
             
-            st.plotly_chart(
-                criar_grafico_comparacao(dados_mun['cmi'], dados_mun['cmi_mil'], 'CMI', 'CMI-Mil', 
-                                        f'Comparação CMI vs CMI-Mil - {nome_municipio}'),
-                use_container_width=True
-            )
+                exibir_grafico(
+                    entradas, 'comparacao', [entradas['codigos'][mun_sel]], ('Comparação CMI vs CMI-Mil',),
+                    lambda: criar_grafico_comparacao(dados_mun['cmi'], dados_mun['cmi_mil'], 'CMI', 'CMI-Mil',
+                                                     f'Comparação CMI vs CMI-Mil - {nome_municipio}')
+                )
 
-st.markdown("""
-<div class="explanation-box">
-<b>Sobre esta comparação:</b><br>
-• <b>CMI</b>: Métrica tradicional de mortalidade infantil, pode apresentar imprecisões devido à metodologia de cálculo<br>
-• <b>CMI-Mil</b>: Indicador baseado em dados factuais e melhor metodologia, gerando resultados mais fiéis à realidade<br>
-• Esta visualização permite comparar as duas métricas ao longo do tempo e identificar discrepâncias
-</div>
-""", unsafe_allow_html=True)
+    st.markdown("""
+    <div class="explanation-box">
+    <b>Sobre esta comparação:</b><br>
+    • <b>CMI</b>: Métrica tradicional de mortalidade infantil, pode apresentar imprecisões devido à metodologia de cálculo<br>
+    • <b>CMI-Mil</b>: Indicador baseado em dados factuais e melhor metodologia, gerando resultados mais fiéis à realidade<br>
+    • Esta visualização permite comparar as duas métricas ao longo do tempo e identificar discrepâncias
+    </div>
+    """, unsafe_allow_html=True)
+
+secao_cmi(entradas)
 
 # ====================================================================================
 # SEÇÃO 2: NASCIDOS VIVOS E ÓBITOS
 # ====================================================================================
-st.markdown('<div class="section-header">Nascidos Vivos e Óbitos Infantis</div>', unsafe_allow_html=True)
-
-if len(municipios_selecionados) > 1 and modo_visualizacao == "Comparativo":
-    # Modo comparativo
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### Nascidos Vivos - Comparação")
-        dados_nv_comp = {mun: dados['nv'] for mun, dados in dados_municipios.items() if not dados['nv'].empty}
-        if dados_nv_comp:
-            fig = criar_grafico_multiplos_municipios(dados_nv_comp, 'Nascidos Vivos', 'Comparação de Nascidos Vivos')
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("Dados de Nascidos Vivos não disponíveis")
-    
-    with col2:
-        st.markdown("### Óbitos Infantis - Comparação")
-        dados_ob_comp = {mun: dados['ob'] for mun, dados in dados_municipios.items() if not dados['ob'].empty}
-        if dados_ob_comp:
-            fig = criar_grafico_multiplos_municipios(dados_ob_comp, 'Óbitos', 'Comparação de Óbitos Infantis')
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("Dados de Óbitos não disponíveis")
-    
-    # Tabela comparativa
-    st.markdown("### Estatísticas Comparativas")
-    estatisticas_nv_ob = []
-    for mun, dados in dados_municipios.items():
-        if not dados['nv'].empty:
-            estatisticas_nv_ob.append({
-                'Município': mun,
-                'Indicador': 'Nascidos Vivos',
-                'Total': f"{dados['nv']['Valor'].sum():,}",
-                'Média Anual': f"{dados['nv']['Valor'].mean():.0f}",
-                'Mín': f"{dados['nv']['Valor'].min()}",
-                'Máx': f"{dados['nv']['Valor'].max()}"
-            })
-        if not dados['ob'].empty:
-            estatisticas_nv_ob.append({
-                'Município': mun,
-                'Indicador': 'Óbitos Infantis',
-                'Total': f"{dados['ob']['Valor'].sum():,}",
-                'Média Anual': f"{dados['ob']['Valor'].mean():.0f}",
-                'Mín': f"{dados['ob']['Valor'].min()}",
-                'Máx': f"{dados['ob']['Valor'].max()}"
-            })
-    
-    if estatisticas_nv_ob:
-        df_stats = pd.DataFrame(estatisticas_nv_ob)
-        st.dataframe(df_stats, use_container_width=True, hide_index=True)
-
-else:
-    # Modo individual
-    for mun_sel in municipios_selecionados:
-        nome_municipio, uf = mun_sel.rsplit(' - ', 1)
-        dados_mun = dados_municipios[mun_sel]
+@st.fragment
+@medir('secao_nascidos_obitos')
+def secao_nascidos_obitos(entradas):
+    """Seção 2: Nascidos Vivos e Óbitos Infantis"""
+    import pandas as pd
+
+    municipios_selecionados = entradas['municipios']
+    dados_municipios = entradas['dados']
+    modo_visualizacao = entradas['modo']
+    
+    st.markdown('<div class="section-header">Nascidos Vivos e Óbitos Infantis</div>', unsafe_allow_html=True)
+
+    # Séries mensais (abas do SINASC/SIM exportadas por mês): eixo ano/mês nos painéis individuais
+    mensais = {chave: carregar_series_mensais(INDICADORES_DASHBOARD[chave]) for chave in ('nv', 'ob')}
+    if any(armazem is not None for armazem in mensais.values()):
+        granularidade = st.radio("Granularidade", ["Anual", "Mensal"], horizontal=True, key="granularidade_nv_ob")
+        if granularidade == "Mensal" and len(municipios_selecionados) > 1 and modo_visualizacao == "Comparativo":
+            st.caption("A série mensal aparece no modo Individual; a comparação entre municípios segue anual")
+    else:
+        granularidade = "Anual"
+    if granularidade == "Anual":
+        mensais = dict.fromkeys(mensais)
+
+    if len(municipios_selecionados) > 1 and modo_visualizacao == "Comparativo":
+        # Modo comparativo
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            st.markdown("### Nascidos Vivos - Comparação")
+            dados_nv_comp = {mun: dados['nv'] for mun, dados in dados_municipios.items() if not dados['nv'].empty}
+            if dados_nv_comp:
+                exibir_comparacao_municipios(entradas, dados_nv_comp, *COMPARACOES['nv'])
+            else:
+                st.warning("Dados de Nascidos Vivos não disponíveis")
+    
+        with col2:
+            st.markdown("### Óbitos Infantis - Comparação")
+            dados_ob_comp = {mun: dados['ob'] for mun, dados in dados_municipios.items() if not dados['ob'].empty}
+            if dados_ob_comp:
+                exibir_comparacao_municipios(entradas, dados_ob_comp, *COMPARACOES['ob'])
+            else:
+                st.warning("Dados de Óbitos não disponíveis")
+    
+        # Tabela comparativa
+        st.markdown("### Estatísticas Comparativas")
+        estatisticas_nv_ob = []
+        for mun, dados in dados_municipios.items():
+            if not dados['nv'].empty:
+                estatisticas_nv_ob.append({
+                    'Município': mun,
+                    'Indicador': 'Nascidos Vivos',
+                    'Total': f"{dados['nv']['Valor'].sum():,}",
+                    'Média Anual': f"{dados['nv']['Valor'].mean():.0f}",
+                    'Mín': f"{dados['nv']['Valor'].min()}",
+                    'Máx': f"{dados['nv']['Valor'].max()}"
+                })
+            if not dados['ob'].empty:
+                estatisticas_nv_ob.append({
+                    'Município': mun,
+                    'Indicador': 'Óbitos Infantis',
+                    'Total': f"{dados['ob']['Valor'].sum():,}",
+                    'Média Anual': f"{dados['ob']['Valor'].mean():.0f}",
+                    'Mín': f"{dados['ob']['Valor'].min()}",
+                    'Máx': f"{dados['ob']['Valor'].max()}"
+                })
+    
+        if estatisticas_nv_ob:
+            df_stats = pd.DataFrame(estatisticas_nv_ob)
+            st.dataframe(df_stats, use_container_width=True, hide_index=True)
+
+    else:
+        # Modo individual
+        for mun_sel in paginar(municipios_selecionados, 'pagina_nv_ob'):
+            nome_municipio, uf = mun_sel.rsplit(' - ', 1)
+            dados_mun = dados_municipios[mun_sel]
         
-        if len(municipios_selecionados) > 1:
-            st.markdown(f"### {nome_municipio} - {uf}")
+            if len(municipios_selecionados) > 1:
+                st.markdown(f"### {nome_municipio} - {uf}")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.markdown("#### Nascidos Vivos")
-            if not dados_mun['nv'].empty:
-                st.plotly_chart(
-                    criar_grafico_linha(dados_mun['nv'], f"Nascidos Vivos - {nome_municipio}", '#2ecc71', 'Nascidos Vivos'),
-                    use_container_width=True
-                )
+            with col1:
+                st.markdown("#### Nascidos Vivos")
+                if not dados_mun['nv'].empty:
+                    exibir_linha_nv_ob(
+                        entradas, mun_sel, 'nv', mensais['nv'], f"Nascidos Vivos - {nome_municipio}", '#2ecc71', 'Nascidos Vivos'
+                    )
                 
-                col_a, col_b, col_c, col_d = st.columns(4)
-                total_nv = dados_mun['nv']['Valor'].sum()
-                media_nv = dados_mun['nv']['Valor'].mean()
-                min_nv = dados_mun['nv']['Valor'].min()
-                max_nv = dados_mun['nv']['Valor'].max()
+                    col_a, col_b, col_c, col_d = st.columns(4)
+                    total_nv = dados_mun['nv']['Valor'].sum()
+                    media_nv = dados_mun['nv']['Valor'].mean()
+                    min_nv = dados_mun['nv']['Valor'].min()
+                    max_nv = dados_mun['nv']['Valor'].max()
                 
-                col_a.metric("Total", f"{total_nv:,}")
-                col_b.metric("Média Anual", f"{media_nv:.0f}")
-                col_c.metric("Mínimo", f"{min_nv}")
-                col_d.metric("Máximo", f"{max_nv}")
-            else:
-                st.warning("Dados de Nascidos Vivos não disponíveis")
+                    col_a.metric("Total", f"{total_nv:,}")
+                    col_b.metric("Média Anual", f"{media_nv:.0f}")
+                    col_c.metric("Mínimo", f"{min_nv}")
+                    col_d.metric("Máximo", f"{max_nv}")
+                else:
+                    st.warning("Dados de Nascidos Vivos não disponíveis")
         
-        with col2:
-            st.markdown("#### Óbitos Infantis")
-            if not dados_mun['ob'].empty:
-                st.plotly_chart(
-                    criar_grafico_linha(dados_mun['ob'], f"Óbitos Infantis - {nome_municipio}", '#e67e22', 'Óbitos'),
-                    use_container_width=True
-                )
+            with col2:
+                st.markdown("#### Óbitos Infantis")
+                if not dados_mun['ob'].empty:
+                    exibir_linha_nv_ob(
+                        entradas, mun_sel, 'ob', mensais['ob'], f"Óbitos Infantis - {nome_municipio}", '#e67e22', 'Óbitos'
+                    )
                 
-                col_a, col_b, col_c, col_d = st.columns(4)
-                total_ob = dados_mun['ob']['Valor'].sum()
-                media_ob = dados_mun['ob']['Valor'].mean()
-                min_ob = dados_mun['ob']['Valor'].min()
-                max_ob = dados_mun['ob']['Valor'].max()
+                    col_a, col_b, col_c, col_d = st.columns(4)
+                    total_ob = dados_mun['ob']['Valor'].sum()
+                    media_ob = dados_mun['ob']['Valor'].mean()
+                    min_ob = dados_mun['ob']['Valor'].min()
+                    max_ob = dados_mun['ob']['Valor'].max()
                 
-                col_a.metric("Total", f"{total_ob:,}")
-                col_b.metric("Média Anual", f"{media_ob:.0f}")
-                col_c.metric("Mínimo", f"{min_ob}")
-                col_d.metric("Máximo", f"{max_ob}")
-            else:
-                st.warning("Dados de Óbitos não disponíveis")
+                    col_a.metric("Total", f"{total_ob:,}")
+                    col_b.metric("Média Anual", f"{media_ob:.0f}")
+                    col_c.metric("Mínimo", f"{min_ob}")
+                    col_d.metric("Máximo", f"{max_ob}")
+                else:
+                    st.warning("Dados de Óbitos não disponíveis")
         
-        if len(municipios_selecionados) > 1:
-            st.markdown("---")
+            if len(municipios_selecionados) > 1:
+                st.markdown("---")
+
+secao_nascidos_obitos(entradas)
 
 # ====================================================================================
 # SEÇÃO 3: MÉTRICAS COMPARATIVAS
 # ====================================================================================
-st.markdown('<div class="section-header">Métricas Comparativas</div>', unsafe_allow_html=True)
-
-# Criar abas para cada métrica
-tab1, tab2, tab3 = st.tabs([
-    "Diferença Absoluta",
-    "Correlação",
-    "Análise de Períodos"
-])
+@st.fragment
+@medir('secao_metricas')
+def secao_metricas(entradas):
+    """Seção 3: Métricas comparativas (diferença, correlação e análise de períodos)"""
+    import pandas as pd
 
-# TAB 1: Diferença Absoluta CMI vs CMI-Mil
-with tab1:
-    st.markdown("### Diferença Absoluta: CMI vs CMI-Mil")
+    municipios_selecionados = entradas['municipios']
+    dados_municipios = entradas['dados']
     
-    st.markdown("""
-    <div class="explanation-box">
-    <b>Como interpretar:</b><br>
-    • <b style="color: green;">Barras verdes</b>: CMI é maior que CMI-Mil (possível superestimação do CMI)<br>
-    • <b style="color: red;">Barras vermelhas</b>: CMI é menor que CMI-Mil (possível subestimação do CMI)<br>
-    • Quanto maior a barra, maior a discrepância entre as duas métricas
-    </div>
-    """, unsafe_allow_html=True)
-    
-    for mun_sel in municipios_selecionados:
-        nome_municipio, uf = mun_sel.rsplit(' - ', 1)
-        dados_mun = dados_municipios[mun_sel]
-        
-        if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
-            if len(municipios_selecionados) > 1:
-                st.markdown(f"#### {nome_municipio} - {uf}")
-            
-            # Merge dos dados
-            df_merged = pd.merge(
-                dados_mun['cmi'][['Ano', 'Valor']],
-                dados_mun['cmi_mil'][['Ano', 'Valor']],
-                on='Ano',
-                suffixes=('_CMI', '_CMI_MIL')
-            )
-            df_merged['Diferenca'] = df_merged['Valor_CMI'] - df_merged['Valor_CMI_MIL']
-            
-            # Gráfico de diferença
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=df_merged['Ano'],
-                y=df_merged['Diferenca'],
-                marker_color=['green' if x >= 0 else 'red' for x in df_merged['Diferenca']],
-                name='Diferença (CMI - CMI-Mil)'
-            ))
-            fig.update_layout(
-                title=f'Diferença Absoluta entre CMI e CMI-Mil - {nome_municipio}',
-                xaxis_title='Ano',
-                yaxis_title='Diferença',
-                template='plotly_white',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Estatísticas
-            col1, col2, col3 = st.columns(3)
-            col1.metric("Média da Diferença", f"{df_merged['Diferenca'].mean():.1f}")
-            col2.metric("Maior Diferença", f"{df_merged['Diferenca'].max():.1f}")
-            col3.metric("Menor Diferença", f"{df_merged['Diferenca'].min():.1f}")
-            
-            if len(municipios_selecionados) > 1:
-                st.markdown("---")
+    st.markdown('<div class="section-header">Métricas Comparativas</div>', unsafe_allow_html=True)
 
-# TAB 2: Correlação
-with tab2:
-    st.markdown("### Correlação entre CMI e CMI-Mil")
+    # Criar abas para cada métrica
+    # on_change="rerun": só a aba aberta é executada (merges, regressões e figuras das demais ficam de fora)
+    tab1, tab2, tab3 = st.tabs([
+        "Diferença Absoluta",
+        "Correlação",
+        "Análise de Períodos"
+    ], key="aba_metricas", on_change="rerun")
+
+    # TAB 1: Diferença Absoluta CMI vs CMI-Mil
+    with tab1, medir('aba_diferenca', registrar=tab1.open):
+        if tab1.open:
+            st.markdown("### Diferença Absoluta: CMI vs CMI-Mil")
     
-    st.markdown("""
-    <div class="explanation-box">
-    <b>O que este gráfico mostra:</b><br>
-    • Cada ponto representa um ano de dados<br>
-    • Se os pontos estiverem próximos da linha de tendência (vermelha), indica alta correlação<br>
-    • Correlação > 0.7 = Alta similaridade entre as métricas<br>
-    • Correlação entre 0.4 e 0.7 = Similaridade moderada<br>
-    • Correlação < 0.4 = Baixa similaridade (maior discrepância entre as métricas)
-    </div>
-    """, unsafe_allow_html=True)
+            st.markdown("""
+            <div class="explanation-box">
+            <b>Como interpretar:</b><br>
+            • <b style="color: green;">Barras verdes</b>: CMI é maior que CMI-Mil (possível superestimação do CMI)<br>
+            • <b style="color: red;">Barras vermelhas</b>: CMI é menor que CMI-Mil (possível subestimação do CMI)<br>
+            • Quanto maior a barra, maior a discrepância entre as duas métricas
+            </div>
+            """, unsafe_allow_html=True)
     
-    for mun_sel in municipios_selecionados:
-        nome_municipio, uf = mun_sel.rsplit(' - ', 1)
-        dados_mun = dados_municipios[mun_sel]
-        
-        if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
-            if len(municipios_selecionados) > 1:
-                st.markdown(f"#### {nome_municipio} - {uf}")
+            for mun_sel in paginar(municipios_selecionados, 'pagina_diferenca'):
+                nome_municipio, uf = mun_sel.rsplit(' - ', 1)
+                dados_mun = dados_municipios[mun_sel]
             
-            df_merged = pd.merge(
-                dados_mun['cmi'][['Ano', 'Valor']],
-                dados_mun['cmi_mil'][['Ano', 'Valor']],
-                on='Ano',
-                suffixes=('_CMI', '_CMI_MIL')
-            )
-            
-            correlacao = df_merged['Valor_CMI'].corr(df_merged['Valor_CMI_MIL'])
-            
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                st.metric(
-                    "Correlação CMI ↔ CMI-Mil",
-                    f"{correlacao:.3f}",
-                    delta="Alta correlação" if abs(correlacao) > 0.7 else "Correlação moderada"
-                )
+                if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
+                    if len(municipios_selecionados) > 1:
+                        st.markdown(f"#### {nome_municipio} - {uf}")
                 
-                if abs(correlacao) > 0.7:
-                    interpretacao = "As duas métricas apresentam comportamento similar ao longo do tempo."
-                elif abs(correlacao) > 0.4:
-                    interpretacao = "As métricas mostram alguma similaridade, mas com discrepâncias notáveis."
-                else:
-                    interpretacao = "As métricas divergem significativamente, indicando diferenças metodológicas importantes."
+                    # Merge dos dados
+                    df_merged = pd.merge(
+                        dados_mun['cmi'][['Ano', 'Valor']],
+                        dados_mun['cmi_mil'][['Ano', 'Valor']],
+                        on='Ano',
+                        suffixes=('_CMI', '_CMI_MIL')
+                    )
+                    df_merged['Diferenca'] = df_merged['Valor_CMI'] - df_merged['Valor_CMI_MIL']
                 
-                st.markdown(f"""
-                <div class="info-box">
-                <b>Interpretação:</b><br>
-                {interpretacao}
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                # Scatter plot
-                fig = px.scatter(
-                    df_merged,
-                    x='Valor_CMI',
-                    y='Valor_CMI_MIL',
-                    labels={'Valor_CMI': 'CMI', 'Valor_CMI_MIL': 'CMI-Mil'},
-                    title=f'Correlação: CMI vs CMI-Mil - {nome_municipio}'
-                )
+                    # Gráfico de diferença
+                    exibir_grafico(
+                        entradas, 'diferenca', [entradas['codigos'][mun_sel]], (),
+                        lambda: criar_grafico_diferenca(df_merged, nome_municipio)
+                    )
                 
-                # Adicionar linha de tendência manual
-                if len(df_merged) > 1:
-                    z = np.polyfit(df_merged['Valor_CMI'], df_merged['Valor_CMI_MIL'], 1)
-                    p = np.poly1d(z)
-                    x_line = np.linspace(df_merged['Valor_CMI'].min(), df_merged['Valor_CMI'].max(), 100)
-                    fig.add_trace(go.Scatter(
-                        x=x_line, 
-                        y=p(x_line), 
-                        mode='lines', 
-                        name='Tendência',
-                        line=dict(color='red', dash='dash')
-                    ))
+                    # Estatísticas
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Média da Diferença", f"{df_merged['Diferenca'].mean():.1f}")
+                    col2.metric("Maior Diferença", f"{df_merged['Diferenca'].max():.1f}")
+                    col3.metric("Menor Diferença", f"{df_merged['Diferenca'].min():.1f}")
                 
-                fig.update_layout(height=350)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            if len(municipios_selecionados) > 1:
-                st.markdown("---")
+                    if len(municipios_selecionados) > 1:
+                        st.markdown("---")
 
-# TAB 3: Análise de Períodos
-with tab3:
-    st.markdown("### Análise de Períodos: Nascidos Vivos e Óbitos")
+    # TAB 2: Correlação
+    with tab2, medir('aba_correlacao', registrar=tab2.open):
+        if tab2.open:
+            st.markdown("### Correlação entre CMI e CMI-Mil")
     
-    st.markdown("""
-    <div class="explanation-box">
-    <b>Esta análise divide os dados em dois períodos iguais para identificar:</b><br>
-    • Mudanças na taxa de natalidade ao longo do tempo<br>
-    • Variações na mortalidade infantil<br>
-    • Anos com melhores e piores indicadores (menor óbito = melhor ano)
-    </div>
-    """, unsafe_allow_html=True)
+            st.markdown("""
+            <div class="explanation-box">
+            <b>O que este gráfico mostra:</b><br>
+            • Cada ponto representa um ano de dados<br>
+            • Se os pontos estiverem próximos da linha de tendência (vermelha), indica alta correlação<br>
+            • Correlação > 0.7 = Alta similaridade entre as métricas<br>
+            • Correlação entre 0.4 e 0.7 = Similaridade moderada<br>
+            • Correlação < 0.4 = Baixa similaridade (maior discrepância entre as métricas)
+            </div>
+            """, unsafe_allow_html=True)
     
-    for mun_sel in municipios_selecionados:
-        nome_municipio, uf = mun_sel.rsplit(' - ', 1)
-        dados_mun = dados_municipios[mun_sel]
-        
-        if len(municipios_selecionados) > 1:
-            st.markdown(f"#### {nome_municipio} - {uf}")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("##### Nascidos Vivos")
-            if not dados_mun['nv'].empty and len(dados_mun['nv']) > 1:
-                # Dividir em períodos
-                meio = len(dados_mun['nv']) // 2
-                periodo1 = dados_mun['nv'].iloc[:meio]
-                periodo2 = dados_mun['nv'].iloc[meio:]
-                
-                media_p1 = periodo1['Valor'].mean()
-                media_p2 = periodo2['Valor'].mean()
-                variacao = ((media_p2 - media_p1) / media_p1) * 100
+            for mun_sel in paginar(municipios_selecionados, 'pagina_correlacao'):
+                nome_municipio, uf = mun_sel.rsplit(' - ', 1)
+                dados_mun = dados_municipios[mun_sel]
+            
+                if not dados_mun['cmi'].empty and not dados_mun['cmi_mil'].empty:
+                    if len(municipios_selecionados) > 1:
+                        st.markdown(f"#### {nome_municipio} - {uf}")
                 
-                st.metric(
-                    f"Variação ({periodo1['Ano'].min()}-{periodo1['Ano'].max()} → {periodo2['Ano'].min()}-{periodo2['Ano'].max()})",
-                    f"{variacao:+.1f}%",
-                    delta=f"{media_p2 - media_p1:+.0f} nascimentos/ano"
-                )
+                    df_merged = pd.merge(
+                        dados_mun['cmi'][['Ano', 'Valor']],
+                        dados_mun['cmi_mil'][['Ano', 'Valor']],
+                        on='Ano',
+                        suffixes=('_CMI', '_CMI_MIL')
+                    )
                 
-                # Melhor e pior ano
-                melhor_ano = dados_mun['nv'].loc[dados_mun['nv']['Valor'].idxmax()]
-                pior_ano = dados_mun['nv'].loc[dados_mun['nv']['Valor'].idxmin()]
+                    correlacao = df_merged['Valor_CMI'].corr(df_merged['Valor_CMI_MIL'])
                 
-                st.info(f"**Maior natalidade:** {melhor_ano['Ano']} ({melhor_ano['Valor']} nascimentos)")
-                st.warning(f"**Menor natalidade:** {pior_ano['Ano']} ({pior_ano['Valor']} nascimentos)")
-            else:
-                st.warning("Dados insuficientes")
-        
-        with col2:
-            st.markdown("##### Óbitos Infantis")
-            if not dados_mun['ob'].empty and len(dados_mun['ob']) > 1:
-                # Dividir em períodos
-                meio = len(dados_mun['ob']) // 2
-                periodo1 = dados_mun['ob'].iloc[:meio]
-                periodo2 = dados_mun['ob'].iloc[meio:]
+                    col1, col2 = st.columns([1, 2])
                 
-                media_p1 = periodo1['Valor'].mean()
-                media_p2 = periodo2['Valor'].mean()
-                variacao = ((media_p2 - media_p1) / media_p1) * 100 if media_p1 > 0 else 0
+                    with col1:
+                        st.metric(
+                            "Correlação CMI ↔ CMI-Mil",
+                            f"{correlacao:.3f}",
+                            delta="Alta correlação" if abs(correlacao) > 0.7 else "Correlação moderada"
+                        )
+                    
+                        if abs(correlacao) > 0.7:
+                            interpretacao = "As duas métricas apresentam comportamento similar ao longo do tempo."
+                        elif abs(correlacao) > 0.4:
+                            interpretacao = "As métricas mostram alguma similaridade, mas com discrepâncias notáveis."
+                        else:
+                            interpretacao = "As métricas divergem significativamente, indicando diferenças metodológicas importantes."
+                    
+                        st.markdown(f"""
+                        <div class="info-box">
+                        <b>Interpretação:</b><br>
+                        {interpretacao}
+                        </div>
+                        """, unsafe_allow_html=True)
                 
-                st.metric(
-                    f"Variação ({periodo1['Ano'].min()}-{periodo1['Ano'].max()} → {periodo2['Ano'].min()}-{periodo2['Ano'].max()})",
-                    f"{variacao:+.1f}%",
-                    delta=f"{media_p2 - media_p1:+.1f} óbitos/ano"
-                )
+                    with col2:
+                        # Scatter plot
+                        exibir_grafico(
+                            entradas, 'correlacao', [entradas['codigos'][mun_sel]], (),
+                            lambda: criar_grafico_correlacao(df_merged, nome_municipio)
+                        )
                 
-                # Melhor (menor) e pior (maior) ano
-                melhor_ano = dados_mun['ob'].loc[dados_mun['ob']['Valor'].idxmin()]
-                pior_ano = dados_mun['ob'].loc[dados_mun['ob']['Valor'].idxmax()]
-                
-                st.success(f"**Melhor ano (menos óbitos):** {melhor_ano['Ano']} ({melhor_ano['Valor']} óbitos)")
-                st.error(f"**Pior ano (mais óbitos):** {pior_ano['Ano']} ({pior_ano['Valor']} óbitos)")
-            else:
-                st.warning("Dados insuficientes")
-        
-        if len(municipios_selecionados) > 1:
-            st.markdown("---")
+                    if len(municipios_selecionados) > 1:
+                        st.markdown("---")
+
+    # TAB 3: Análise de Períodos
+    with tab3, medir('aba_periodos', registrar=tab3.open):
+        if tab3.open:
+            st.markdown("### Análise de Períodos: Nascidos Vivos e Óbitos")
+    
+            st.markdown("""
+            <div class="explanation-box">
+            <b>Esta análise divide os dados em dois períodos iguais para identificar:</b><br>
+            • Mudanças na taxa de natalidade ao longo do tempo<br>
+            • Variações na mortalidade infantil<br>
+            • Anos com melhores e piores indicadores (menor óbito = melhor ano)
+            </div>
+            """, unsafe_allow_html=True)
+    
+            for mun_sel in paginar(municipios_selecionados, 'pagina_periodos'):
+                nome_municipio, uf = mun_sel.rsplit(' - ', 1)
+                dados_mun = dados_municipios[mun_sel]
+            
+                if len(municipios_selecionados) > 1:
+                    st.markdown(f"#### {nome_municipio} - {uf}")
+            
+                col1, col2 = st.columns(2)
+            
+                with col1:
+                    st.markdown("##### Nascidos Vivos")
+                    if not dados_mun['nv'].empty and len(dados_mun['nv']) > 1:
+                        # Dividir em períodos
+                        meio = len(dados_mun['nv']) // 2
+                        periodo1 = dados_mun['nv'].iloc[:meio]
+                        periodo2 = dados_mun['nv'].iloc[meio:]
+                    
+                        media_p1 = periodo1['Valor'].mean()
+                        media_p2 = periodo2['Valor'].mean()
+                        variacao = ((media_p2 - media_p1) / media_p1) * 100
+                    
+                        st.metric(
+                            f"Variação ({periodo1['Ano'].min()}-{periodo1['Ano'].max()} → {periodo2['Ano'].min()}-{periodo2['Ano'].max()})",
+                            f"{variacao:+.1f}%",
+                            delta=f"{media_p2 - media_p1:+.0f} nascimentos/ano"
+                        )
+                    
+                        # Melhor e pior ano
+                        melhor_ano = dados_mun['nv'].loc[dados_mun['nv']['Valor'].idxmax()]
+                        pior_ano = dados_mun['nv'].loc[dados_mun['nv']['Valor'].idxmin()]
+                    
+                        st.info(f"**Maior natalidade:** {melhor_ano['Ano']} ({melhor_ano['Valor']} nascimentos)")
+                        st.warning(f"**Menor natalidade:** {pior_ano['Ano']} ({pior_ano['Valor']} nascimentos)")
+                    else:
+                        st.warning("Dados insuficientes")
+            
+                with col2:
+                    st.markdown("##### Óbitos Infantis")
+                    if not dados_mun['ob'].empty and len(dados_mun['ob']) > 1:
+                        # Dividir em períodos
+                        meio = len(dados_mun['ob']) // 2
+                        periodo1 = dados_mun['ob'].iloc[:meio]
+                        periodo2 = dados_mun['ob'].iloc[meio:]
+                    
+                        media_p1 = periodo1['Valor'].mean()
+                        media_p2 = periodo2['Valor'].mean()
+                        variacao = ((media_p2 - media_p1) / media_p1) * 100 if media_p1 > 0 else 0
+                    
+                        st.metric(
+                            f"Variação ({periodo1['Ano'].min()}-{periodo1['Ano'].max()} → {periodo2['Ano'].min()}-{periodo2['Ano'].max()})",
+                            f"{variacao:+.1f}%",
+                            delta=f"{media_p2 - media_p1:+.1f} óbitos/ano"
+                        )
+                    
+                        # Melhor (menor) e pior (maior) ano
+                        melhor_ano = dados_mun['ob'].loc[dados_mun['ob']['Valor'].idxmin()]
+                        pior_ano = dados_mun['ob'].loc[dados_mun['ob']['Valor'].idxmax()]
+                    
+                        st.success(f"**Melhor ano (menos óbitos):** {melhor_ano['Ano']} ({melhor_ano['Valor']} óbitos)")
+                        st.error(f"**Pior ano (mais óbitos):** {pior_ano['Ano']} ({pior_ano['Valor']} óbitos)")
+                    else:
+                        st.warning("Dados insuficientes")
+            
+                if len(municipios_selecionados) > 1:
+                    st.markdown("---")
+
+secao_metricas(entradas)
+
+# ====================================================================================
+# SEÇÃO 4: EXPORTAR DADOS
+# ====================================================================================
+@st.fragment
+@medir('secao_exportacao')
+def secao_exportacao(entradas):
+    """Seção 4: download das séries (seleção atual, UF inteira ou Brasil) em CSV, Parquet ou Excel"""
+    municipios_selecionados = entradas['municipios']
+    ano_inicio, ano_fim = entradas['anos']
+    
+    st.markdown('<div class="section-header">Exportar Dados</div>', unsafe_allow_html=True)
+
+    col_escopo, col_formato, col_periodo = st.columns(3)
+    with col_escopo:
+        escopo = st.radio("Municípios", ["Seleção atual", "UF inteira", "Brasil"], horizontal=True, key="exportar_escopo")
+        uf = None
+        if escopo == "UF inteira":
+            ufs = sorted({rotulo.rsplit(' - ', 1)[1] for rotulo in obter_lista_municipios()})
+            uf_atual = municipios_selecionados[0].rsplit(' - ', 1)[1]
+            uf = st.selectbox("UF", ufs, index=ufs.index(uf_atual) if uf_atual in ufs else 0, key="exportar_uf")
+    with col_formato:
+        formato = st.selectbox(
+            "Formato", formatos_disponiveis(), format_func=lambda f: FORMATOS[f]['rotulo'], key="exportar_formato"
+        )
+    with col_periodo:
+        apenas_periodo = st.checkbox(f"Apenas o período {ano_inicio}–{ano_fim}", value=True, key="exportar_periodo")
+    anos = entradas['anos'] if apenas_periodo else None
+
+    codigos_selecao = list(entradas['codigos'].values())
+    nome = {'Seleção atual': 'selecao', 'UF inteira': uf, 'Brasil': 'brasil'}[escopo]
+
+    if formato == 'xlsx':
+        # Planilha acima do limite de linhas do Excel: recusada antes de oferecer o download
+        dados = carregar_dados_indicadores()
+        codigos = codigos_selecao if escopo == "Seleção atual" else codigos_do_escopo(catalogo_de_indicadores(dados), uf)
+        try:
+            validar_exportacao(dados, formato, codigos, anos=anos)
+        except ValueError as erro:
+            st.warning(f"⚠️ {erro}")
+            return
+
+    url = url_exportacao_api(formato, codigos_selecao if escopo == "Seleção atual" else None, uf, anos)
+    if url:
+        st.link_button(f"Baixar {FORMATOS[formato]['rotulo']}", url)
+        st.caption("O arquivo é gerado e enviado em partes pela API de consultas, sem passar pela memória do dashboard")
+        return
+
+    def gerar_arquivo():
+        """
+        Gerado só quando o botão é clicado (download adiado do st.download_button: o Streamlit chama a função
+        fora da execução do script); o arquivo temporário é escrito em partes, mas o Streamlit guarda o
+        conteúdo inteiro em memória para servi-lo, por isso exportações grandes devem usar a API
+        """
+        dados = carregar_dados_indicadores()
+        catalogo = catalogo_de_indicadores(dados)
+        codigos = codigos_selecao if escopo == "Seleção atual" else codigos_do_escopo(catalogo, uf)
+        with exportar(dados, catalogo, formato, codigos, anos=anos) as arquivo:
+            return arquivo.read()
+
+    st.download_button(
+        f"Baixar {FORMATOS[formato]['rotulo']}",
+        data=gerar_arquivo,
+        file_name=nome_arquivo(nome, formato, anos),
+        mime=FORMATOS[formato]['mime'],
+        on_click="ignore",
+        key="exportar_baixar"
+    )
+    st.caption(
+        "O arquivo é gerado quando o botão é clicado e mantido em memória pelo Streamlit até o download; "
+        "para exportações grandes, inicie a API de consultas e defina DASHBOARD_API_URL"
+    )
+
+secao_exportacao(entradas)
 
 # Footer
 st.markdown("---")
@@ -842,3 +1475,10 @@ st.markdown("""
     <p>Dados: CMI, CMI-Mil, Nascidos Vivos e Óbitos | 1996-2024</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Perfil (DASHBOARD_PERFIL=1): tempo do script inteiro e painel de administração oculto
+if perfil_ativo():
+    registrar_tempo('script', time.perf_counter() - inicio_script)
+    if st.session_state.get("admin"):
+        with st.sidebar:
+            painel_administracao()
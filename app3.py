@@ -16,9 +16,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import json
 from pathlib import Path
 
+from src.armazenamento import ler_jsons
+from src.codigos_municipios import resolver_codigos
+
 # Configuração da página
 st.set_page_config(
     page_title="APP3 - CMI & CMI-Mil",
@@ -40,19 +42,15 @@ COLOR_CMI_MIL = '#3b82f6'  # Azul
 
 @st.cache_data(ttl=60)  # Cache expira após 60 segundos
 def carregar_todos_dados(diretorio):
-    """Carrega todos os JSONs de um diretório em um único DataFrame"""
-    todos_registros = []
-    
-    for arquivo in diretorio.glob('*.json'):
-        try:
-            with open(arquivo, 'r', encoding='utf-8') as f:
-                registros = json.load(f)
-                todos_registros.extend(registros)
-        except Exception as e:
-            st.error(f"Erro ao carregar {arquivo.name}: {e}")
-    
-    if todos_registros:
-        df = pd.DataFrame(todos_registros)
+    """Carrega todos os JSONs de um diretório (lidos em paralelo) em um único DataFrame"""
+    todos_registros = ler_jsons(
+        sorted(diretorio.glob('*.json')),
+        ao_falhar=lambda arquivo, e: st.error(f"Erro ao carregar {arquivo.name}: {e}")
+    )
+    
+    if not todos_registros.empty:
+        # Resolve o código IBGE de todos os registros (os JSONs de CMI não trazem o código)
+        df = resolver_codigos(todos_registros)
         # Cria coluna combinada Município + UF
         df['Municipio_UF'] = df['Municipio'] + ' - ' + df['UF']
         return df
@@ -61,23 +59,13 @@ def carregar_todos_dados(diretorio):
 
 
 def listar_municipios_disponiveis(df):
-    """Lista todos os municípios disponíveis (com código)"""
+    """Mapeia 'Município - UF' -> código IBGE (apenas municípios com código resolvido)"""
     if df is None:
-        return []
-    
-    municipios = df.groupby(['Municipio_UF', 'Codigo_Municipio']).size().reset_index()[['Municipio_UF', 'Codigo_Municipio']]
-    municipios_list = []
-    
-    for _, row in municipios.iterrows():
-        codigo = row['Codigo_Municipio']
-        nome_uf = row['Municipio_UF']
-        
-        if codigo:
-            municipios_list.append(f"{codigo} {nome_uf}")
-        else:
-            municipios_list.append(nome_uf)
+        return {}
     
-    return sorted(municipios_list)
+    municipios = df.loc[df['Codigo_Municipio'].notna(), ['Municipio_UF', 'Codigo_Municipio']]
+    municipios = municipios.drop_duplicates('Municipio_UF')
+    return dict(zip(municipios['Municipio_UF'], municipios['Codigo_Municipio'].astype(int)))
 
 
 # ===== CARREGAMENTO DE DADOS =====
@@ -126,8 +114,8 @@ if modo == "CMI-Mil":
         st.error("❌ Dados de CMI-Mil não encontrados!")
         st.stop()
     
-    # Lista municípios disponíveis (sem código, apenas nome - UF)
-    municipios_disponiveis = sorted(df_cmi_mil['Municipio_UF'].unique())
+    codigos_municipios = listar_municipios_disponiveis(df_cmi_mil)
+    municipios_disponiveis = sorted(codigos_municipios)
     
 else:  # CMI (Comparação)
     st.sidebar.info("Modo: Comparação CMI vs CMI-Mil")
@@ -136,10 +124,10 @@ else:  # CMI (Comparação)
         st.error("❌ Dados de CMI ou CMI-Mil não encontrados!")
         st.stop()
     
-    # Municípios que existem em AMBAS as bases
-    municipios_cmi = set(df_cmi['Municipio_UF'].unique())
-    municipios_mil = set(df_cmi_mil['Municipio_UF'].unique())
-    municipios_disponiveis = sorted(list(municipios_cmi & municipios_mil))
+    # Municípios que existem em AMBAS as bases (junção pelo código IBGE)
+    codigos_municipios = listar_municipios_disponiveis(df_cmi_mil)
+    codigos_cmi = set(df_cmi['Codigo_Municipio'].dropna().astype(int))
+    municipios_disponiveis = sorted(m for m, codigo in codigos_municipios.items() if codigo in codigos_cmi)
 
 if not municipios_disponiveis:
     st.error("❌ Nenhum município encontrado")
@@ -183,8 +171,9 @@ if modo == "CMI-Mil":
         
         st.stop()
     
-    # Filtra dados diretamente usando Municipio_UF
-    df_filtrado = df_cmi_mil[df_cmi_mil['Municipio_UF'].isin(municipios_selecionados)]
+    # Filtra dados pelo código IBGE dos municípios selecionados
+    codigos_selecionados = [codigos_municipios[m] for m in municipios_selecionados if m in codigos_municipios]
+    df_filtrado = df_cmi_mil[df_cmi_mil['Codigo_Municipio'].isin(codigos_selecionados)]
     
     if df_filtrado.empty:
         st.error("❌ Nenhum dado encontrado para os municípios selecionados")
@@ -302,9 +291,10 @@ elif modo == "CMI (Comparação)":
         
         st.stop()
     
-    # Filtra dados de ambas as bases
-    df_cmi_filtrado = df_cmi[df_cmi['Municipio_UF'].isin(municipios_selecionados)]
-    df_mil_filtrado = df_cmi_mil[df_cmi_mil['Municipio_UF'].isin(municipios_selecionados)]
+    # Filtra dados de ambas as bases pelo código IBGE
+    codigos_selecionados = [codigos_municipios[m] for m in municipios_selecionados if m in codigos_municipios]
+    df_cmi_filtrado = df_cmi[df_cmi['Codigo_Municipio'].isin(codigos_selecionados)]
+    df_mil_filtrado = df_cmi_mil[df_cmi_mil['Codigo_Municipio'].isin(codigos_selecionados)]
     
     if df_cmi_filtrado.empty and df_mil_filtrado.empty:
         st.error("❌ Nenhum dado encontrado para os municípios selecionados")
@@ -487,8 +477,9 @@ elif modo == "CMI (Comparação)":
     
     for municipio in municipios_selecionados:
         with st.expander(f"📍 {municipio}"):
-            df_mun_cmi = df_cmi_filtrado[df_cmi_filtrado['Municipio_UF'] == municipio]
-            df_mun_mil = df_mil_filtrado[df_mil_filtrado['Municipio_UF'] == municipio]
+            codigo = codigos_municipios.get(municipio)
+            df_mun_cmi = df_cmi_filtrado[df_cmi_filtrado['Codigo_Municipio'] == codigo]
+            df_mun_mil = df_mil_filtrado[df_mil_filtrado['Codigo_Municipio'] == codigo]
             
             col1, col2 = st.columns(2)
             
@@ -0,0 +1,312 @@
+"""
+Benchmark de carga e latência dos dashboards (app.py e app3.py) com sessão simulada (AppTest)
+Para cada app e cada quantidade K de municípios (1, 10 e 100), um processo novo abre o app
+e executa uma sequência fixa de interações, medindo cada rerun:
+- app.py: abrir, selecionar K municípios, mover o período, voltar ao período completo,
+  trocar as abas de Métricas Comparativas e um rerun sem mudança
+- app3.py (sem abas): abrir, selecionar K municípios, mover o período, voltar ao período completo,
+  trocar o modo (CMI-Mil <-> Comparação) e um rerun sem mudança
+
+Por rerun: latência, RSS e chamadas/acertos de cache (st.cache_data/st.cache_resource e o cache
+de processo de src/armazenamento.py). O registro de acessos vai para um arquivo temporário.
+
+Com um diretório de saídas sintéticas (benchmarks/gerador_saidas.py), o app lê os indicadores
+de lá em vez de data/output/ (teste de carga com 10× ou 100× o volume atual).
+
+O histórico fica em benchmarks/resultados/dashboard.json (versionado) para comparar entre mudanças.
+
+Uso: python benchmarks/dashboard.py [app.py|app3.py ...] [K ...] [diretório de saídas sintéticas]
+"""
+import functools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.etl import pico_rss_mb, salvar_resultado
+
+ARQUIVO_RESULTADOS = Path(__file__).parent / 'resultados' / 'dashboard.json'
+
+APPS = ['app.py', 'app3.py']
+QUANTIDADES_PADRAO = [1, 10, 100]
+TIMEOUT_RERUN = 600  # Segundos por rerun (a primeira execução lê todos os JSONs)
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+# ============================================================================
+# INTERAÇÕES
+# ============================================================================
+
+def selecionar(chave, quantidade):
+    """Seleciona os `quantidade` primeiros municípios da lista do multiselect"""
+    def acao(at):
+        widget = at.multiselect(key=chave)
+        widget.set_value(list(widget.options)[:quantidade])
+    return acao
+
+
+def slider_periodo(at):
+    """Slider de período da sidebar"""
+    return next(slider for slider in at.slider if 'período' in str(slider.label).lower())
+
+
+def encurtar_periodo(at):
+    """Período sem os 5 primeiros e os 5 últimos anos (ou o menor intervalo possível)"""
+    slider = slider_periodo(at)
+    inicio, fim = slider.min, slider.max
+    if fim - inicio > 10:
+        inicio, fim = inicio + 5, fim - 5
+    slider.set_value((inicio, fim))
+
+
+def periodo_completo(at):
+    """Volta ao período completo (mesmos argumentos da abertura: deve acertar o cache)"""
+    slider = slider_periodo(at)
+    slider.set_value((slider.min, slider.max))
+
+
+def abrir_aba(rotulo):
+    """Troca a aba de Métricas Comparativas (st.tabs com key, sem seletor no AppTest)"""
+    def acao(at):
+        at.session_state['aba_metricas'] = rotulo
+    return acao
+
+
+def trocar_modo(rotulo):
+    """Modo de visualização do app3 (radio da sidebar)"""
+    def acao(at):
+        next(radio for radio in at.radio if radio.label == "Modo de Visualização").set_value(rotulo)
+    return acao
+
+
+def passos_do_app(app, quantidade):
+    """[(nome do passo, ação antes do rerun ou None), ...]"""
+    if app == 'app.py':
+        return [
+            ('abrir', None),
+            (f'selecionar_{quantidade}', selecionar('municipios_select', quantidade)),
+            ('encurtar_periodo', encurtar_periodo),
+            ('periodo_completo', periodo_completo),
+            ('aba_correlacao', abrir_aba('Correlação')),
+            ('aba_periodos', abrir_aba('Análise de Períodos')),
+            ('aba_diferenca', abrir_aba('Diferença Absoluta')),
+            ('rerun_sem_mudanca', None),
+        ]
+    return [
+        ('abrir', None),
+        (f'selecionar_{quantidade}', selecionar('municipios_selecionados', quantidade)),
+        ('encurtar_periodo', encurtar_periodo),
+        ('periodo_completo', periodo_completo),
+        ('modo_comparacao', trocar_modo("CMI (Comparação)")),
+        ('modo_cmi_mil', trocar_modo("CMI-Mil")),
+        ('rerun_sem_mudanca', None),
+    ]
+
+
+# ============================================================================
+# MEDIÇÃO (processo filho)
+# ============================================================================
+
+def rss_atual_mb():
+    """Memória residente atual (MB) via /proc; None fora do Linux"""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as f:
+            paginas = int(f.read().split()[1])
+    except OSError:
+        return None
+    import resource
+    return paginas * resource.getpagesize() / (1024 * 1024)
+
+
+def contar_caches(contagem):
+    """
+    Conta chamadas e faltas (misses) de cache por função em `contagem`
+    Streamlit: CachedFunc (API interna; se mudar, o benchmark segue sem essas contagens)
+    Armazenamento: em_cache_do_processo (a função carregar só roda na falta)
+    """
+    from src import armazenamento
+
+    try:
+        from streamlit.runtime.caching.cache_utils import CachedFunc
+        obter_original = CachedFunc._get_or_create_cached_value
+        falta_original = CachedFunc._handle_cache_miss
+    except (ImportError, AttributeError):
+        print("  ⚠️ API interna de cache do Streamlit mudou: contagem só do armazenamento", file=sys.stderr)
+    else:
+        @functools.wraps(obter_original)
+        def obter(self, *args, **kwargs):
+            contagem[self._info.func.__qualname__]['chamadas'] += 1
+            return obter_original(self, *args, **kwargs)
+
+        @functools.wraps(falta_original)
+        def falta(self, *args, **kwargs):
+            contagem[self._info.func.__qualname__]['faltas'] += 1
+            return falta_original(self, *args, **kwargs)
+
+        CachedFunc._get_or_create_cached_value = obter
+        CachedFunc._handle_cache_miss = falta
+
+    cache_original = armazenamento.em_cache_do_processo
+
+    @functools.wraps(cache_original)
+    def em_cache(chave, arquivos, carregar):
+        nome = f"armazenamento:{chave[0]}"
+        contagem[nome]['chamadas'] += 1
+
+        def carregar_contando():
+            contagem[nome]['faltas'] += 1
+            return carregar()
+
+        return cache_original(chave, arquivos, carregar_contando)
+
+    armazenamento.em_cache_do_processo = em_cache
+
+
+def isolar_acessos(arquivo):
+    """Registro de acessos (e estados populares do aquecimento) em um arquivo temporário"""
+    from src import acessos
+
+    acessos.registrar_acesso = functools.partial(acessos.registrar_acesso, arquivo=arquivo)
+    acessos.estados_populares = functools.partial(acessos.estados_populares, arquivo=arquivo)
+
+
+def totais(contagem):
+    """(chamadas, acertos) somados entre as funções"""
+    chamadas = sum(valores['chamadas'] for valores in contagem.values())
+    return chamadas, chamadas - sum(valores['faltas'] for valores in contagem.values())
+
+
+def taxa(chamadas, acertos):
+    return round(acertos / chamadas, 3) if chamadas else None
+
+
+def medir_app(app, quantidade, dados=None):
+    """Executa os passos do app com K municípios (neste processo) e devolve as medidas"""
+    from streamlit.testing.v1 import AppTest
+
+    if dados:
+        from benchmarks.gerador_saidas import apontar_armazenamento
+        apontar_armazenamento(dados)
+    contagem = defaultdict(lambda: {'chamadas': 0, 'faltas': 0})
+    contar_caches(contagem)
+
+    with tempfile.TemporaryDirectory() as temporario:
+        isolar_acessos(Path(temporario) / 'acessos.jsonl')
+        at = AppTest.from_file(str(BASE_DIR / app), default_timeout=TIMEOUT_RERUN)
+
+        passos = []
+        for nome, acao in passos_do_app(app, quantidade):
+            if acao is not None:
+                acao(at)
+            antes = totais(contagem)
+            inicio = time.perf_counter()
+            at.run()
+            latencia = time.perf_counter() - inicio
+            if at.exception:
+                raise RuntimeError(f"{app} falhou no passo {nome}: {at.exception[0].value}")
+
+            depois = totais(contagem)
+            chamadas, acertos = depois[0] - antes[0], depois[1] - antes[1]
+            rss = rss_atual_mb()
+            passos.append({
+                'passo': nome,
+                'latencia_ms': round(latencia * 1000, 1),
+                'cache_chamadas': chamadas,
+                'cache_acertos': acertos,
+                'rss_mb': None if rss is None else round(rss, 1),
+            })
+
+    chamadas, acertos = totais(contagem)
+    pico = pico_rss_mb()
+    return {
+        'passos': passos,
+        'total_ms': round(sum(passo['latencia_ms'] for passo in passos), 1),
+        'taxa_acerto_cache': taxa(chamadas, acertos),
+        'caches': {
+            nome: {**valores, 'taxa_acerto': taxa(valores['chamadas'], valores['chamadas'] - valores['faltas'])}
+            for nome, valores in sorted(contagem.items())
+        },
+        'rss_pico_mb': None if pico is None else round(pico, 1),
+    }
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def executar_em_processo(app, quantidade, dados=None):
+    """Mede um cenário em um processo novo (caches frios, pico de RSS isolado)"""
+    saida = subprocess.run(
+        [sys.executable, str(Path(__file__)), '--medir', app, str(quantidade), *([str(dados)] if dados else [])],
+        cwd=BASE_DIR, capture_output=True, text=True, encoding='utf-8'
+    )
+    if saida.returncode != 0:
+        raise RuntimeError(f"{app} com {quantidade} municípios falhou:\n{saida.stderr[-3000:]}")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def executar_benchmark(apps=None, quantidades=None, dados=None):
+    """Mede cada app em cada quantidade de municípios, exibe e salva o resultado"""
+    apps = list(apps or APPS)
+    quantidades = list(quantidades or QUANTIDADES_PADRAO)
+    print("\n" + "="*70)
+    print(" ⏱️  BENCHMARK - CARGA E LATÊNCIA DOS DASHBOARDS (AppTest)")
+    print("="*70)
+
+    import streamlit
+
+    cenarios = {}
+    for app in apps:
+        cenarios[app] = {}
+        for quantidade in quantidades:
+            print(f"\n  ▶️  {app} com {quantidade} município(s)...")
+            medida = executar_em_processo(app, quantidade, dados)
+            cenarios[app][str(quantidade)] = medida
+
+            print(f"  {'Passo':<22} {'Latência':>10} {'Cache':>9} {'RSS':>9}")
+            print(f"  {'-'*22} {'-'*10} {'-'*9} {'-'*9}")
+            for passo in medida['passos']:
+                cache = f"{passo['cache_acertos']}/{passo['cache_chamadas']}"
+                rss = f"{passo['rss_mb']:.0f} MB" if passo['rss_mb'] is not None else '-'
+                print(f"  {passo['passo']:<22} {passo['latencia_ms']:>8.0f}ms {cache:>9} {rss:>9}")
+            taxa_total = medida['taxa_acerto_cache']
+            print(
+                f"  🕐 Total: {medida['total_ms'] / 1000:.1f}s | "
+                f"acertos de cache: {'-' if taxa_total is None else f'{taxa_total:.0%}'} | "
+                f"RSS pico: {medida['rss_pico_mb'] or '-'} MB"
+            )
+
+    resultado = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'streamlit': streamlit.__version__,
+        'dados': str(dados) if dados else 'data/output',
+        'cenarios': cenarios,
+    }
+    salvar_resultado(resultado, ARQUIVO_RESULTADOS)
+    print(f"\n  💾 Histórico: {ARQUIVO_RESULTADOS.relative_to(BASE_DIR)}")
+    print("="*70)
+    return resultado
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--medir':
+        # Processo filho: uma linha JSON com as medidas na saída padrão
+        print(json.dumps(medir_app(sys.argv[2], int(sys.argv[3]), *sys.argv[4:5])))
+    else:
+        executar_benchmark(
+            [valor for valor in sys.argv[1:] if valor.endswith('.py')],
+            [int(valor) for valor in sys.argv[1:] if valor.isdigit()],
+            next((valor for valor in sys.argv[1:] if Path(valor).is_dir()), None),
+        )
@@ -0,0 +1,169 @@
+"""
+Benchmark de carga e consulta do armazenamento em escala (saídas sintéticas de gerador_saidas.py)
+Para cada fator de anos (1 = volume atual; 5 ≈ 3 milhões de registros), gera as saídas em um
+diretório temporário e, em um processo novo apontado para elas, mede:
+- carregar_indicador_preparado de cada indicador (leitura dos JSONs, códigos, bloqueios e índice)
+- rotulos_municipios e indice_busca_municipios (catálogo e índice de busca)
+- obter_series para 1, 100 e 1000 municípios no período completo (mediana de REPETICOES)
+- memória dos DataFrames (memory_usage deep, com os tipos originais e compactos) e pico de RSS
+
+O histórico fica em benchmarks/resultados/escala.json (versionado) para comparar entre mudanças.
+
+Uso: python benchmarks/escala.py [fator_anos ...] [mensal]
+"""
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.etl import pico_rss_mb, salvar_resultado
+from benchmarks.gerador_saidas import apontar_armazenamento, gerar_saidas
+
+ARQUIVO_RESULTADOS = Path(__file__).parent / 'resultados' / 'escala.json'
+
+FATORES_PADRAO = [1, 5]
+QUANTIDADES_CONSULTA = [1, 100, 1000]
+REPETICOES = 5
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+# ============================================================================
+# MEDIÇÃO (processo filho)
+# ============================================================================
+
+def cronometrar(funcao, *args):
+    """(resultado, segundos) de uma chamada"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def medir_armazenamento(destino):
+    """Carga e consultas do armazenamento apontado para `destino` (neste processo)"""
+    import numpy as np
+
+    from src import armazenamento
+
+    diretorios = apontar_armazenamento(destino)
+
+    indicadores = {}
+    dados = {}
+    for tipo in diretorios:
+        df, duracao = cronometrar(armazenamento.carregar_indicador_preparado, tipo)
+        dados[tipo] = df
+        memoria = armazenamento.memoria_indicadores().get(tipo, {'original_bytes': 0})
+        indicadores[tipo] = {
+            'registros': len(df),
+            'carga_s': round(duracao, 3),
+            'memoria_mb': round(df.memory_usage(deep=True).sum() / (1024 * 1024), 1),
+            'memoria_original_mb': round(memoria['original_bytes'] / (1024 * 1024), 1),
+        }
+
+    rotulos, duracao_rotulos = cronometrar(armazenamento.rotulos_municipios)
+    _, duracao_indice = cronometrar(armazenamento.indice_busca_municipios)
+
+    codigos = np.array(sorted(rotulos.values()), dtype=np.int32)
+    gerador = np.random.default_rng(42)
+    consultas = {}
+    for quantidade in QUANTIDADES_CONSULTA:
+        escolhidos = gerador.choice(codigos, size=min(quantidade, len(codigos)), replace=False)
+        tempos = [cronometrar(armazenamento.obter_series, dados, escolhidos)[1] for _ in range(REPETICOES)]
+        consultas[str(quantidade)] = round(statistics.median(tempos) * 1000, 2)
+
+    pico = pico_rss_mb()
+    return {
+        'indicadores': indicadores,
+        'registros_total': sum(medida['registros'] for medida in indicadores.values()),
+        'carga_total_s': round(sum(medida['carga_s'] for medida in indicadores.values()), 3),
+        'rotulos_s': round(duracao_rotulos, 3),
+        'indice_busca_s': round(duracao_indice, 3),
+        'municipios': len(rotulos),
+        'obter_series_ms': consultas,
+        'rss_pico_mb': None if pico is None else round(pico, 1),
+    }
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def executar_em_processo(destino):
+    """Mede em um processo novo (cache do processo vazio, pico de RSS isolado)"""
+    saida = subprocess.run(
+        [sys.executable, str(Path(__file__)), '--medir', str(destino)],
+        cwd=BASE_DIR, capture_output=True, text=True, encoding='utf-8'
+    )
+    if saida.returncode != 0:
+        raise RuntimeError(f"Medição em {destino} falhou:\n{saida.stderr[-3000:]}")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def executar_benchmark(fatores=None, mensal=False):
+    """Gera, mede e descarta as saídas de cada fator; exibe e salva o resultado"""
+    fatores = list(fatores or FATORES_PADRAO)
+    print("\n" + "="*70)
+    print(f" ⏱️  BENCHMARK - ARMAZENAMENTO EM ESCALA{' (MENSAL)' if mensal else ''}")
+    print("="*70)
+
+    import pandas
+
+    cenarios = {}
+    for fator in fatores:
+        temporario = Path(tempfile.mkdtemp(prefix='escala_'))
+        try:
+            print(f"\n  ▶️  Fator de anos {fator}: gerando saídas...")
+            _, duracao_geracao = cronometrar(gerar_saidas, temporario, fator, 0, mensal)
+            medida = executar_em_processo(temporario)
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+        medida['geracao_s'] = round(duracao_geracao, 1)
+        cenarios[str(fator)] = medida
+
+        print(f"  {'Indicador':<10} {'Registros':>12} {'Carga':>9} {'Memória':>10} {'Original':>10}")
+        print(f"  {'-'*10} {'-'*12} {'-'*9} {'-'*10} {'-'*10}")
+        for tipo, indicador in medida['indicadores'].items():
+            print(
+                f"  {tipo:<10} {indicador['registros']:>12,} {indicador['carga_s']:>8.2f}s "
+                f"{indicador['memoria_mb']:>7.1f} MB {indicador['memoria_original_mb']:>7.1f} MB"
+            )
+        consultas = ' | '.join(f"{k}: {ms:.1f}ms" for k, ms in medida['obter_series_ms'].items())
+        print(
+            f"  🕐 Carga: {medida['carga_total_s']:.1f}s | rótulos: {medida['rotulos_s']:.2f}s | "
+            f"índice de busca: {medida['indice_busca_s']:.2f}s | RSS pico: {medida['rss_pico_mb'] or '-'} MB"
+        )
+        print(f"  🔎 obter_series ({consultas})")
+
+    resultado = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'mensal': mensal,
+        'cenarios': cenarios,
+    }
+    salvar_resultado(resultado, ARQUIVO_RESULTADOS)
+    print(f"\n  💾 Histórico: {ARQUIVO_RESULTADOS.relative_to(BASE_DIR)}")
+    print("="*70)
+    return resultado
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--medir':
+        # Processo filho: uma linha JSON com as medidas na saída padrão
+        print(json.dumps(medir_armazenamento(sys.argv[2])))
+    else:
+        executar_benchmark(
+            [int(valor) for valor in sys.argv[1:] if valor.isdigit()],
+            mensal='mensal' in sys.argv[1:],
+        )
@@ -0,0 +1,255 @@
+"""
+Benchmark dos scripts de ETL (planilhas -> JSONs) sobre planilhas sintéticas
+Gera N UFs × M municípios × Y anos no layout real (benchmarks/gerador_planilhas.py) e executa
+cada script em um processo próprio, com entradas e saídas redirecionadas para um diretório temporário.
+
+Por script: tempo de parede, pico de memória (RSS) e tempo por etapa. As etapas são medidas
+envolvendo as funções dos scripts e do pandas; o tempo de uma chamada aninhada conta só para
+a etapa mais interna (ex.: read_excel dentro de processar_aba é leitura, não limpeza):
+- leitura: pd.read_excel / pd.ExcelFile / ler_abas (leitor nativo de ODS)
+- cabecalho: encontrar_linha_cabecalho
+- limpeza: processar_aba (o que sobra dela: colunas de anos, filtros de texto, códigos, tipos)
+- melt: DataFrame.melt
+- escrita: salvar_json, codigos_para_json, DataFrame.to_dict e json.dump
+- outros: o restante (laços, concat, análise final)
+Reconstrução do dicionário e validação (executadas ao final de alguns scripts) leem os dados
+reais de data/output e ficam fora da medição. A instrumentação dos scripts (src/instrumentacao.py,
+com tracemalloc) fica desligada para não pesar nos tempos; ETL_INSTRUMENTACAO=1 a liga (log no
+diretório temporário).
+
+O histórico fica em benchmarks/resultados/etl.json (versionado) para comparar entre mudanças.
+
+Uso: python benchmarks/etl.py [ufs] [municipios] [anos] [script ...]
+"""
+import functools
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.gerador_planilhas import gerar_planilhas
+
+ARQUIVO_RESULTADOS = Path(__file__).parent / 'resultados' / 'etl.json'
+
+UFS_PADRAO = 5
+MUNICIPIOS_PADRAO = 100
+ANOS_PADRAO = 29
+
+ETAPAS = ['leitura', 'cabecalho', 'limpeza', 'melt', 'escrita', 'outros']
+
+# Por script: função principal, constantes de entrada (-> arquivo gerado) e de saída,
+# funções do próprio módulo por etapa e etapas finais desligadas no benchmark
+SCRIPTS = {
+    'converter_ods': {
+        'modulo': 'src.converter_ods',
+        'funcao': 'processar_todas_planilhas',
+        'entradas': {'ARQUIVO_CMI_MIL': 'CMI-Mil.ods', 'ARQUIVO_CMI': 'CMI.ods'},
+        'saidas': ['OUTPUT_DIR_CMI_MIL', 'OUTPUT_DIR_CMI_PURO'],
+        'etapas': {'cabecalho': ['encontrar_linha_cabecalho'], 'limpeza': ['processar_aba'],
+                   'escrita': ['salvar_json', 'codigos_para_json']},
+        'desligar': [],
+    },
+    'raspagem_obitos_nv': {
+        'modulo': 'src.raspagem_obitos_nv',
+        'funcao': 'processar_todas_abas',
+        'entradas': {'ARQUIVO_CMI_MIL': 'CMI-Mil.ods'},
+        'saidas': ['OUTPUT_DIR_NV', 'OUTPUT_DIR_OB'],
+        'etapas': {'cabecalho': ['encontrar_linha_cabecalho'], 'limpeza': ['processar_aba'],
+                   'escrita': ['codigos_para_json']},
+        'desligar': ['reconstruir_dicionario', 'executar_validacao'],
+    },
+    'processar_nv_ob': {
+        'modulo': 'src.processar_nv_ob',
+        'funcao': 'processar_nv_ob',
+        'entradas': {'ARQUIVO_CMI_MIL': 'CMI-Mil.ods'},
+        'saidas': ['OUTPUT_DIR_NV', 'OUTPUT_DIR_OB', 'OUTPUT_DIR_MENSAL'],
+        'etapas': {'cabecalho': ['encontrar_linha_cabecalho'], 'limpeza': ['processar_aba_nv_ob'],
+                   'escrita': ['codigos_para_json']},
+        'desligar': ['executar_validacao'],
+    },
+    'converter_dados': {
+        'modulo': 'src.converter_dados',
+        'funcao': 'processar_planilha',
+        'entradas': {'ARQUIVO_EXCEL': 'CMI_Mil_Br_0_4.xlsx', 'ARQUIVO_EXCEL_PURO': 'CMI_PURO_semMIL.xlsx'},
+        'saidas': ['OUTPUT_DIR_NV', 'OUTPUT_DIR_OB', 'OUTPUT_DIR_CMI_MIL', 'OUTPUT_DIR_CMI_PURO'],
+        'etapas': {'cabecalho': ['encontrar_linha_cabecalho'], 'limpeza': ['processar_aba'],
+                   'escrita': ['salvar_json']},
+        'desligar': [],
+    },
+}
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+class Cronometro:
+    """Acumula tempo exclusivo por etapa: a chamada envolvida mais interna recebe o tempo"""
+
+    def __init__(self):
+        self.tempos = dict.fromkeys(ETAPAS, 0.0)
+        self._pilha = []  # [[etapa, início do trecho atual], ...]
+
+    def envolver(self, alvo, nome, etapa):
+        """Substitui alvo.nome por uma versão cronometrada"""
+        original = getattr(alvo, nome)
+
+        @functools.wraps(original)
+        def medido(*args, **kwargs):
+            agora = time.perf_counter()
+            if self._pilha:
+                self.tempos[self._pilha[-1][0]] += agora - self._pilha[-1][1]
+            self._pilha.append([etapa, agora])
+            try:
+                return original(*args, **kwargs)
+            finally:
+                fim = time.perf_counter()
+                etapa_atual, inicio = self._pilha.pop()
+                self.tempos[etapa_atual] += fim - inicio
+                if self._pilha:
+                    self._pilha[-1][1] = fim
+
+        setattr(alvo, nome, medido)
+
+
+def pico_rss_mb():
+    """Pico de memória residente do processo (MB); None onde `resource` não existe (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def medir_script(nome, dir_planilhas, dir_saida):
+    """Executa um script (neste processo) com entradas/saídas redirecionadas e devolve as medidas"""
+    import pandas as pd
+
+    from src import instrumentacao
+
+    os.environ.setdefault('ETL_INSTRUMENTACAO', '0')
+    instrumentacao.ARQUIVO_EXECUCOES = Path(dir_saida) / instrumentacao.ARQUIVO_EXECUCOES.name
+
+    config = SCRIPTS[nome]
+    modulo = importlib.import_module(config['modulo'])
+    for constante, arquivo in config['entradas'].items():
+        setattr(modulo, constante, Path(dir_planilhas) / arquivo)
+    for constante in config['saidas']:
+        setattr(modulo, constante, Path(dir_saida) / getattr(modulo, constante).name)
+    for funcao in config['desligar']:
+        setattr(modulo, funcao, lambda: None)
+
+    cronometro = Cronometro()
+    cronometro.envolver(pd, 'read_excel', 'leitura')
+    cronometro.envolver(pd, 'ExcelFile', 'leitura')
+    if hasattr(modulo, 'ler_abas'):
+        cronometro.envolver(modulo, 'ler_abas', 'leitura')
+    cronometro.envolver(pd.DataFrame, 'melt', 'melt')
+    cronometro.envolver(pd.DataFrame, 'to_dict', 'escrita')
+    cronometro.envolver(json, 'dump', 'escrita')
+    for etapa, funcoes in config['etapas'].items():
+        for funcao in funcoes:
+            cronometro.envolver(modulo, funcao, etapa)
+    cronometro.envolver(modulo, config['funcao'], 'outros')
+
+    rss_base = pico_rss_mb()
+    inicio = time.perf_counter()
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, redirect_stdout(nulo):
+        getattr(modulo, config['funcao'])()
+    total = time.perf_counter() - inicio
+
+    jsons = list(Path(dir_saida).rglob('*.json'))
+    return {
+        'total_s': round(total, 3),
+        'etapas_s': {etapa: round(segundos, 3) for etapa, segundos in cronometro.tempos.items()},
+        'rss_base_mb': None if rss_base is None else round(rss_base, 1),
+        'rss_pico_mb': None if rss_base is None else round(pico_rss_mb(), 1),
+        'jsons_gerados': len(jsons),
+        'mb_gerados': round(sum(arquivo.stat().st_size for arquivo in jsons) / (1024 * 1024), 2),
+    }
+
+
+def executar_em_processo(nome, dir_planilhas, dir_saida):
+    """Mede um script em um processo novo (pico de RSS isolado, módulos sem estado anterior)"""
+    saida = subprocess.run(
+        [sys.executable, str(Path(__file__)), '--medir', nome, str(dir_planilhas), str(dir_saida)],
+        cwd=BASE_DIR, capture_output=True, text=True, encoding='utf-8'
+    )
+    if saida.returncode != 0:
+        raise RuntimeError(f"{nome} falhou:\n{saida.stderr}")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def salvar_resultado(resultado, arquivo=ARQUIVO_RESULTADOS):
+    """Acrescenta o resultado ao histórico"""
+    historico = json.loads(arquivo.read_text(encoding='utf-8')) if arquivo.exists() else []
+    historico.append(resultado)
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    arquivo.write_text(json.dumps(historico, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+def executar_benchmark(ufs=UFS_PADRAO, municipios=MUNICIPIOS_PADRAO, anos=ANOS_PADRAO, scripts=None):
+    """Gera as planilhas, mede cada script, exibe e salva o resultado"""
+    scripts = list(scripts or SCRIPTS)
+    print("\n" + "="*70)
+    print(" ⏱️  BENCHMARK - SCRIPTS DE ETL (PLANILHAS -> JSON)")
+    print("="*70)
+    print(f"\n  📐 {ufs} UFs × {municipios} municípios × {anos} anos")
+
+    # Dentro do repositório: os scripts exibem caminhos relativos a BASE_DIR
+    with tempfile.TemporaryDirectory(dir=Path(__file__).parent, prefix='etl_') as temporario:
+        dir_planilhas = Path(temporario) / 'input'
+        inicio = time.perf_counter()
+        planilhas = gerar_planilhas(dir_planilhas, ufs, municipios, anos)
+        print(f"  📄 Planilhas sintéticas geradas em {time.perf_counter() - inicio:.1f}s")
+        for nome_planilha, arquivo in planilhas.items():
+            print(f"     {nome_planilha}: {arquivo.stat().st_size / 1024:,.0f} KB")
+
+        medidas = {}
+        for nome in scripts:
+            print(f"  ▶️  {nome}...")
+            medidas[nome] = executar_em_processo(nome, dir_planilhas, Path(temporario) / 'output' / nome)
+
+    print(f"\n  {'Script':<20} {'Total':>8} " + ' '.join(f"{etapa:>9}" for etapa in ETAPAS) + f" {'RSS pico':>9}")
+    print(f"  {'-'*20} {'-'*8} " + ' '.join('-'*9 for _ in ETAPAS) + f" {'-'*9}")
+    for nome, medida in medidas.items():
+        rss = f"{medida['rss_pico_mb']:.0f} MB" if medida['rss_pico_mb'] is not None else '-'
+        print(
+            f"  {nome:<20} {medida['total_s']:>7.2f}s "
+            + ' '.join(f"{medida['etapas_s'][etapa]:>8.2f}s" for etapa in ETAPAS)
+            + f" {rss:>9}"
+        )
+
+    resultado = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'ufs': ufs,
+        'municipios_por_uf': municipios,
+        'anos': anos,
+        'scripts': medidas,
+    }
+    salvar_resultado(resultado)
+    print(f"\n  💾 Histórico: {ARQUIVO_RESULTADOS.relative_to(BASE_DIR)}")
+    print("="*70)
+    return resultado
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--medir':
+        # Processo filho: uma linha JSON com as medidas na saída padrão
+        print(json.dumps(medir_script(*sys.argv[2:5])))
+    else:
+        numeros = [int(valor) for valor in sys.argv[1:4] if valor.isdigit()]
+        executar_benchmark(*numeros, scripts=[valor for valor in sys.argv[1:] if not valor.isdigit()])
@@ -0,0 +1,189 @@
+"""
+Gerador de planilhas sintéticas no layout das planilhas reais (entrada dos scripts de ETL)
+N UFs × M municípios × Y anos, com as mesmas abas, linhas de título antes do cabeçalho,
+colunas "#Mun"/"Inic"/"Fim", linha "MUNICIPIO IGNORADO", linha "Total" e notas de rodapé.
+
+Arquivos gerados no diretório de destino:
+- CMI-Mil.ods: abas "CMI-Mil UF", "UF NV" e "UF OB" (converter_ods, raspagem_obitos_nv, processar_nv_ob)
+- CMI.ods: abas "CMI UF" (converter_ods)
+- CMI_Mil_Br_0_4.xlsx e CMI_PURO_semMIL.xlsx: abas "CMI UF" (+ "UF NV"/"UF OB" na primeira) (converter_dados)
+
+Uso: python benchmarks/gerador_planilhas.py <destino> [ufs] [municipios] [anos]
+"""
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.codigos_municipios import UF_POR_PREFIXO_IBGE
+
+ANO_INICIAL = 1996
+MAX_ANOS = 2030 - ANO_INICIAL + 1  # Os scripts só aceitam anos de 1990 a 2030
+MAX_MUNICIPIOS = 9999  # Código de 6 dígitos: prefixo da UF + 4 dígitos
+
+PREFIXOS_NOME = ['', '', '', 'SAO ', 'SANTA ', 'NOVA ', 'PORTO ', 'SERRA DO ']
+SILABAS = ['BA', 'CA', 'DA', 'JU', 'LI', 'MA', 'NO', 'PA', 'RI', 'SA', 'VI', 'XA', 'GUA', 'RA', 'PI', 'CU', 'CO', 'RE']
+
+TITULOS = {
+    'NV': 'Nascim p/resid.mãe por Município e Ano do nascimento',
+    'OB': 'Óbitos p/Residênc por Município e Ano do Óbito',
+}
+NOTAS_RODAPE = {
+    'NV': [
+        'Fonte: MS/SVSA/CGIAE - Sistema de Informações sobre Nascidos Vivos - SINASC',
+        'Notas:',
+        'Dados finais disponíveis até 2023. Dados preliminares de 2024 atualizados em 10/2025.',
+        'Em 2011, houve uma mudança no conteúdo da Declaração de Nascido Vivo, com maior detalhamento das '
+        'informações coletadas. Para este ano, foram',
+        'utilizados simultaneamente os dois formulários. Para mais detalhes sobre as mudanças ocorridas e os '
+        'seus efeitos, veja o documento',
+        '"Consolidação do Sistema de Informações sobre Nascidos Vivos - 2011".',
+        '* A categorização da "Adequação quantitativa de pré-natal" mostrada na variável "Adeq quant pré-natal" '
+        'considera o início do',
+    ],
+    'OB': [
+        'Fonte: MS/SVSA/CGIAE - Sistema de Informações sobre Mortalidade - SIM',
+        'Notas:',
+        'Dados finais disponíveis até 2023. Dados preliminares de 2024 atualizados em 10/2025.',
+        'Em 2011, houve uma mudança no conteúdo da Declaração de Óbito, com maior detalhamento das '
+        'informações coletadas. Para este ano, foram',
+        'utilizados simultaneamente os dois formulários. Para mais detalhes sobre as mudanças ocorridas e os '
+        'seus efeitos, veja o documento',
+    ],
+}
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def ufs_sinteticas(quantidade):
+    """As `quantidade` primeiras UFs por código IBGE: [(prefixo, sigla), ...]"""
+    if not 1 <= quantidade <= len(UF_POR_PREFIXO_IBGE):
+        raise ValueError(f"Quantidade de UFs deve estar entre 1 e {len(UF_POR_PREFIXO_IBGE)}")
+    return sorted(UF_POR_PREFIXO_IBGE.items())[:quantidade]
+
+
+def nome_municipio(gerador):
+    """Nome fictício em maiúsculas, sem acentos (como nas planilhas)"""
+    silabas = ''.join(gerador.choice(SILABAS) for _ in range(gerador.randint(2, 4)))
+    return gerador.choice(PREFIXOS_NOME) + silabas
+
+
+def municipios_da_uf(prefixo, quantidade, gerador):
+    """[(código IBGE de 6 dígitos, nome), ...] com nomes distintos"""
+    nomes = set()
+    while len(nomes) < quantidade:
+        nomes.add(nome_municipio(gerador))
+    return [(prefixo * 10000 + i, nome) for i, nome in enumerate(sorted(nomes), start=1)]
+
+
+def series_da_uf(municipios, anos, gerador):
+    """Nascidos vivos e óbitos infantis por município e ano: ({código: [nv, ...]}, {código: [ob, ...]})"""
+    nascidos, obitos = {}, {}
+    for codigo, _ in municipios:
+        porte = gerador.lognormvariate(5, 1.2)
+        nascidos[codigo] = [max(0, int(gerador.gauss(porte, porte * 0.1))) for _ in anos]
+        obitos[codigo] = [
+            min(nv, max(0, round(gerador.gauss(nv * 0.015, (nv * 0.015) ** 0.5))))
+            for nv in nascidos[codigo]
+        ]
+    return nascidos, obitos
+
+
+def _colunas_extras(posicao, valores):
+    """#Mun, Inic e Fim: posição do município, primeiro e último ano com dado"""
+    com_dado = [i for i, valor in enumerate(valores) if valor]
+    return [posicao, ANO_INICIAL + com_dado[0], ANO_INICIAL + com_dado[-1]] if com_dado else [posicao, None, None]
+
+
+def aba_cmi(uf, municipios, anos, nascidos, obitos, escala, linhas_titulo, gerador):
+    """Aba "CMI-Mil UF"/"CMI UF": taxa por município e ano (#VALOR! onde NV = 0 em parte das células)"""
+    linhas = [[None] for _ in range(linhas_titulo)]
+    linhas.append(['Município', *[float(ano) for ano in anos], '#Mun', 'Inic', 'Fim'])
+    linhas.append([f'MUNICIPIO IGNORADO - {uf}', *[0.0] * len(anos), None, None, None])
+    for posicao, (codigo, nome) in enumerate(municipios, start=1):
+        taxas = []
+        for nv, ob in zip(nascidos[codigo], obitos[codigo]):
+            if nv:
+                taxas.append(round(ob / nv * escala, 1))
+            else:
+                taxas.append('#VALOR!' if gerador.random() < 0.5 else 0.0)
+        linhas.append([f'{codigo} {nome}', *taxas, *_colunas_extras(posicao, nascidos[codigo])])
+    return pd.DataFrame(linhas, dtype=object)
+
+
+def aba_contagem(tipo, uf, municipios, anos, contagens):
+    """Aba "UF NV"/"UF OB": título, período, contagens ('-' para zero), Total e notas de rodapé"""
+    def celula(valor):
+        return valor if valor else '-'
+
+    linhas = [[TITULOS[tipo]], [f'Período:{anos[0]}-{anos[-1]}']]
+    linhas.append(['Município', *anos, 'Total', '#Mun', 'Inic', 'Fim'])
+    linhas.append([f'MUNICIPIO IGNORADO - {uf}', *['-'] * len(anos), '-', None, None, None])
+    totais = [0] * len(anos)
+    for posicao, (codigo, nome) in enumerate(municipios, start=1):
+        valores = contagens[codigo]
+        totais = [total + valor for total, valor in zip(totais, valores)]
+        linhas.append([f'{codigo} {nome}', *map(celula, valores), sum(valores), *_colunas_extras(posicao, valores)])
+    linhas.append(['Total', *map(celula, totais), sum(totais), None, None, None])
+    linhas.append([None])
+    linhas.extend([nota] for nota in NOTAS_RODAPE[tipo])
+    return pd.DataFrame(linhas, dtype=object)
+
+
+def salvar_planilha(arquivo, abas, engine):
+    """Grava {nome da aba: DataFrame} sem cabeçalho nem índice (o layout já está nas linhas)"""
+    with pd.ExcelWriter(arquivo, engine=engine) as escritor:
+        for nome_aba, df in abas.items():
+            df.to_excel(escritor, sheet_name=nome_aba, header=False, index=False)
+
+
+def gerar_planilhas(destino, ufs=5, municipios=100, anos=29, semente=42):
+    """Gera as quatro planilhas em `destino` e retorna {nome do arquivo: Path}"""
+    if not 1 <= anos <= MAX_ANOS:
+        raise ValueError(f"Quantidade de anos deve estar entre 1 e {MAX_ANOS}")
+    if not 1 <= municipios <= MAX_MUNICIPIOS:
+        raise ValueError(f"Quantidade de municípios deve estar entre 1 e {MAX_MUNICIPIOS}")
+
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    gerador = random.Random(semente)
+    lista_anos = list(range(ANO_INICIAL, ANO_INICIAL + anos))
+
+    abas_cmi_mil_ods, abas_cmi_ods, abas_cmi_mil_xlsx, abas_cmi_xlsx = {}, {}, {}, {}
+    for prefixo, uf in ufs_sinteticas(ufs):
+        lista = municipios_da_uf(prefixo, municipios, gerador)
+        nascidos, obitos = series_da_uf(lista, lista_anos, gerador)
+        cmi_mil = aba_cmi(uf, lista, lista_anos, nascidos, obitos, 1000, 2, gerador)
+        cmi = aba_cmi(uf, lista, lista_anos, nascidos, obitos, 100, 3, gerador)
+        nv = aba_contagem('NV', uf, lista, lista_anos, nascidos)
+        ob = aba_contagem('OB', uf, lista, lista_anos, obitos)
+
+        abas_cmi_mil_ods.update({f'{uf} OB': ob, f'{uf} NV': nv, f'CMI-Mil {uf}': cmi_mil})
+        abas_cmi_ods[f'CMI {uf}'] = cmi
+        abas_cmi_mil_xlsx.update({f'CMI {uf}': cmi_mil, f'{uf} OB': ob, f'{uf} NV': nv})
+        abas_cmi_xlsx[f'CMI {uf}'] = cmi
+
+    arquivos = {
+        'CMI-Mil.ods': (abas_cmi_mil_ods, 'odf'),
+        'CMI.ods': (abas_cmi_ods, 'odf'),
+        'CMI_Mil_Br_0_4.xlsx': (abas_cmi_mil_xlsx, 'openpyxl'),
+        'CMI_PURO_semMIL.xlsx': (abas_cmi_xlsx, 'openpyxl'),
+    }
+    for nome, (abas, engine) in arquivos.items():
+        salvar_planilha(destino / nome, abas, engine)
+    return {nome: destino / nome for nome in arquivos}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python benchmarks/gerador_planilhas.py <destino> [ufs] [municipios] [anos]")
+        sys.exit(1)
+    parametros = [int(valor) for valor in sys.argv[2:5]]
+    for nome, arquivo in gerar_planilhas(sys.argv[1], *parametros).items():
+        print(f"  💾 {nome}: {arquivo.stat().st_size / 1024:,.0f} KB")
@@ -0,0 +1,192 @@
+"""
+Gerador de saídas sintéticas no esquema de data/output/<indicador>/UF.json, em escala configurável
+Serve para testar carga, índices e dashboard com 10× ou 100× o volume atual antes dos dados reais.
+
+Os municípios (nomes e códigos IBGE) vêm do dicionário data/output/codigos_municipios.json, então os
+JSONs de CMI e CMI-Mil saem sem código (como os reais) e são resolvidos pelo próprio dicionário.
+Registros: {"Municipio", "Codigo_Municipio", "Ano", "Valor", "UF", "Tipo"}.
+
+Multiplicadores:
+- fator_anos: 29 × fator anos terminando em 2024 (fator 10: 290 anos)
+- indicadores_extras: diretórios extra_01, extra_02... com taxas no mesmo esquema
+- mensal: NV/OB com 12 registros por município e ano, no armazenamento colunar mensal
+  (mensal/NV.npz e mensal/OB.npz, src/series_mensais.py); CMI e CMI-Mil continuam anuais
+
+Volume (5.570 municípios): 161 mil registros por indicador no fator 1; 646 mil nos quatro indicadores.
+Cerca de 3 milhões: fator_anos=5. Cerca de 30 milhões: fator_anos=7 com mensal.
+
+Uso: python benchmarks/gerador_saidas.py <destino> [fator_anos] [indicadores_extras] [mensal]
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.armazenamento import DIRETORIOS_INDICADORES, INDICADORES_CONTAGEM
+from src import series_mensais
+from src.codigos_municipios import carregar_dicionario
+
+ANO_FINAL = 2024
+ANOS_BASE = 29  # 1996-2024, como nos dados reais
+
+# Tipo gravado em cada registro (igual aos JSONs reais)
+TIPOS = {'CMI': 'CMI', 'CMI_MIL': 'CMI-Mil', 'NV': 'Nascidos_Vivos', 'OB': 'Obitos'}
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def diretorio_extra(numero):
+    """Nome do diretório (e indicador) extra de número `numero`: extra_01 / EXTRA_01"""
+    return f'extra_{numero:02d}'
+
+
+def linhas_por_indicador(municipios, fator_anos=1, mensal=False):
+    """Registros de um indicador para `municipios` municípios (mensal: NV/OB)"""
+    return municipios * ANOS_BASE * fator_anos * (12 if mensal else 1)
+
+
+def municipios_por_uf():
+    """{UF: [(código IBGE, nome), ...]} do dicionário de códigos, ordenados pelo nome"""
+    dicionario = carregar_dicionario()
+    if not dicionario:
+        raise FileNotFoundError("Dicionário de códigos vazio: execute python src/codigos_municipios.py")
+    return {uf: sorted(((codigo, nome) for nome, codigo in nomes.items()), key=lambda par: par[1])
+            for uf, nomes in sorted(dicionario.items())}
+
+
+def periodos(fator_anos, mensal):
+    """(anos, meses) de cada período, em ordem cronológica; meses é None sem mensal"""
+    anos = np.arange(ANO_FINAL - ANOS_BASE * fator_anos + 1, ANO_FINAL + 1)
+    if not mensal:
+        return anos, None
+    return np.repeat(anos, 12), np.tile(np.arange(1, 13), len(anos))
+
+
+def series_da_uf(quantidade, total_periodos, mensal, gerador):
+    """Nascidos vivos e óbitos (municípios × períodos) com porte e taxa próprios de cada município"""
+    porte = gerador.lognormal(5, 1.2, size=(quantidade, 1)) / (12 if mensal else 1)
+    nascidos = np.maximum(0, np.rint(gerador.normal(porte, porte * 0.1, size=(quantidade, total_periodos))))
+    nascidos = nascidos.astype(np.int64)
+    taxa = gerador.uniform(0.008, 0.025, size=(quantidade, 1))
+    obitos = gerador.binomial(nascidos, np.broadcast_to(taxa, nascidos.shape))
+    return nascidos, obitos
+
+
+def registros(uf, municipios, anos, meses, valores, tipo, com_codigo):
+    """
+    DataFrame no esquema dos JSONs: período por período, municípios em ordem alfabética
+    valores: (municípios × períodos), NaN onde não há registro
+    """
+    quantidade, total_periodos = valores.shape
+    codigos = np.array([str(codigo) for codigo, _ in municipios], dtype=object)
+    nomes = np.array([nome for _, nome in municipios], dtype=object)
+
+    colunas = {
+        'Municipio': np.tile(nomes, total_periodos),
+        'Codigo_Municipio': np.tile(codigos, total_periodos) if com_codigo else np.full(quantidade * total_periodos, None),
+        'Ano': np.repeat(anos, quantidade),
+    }
+    if meses is not None:
+        colunas['Mes'] = np.repeat(meses, quantidade)
+    colunas['Valor'] = valores.T.ravel()
+    df = pd.DataFrame(colunas)
+    df['UF'] = uf
+    df['Tipo'] = tipo
+    return df[df['Valor'].notna()]
+
+
+def salvar_json(df, arquivo):
+    """Grava a lista de registros (sem indentação: os leitores só usam json.load)"""
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        f.write(df.to_json(orient='records', force_ascii=False))
+
+
+def gerar_saidas(destino, fator_anos=1, indicadores_extras=0, mensal=False, semente=42):
+    """
+    Gera os JSONs de CMI, CMI-Mil, NV, OB (e extras) em `destino`, um por UF
+    (com mensal, NV e OB vão para destino/mensal/NV.npz e OB.npz)
+    Retorna {indicador: (diretório ou arquivo, registros gravados)}
+    """
+    if fator_anos < 1:
+        raise ValueError("fator_anos deve ser pelo menos 1")
+    destino = Path(destino)
+    gerador = np.random.default_rng(semente)
+    anos, meses = periodos(fator_anos, mensal)
+    anos_anuais = anos[::12] if mensal else anos
+
+    diretorios = {tipo: destino / DIRETORIOS_INDICADORES[tipo].name for tipo in TIPOS}
+    for numero in range(1, indicadores_extras + 1):
+        diretorios[diretorio_extra(numero).upper()] = destino / diretorio_extra(numero)
+    totais = dict.fromkeys(diretorios, 0)
+    mensais = {'NV': [], 'OB': []}
+
+    for uf, municipios in municipios_por_uf().items():
+        nascidos, obitos = series_da_uf(len(municipios), len(anos), mensal, gerador)
+        if mensal:
+            for tipo, valores in (('NV', nascidos), ('OB', obitos)):
+                mensais[tipo].append(registros(uf, municipios, anos, meses, valores, TIPOS[tipo], True))
+            nascidos = nascidos.reshape(len(municipios), -1, 12).sum(axis=2)
+            obitos = obitos.reshape(len(municipios), -1, 12).sum(axis=2)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cmi_mil = np.where(nascidos > 0, obitos / nascidos * 1000, np.nan)
+        indicadores = {} if mensal else {
+            'NV': (nascidos.astype(float), True),
+            'OB': (obitos.astype(float), True),
+        }
+        indicadores.update({
+            'CMI_MIL': (np.round(cmi_mil, 1), False),
+            'CMI': (np.round(cmi_mil * gerador.uniform(0.85, 1.15, size=cmi_mil.shape), 2), False),
+        })
+        for numero in range(1, indicadores_extras + 1):
+            indicadores[diretorio_extra(numero).upper()] = (
+                np.round(cmi_mil * gerador.uniform(0.5, 1.5, size=(len(municipios), 1)), 2), True
+            )
+
+        for tipo, (valores, com_codigo) in indicadores.items():
+            df = registros(uf, municipios, anos_anuais, None, valores, TIPOS.get(tipo, tipo.title()), com_codigo)
+            if tipo in INDICADORES_CONTAGEM:
+                df = df.astype({'Valor': np.int64})
+            salvar_json(df, diretorios[tipo] / f'{uf}.json')
+            totais[tipo] += len(df)
+
+    for tipo, frames in mensais.items():
+        if frames:
+            diretorios[tipo] = destino / 'mensal' / f'{tipo}.npz'
+            df = pd.concat(frames, ignore_index=True)
+            totais[tipo] = series_mensais.salvar_indicador_mensal(df, tipo, diretorios[tipo])
+    return {tipo: (diretorios[tipo], totais[tipo]) for tipo in diretorios}
+
+
+def apontar_armazenamento(destino):
+    """
+    Redireciona src/armazenamento.py (neste processo) para as saídas geradas em `destino`,
+    incluindo os indicadores extras e as séries mensais; retorna {indicador: diretório}
+    """
+    destino = Path(destino)
+    series_mensais.DIR_MENSAL = destino / 'mensal'
+    for tipo, diretorio in DIRETORIOS_INDICADORES.items():
+        DIRETORIOS_INDICADORES[tipo] = destino / diretorio.name
+    for diretorio in sorted(destino.glob('extra_*')):
+        DIRETORIOS_INDICADORES[diretorio.name.upper()] = diretorio
+    return dict(DIRETORIOS_INDICADORES)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python benchmarks/gerador_saidas.py <destino> [fator_anos] [indicadores_extras] [mensal]")
+        sys.exit(1)
+    parametros = [int(valor) for valor in sys.argv[2:] if valor.isdigit()]
+    gerados = gerar_saidas(sys.argv[1], *parametros[:2], mensal='mensal' in sys.argv[2:])
+    for tipo, (diretorio, total) in gerados.items():
+        arquivos = [diretorio] if diretorio.is_file() else diretorio.glob('*.json')
+        tamanho = sum(arquivo.stat().st_size for arquivo in arquivos)
+        print(f"  💾 {tipo:<10} {total:>12,} registros  {tamanho / (1024 * 1024):>9,.1f} MB  {diretorio}")
+    print(f"  📊 Total: {sum(total for _, total in gerados.values()):,} registros")
@@ -0,0 +1,120 @@
+"""
+Benchmark do tempo de importação do dashboard (partida a frio de cada worker)
+Executa os imports do topo de app.py em um processo novo com `python -X importtime`,
+agrupa o tempo cumulativo por pacote de primeiro nível e mede o tempo total (melhor de N execuções).
+
+O histórico fica em benchmarks/resultados/importacao.json (versionado) para comparar entre mudanças.
+
+Uso: python benchmarks/importacao.py [repeticoes]
+"""
+import ast
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+APP = BASE_DIR / 'app.py'
+ARQUIVO_RESULTADOS = Path(__file__).parent / 'resultados' / 'importacao.json'
+
+REPETICOES_PADRAO = 5
+MAX_PACOTES_EXIBIDOS = 15
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def imports_do_topo(arquivo=APP):
+    """Comandos import/from ... import do nível de módulo do arquivo, na ordem em que aparecem"""
+    arvore = ast.parse(arquivo.read_text(encoding='utf-8'))
+    return [
+        ast.unparse(no) for no in arvore.body
+        if isinstance(no, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def medir_importtime(codigo):
+    """
+    Executa o código com -X importtime e devolve {pacote de primeiro nível: cumulativo em ms}
+    Só as linhas de nível 0 entram (o cumulativo já inclui os submódulos)
+    """
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    ).stderr
+
+    pacotes = {}
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|')
+        if nome.startswith('   '):  # Submódulo (indentado sob o módulo que o importou)
+            continue
+        raiz = nome.strip().split('.')[0]
+        pacotes[raiz] = pacotes.get(raiz, 0.0) + int(cumulativo) / 1000
+    return pacotes
+
+
+def medir_total(codigo, repeticoes):
+    """Melhor tempo de parede (ms) de um processo Python que só executa os imports"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, '-c', codigo], cwd=BASE_DIR, check=True)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], cwd=BASE_DIR, check=True)
+    interpretador = time.perf_counter() - inicio
+    return melhor * 1000, interpretador * 1000
+
+
+def salvar_resultado(resultado, arquivo=ARQUIVO_RESULTADOS):
+    """Acrescenta o resultado ao histórico"""
+    historico = json.loads(arquivo.read_text(encoding='utf-8')) if arquivo.exists() else []
+    historico.append(resultado)
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    arquivo.write_text(json.dumps(historico, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+def executar_benchmark(repeticoes=REPETICOES_PADRAO):
+    """Mede, exibe e salva o tempo de importação do dashboard"""
+    print("\n" + "="*70)
+    print(" ⏱️  BENCHMARK - TEMPO DE IMPORTAÇÃO DO DASHBOARD")
+    print("="*70)
+
+    imports = imports_do_topo()
+    codigo = '\n'.join(imports)
+    print(f"\n  📦 {len(imports)} imports no topo de {APP.name}")
+
+    pacotes = medir_importtime(codigo)
+    total, interpretador = medir_total(codigo, repeticoes)
+
+    print(f"\n  {'Pacote':<30} {'Cumulativo (ms)':>16}")
+    print(f"  {'-'*30} {'-'*16}")
+    for pacote, ms in sorted(pacotes.items(), key=lambda item: -item[1])[:MAX_PACOTES_EXIBIDOS]:
+        print(f"  {pacote:<30} {ms:>16.1f}")
+
+    print(f"\n  🕐 Processo com os imports (melhor de {repeticoes}): {total:.0f} ms")
+    print(f"  🕐 Interpretador vazio: {interpretador:.0f} ms")
+
+    resultado = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'imports': imports,
+        'total_ms': round(total, 1),
+        'interpretador_ms': round(interpretador, 1),
+        'pacotes_ms': {pacote: round(ms, 1) for pacote, ms in sorted(pacotes.items(), key=lambda item: -item[1])},
+    }
+    salvar_resultado(resultado)
+    print(f"  💾 Histórico: {ARQUIVO_RESULTADOS.relative_to(BASE_DIR)}")
+    print("="*70)
+    return resultado
+
+
+if __name__ == "__main__":
+    executar_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES_PADRAO)
@@ -0,0 +1,140 @@
+"""
+Benchmark da leitura dos JSONs dos indicadores (ler_jsons em src/armazenamento.py)
+Para cada indicador de data/output (ou das saídas sintéticas de gerador_saidas.py com um fator de anos),
+mede a mediana de REPETICOES leituras completas, com o json da biblioteca padrão e com orjson:
+- sequencial: lê, decodifica e monta o DataFrame de um arquivo por vez
+- threads_conversao: cada thread lê, decodifica e monta o DataFrame do seu arquivo
+- threads_leitura: as threads só leem os arquivos do disco; decodificação e DataFrame na thread principal
+  (o que ler_jsons faz)
+Decodificar o JSON e montar o DataFrame a partir de uma lista de dicionários seguram o GIL: com threads,
+só a leitura do disco anda em paralelo. Os arquivos já estão no cache do sistema operacional após a
+primeira repetição, então o ganho de ler em paralelo num disco frio não aparece aqui.
+
+O histórico fica em benchmarks/resultados/leitura_json.json (versionado) para comparar entre mudanças.
+
+Uso: python benchmarks/leitura_json.py [fator_anos]
+"""
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.etl import salvar_resultado
+from benchmarks.gerador_saidas import apontar_armazenamento, gerar_saidas
+from src import armazenamento
+
+ARQUIVO_RESULTADOS = Path(__file__).parent / 'resultados' / 'leitura_json.json'
+
+REPETICOES = 5
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+# ============================================================================
+# VARIANTES DE LEITURA
+# ============================================================================
+
+def _quadro(arquivo):
+    return pd.DataFrame(armazenamento.decodificar_json(Path(arquivo).read_bytes()))
+
+
+def ler_sequencial(arquivos):
+    return pd.concat([_quadro(arquivo) for arquivo in arquivos], ignore_index=True)
+
+
+def ler_threads_conversao(arquivos):
+    with ThreadPoolExecutor(max_workers=min(len(arquivos), armazenamento.MAX_LEITORES_JSON)) as leitores:
+        return pd.concat(list(leitores.map(_quadro, arquivos)), ignore_index=True)
+
+
+VARIANTES = {
+    'sequencial': ler_sequencial,
+    'threads_conversao': ler_threads_conversao,
+    'threads_leitura': armazenamento.ler_jsons,
+}
+
+
+def medir(arquivos, leitura):
+    """Mediana (ms) de REPETICOES leituras completas"""
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        leitura(arquivos)
+        tempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tempos) * 1000, 1)
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def executar_benchmark(fator=None):
+    """Mede as variantes com cada decodificador; exibe e salva o resultado"""
+    print("\n" + "="*70)
+    print(" ⏱️  BENCHMARK - LEITURA DOS JSONS DOS INDICADORES")
+    print("="*70)
+
+    temporario = None
+    if fator:
+        temporario = Path(tempfile.mkdtemp(prefix='leitura_json_'))
+        print(f"\n  ▶️  Fator de anos {fator}: gerando saídas...")
+        gerar_saidas(temporario, fator)
+        apontar_armazenamento(temporario)
+
+    orjson_instalado = armazenamento.orjson
+    decodificadores = {'json': None}
+    if orjson_instalado is not None:
+        decodificadores['orjson'] = orjson_instalado
+
+    try:
+        indicadores = {}
+        for tipo, diretorio in armazenamento.DIRETORIOS_INDICADORES.items():
+            arquivos = sorted(diretorio.glob('*.json'))
+            if not arquivos:
+                continue
+            medidas = {'arquivos': len(arquivos), 'registros': len(armazenamento.ler_jsons(arquivos))}
+            for nome, modulo in decodificadores.items():
+                armazenamento.orjson = modulo
+                medidas[nome] = {variante: medir(arquivos, leitura) for variante, leitura in VARIANTES.items()}
+            indicadores[tipo] = medidas
+    finally:
+        armazenamento.orjson = orjson_instalado
+        if temporario is not None:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    print(f"\n  {'Indicador':<10} {'Decodificador':<14} " + ' '.join(f"{variante:>18}" for variante in VARIANTES))
+    for tipo, medidas in indicadores.items():
+        for nome in decodificadores:
+            tempos = ' '.join(f"{medidas[nome][variante]:>16.1f}ms" for variante in VARIANTES)
+            print(f"  {tipo:<10} {nome:<14} {tempos}")
+
+    resultado = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'cpus': os.cpu_count(),
+        'leitores': armazenamento.MAX_LEITORES_JSON,
+        'fator_anos': fator or None,
+        'indicadores': indicadores,
+    }
+    salvar_resultado(resultado, ARQUIVO_RESULTADOS)
+    print(f"\n  💾 Histórico: {ARQUIVO_RESULTADOS.relative_to(BASE_DIR)}")
+    print("="*70)
+    return resultado
+
+
+if __name__ == "__main__":
+    executar_benchmark(next((int(valor) for valor in sys.argv[1:] if valor.isdigit()), None))
@@ -0,0 +1,34 @@
+"""
+Sobe o dashboard com os dados já carregados
+Enquanto o Streamlit inicia, uma thread carrega os quatro indicadores, o catálogo de municípios
+e o índice de busca no cache do processo (src/armazenamento.py); a primeira requisição não paga
+a leitura dos JSONs. Uma requisição que chegue durante o aquecimento espera a mesma carga.
+
+Uso: python iniciar_dashboard.py [opções do streamlit run, ex: --server.port 8502]
+"""
+import sys
+import threading
+from pathlib import Path
+
+from streamlit.web import cli as streamlit_cli
+
+from src.armazenamento import aquecer_armazenamento
+
+APP = Path(__file__).parent / 'app.py'
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def main():
+    print("  🔥 Aquecendo o armazenamento em segundo plano...")
+    threading.Thread(target=aquecer_armazenamento, name="aquecimento_armazenamento", daemon=True).start()
+
+    # Mesmo processo: o app encontra o cache já preenchido
+    sys.argv = ['streamlit', 'run', str(APP), *sys.argv[1:]]
+    sys.exit(streamlit_cli.main())
+
+
+if __name__ == "__main__":
+    main()
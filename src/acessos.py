@@ -0,0 +1,109 @@
+"""
+Estado compartilhável do dashboard (query params) e registro de acessos
+O estado (municípios, período e modo) vai na URL pelos códigos IBGE:
+    ?municipios=230440,355030&anos=2000-2020&modo=comparativo
+
+Cada estado novo aberto no dashboard é registrado em data/output/acessos.jsonl (uma linha JSON).
+Ao passar de TAMANHO_MAX_REGISTRO bytes o arquivo vira acessos.jsonl.1 (substituindo o anterior) e um novo
+é iniciado: o registro ocupa no máximo duas vezes esse tamanho em disco.
+Na subida do servidor os estados mais acessados são lidos daqui e pré-calculados (dados e figuras).
+"""
+import json
+import os
+import threading
+from collections import Counter, deque
+from datetime import datetime
+
+from src.armazenamento import DIR_OUTPUT
+
+ARQUIVO_ACESSOS = DIR_OUTPUT / 'acessos.jsonl'
+
+MODOS = {'comparativo': 'Comparativo', 'individual': 'Individual'}
+MAX_LINHAS_LIDAS = 50_000  # Só os acessos mais recentes entram no ranking de estados populares
+TAMANHO_MAX_REGISTRO = 16 * 1024 * 1024  # Bytes do registro atual antes da rotação
+LIMITE_ESTADOS_POPULARES = 10
+
+_trava_registro = threading.Lock()
+
+
+def codificar_estado(codigos, anos, modo):
+    """Estado do dashboard -> query params (strings)"""
+    return {
+        'municipios': ','.join(str(int(codigo)) for codigo in codigos),
+        'anos': f"{anos[0]}-{anos[1]}",
+        'modo': modo.lower(),
+    }
+
+
+def decodificar_estado(parametros):
+    """
+    Query params -> {'codigos': [...], 'anos': (inicio, fim) ou None, 'modo': 'Comparativo'/'Individual' ou None}
+    Valores inválidos são ignorados (o dashboard usa o padrão no lugar)
+    """
+    codigos = []
+    for item in str(parametros.get('municipios', '')).split(','):
+        item = item.strip()
+        if item.isdigit():
+            codigo = int(item)
+            # Códigos de 7 dígitos trazem o dígito verificador no final
+            codigos.append(codigo // 10 if codigo >= 1_000_000 else codigo)
+
+    anos = None
+    inicio, _, fim = str(parametros.get('anos', '')).partition('-')
+    if inicio.strip().isdigit() and fim.strip().isdigit():
+        anos = tuple(sorted((int(inicio), int(fim))))
+
+    return {
+        'codigos': list(dict.fromkeys(codigos)),
+        'anos': anos,
+        'modo': MODOS.get(str(parametros.get('modo', '')).lower()),
+    }
+
+
+def arquivo_anterior(arquivo=ARQUIVO_ACESSOS):
+    """Registro rotacionado (acessos.jsonl.1)"""
+    return arquivo.with_name(arquivo.name + '.1')
+
+
+def registrar_acesso(codigos, anos, modo, arquivo=ARQUIVO_ACESSOS):
+    """
+    Acrescenta um estado ao registro de acessos, rotacionando-o ao passar de TAMANHO_MAX_REGISTRO
+    (falhas de escrita não interrompem o dashboard)
+    """
+    linha = json.dumps({
+        'em': datetime.now().isoformat(timespec='seconds'),
+        'municipios': [int(codigo) for codigo in codigos],
+        'anos': [int(anos[0]), int(anos[1])],
+        'modo': modo,
+    })
+    try:
+        with _trava_registro:
+            with open(arquivo, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+                tamanho = f.tell()
+            if tamanho > TAMANHO_MAX_REGISTRO:
+                os.replace(arquivo, arquivo_anterior(arquivo))
+    except OSError:
+        pass
+
+
+def estados_populares(limite=LIMITE_ESTADOS_POPULARES, arquivo=ARQUIVO_ACESSOS):
+    """
+    Estados mais acessados entre os MAX_LINHAS_LIDAS registros mais recentes (do registro rotacionado e do atual)
+    Retorna [(codigos, anos, modo), ...] em ordem decrescente de acessos
+    """
+    linhas = deque(maxlen=MAX_LINHAS_LIDAS)
+    for origem in (arquivo_anterior(arquivo), arquivo):
+        if origem.exists():
+            with open(origem, 'r', encoding='utf-8') as f:
+                linhas.extend(f)
+
+    contagem = Counter()
+    for linha in linhas:
+        try:
+            acesso = json.loads(linha)
+            contagem[(tuple(acesso['municipios']), tuple(acesso['anos']), acesso['modo'])] += 1
+        except (ValueError, KeyError, TypeError):
+            continue
+
+    return [estado for estado, _ in contagem.most_common(limite)]
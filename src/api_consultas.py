@@ -0,0 +1,679 @@
+"""
+API de consultas (HTTP/JSON) sobre os indicadores processados
+Serve as séries por código IBGE sem que outros serviços precisem ler os JSONs de data/output/
+
+Os quatro indicadores são carregados uma única vez (sem os registros bloqueados na validação),
+indexados por código e recarregados automaticamente quando o ETL regrava algum arquivo.
+Toda resposta traz ETag derivado da versão dos dados: com If-None-Match o cliente recebe 304.
+
+O servidor é assíncrono (asyncio): as consultas rodam em threads e pedidos idênticos que chegam
+ao mesmo tempo são agrupados em uma única execução, cujo resultado é entregue a todos.
+
+Rotas (GET):
+  /versao
+  /municipios?uf=CE
+  /series?codigos=230440,355030&indicadores=CMI,NV&inicio=2000&fim=2010
+  /uf/CE?indicadores=NV,OB&inicio=2000&fim=2010
+  /ranking?indicador=CMI&ano=2020&uf=CE&ordem=desc&limite=10
+  /comparacao?codigos=230440,355030&indicador=CMI&inicio=2000&fim=2010
+  /bloco?codigos=230440,355030&indicadores=CMI,NV&inicio=2000&fim=2010
+  /exportar?formato=csv&uf=CE&inicio=2000&fim=2010  (formato csv/parquet/xlsx; codigos=..., uf=... ou nacional)
+Rota (POST):
+  /lote  corpo: [{"rota": "/series", "parametros": {"codigos": [230440, 355030]}}, ...]
+
+Uso: python src/api_consultas.py [porta]
+"""
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import namedtuple
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+# Permite executar como script (python src/api_consultas.py) e importar como src.api_consultas
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.armazenamento import (
+    DIRETORIOS_INDICADORES, INDICADORES_CONTAGEM, MAX_CODIGOS, carregar_indicadores_preparados,
+    catalogo_de_indicadores, fatiar_por_codigo, obter_series, versao_dados_preparados,
+)
+from src.exportacao import (
+    FORMATOS, codigos_do_escopo, exportar, formatos_disponiveis, gerar_csv, nome_arquivo, partes_exportacao,
+    validar_exportacao,
+)
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PORTA_PADRAO = 8600
+INTERVALO_VERIFICACAO = 5  # Segundos entre verificações de mudança nos arquivos
+MAX_LOTE = 100
+MAX_RANKING = 1000
+MAX_CABECALHOS = 100
+MAX_CORPO = 2 << 20  # Bytes do corpo de um POST (um /lote de MAX_LOTE consultas com MAX_CODIGOS códigos cabe)
+CAMPOS_LOTE = {'rota', 'parametros'}  # Campos aceitos em cada consulta do POST /lote
+TAMANHO_BLOCO_ENVIO = 1 << 20  # Bytes por bloco ao enviar arquivos Parquet/XLSX já gerados
+MAX_RESPOSTAS_EM_CACHE = 512  # Respostas serializadas guardadas por versão dos dados
+
+# Base da versão atual: substituída inteira quando os dados mudam, nunca alterada no lugar,
+# para que uma consulta em andamento termine sobre a versão com que começou
+_base = {'versao': None, 'dados': {}, 'catalogo': None, 'anos': (0, -1), 'respostas': {}}
+_verificado_em = 0.0
+_trava_base = threading.Lock()
+_trava_respostas = threading.Lock()
+
+
+# ====================================================================================
+# BASE DE DADOS EM MEMÓRIA
+# ====================================================================================
+
+def carregar_base():
+    """Carrega os indicadores (sem bloqueios, indexados por código, em paralelo) e o catálogo de municípios"""
+    return montar_base(carregar_indicadores_preparados())
+
+
+def montar_base(dados, versao=None):
+    """
+    Base de consultas a partir de {indicador: DataFrame indexado por código}: catálogo, intervalo de anos
+    e o cache de respostas serializadas desta versão
+    """
+    com_dados = [df for df in dados.values() if not df.empty]
+    if com_dados:
+        anos = (min(int(df['Ano'].min()) for df in com_dados), max(int(df['Ano'].max()) for df in com_dados))
+    else:
+        anos = (0, -1)
+    return {
+        'versao': versao, 'dados': dados, 'catalogo': catalogo_de_indicadores(dados), 'anos': anos, 'respostas': {},
+    }
+
+
+def obter_base():
+    """Base em memória, recarregada quando a versão dos dados muda (verificada a cada INTERVALO_VERIFICACAO s)"""
+    global _base, _verificado_em
+    with _trava_base:
+        agora = time.monotonic()
+        if _base['versao'] is not None and agora - _verificado_em < INTERVALO_VERIFICACAO:
+            return _base
+
+        versao = versao_dados_preparados()
+        if versao != _base['versao']:
+            base = carregar_base()
+            base['versao'] = versao
+            _base = base
+        _verificado_em = agora
+        return _base
+
+
+# ====================================================================================
+# PARÂMETROS
+# ====================================================================================
+
+def _lista(valor):
+    """Aceita '1,2,3' (query string) ou [1, 2, 3] (corpo JSON do lote)"""
+    if valor is None or valor == '':
+        return []
+    if isinstance(valor, (list, tuple)):
+        return [str(v).strip() for v in valor]
+    return [v.strip() for v in str(valor).split(',') if v.strip()]
+
+
+def _inteiro(valor, nome, padrao=None):
+    """Converte um parâmetro para int (ValueError com mensagem clara se inválido)"""
+    if valor is None or valor == '':
+        return padrao
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Parâmetro '{nome}' deve ser inteiro: {valor!r}")
+
+
+def _codigos(parametros, obrigatorio=True):
+    """Lista de códigos IBGE (6 ou 7 dígitos) do parâmetro 'codigos'"""
+    codigos = [_inteiro(c, 'codigos') for c in _lista(parametros.get('codigos'))]
+    codigos = [c // 10 if c >= 1_000_000 else c for c in codigos]
+    if obrigatorio and not codigos:
+        raise ValueError("Parâmetro 'codigos' é obrigatório")
+    if len(codigos) > MAX_CODIGOS:
+        raise ValueError(f"No máximo {MAX_CODIGOS} códigos por consulta")
+    return list(dict.fromkeys(codigos))
+
+
+def _indicadores(parametros, nome='indicadores'):
+    """Indicadores pedidos (todos por padrão), validados contra DIRETORIOS_INDICADORES"""
+    indicadores = [i.upper() for i in _lista(parametros.get(nome))] or list(DIRETORIOS_INDICADORES)
+    desconhecidos = [i for i in indicadores if i not in DIRETORIOS_INDICADORES]
+    if desconhecidos:
+        raise ValueError(f"Indicador(es) desconhecido(s): {', '.join(desconhecidos)}")
+    return indicadores
+
+
+def _periodo(df, parametros):
+    """Filtra o DataFrame pelo intervalo [inicio, fim] de anos (ambos opcionais)"""
+    inicio = _inteiro(parametros.get('inicio'), 'inicio')
+    fim = _inteiro(parametros.get('fim'), 'fim')
+    if inicio is not None:
+        df = df[df['Ano'] >= inicio]
+    if fim is not None:
+        df = df[df['Ano'] <= fim]
+    return df
+
+
+def _valores(serie, inteiros=False):
+    """Valores serializáveis em JSON (NaN vira null; inteiros=True para contagens vindas de float)"""
+    if inteiros:
+        return [None if pd.isna(v) else int(v) for v in serie.tolist()]
+    return [None if pd.isna(v) else v for v in serie.tolist()]
+
+
+def _municipio(base, codigo):
+    """Nome e UF de um código (LookupError se o código não existe na base)"""
+    if codigo not in base['catalogo'].index:
+        raise LookupError(f"Município {codigo} não encontrado")
+    municipio, uf = base['catalogo'].loc[codigo, ['Municipio', 'UF']]
+    return {'codigo': int(codigo), 'municipio': municipio, 'uf': uf}
+
+
+# ====================================================================================
+# CONSULTAS
+# ====================================================================================
+
+def consultar_versao(base, parametros):
+    """Versão dos dados e tamanho da base"""
+    return {
+        'versao': base['versao'],
+        'municipios': int(len(base['catalogo'])),
+        'registros': {tipo: int(len(df)) for tipo, df in base['dados'].items()},
+    }
+
+
+def consultar_municipios(base, parametros):
+    """Catálogo de municípios (código, nome, UF), opcionalmente filtrado por UF"""
+    catalogo = base['catalogo'].reset_index()
+    uf = str(parametros.get('uf', '')).upper()
+    if uf:
+        catalogo = catalogo[catalogo['UF'] == uf]
+    return {
+        'municipios': [
+            {'codigo': int(codigo), 'municipio': municipio, 'uf': uf_municipio}
+            for codigo, municipio, uf_municipio in catalogo.itertuples(index=False)
+        ]
+    }
+
+
+def consultar_series(base, parametros):
+    """Séries anuais de vários municípios e indicadores em uma única resposta"""
+    indicadores = _indicadores(parametros)
+    resultado = []
+    for codigo in _codigos(parametros):
+        item = _municipio(base, codigo)
+        item['series'] = {}
+        for tipo in indicadores:
+            serie = _periodo(fatiar_por_codigo(base['dados'][tipo], codigo), parametros)
+            item['series'][tipo] = {'anos': serie['Ano'].tolist(), 'valores': _valores(serie['Valor'])}
+        resultado.append(item)
+    return {'municipios': resultado}
+
+
+def consultar_uf(base, parametros):
+    """Agregado anual de uma UF: soma para NV/OB, média municipal para CMI/CMI_MIL"""
+    uf = str(parametros.get('uf', '')).upper()
+    if uf not in set(base['catalogo']['UF']):
+        raise LookupError(f"UF {uf!r} não encontrada")
+
+    indicadores = {}
+    for tipo in _indicadores(parametros):
+        df = base['dados'][tipo]
+        df = _periodo(df[df['UF'] == uf], parametros)
+        # Contagens (NV, OB) são somadas; taxas usam a média municipal
+        soma = tipo in INDICADORES_CONTAGEM
+        por_ano = df.groupby('Ano')['Valor'].agg(valor='sum' if soma else 'mean', municipios='size')
+        indicadores[tipo] = {
+            'agregacao': 'soma' if soma else 'media',
+            'anos': por_ano.index.tolist(),
+            'valores': _valores(por_ano['valor'].round(2)),
+            'municipios': por_ano['municipios'].tolist(),
+        }
+    return {'uf': uf, 'indicadores': indicadores}
+
+
+def consultar_ranking(base, parametros):
+    """Ranking dos municípios em um indicador e ano (último ano disponível por padrão)"""
+    tipo = _indicadores(parametros, 'indicador')[0] if parametros.get('indicador') else None
+    if tipo is None:
+        raise ValueError("Parâmetro 'indicador' é obrigatório")
+
+    df = base['dados'][tipo]
+    uf = str(parametros.get('uf', '')).upper()
+    if uf:
+        df = df[df['UF'] == uf]
+    if df.empty:
+        return {'indicador': tipo, 'ano': None, 'uf': uf or None, 'ranking': []}
+
+    ano = _inteiro(parametros.get('ano'), 'ano', int(df['Ano'].max()))
+    ordem = str(parametros.get('ordem', 'desc')).lower()
+    if ordem not in ('asc', 'desc'):
+        raise ValueError("Parâmetro 'ordem' deve ser 'asc' ou 'desc'")
+    limite = min(_inteiro(parametros.get('limite'), 'limite', 10), MAX_RANKING)
+
+    do_ano = df[df['Ano'] == ano].sort_values(['Valor', 'Municipio'], ascending=[ordem == 'asc', True])
+    ranking = [
+        {'posicao': posicao, 'codigo': int(codigo), 'municipio': municipio, 'uf': uf_municipio, 'valor': valor}
+        for posicao, (codigo, municipio, uf_municipio, valor) in enumerate(
+            do_ano[['Codigo_Municipio', 'Municipio', 'UF', 'Valor']].head(limite).itertuples(index=False), start=1
+        )
+    ]
+    return {'indicador': tipo, 'ano': ano, 'uf': uf or None, 'ordem': ordem, 'ranking': ranking}
+
+
+def consultar_comparacao(base, parametros):
+    """Um indicador para vários municípios alinhado nos mesmos anos, com média/mínimo/máximo"""
+    tipo = _indicadores(parametros, 'indicador')[0] if parametros.get('indicador') else None
+    if tipo is None:
+        raise ValueError("Parâmetro 'indicador' é obrigatório")
+
+    bloco = _bloco(base, parametros, [tipo])
+    contagem = tipo in INDICADORES_CONTAGEM
+    municipios = []
+    for posicao, codigo in enumerate(bloco['codigos'].tolist()):
+        item = _municipio(base, codigo)
+        serie = pd.Series(bloco['valores'][0, posicao])
+        converter = int if contagem else float
+        vazia = serie.isna().all()
+        item.update(
+            valores=_valores(serie, contagem),
+            media=None if vazia else round(float(serie.mean()), 2),
+            minimo=None if vazia else converter(serie.min()),
+            maximo=None if vazia else converter(serie.max()),
+        )
+        municipios.append(item)
+    return {'indicador': tipo, 'anos': bloco['anos'].tolist(), 'municipios': municipios}
+
+
+def _bloco(base, parametros, indicadores):
+    """obter_series sobre a base com os códigos e o período [inicio, fim] dos parâmetros"""
+    codigos = _codigos(parametros)
+    for codigo in codigos:
+        _municipio(base, codigo)
+
+    return obter_series(base['dados'], codigos, indicadores, _anos(base, parametros))
+
+
+def _anos(base, parametros):
+    """
+    Intervalo (inicio, fim) para obter_series, limitado aos anos da base (um período fora dos dados
+    não aloca anos vazios: fica sem anos); None quando nenhum dos dois foi informado
+    """
+    inicio = _inteiro(parametros.get('inicio'), 'inicio')
+    fim = _inteiro(parametros.get('fim'), 'fim')
+    if inicio is None and fim is None:
+        return None
+    primeiro, ultimo = base['anos']
+    inicio = primeiro if inicio is None else max(inicio, primeiro)
+    fim = ultimo if fim is None else min(fim, ultimo)
+    return (inicio, fim) if inicio <= fim else (primeiro, primeiro - 1)
+
+
+def consultar_bloco(base, parametros):
+    """
+    Bloco alinhado de séries (obter_series): valores[indicador][municipio][ano], null onde não há dado
+    Uma única resposta para painéis com dezenas de municípios
+    """
+    bloco = _bloco(base, parametros, _indicadores(parametros))
+    return {
+        'codigos': bloco['codigos'].tolist(),
+        'indicadores': bloco['indicadores'],
+        'anos': bloco['anos'].tolist(),
+        'valores': [
+            [_valores(serie, tipo in INDICADORES_CONTAGEM) for serie in matriz]
+            for tipo, matriz in zip(bloco['indicadores'], bloco['valores'])
+        ],
+    }
+
+
+ROTAS = {
+    '/versao': consultar_versao,
+    '/municipios': consultar_municipios,
+    '/series': consultar_series,
+    '/uf': consultar_uf,
+    '/ranking': consultar_ranking,
+    '/comparacao': consultar_comparacao,
+    '/bloco': consultar_bloco,
+}
+
+
+# Resposta em partes (arquivo de exportação): gerador de blocos de bytes, tipo MIME e nome do arquivo
+RespostaArquivo = namedtuple('RespostaArquivo', ['blocos', 'mime', 'nome'])
+
+
+def preparar_exportacao(parametros):
+    """
+    GET /exportar: valida os parâmetros e retorna (status, RespostaArquivo ou corpo de erro)
+    CSV é enviado lote a lote enquanto é gerado; Parquet e XLSX são gerados em arquivo temporário
+    e enviados em blocos de TAMANHO_BLOCO_ENVIO
+    """
+    base = obter_base()
+    try:
+        formato = str(parametros.get('formato') or 'csv').lower()
+        if formato not in formatos_disponiveis():
+            raise ValueError(f"Formato indisponível: {formato} (disponíveis: {', '.join(formatos_disponiveis())})")
+        indicadores = _indicadores(parametros)
+        anos = _anos(base, parametros)
+
+        uf = parametros.get('uf')
+        if parametros.get('codigos'):
+            codigos, escopo = _codigos(parametros), 'selecao'
+            for codigo in codigos:
+                _municipio(base, codigo)
+        elif uf:
+            codigos, escopo = codigos_do_escopo(base['catalogo'], uf), str(uf).upper()
+            if not codigos:
+                raise LookupError(f"UF {uf} não encontrada")
+        else:
+            codigos, escopo = codigos_do_escopo(base['catalogo']), 'brasil'
+        # Antes da resposta começar: XLSX acima do limite de linhas é recusado aqui (400), não no meio do envio
+        validar_exportacao(base['dados'], formato, codigos, indicadores, anos)
+    except LookupError as erro:
+        return 404, _erro(str(erro.args[0]))
+    except ValueError as erro:
+        return 400, _erro(str(erro))
+
+    if formato == 'csv':
+        blocos = gerar_csv(partes_exportacao(base['dados'], base['catalogo'], codigos, indicadores, anos))
+    else:
+        def blocos_do_arquivo():
+            with exportar(base['dados'], base['catalogo'], formato, codigos, indicadores, anos) as arquivo:
+                while bloco := arquivo.read(TAMANHO_BLOCO_ENVIO):
+                    yield bloco
+        blocos = blocos_do_arquivo()
+    return 200, RespostaArquivo(blocos, FORMATOS[formato]['mime'], nome_arquivo(escopo, formato, anos))
+
+
+def _separar_rota(caminho, parametros):
+    """'/uf/CE' -> ('/uf', {'uf': 'CE'}); demais rotas não têm parâmetros no caminho"""
+    partes = [p for p in caminho.split('/') if p]
+    if len(partes) == 2 and partes[0] == 'uf':
+        return '/uf', {**parametros, 'uf': partes[1]}
+    return '/' + '/'.join(partes), parametros
+
+
+def _chave_parametros(parametros):
+    """Representação canônica (ordenada, hashável) dos parâmetros de uma consulta"""
+    return tuple(sorted((nome, ','.join(_lista(valor))) for nome, valor in parametros.items()))
+
+
+def _consultar_em_cache(base, rota, chave):
+    """
+    Resposta serializada de uma consulta sobre `base`, guardada no cache de respostas da própria base
+    (descartado junto com ela quando a versão dos dados muda; as menos usadas saem primeiro)
+    """
+    respostas = base['respostas']
+    with _trava_respostas:
+        corpo = respostas.pop((rota, chave), None)
+        if corpo is not None:
+            respostas[(rota, chave)] = corpo
+            return corpo
+
+    corpo = json.dumps(ROTAS[rota](base, dict(chave)), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with _trava_respostas:
+        respostas[(rota, chave)] = corpo
+        while len(respostas) > MAX_RESPOSTAS_EM_CACHE:
+            respostas.pop(next(iter(respostas)))
+    return corpo
+
+
+def executar_consulta(caminho, parametros, base=None):
+    """Executa uma consulta sobre `base` (padrão: obter_base()) e retorna (status HTTP, corpo JSON em bytes)"""
+    rota, parametros = _separar_rota(caminho, parametros)
+    if rota not in ROTAS:
+        return 404, json.dumps({'erro': f"Rota desconhecida: {caminho}"}, ensure_ascii=False).encode('utf-8')
+
+    if base is None:
+        base = obter_base()
+    try:
+        return 200, _consultar_em_cache(base, rota, _chave_parametros(parametros))
+    except LookupError as erro:
+        return 404, json.dumps({'erro': str(erro.args[0])}, ensure_ascii=False).encode('utf-8')
+    except ValueError as erro:
+        return 400, json.dumps({'erro': str(erro)}, ensure_ascii=False).encode('utf-8')
+
+
+def gerar_etag(versao, caminho, parametros):
+    """ETag forte de uma consulta: versão dos dados + hash da rota e dos parâmetros canônicos"""
+    consulta = f"{caminho}?{_chave_parametros(parametros)}".encode('utf-8')
+    return f'"{versao}-{hashlib.sha1(consulta).hexdigest()[:12]}"'
+
+
+# ====================================================================================
+# SERVIDOR HTTP
+# ====================================================================================
+
+# Consultas em execução: pedidos idênticos simultâneos aguardam a mesma tarefa
+_em_andamento = {}
+estatisticas = {'consultas': 0, 'execucoes': 0, 'agrupadas': 0}
+
+
+async def consultar_agrupado(caminho, parametros, base):
+    """
+    Executa a consulta sobre `base` em uma thread; se uma consulta idêntica (mesma versão dos dados,
+    rota e parâmetros canônicos) já está em execução, aguarda o resultado dela em vez de repetir o trabalho
+    """
+    estatisticas['consultas'] += 1
+    chave = (base['versao'], caminho, _chave_parametros(parametros))
+    tarefa = _em_andamento.get(chave)
+    if tarefa is None:
+        estatisticas['execucoes'] += 1
+        tarefa = asyncio.ensure_future(asyncio.to_thread(executar_consulta, caminho, parametros, base))
+        _em_andamento[chave] = tarefa
+        tarefa.add_done_callback(lambda _: _em_andamento.pop(chave, None))
+    else:
+        estatisticas['agrupadas'] += 1
+    # shield: um cliente que desconecta não cancela a consulta dos demais
+    return await asyncio.shield(tarefa)
+
+
+def _erro(mensagem):
+    return json.dumps({'erro': mensagem}, ensure_ascii=False).encode('utf-8')
+
+
+def _consulta_do_lote(posicao, consulta):
+    """(rota, parametros) de um item do lote (ValueError se o item não é {rota, parametros} com valores simples)"""
+    if not isinstance(consulta, dict) or not isinstance(consulta.get('rota'), str) or set(consulta) - CAMPOS_LOTE:
+        raise ValueError(f"Consulta {posicao} do lote deve ser um objeto {{rota, parametros}}")
+    parametros = consulta.get('parametros')
+    if parametros is None:
+        return consulta['rota'], {}
+    if not isinstance(parametros, dict):
+        raise ValueError(f"Consulta {posicao} do lote: 'parametros' deve ser um objeto")
+    for nome, valor in parametros.items():
+        valores = valor if isinstance(valor, list) else [valor]
+        if not all(v is None or isinstance(v, (str, int, float)) for v in valores):
+            raise ValueError(f"Consulta {posicao} do lote: parâmetro '{nome}' deve ser texto, número ou lista deles")
+    return consulta['rota'], parametros
+
+
+async def _atender_lote(corpo):
+    """POST /lote: valida o lote inteiro e executa todas as consultas em paralelo, na ordem recebida"""
+    try:
+        consultas = json.loads(corpo or b'[]')
+        if not isinstance(consultas, list) or len(consultas) > MAX_LOTE:
+            raise ValueError(f"O lote deve ser uma lista com até {MAX_LOTE} consultas")
+        consultas = [_consulta_do_lote(posicao, consulta) for posicao, consulta in enumerate(consultas)]
+    except ValueError as erro:
+        return 400, _erro(str(erro))
+
+    # Todas as consultas do lote usam a mesma versão dos dados
+    base = await asyncio.to_thread(obter_base)
+    respostas = await asyncio.gather(*(consultar_agrupado(rota, parametros, base) for rota, parametros in consultas))
+    # Cada resposta do lote já vem serializada; só o envelope é montado aqui
+    partes = [b'{"status":%d,"corpo":%s}' % (status, corpo) for status, corpo in respostas]
+    return 200, b'[' + b','.join(partes) + b']'
+
+
+async def responder(metodo, alvo, cabecalhos, corpo):
+    """Retorna (status, corpo, etag) de uma requisição HTTP já lida"""
+    url = urlsplit(alvo)
+    if metodo == 'POST':
+        if url.path.rstrip('/') != '/lote':
+            return 404, _erro(f"Rota desconhecida: {url.path}"), None
+        status, corpo_resposta = await _atender_lote(corpo)
+        return status, corpo_resposta, None
+    if metodo != 'GET':
+        return 405, _erro(f"Método não suportado: {metodo}"), None
+
+    parametros = dict(parse_qsl(url.query))
+    if url.path.rstrip('/') == '/exportar':
+        status, resposta = await asyncio.to_thread(preparar_exportacao, parametros)
+        return status, resposta, None
+
+    # ETag e resposta saem da mesma base, mesmo que os dados mudem durante a consulta
+    base = await asyncio.to_thread(obter_base)
+    etag = gerar_etag(base['versao'], url.path, parametros)
+    if etag in [e.strip() for e in cabecalhos.get('if-none-match', '').split(',')]:
+        return 304, b'', etag
+
+    status, corpo_resposta = await consultar_agrupado(url.path, parametros, base)
+    return status, corpo_resposta, etag if status == 200 else None
+
+
+async def _ler_requisicao(leitor):
+    """
+    Lê linha de requisição, cabeçalhos e corpo (None quando o cliente fecha a conexão)
+    Corpo acima de MAX_CORPO não é lido: volta como None
+    """
+    linha = await leitor.readline()
+    if not linha.strip():
+        return None
+    metodo, alvo, versao_http = linha.decode('latin-1').split()
+
+    cabecalhos = {}
+    for _ in range(MAX_CABECALHOS):
+        cabecalho = await leitor.readline()
+        if cabecalho in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = cabecalho.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    tamanho = int(cabecalhos.get('content-length') or 0)
+    if tamanho > MAX_CORPO:
+        return metodo.upper(), alvo, versao_http, cabecalhos, None
+    corpo = await leitor.readexactly(tamanho)
+    return metodo.upper(), alvo, versao_http, cabecalhos, corpo
+
+
+async def _enviar_arquivo(escritor, resposta, chunked):
+    """
+    Envia um RespostaArquivo bloco a bloco; cada bloco é gerado em uma thread
+    HTTP/1.1 usa Transfer-Encoding: chunked; sem chunked o fim do corpo é o fechamento da conexão
+    Retorna False quando a conexão deve ser encerrada
+    """
+    linhas = [
+        "HTTP/1.1 200 OK",
+        f"Content-Type: {resposta.mime}",
+        f'Content-Disposition: attachment; filename="{resposta.nome}"',
+        "Cache-Control: no-cache",
+        f"X-Versao-Dados: {_base['versao'] or ''}",
+        "Transfer-Encoding: chunked" if chunked else "Connection: close",
+    ]
+    escritor.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1'))
+
+    blocos = iter(resposta.blocos)
+    try:
+        while (bloco := await asyncio.to_thread(next, blocos, None)) is not None:
+            if not bloco:
+                continue
+            escritor.write(b'%x\r\n%s\r\n' % (len(bloco), bloco) if chunked else bloco)
+            await escritor.drain()
+    except Exception:
+        # O status 200 já foi enviado: a conexão é encerrada sem o bloco final (download incompleto)
+        return False
+    finally:
+        if hasattr(blocos, 'close'):
+            blocos.close()  # Fecha o gerador (e o arquivo temporário) mesmo se o cliente desconectar
+
+    if chunked:
+        escritor.write(b'0\r\n\r\n')
+        await escritor.drain()
+    return chunked
+
+
+async def atender_conexao(leitor, escritor):
+    """Atende uma conexão HTTP/1.1 (com keep-alive) até o cliente encerrar"""
+    try:
+        while True:
+            requisicao = await _ler_requisicao(leitor)
+            if requisicao is None:
+                break
+            metodo, alvo, versao_http, cabecalhos, corpo = requisicao
+
+            if corpo is None:
+                # O corpo não foi lido: responde 413 e encerra a conexão
+                status, corpo_resposta, etag = 413, _erro(f"Corpo da requisição acima de {MAX_CORPO:,} bytes"), None
+                cabecalhos['connection'] = 'close'
+            else:
+                try:
+                    status, corpo_resposta, etag = await responder(metodo, alvo, cabecalhos, corpo)
+                except Exception as erro:
+                    status, corpo_resposta, etag = 500, _erro(f"Erro interno: {erro}"), None
+
+            manter = versao_http == 'HTTP/1.1' and cabecalhos.get('connection', '').lower() != 'close'
+            if isinstance(corpo_resposta, RespostaArquivo):
+                if not await _enviar_arquivo(escritor, corpo_resposta, manter):
+                    break
+                continue
+
+            linhas = [
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(corpo_resposta)}",
+                "Cache-Control: no-cache",
+                f"X-Versao-Dados: {_base['versao'] or ''}",
+                f"Connection: {'keep-alive' if manter else 'close'}",
+            ]
+            if etag:
+                linhas.append(f"ETag: {etag}")
+            escritor.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + corpo_resposta)
+            await escritor.drain()
+            if not manter:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(porta=PORTA_PADRAO, host='127.0.0.1'):
+    """Servidor asyncio das consultas"""
+    servidor = await asyncio.start_server(atender_conexao, host, porta)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def iniciar_servidor(porta=PORTA_PADRAO, host='127.0.0.1'):
+    """Carrega a base e atende as consultas até Ctrl+C"""
+    print("\n" + "="*70)
+    print(" 🌐 API DE CONSULTAS DOS INDICADORES")
+    print("="*70)
+
+    inicio = time.perf_counter()
+    base = obter_base()
+    total = sum(len(df) for df in base['dados'].values())
+    print(f"\n  📊 {total:,} registros de {len(base['catalogo']):,} municípios em {time.perf_counter() - inicio:.1f}s")
+    print(f"  🔖 Versão dos dados: {base['versao']}")
+    print(f"  🚀 Servindo em http://{host}:{porta}  (Ctrl+C para encerrar)")
+    print("="*70)
+
+    try:
+        asyncio.run(servir(porta, host))
+    except KeyboardInterrupt:
+        print("\n  ⏹️  Servidor encerrado")
+
+
+if __name__ == "__main__":
+    iniciar_servidor(int(sys.argv[1]) if len(sys.argv) > 1 else PORTA_PADRAO)
@@ -0,0 +1,461 @@
+"""
+Acesso aos dados processados dos indicadores (JSONs por UF em data/output/)
+Usado pelo dashboard e pelas etapas de validação do pipeline
+
+Os indicadores prontos para consulta, o catálogo e o índice de busca ficam em um cache do processo
+(carregar_indicador_preparado, rotulos_municipios, indice_busca_municipios, indice_semelhanca), recarregado apenas
+quando algum arquivo de origem muda. aquecer_armazenamento() preenche esse cache na subida do servidor.
+Os indicadores preparados usam tipos compactos (compactar_indicador); a memória antes e depois
+fica em memoria_indicadores(), exibida pelo perfil do dashboard.
+Os arquivos JSON de cada indicador são lidos do disco em paralelo (ler_jsons) enquanto os já lidos são
+convertidos em DataFrame, e os quatro indicadores carregam ao mesmo tempo (carregar_indicadores_preparados,
+carregar_todos_indicadores); com orjson instalado, ele faz a decodificação.
+"""
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: json da biblioteca padrão
+    orjson = None
+
+from src.busca_municipios import construir_indice
+from src import semelhanca
+from src.codigos_municipios import ARQUIVO_DICIONARIO, carregar_dicionario, resolver_codigos
+from src.series_mensais import (
+    TIPOS_MENSAIS, agregar_anual, arquivo_mensal, carregar_indicador_mensal, ufs_mensais
+)
+
+BASE_DIR = Path(__file__).parent.parent
+DIR_OUTPUT = BASE_DIR / 'data' / 'output'
+
+# Diretório de cada indicador consumido pelo dashboard
+DIRETORIOS_INDICADORES = {
+    'CMI': DIR_OUTPUT / 'cmi_app3',
+    'CMI_MIL': DIR_OUTPUT / 'cmi-mil_app3',
+    'NV': DIR_OUTPUT / 'nascidos_vivos',
+    'OB': DIR_OUTPUT / 'obitos',
+}
+
+# Indicadores de contagem (inteiros); CMI e CMI_MIL são taxas
+INDICADORES_CONTAGEM = ('NV', 'OB')
+
+MAX_LEITORES_JSON = 8  # Threads que leem do disco os JSONs (um por UF) de um indicador
+MAX_CODIGOS = 1000  # Municípios por consulta da API (e por link de exportação do dashboard)
+
+# Tipos compactos dos indicadores preparados (compactar_indicador); as taxas ficam em float64,
+# como foram gravadas: float32 arredondaria CMI e CMI_MIL e cada consumidor teria de desfazer o arredondamento
+TIPO_ANO = np.int16
+TIPO_CONTAGEM = np.int32
+TIPO_TAXA = np.float64
+
+
+def decodificar_json(conteudo):
+    """Registros de um JSON já lido (bytes), com orjson quando instalado"""
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    return json.loads(conteudo)
+
+
+def ler_json(arquivo):
+    """Registros de um JSON"""
+    return decodificar_json(Path(arquivo).read_bytes())
+
+
+def ler_jsons(arquivos, ao_falhar=None):
+    """
+    Registros de vários JSONs em um DataFrame, concatenados uma única vez na ordem de `arquivos`
+    Só a leitura do disco vai para as threads (a E/S libera o GIL); decodificar o JSON e montar o DataFrame
+    seguram o GIL, então rodam aqui, um arquivo por vez, enquanto os próximos são lidos
+    (medido em benchmarks/leitura_json.py)
+    ao_falhar(arquivo, erro), chamada na thread de quem pediu, pula o arquivo com erro (sem ela o erro sobe)
+    """
+    arquivos = list(arquivos)
+    if not arquivos:
+        return pd.DataFrame()
+
+    frames = []
+    with ThreadPoolExecutor(max_workers=min(len(arquivos), MAX_LEITORES_JSON)) as leitores:
+        futuros = [leitores.submit(Path(arquivo).read_bytes) for arquivo in arquivos]
+        for arquivo, futuro in zip(arquivos, futuros):
+            try:
+                df = pd.DataFrame(decodificar_json(futuro.result()))
+            except Exception as erro:
+                if ao_falhar is None:
+                    raise
+                ao_falhar(arquivo, erro)
+                continue
+            if not df.empty:
+                frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def carregar_indicador(tipo, dicionario=None):
+    """
+    Carrega todos os JSONs de um indicador (CMI, CMI_MIL, NV, OB) em um DataFrame
+    Todo registro recebe o código IBGE (Codigo_Municipio, Int32) quando é possível resolvê-lo
+    NV/OB com série mensal (src/series_mensais.py): as UFs do arquivo mensal vêm da soma dos meses
+    """
+    diretorio = DIRETORIOS_INDICADORES.get(tipo)
+    if diretorio is None:
+        return pd.DataFrame()
+
+    mensal = carregar_indicador_mensal(tipo) if tipo in TIPOS_MENSAIS else None
+    ufs_do_mensal = ufs_mensais(mensal)
+
+    arquivos = [arquivo for arquivo in sorted(diretorio.glob('*.json')) if arquivo.stem not in ufs_do_mensal]
+    registros = ler_jsons(arquivos)
+
+    frames = []
+    if not registros.empty:
+        frames.append(resolver_codigos(registros, dicionario))
+    if mensal is not None:
+        frames.append(agregar_anual(mensal, tipo))
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def carregar_todos_indicadores():
+    """Carrega os quatro indicadores (em paralelo) em um único DataFrame longo com a coluna 'Indicador'"""
+    dicionario = carregar_dicionario()
+    tipos = list(DIRETORIOS_INDICADORES)
+    with ThreadPoolExecutor(max_workers=len(tipos)) as indicadores:
+        carregados = indicadores.map(lambda tipo: carregar_indicador(tipo, dicionario), tipos)
+        frames = [df.assign(Indicador=tipo) for tipo, df in zip(tipos, carregados) if not df.empty]
+
+    if not frames:
+        return pd.DataFrame(columns=['Municipio', 'Ano', 'Valor', 'UF', 'Indicador'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def indexar_por_codigo(df):
+    """
+    Índice de junção por código: descarta registros sem código, converte para int32
+    e ordena por (Codigo_Municipio, Ano) para que fatiar_por_codigo use busca binária
+    """
+    if df.empty:
+        return df
+    indexado = df[df['Codigo_Municipio'].notna()].astype({'Codigo_Municipio': 'int32'})
+    return indexado.sort_values(['Codigo_Municipio', 'Ano'], kind='stable').reset_index(drop=True)
+
+
+def fatiar_por_codigo(df_indexado, codigo):
+    """Registros de um município (ordenados por ano) em um DataFrame gerado por indexar_por_codigo"""
+    if df_indexado.empty:
+        return df_indexado
+    codigos = df_indexado['Codigo_Municipio'].to_numpy()
+    inicio = np.searchsorted(codigos, codigo, side='left')
+    fim = np.searchsorted(codigos, codigo, side='right')
+    return df_indexado.iloc[inicio:fim]
+
+
+def obter_series(dados, codigos, indicadores=None, anos=None):
+    """
+    Séries de vários municípios e indicadores em um único bloco alinhado
+    dados: {indicador: DataFrame gerado por indexar_por_codigo}
+    anos: (inicio, fim) ou None para o intervalo dos anos com dado nos municípios pedidos
+    Retorna {'codigos', 'indicadores', 'anos', 'valores'}, com valores[indicador, municipio, ano]
+    em float64 e NaN onde não há registro
+    """
+    indicadores = list(indicadores or dados)
+    codigos = np.asarray(codigos, dtype=np.int32)
+
+    # Linhas de todos os municípios de uma vez: duas buscas binárias vetorizadas por indicador
+    linhas = {}
+    for tipo in indicadores:
+        df = dados[tipo]
+        if df.empty:
+            linhas[tipo] = (np.array([], dtype=np.intp), np.array([], dtype=np.int64), np.array([]))
+            continue
+        chaves = df['Codigo_Municipio'].to_numpy()
+        inicios = np.searchsorted(chaves, codigos, side='left')
+        tamanhos = np.searchsorted(chaves, codigos, side='right') - inicios
+        deslocamento = np.repeat(inicios - (np.cumsum(tamanhos) - tamanhos), tamanhos)
+        posicoes = np.arange(tamanhos.sum()) + deslocamento
+        linhas[tipo] = (
+            np.repeat(np.arange(len(codigos)), tamanhos),
+            df['Ano'].to_numpy()[posicoes],
+            df['Valor'].to_numpy(dtype=np.float64)[posicoes],
+        )
+
+    if anos is None:
+        todos_anos = np.concatenate([ano for _, ano, _ in linhas.values()] or [np.array([], dtype=np.int64)])
+        anos = (int(todos_anos.min()), int(todos_anos.max())) if len(todos_anos) else (0, -1)
+    inicio, fim = anos
+
+    vetor_anos = np.arange(inicio, fim + 1)
+    valores = np.full((len(indicadores), len(codigos), len(vetor_anos)), np.nan)
+    for i, tipo in enumerate(indicadores):
+        municipio, ano, valor = linhas[tipo]
+        dentro = (ano >= inicio) & (ano <= fim)
+        valores[i, municipio[dentro], ano[dentro] - inicio] = valor[dentro]
+
+    return {'codigos': codigos, 'indicadores': indicadores, 'anos': vetor_anos, 'valores': valores}
+
+
+def bloco_tem_dados(bloco):
+    """Algum valor (não NaN) no bloco de obter_series?"""
+    return not np.isnan(bloco['valores']).all()
+
+
+def serie_do_bloco(bloco, indicador, posicao):
+    """DataFrame (Ano, Valor) de um município do bloco de obter_series, sem os anos vazios"""
+    valores = bloco['valores'][bloco['indicadores'].index(indicador), posicao]
+    com_dado = ~np.isnan(valores)
+    serie = pd.DataFrame({'Ano': bloco['anos'][com_dado], 'Valor': valores[com_dado]})
+    if indicador in INDICADORES_CONTAGEM:
+        serie['Valor'] = serie['Valor'].astype(np.int64)
+    return serie
+
+
+def compactar_indicador(df, tipo):
+    """
+    Tipos compactos para o indicador em memória: Municipio e UF categóricos, Tipo (constante) descartado,
+    Ano int16, contagens (NV, OB) int32 e taxas float64 (sem perda de precisão)
+    """
+    if df.empty:
+        return df
+    contagem = tipo in INDICADORES_CONTAGEM and not df['Valor'].isna().any()
+    tipos = {
+        'Municipio': 'category',
+        'UF': 'category',
+        'Ano': TIPO_ANO,
+        'Valor': TIPO_CONTAGEM if contagem else TIPO_TAXA,
+    }
+    return df.drop(columns='Tipo', errors='ignore').astype({
+        coluna: tipo_coluna for coluna, tipo_coluna in tipos.items() if coluna in df.columns
+    })
+
+
+def memoria_dataframe(df):
+    """Bytes ocupados pelo DataFrame, incluindo os textos (memory_usage deep)"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def catalogo_municipios(df):
+    """Código, nome e UF de cada município com código resolvido (um por código)"""
+    if df.empty:
+        return pd.DataFrame(columns=['Codigo_Municipio', 'Municipio', 'UF'])
+    catalogo = df.loc[df['Codigo_Municipio'].notna(), ['Codigo_Municipio', 'Municipio', 'UF']]
+    catalogo = catalogo.drop_duplicates('Codigo_Municipio').astype({'Codigo_Municipio': 'int32'})
+    return catalogo.sort_values(['Municipio', 'UF']).reset_index(drop=True)
+
+
+def catalogo_de_indicadores(dados):
+    """
+    Catálogo (indexado por Codigo_Municipio: Municipio, UF) dos municípios presentes
+    em qualquer um dos indicadores de {tipo: DataFrame indexado}
+    """
+    com_dados = [df[['Codigo_Municipio', 'Municipio', 'UF']] for df in dados.values() if not df.empty]
+    catalogo = catalogo_municipios(pd.concat(com_dados) if com_dados else pd.DataFrame())
+    return catalogo.set_index('Codigo_Municipio')
+
+
+def versao_dados(*arquivos_extras):
+    """
+    Versão dos dados processados: hash curto de nome, tamanho e data de modificação
+    de todos os JSONs dos indicadores (e dos arquivos extras, como o relatório de validação)
+    Muda sempre que o ETL regrava algum arquivo; serve de ETag e de chave de cache
+    """
+    arquivos = [arquivo for tipo in DIRETORIOS_INDICADORES for arquivo in _arquivos_indicador(tipo)]
+    arquivos += [Path(arquivo) for arquivo in arquivos_extras]
+
+    assinatura = hashlib.sha1()
+    for nome, tamanho, modificado in _estado_arquivos(arquivos):
+        assinatura.update(f"{nome}|{tamanho}|{modificado};".encode())
+    return assinatura.hexdigest()[:16]
+
+
+def _arquivos_indicador(tipo):
+    """JSONs (um por UF) de um indicador, mais o arquivo mensal de NV/OB"""
+    arquivos = sorted(DIRETORIOS_INDICADORES[tipo].glob('*.json'))
+    if tipo in TIPOS_MENSAIS:
+        arquivos.append(arquivo_mensal(tipo))
+    return arquivos
+
+
+def _estado_arquivos(arquivos):
+    """(nome, tamanho, data de modificação) de cada arquivo existente"""
+    estados = []
+    for arquivo in arquivos:
+        arquivo = Path(arquivo)
+        if arquivo.exists():
+            estado = arquivo.stat()
+            estados.append((arquivo.name, estado.st_size, estado.st_mtime_ns))
+    return tuple(estados)
+
+
+# Cache do processo: chave -> (estado dos arquivos de origem, valor)
+_cache_processo = {}
+_travas_cache = {}
+_trava_travas = threading.Lock()
+# Cargas (faltas) da chamada em curso, para o perfil do dashboard: um contador por contar_faltas(),
+# visto também pelas threads que recebem uma cópia do contexto (carregar_indicadores_preparados)
+_faltas = contextvars.ContextVar('faltas_cache', default=None)
+_trava_faltas = threading.Lock()
+_memoria_indicadores = {}  # indicador -> {'registros', 'original_bytes', 'compacto_bytes'} da última carga
+
+
+def em_cache_do_processo(chave, arquivos, carregar):
+    """
+    Valor de carregar() mantido em memória enquanto os arquivos de origem não mudarem
+    Chamadas simultâneas para a mesma chave esperam uma única carga
+    """
+    with _trava_travas:
+        trava = _travas_cache.setdefault(chave, threading.Lock())
+
+    with trava:
+        estado = _estado_arquivos(arquivos)
+        guardado = _cache_processo.get(chave)
+        if guardado is not None and guardado[0] == estado:
+            return guardado[1]
+
+        valor = carregar()
+        _cache_processo[chave] = (estado, valor)
+        contagem = _faltas.get()
+        if contagem is not None:
+            with _trava_faltas:
+                contagem['faltas'] += 1
+        return valor
+
+
+@contextmanager
+def contar_faltas():
+    """
+    Conta as vezes que em_cache_do_processo precisou carregar um valor dentro do bloco,
+    inclusive nas threads de carregar_indicadores_preparados:
+
+        with contar_faltas() as contagem:
+            carregar_indicadores_preparados()
+        contagem['faltas']  # 0: tudo veio do cache
+    """
+    contagem = {'faltas': 0}
+    token = _faltas.set(contagem)
+    try:
+        yield contagem
+    finally:
+        _faltas.reset(token)
+
+
+def _arquivos_extras_preparados():
+    """Arquivos, além dos JSONs, dos quais dependem os indicadores preparados: dicionário de códigos e relatório de validação"""
+    from src.validacao import ARQUIVO_RELATORIO  # validacao importa este módulo
+
+    return [ARQUIVO_DICIONARIO, ARQUIVO_RELATORIO]
+
+
+def _arquivos_preparado(tipo):
+    """Arquivos dos quais depende o indicador preparado: JSONs, dicionário de códigos e relatório de validação"""
+    return _arquivos_indicador(tipo) + _arquivos_extras_preparados()
+
+
+def versao_dados_preparados():
+    """
+    Versão (versao_dados) dos indicadores preparados: muda com os JSONs, o dicionário de códigos
+    e o relatório de validação, os mesmos arquivos que recarregam o cache do processo
+    Chave dos caches do dashboard e ETag da API de consultas
+    """
+    return versao_dados(*_arquivos_extras_preparados())
+
+
+def carregar_indicador_preparado(tipo):
+    """
+    Indicador pronto para consulta, em cache no processo: sem os registros bloqueados
+    pela validação, indexado por código (indexar_por_codigo) e com tipos compactos (compactar_indicador)
+    """
+    from src.validacao import aplicar_bloqueios, carregar_relatorio  # validacao importa este módulo
+
+    def carregar():
+        df = indexar_por_codigo(aplicar_bloqueios(carregar_indicador(tipo), tipo, carregar_relatorio()))
+        compacto = compactar_indicador(df, tipo)
+        _memoria_indicadores[tipo] = {
+            'registros': len(df),
+            'original_bytes': memoria_dataframe(df),
+            'compacto_bytes': memoria_dataframe(compacto),
+        }
+        return compacto
+
+    return em_cache_do_processo(('indicador', tipo), _arquivos_preparado(tipo), carregar)
+
+
+def carregar_indicadores_preparados(tipos=None):
+    """{indicador: carregar_indicador_preparado(indicador)}, com os indicadores carregados em paralelo"""
+    tipos = list(DIRETORIOS_INDICADORES if tipos is None else tipos)
+    if not tipos:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(tipos)) as indicadores:
+        # Cada carga roda numa cópia do contexto de quem chamou: as faltas contam para ele (contar_faltas)
+        cargas = [
+            indicadores.submit(contextvars.copy_context().run, carregar_indicador_preparado, tipo) for tipo in tipos
+        ]
+        return {tipo: carga.result() for tipo, carga in zip(tipos, cargas)}
+
+
+def memoria_indicadores():
+    """Memória dos indicadores preparados, antes e depois de compactar_indicador: {indicador: {...}}"""
+    return {tipo: dict(medida) for tipo, medida in _memoria_indicadores.items()}
+
+
+def rotulos_municipios():
+    """Municípios do CMI no formato {'MUNICIPIO - UF': codigo IBGE}, ordenados pelo rótulo (cache do processo)"""
+    def carregar():
+        catalogo = catalogo_municipios(carregar_indicador_preparado('CMI'))
+        return dict(sorted(
+            (f"{nome} - {uf}", int(codigo)) for codigo, nome, uf in catalogo.itertuples(index=False)
+        ))
+
+    return em_cache_do_processo(('rotulos',), _arquivos_preparado('CMI'), carregar)
+
+
+def indice_busca_municipios():
+    """Índice de busca (src/busca_municipios.py) sobre os rótulos de rotulos_municipios (cache do processo)"""
+    return em_cache_do_processo(
+        ('indice_busca',), _arquivos_preparado('CMI'), lambda: construir_indice(rotulos_municipios())
+    )
+
+
+def indice_semelhanca():
+    """
+    Índice de municípios semelhantes (src/semelhanca.py) com as séries de CMI e CMI-Mil
+    de todos os municípios de rotulos_municipios (cache do processo)
+    """
+    def carregar():
+        dados = {tipo: carregar_indicador_preparado(tipo) for tipo in semelhanca.INDICADORES_SEMELHANCA}
+        codigos = sorted(rotulos_municipios().values())
+        return semelhanca.construir_indice(obter_series(dados, codigos, semelhanca.INDICADORES_SEMELHANCA))
+
+    arquivos = _arquivos_preparado('CMI') + _arquivos_indicador('CMI_MIL')
+    return em_cache_do_processo(('indice_semelhanca',), arquivos, carregar)
+
+
+def carregar_series_mensais(tipo):
+    """Armazenamento colunar mensal de NV/OB (src/series_mensais.py) em cache do processo; None se não houver"""
+    return em_cache_do_processo(('mensal', tipo), [arquivo_mensal(tipo)], lambda: carregar_indicador_mensal(tipo))
+
+
+def aquecer_armazenamento():
+    """Carrega os quatro indicadores (em paralelo), o catálogo e os índices de busca e de semelhança no cache do processo"""
+    inicio = time.perf_counter()
+    carregar_indicadores_preparados()
+    indice_busca_municipios()
+    indice_semelhanca()
+    memoria = memoria_indicadores().values()
+    original = sum(medida['original_bytes'] for medida in memoria) / (1024 * 1024)
+    compacto = sum(medida['compacto_bytes'] for medida in memoria) / (1024 * 1024)
+    print(
+        f"  🔥 Armazenamento aquecido em {time.perf_counter() - inicio:.1f}s "
+        f"(indicadores: {original:.1f} MB -> {compacto:.1f} MB)"
+    )
@@ -0,0 +1,100 @@
+"""
+Índice de busca de municípios (sem acentos, por prefixo e aproximada)
+Montado uma única vez sobre os ~5.570 rótulos "MUNICIPIO - UF":
+- nomes normalizados (sem acento, maiúsculos, sem pontuação) ordenados para busca binária por prefixo
+- índice invertido de trigramas (trigrama -> posições) para busca por trecho e aproximada
+
+Assim "sao paulo", "SÃO PAULO", "paulo" e "crateus" encontram o município sem varrer a lista inteira.
+"""
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+from src.codigos_municipios import normalizar_nome
+
+LIMIAR_SIMILARIDADE = 0.5  # Fração mínima de trigramas da consulta presentes no nome
+LIMITE_SUGESTOES = 50
+
+
+def normalizar_busca(texto):
+    """Normaliza texto para busca: sem acentos, maiúsculo, pontuação vira espaço"""
+    return re.sub(r'\s+', ' ', re.sub(r'[^A-Z0-9 ]', ' ', normalizar_nome(texto))).strip()
+
+
+def _trigramas(texto, fechar=True):
+    """Trigramas do texto com preenchimento no início (e no fim, se fechar=True)"""
+    preenchido = f"  {texto} " if fechar else f"  {texto}"
+    return {preenchido[i:i + 3] for i in range(len(preenchido) - 2)}
+
+
+def construir_indice(rotulos):
+    """
+    Monta o índice de busca a partir de uma lista de rótulos ("MUNICIPIO - UF")
+    Retorna um dicionário com os rótulos, nomes normalizados, ordem alfabética e trigramas
+    """
+    rotulos = list(rotulos)
+    nomes = [normalizar_busca(rotulo) for rotulo in rotulos]
+
+    ordem = sorted(range(len(nomes)), key=nomes.__getitem__)
+
+    postagens = {}
+    for posicao, nome in enumerate(nomes):
+        for trigrama in _trigramas(nome):
+            postagens.setdefault(trigrama, []).append(posicao)
+
+    return {
+        'rotulos': rotulos,
+        'nomes': nomes,
+        'ordenados': [nomes[i] for i in ordem],
+        'ordem': ordem,
+        'trigramas': {t: np.array(p, dtype=np.int32) for t, p in postagens.items()},
+    }
+
+
+def buscar(indice, consulta, limite=LIMITE_SUGESTOES):
+    """
+    Retorna até `limite` rótulos que correspondem à consulta, em ordem de relevância
+    (categoria, similaridade, nomes mais curtos antes, ordem alfabética):
+    1. nome começa com a consulta
+    2. alguma palavra do nome começa com a consulta
+    3. consulta aparece no meio do nome
+    4. nome parecido (trigramas em comum >= LIMIAR_SIMILARIDADE)
+    """
+    consulta = normalizar_busca(consulta)
+    if not consulta:
+        return []
+
+    nomes = indice['nomes']
+    encontrados = {}
+
+    # 1. Prefixo: busca binária no vetor ordenado (nomes só têm A-Z, 0-9 e espaço, todos antes de '~')
+    # Um nome que começa com a consulta contém todos os trigramas dela: similaridade 1
+    ordenados = indice['ordenados']
+    for i in range(bisect_left(ordenados, consulta), bisect_left(ordenados, consulta + '~')):
+        encontrados[indice['ordem'][i]] = (0, -1.0)
+
+    # 2-4. Trigramas: conta quantos trigramas da consulta cada nome contém
+    # Consultas curtas ("S", "PA") já preenchem o limite só com prefixos
+    trigramas = _trigramas(consulta, fechar=False)
+    postagens = [indice['trigramas'][t] for t in trigramas if t in indice['trigramas']]
+    if postagens and len(encontrados) < limite:
+        contagem = np.bincount(np.concatenate(postagens), minlength=len(nomes))
+        similaridade = contagem / len(trigramas)
+        candidatos = np.flatnonzero(similaridade >= LIMIAR_SIMILARIDADE)
+
+        for posicao in candidatos[np.argsort(-similaridade[candidatos], kind='stable')]:
+            posicao = int(posicao)
+            if posicao in encontrados:
+                continue
+            nome = nomes[posicao]
+            if f" {consulta}" in f" {nome}":
+                categoria = 1
+            elif consulta in nome:
+                categoria = 2
+            else:
+                categoria = 3
+            encontrados[posicao] = (categoria, -float(similaridade[posicao]))
+
+    ranking = sorted(encontrados, key=lambda p: (*encontrados[p], len(nomes[p]), nomes[p]))
+    return [indice['rotulos'][p] for p in ranking[:limite]]
@@ -0,0 +1,221 @@
+"""
+Cache das abas lidas das planilhas, em data/output/cache_planilhas/<SHA-256 da planilha>/<variante>/
+A chave é o conteúdo da planilha (não o caminho nem a data): cópias da mesma planilha compartilham
+o cache e uma planilha substituída nunca devolve abas antigas. Cada aba é um arquivo próprio:
+- Feather (Arrow), com pyarrow instalado e a aba representável sem perda: colunas numéricas como estão e
+  colunas object (texto misturado com números, como "#VALOR!" numa coluna de anos) em duas colunas Arrow
+- pickle, nos demais casos (datas ou valores lógicos em colunas object, sem pyarrow)
+
+Usado por src/leitor_ods.py (ler_abas), então vale para os conversores, o lote e os scripts de
+temporaria/: a segunda leitura de uma planilha inalterada leva milissegundos. PLANILHAS_CACHE=0 desliga.
+
+Uso: python src/cache_planilhas.py [limpar]   (lista o cache ou o apaga)
+"""
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow é opcional: tudo em pickle
+    pa = None
+
+BASE_DIR = Path(__file__).parent.parent
+DIR_CACHE = BASE_DIR / 'data' / 'output' / 'cache_planilhas'
+
+ARQUIVO_ABAS = 'abas.json'  # nomes de todas as abas, na ordem da planilha (gravado numa leitura completa)
+
+_resumos = {}  # (caminho, tamanho, mtime_ns) -> SHA-256: a planilha não é relida a cada chamada
+
+
+def cache_ativo():
+    """Desligado com a variável de ambiente PLANILHAS_CACHE=0"""
+    return os.environ.get('PLANILHAS_CACHE', '1') != '0'
+
+
+def resumo_arquivo(arquivo):
+    """SHA-256 do conteúdo da planilha"""
+    status = os.stat(arquivo)
+    chave = (str(Path(arquivo).resolve()), status.st_size, status.st_mtime_ns)
+    if chave not in _resumos:
+        resumo = hashlib.sha256()
+        with open(arquivo, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                resumo.update(bloco)
+        _resumos[chave] = resumo.hexdigest()
+    return _resumos[chave]
+
+
+def _nome_arquivo(nome_aba):
+    """Nome de arquivo estável para a aba (nomes de abas podem ter caracteres inválidos em caminhos)"""
+    return hashlib.sha1(nome_aba.encode('utf-8')).hexdigest()[:16]
+
+
+def _coluna_representavel(coluna):
+    """Coluna object só com texto, inteiros, não inteiros e vazios (o que os leitores produzem)"""
+    for valor in coluna:
+        if isinstance(valor, str) or (isinstance(valor, int) and not isinstance(valor, bool)):
+            continue
+        if not isinstance(valor, float) or valor.is_integer():
+            return False  # data, lógico... ou 1996.0 (voltaria como 1996)
+    return True
+
+
+def _tipo_coluna(dtype):
+    """'numero', 'objeto' (object), 'texto' (dtype de string do pandas) ou None se não vai para o Arrow"""
+    if dtype == object:
+        return 'objeto'
+    if pd.api.types.is_string_dtype(dtype):
+        return 'texto'
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return 'numero'
+    return None
+
+
+def _cabe_em_arrow(df):
+    """A aba volta idêntica do Feather? Nomes str/int/float, índice 0..n-1 e colunas representáveis"""
+    if pa is None or not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        return False
+    if not all(isinstance(nome, (str, int, float)) and not isinstance(nome, bool) for nome in df.columns):
+        return False
+    tipos = [_tipo_coluna(dtype) for dtype in df.dtypes]
+    return None not in tipos and all(
+        _coluna_representavel(df.iloc[:, j]) for j, tipo in enumerate(tipos) if tipo == 'objeto'
+    )
+
+
+def _para_arrow(df):
+    """
+    Tabela Arrow da aba: colunas numéricas e de texto como estão; cada coluna object vira duas,
+    "j" (float64 com os números) e "j:texto" (string com os textos)
+    """
+    colunas = {}
+    objetos = []
+    textos = {}
+    for j in range(df.shape[1]):
+        coluna = df.iloc[:, j]
+        tipo = _tipo_coluna(coluna.dtype)
+        if tipo == 'numero':
+            colunas[str(j)] = coluna.to_numpy()
+        elif tipo == 'texto':
+            textos[j] = str(coluna.dtype)
+            colunas[str(j)] = pa.array([valor if isinstance(valor, str) else None for valor in coluna], type=pa.string())
+        else:
+            objetos.append(j)
+            colunas[str(j)] = np.array([math.nan if isinstance(valor, str) else valor for valor in coluna], dtype=np.float64)
+            colunas[f'{j}:texto'] = pa.array([valor if isinstance(valor, str) else None for valor in coluna], type=pa.string())
+    tabela = pa.table(colunas)
+    return tabela.replace_schema_metadata({
+        'colunas': json.dumps(list(df.columns), ensure_ascii=False),
+        'tipo_colunas': str(df.columns.dtype),
+        'objetos': json.dumps(objetos),
+        'textos': json.dumps(textos),
+    })
+
+
+def _de_arrow(tabela):
+    """Inverso de _para_arrow: números inteiros voltam como int nas colunas object (como nos leitores)"""
+    metadados = tabela.schema.metadata
+    objetos = set(json.loads(metadados[b'objetos']))
+    textos = {int(j): dtype for j, dtype in json.loads(metadados[b'textos']).items()}
+    nomes = json.loads(metadados[b'colunas'])
+    dados = {}
+    for j in range(len(nomes)):
+        if j in textos:
+            dados[j] = pd.array(tabela.column(str(j)).to_pylist(), dtype=textos[j])
+            continue
+        numeros = tabela.column(str(j)).to_numpy()
+        if j not in objetos:
+            dados[j] = numeros
+            continue
+        coluna = numeros.astype(object)
+        inteiros = np.flatnonzero(np.isfinite(numeros) & (numeros == np.floor(numeros)))
+        coluna[inteiros] = numeros[inteiros].astype(np.int64).astype(object)
+        texto = tabela.column(f'{j}:texto').to_numpy(zero_copy_only=False)
+        com_texto = np.flatnonzero(pd.notna(texto))
+        coluna[com_texto] = texto[com_texto]
+        dados[j] = coluna
+    df = pd.DataFrame(dados, index=pd.RangeIndex(tabela.num_rows))
+    df.columns = pd.Index(nomes, dtype=metadados[b'tipo_colunas'].decode())
+    return df
+
+
+def salvar_aba(df, diretorio, nome_aba):
+    """Grava a aba em Feather (quando cabe) ou pickle; retorna o arquivo gravado"""
+    diretorio.mkdir(parents=True, exist_ok=True)
+    base = diretorio / _nome_arquivo(nome_aba)
+    if _cabe_em_arrow(df):
+        arquivo = base.with_suffix('.feather')
+        temporario = arquivo.with_name(arquivo.name + '.tmp')
+        feather.write_feather(_para_arrow(df), temporario)
+    else:
+        arquivo = base.with_suffix('.pkl')
+        temporario = arquivo.with_name(arquivo.name + '.tmp')
+        df.to_pickle(temporario)
+    os.replace(temporario, arquivo)
+    return arquivo
+
+
+def carregar_aba(diretorio, nome_aba):
+    """Aba do cache ou None se ainda não foi gravada"""
+    base = diretorio / _nome_arquivo(nome_aba)
+    if pa is not None and base.with_suffix('.feather').exists():
+        return _de_arrow(feather.read_table(base.with_suffix('.feather')))
+    if base.with_suffix('.pkl').exists():
+        return pd.read_pickle(base.with_suffix('.pkl'))
+    return None
+
+
+def ler_em_cache(arquivo, abas, variante, ler):
+    """
+    {nome: DataFrame} das abas pedidas (None: todas, na ordem da planilha), lendo do cache o que houver
+    ler(arquivo, nomes ou None) -> {nome: DataFrame} lê da planilha as que faltam, que são gravadas
+    variante separa leituras diferentes da mesma planilha (leitor, linha do cabeçalho)
+    """
+    diretorio = DIR_CACHE / resumo_arquivo(arquivo) / variante
+    arquivo_abas = diretorio / ARQUIVO_ABAS
+    if abas is None:
+        if not arquivo_abas.exists():
+            lidas = ler(arquivo, None)
+            for nome_aba, df in lidas.items():
+                salvar_aba(df, diretorio, nome_aba)
+            with open(arquivo_abas, 'w', encoding='utf-8') as f:
+                json.dump(list(lidas), f, ensure_ascii=False)
+            return lidas
+        with open(arquivo_abas, 'r', encoding='utf-8') as f:
+            abas = json.load(f)
+
+    dados = {nome_aba: carregar_aba(diretorio, nome_aba) for nome_aba in abas}
+    faltando = [nome_aba for nome_aba, df in dados.items() if df is None]
+    if faltando:
+        lidas = ler(arquivo, faltando)
+        for nome_aba in faltando:
+            dados[nome_aba] = lidas[nome_aba]
+            salvar_aba(lidas[nome_aba], diretorio, nome_aba)
+    return dados
+
+
+def tamanho_mb(diretorio):
+    return sum(arquivo.stat().st_size for arquivo in diretorio.rglob('*') if arquivo.is_file()) / (1024 * 1024)
+
+
+if __name__ == "__main__":
+    if 'limpar' in sys.argv[1:]:
+        if DIR_CACHE.exists():
+            print(f"  🗑️  Cache removido: {tamanho_mb(DIR_CACHE):.1f} MB")
+            shutil.rmtree(DIR_CACHE)
+        else:
+            print("  Cache vazio")
+    else:
+        print(f"📁 {DIR_CACHE.relative_to(BASE_DIR)} ({'pyarrow: Feather + pickle' if pa else 'sem pyarrow: pickle'})")
+        for diretorio in sorted(DIR_CACHE.glob('*/*')) if DIR_CACHE.exists() else []:
+            abas = len(list(diretorio.glob('*.feather'))) + len(list(diretorio.glob('*.pkl')))
+            print(f"  {diretorio.parent.name[:12]}…/{diretorio.name:<12} {abas:>4} abas  {tamanho_mb(diretorio):>7.1f} MB")
@@ -0,0 +1,167 @@
+"""
+Resolução do código IBGE dos municípios
+Monta um dicionário nome -> código por UF a partir dos dados que já trazem o código
+(NV e OB, ou nomes no formato "120001 ACRELANDIA") e resolve o código de qualquer registro
+
+O código é normalizado para 6 dígitos (sem o dígito verificador) e armazenado como int32.
+Os dois primeiros dígitos identificam a UF, o que também corrige siglas erradas (ex: 'RD' -> 'RO').
+
+Uso: python src/codigos_municipios.py  (reconstrói data/output/codigos_municipios.json)
+"""
+import json
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+# Permite executar como script (python src/codigos_municipios.py) e importar como src.codigos_municipios
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+ARQUIVO_DICIONARIO = BASE_DIR / 'data' / 'output' / 'codigos_municipios.json'
+
+# Prefixo do código IBGE (2 dígitos) -> sigla da UF
+UF_POR_PREFIXO_IBGE = {
+    11: 'RO', 12: 'AC', 13: 'AM', 14: 'RR', 15: 'PA', 16: 'AP', 17: 'TO',
+    21: 'MA', 22: 'PI', 23: 'CE', 24: 'RN', 25: 'PB', 26: 'PE', 27: 'AL', 28: 'SE', 29: 'BA',
+    31: 'MG', 32: 'ES', 33: 'RJ', 35: 'SP',
+    41: 'PR', 42: 'SC', 43: 'RS',
+    50: 'MS', 51: 'MT', 52: 'GO', 53: 'DF',
+}
+
+
+def normalizar_nome(nome):
+    """Normaliza nome de município para comparação: sem acentos, maiúsculo, espaços simples"""
+    if not isinstance(nome, str):
+        return ''
+    sem_acento = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', sem_acento).strip().upper()
+
+
+def _normalizar_serie(nomes):
+    """Aplica normalizar_nome uma vez por nome distinto"""
+    normalizados = {nome: normalizar_nome(nome) for nome in nomes.unique()}
+    return nomes.map(normalizados)
+
+
+def extrair_codigo_municipio(nome_original):
+    """Extrai o código do município (6 ou 7 dígitos no início do nome)"""
+    if not isinstance(nome_original, str):
+        return None
+    match = re.match(r'^(\d{6,7})\b', nome_original.strip())
+    return match.group(1) if match else None
+
+
+def normalizar_codigos(codigos):
+    """Converte códigos (str/int, 6 ou 7 dígitos) para int32 de 6 dígitos; inválidos viram NA"""
+    numericos = pd.to_numeric(pd.Series(codigos), errors='coerce')
+    # Códigos de 7 dígitos trazem o dígito verificador no final
+    numericos = numericos.where(numericos < 1_000_000, numericos // 10)
+    numericos = numericos.where(numericos >= 100_000)
+    return numericos.astype('Int32')
+
+
+def uf_do_codigo(codigos):
+    """Sigla da UF a partir do prefixo IBGE de cada código (NA se desconhecido)"""
+    return (pd.Series(codigos).astype('Int32') // 10_000).map(UF_POR_PREFIXO_IBGE)
+
+
+def construir_dicionario(df):
+    """
+    Monta {UF: {NOME_NORMALIZADO: codigo}} a partir dos registros com código resolvido
+    Nomes que aparecem com mais de um código na mesma UF são descartados (ambíguos)
+    """
+    com_codigo = df[df['Codigo_Municipio'].notna()]
+    pares = pd.DataFrame({
+        'UF': com_codigo['UF'].to_numpy(),
+        'Nome': _normalizar_serie(com_codigo['Municipio']).to_numpy(),
+        'Codigo': com_codigo['Codigo_Municipio'].astype(int).to_numpy(),
+    }).drop_duplicates()
+    pares = pares[~pares.duplicated(['UF', 'Nome'], keep=False)]
+
+    dicionario = {}
+    for uf, nome, codigo in pares.itertuples(index=False):
+        dicionario.setdefault(uf, {})[nome] = int(codigo)
+    return dicionario
+
+
+def salvar_dicionario(dicionario, arquivo=ARQUIVO_DICIONARIO):
+    """Salva o dicionário nome -> código por UF"""
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(dicionario, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def carregar_dicionario(arquivo=ARQUIVO_DICIONARIO):
+    """Lê o dicionário nome -> código por UF (vazio se ainda não foi gerado)"""
+    if not arquivo.exists():
+        return {}
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def resolver_codigos(df, dicionario=None):
+    """
+    Garante a coluna Codigo_Municipio (Int32) em todos os registros possíveis, nesta ordem:
+    1. código no início do nome ("120001 ACRELANDIA"), que também é removido do nome
+    2. código já presente no registro
+    3. dicionário nome -> código da UF
+    A UF é corrigida pelo prefixo IBGE quando o código é conhecido.
+    """
+    if df.empty:
+        return df
+    if dicionario is None:
+        dicionario = carregar_dicionario()
+
+    df = df.copy()
+    nomes = df['Municipio'].astype(str)
+    codigos = normalizar_codigos(nomes.str.extract(r'^\s*(\d{6,7})\b', expand=False))
+    df['Municipio'] = nomes.str.replace(r'^\s*\d{6,7}\s+', '', regex=True).str.strip()
+
+    if 'Codigo_Municipio' in df.columns:
+        codigos = codigos.fillna(normalizar_codigos(df['Codigo_Municipio']))
+
+    faltantes = codigos.isna()
+    if faltantes.any() and dicionario:
+        chaves = df.loc[faltantes, 'UF'].astype(str) + '|' + _normalizar_serie(df.loc[faltantes, 'Municipio'])
+        achatado = {
+            f"{uf}|{nome}": codigo
+            for uf, nomes_uf in dicionario.items()
+            for nome, codigo in nomes_uf.items()
+        }
+        codigos[faltantes] = chaves.map(achatado).astype('Int32')
+
+    df['Codigo_Municipio'] = codigos
+    uf_ibge = uf_do_codigo(df['Codigo_Municipio'])
+    df['UF'] = uf_ibge.where(uf_ibge.notna(), df['UF'].to_numpy()).to_numpy()
+    return df
+
+
+def codigos_para_json(df):
+    """Converte Codigo_Municipio (Int32) para int/None antes de df.to_dict() + json.dump"""
+    codigos = df['Codigo_Municipio']
+    return df.assign(Codigo_Municipio=codigos.astype(object).where(codigos.notna(), None))
+
+
+def reconstruir_dicionario():
+    """Reconstrói o dicionário a partir dos JSONs de NV e OB (que trazem o código)"""
+    from src.armazenamento import carregar_indicador
+
+    frames = [resolver_codigos(carregar_indicador(tipo), {}) for tipo in ('NV', 'OB')]
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        print("  ❌ Nenhum dado de NV/OB encontrado para montar o dicionário")
+        return {}
+
+    dicionario = construir_dicionario(pd.concat(frames, ignore_index=True))
+    salvar_dicionario(dicionario)
+
+    total = sum(len(nomes) for nomes in dicionario.values())
+    print(f"  💾 Dicionário de códigos: {total:,} municípios em {len(dicionario)} UFs")
+    return dicionario
+
+
+if __name__ == "__main__":
+    reconstruir_dicionario()
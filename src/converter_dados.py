@@ -15,6 +15,11 @@ if sys.platform == 'win32':
 
 # Configuração de caminhos
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.instrumentacao import etapa, medir_etapa, registrar_execucao
+from src.validacao import executar_validacao
+
 # IMPORTANTE: As planilhas contêm dados diferentes!
 # CMI_Mil_Br_0_4.xlsx → CMI calculado ×1000 (por mil nascidos vivos)
 # CMI_PURO_semMIL.xlsx → CMI calculado ×100 (porcentagem)
@@ -98,6 +103,7 @@ def identificar_tipo_aba(nome_aba, planilha_tipo='CMI_MIL'):
     
     return None, None
 
+@medir_etapa('encontrar_linha_cabecalho')
 def encontrar_linha_cabecalho(df_temp):
     """
     Procura a linha que contém o cabeçalho real (onde está 'Município' como coluna)
@@ -139,6 +145,7 @@ def identificar_coluna_municipio(df):
             return col
     return None
 
+@medir_etapa('extrair_colunas_anos')
 def extrair_colunas_anos(df):
     """
     Extrai as colunas que representam anos (números de 1990 a 2030)
@@ -165,15 +172,18 @@ def extrair_colunas_anos(df):
     
     return sorted(colunas_anos)
 
-def processar_aba(xls, nome_aba, tipo, uf):
+@medir_etapa('processar_aba')
+def processar_aba(xls, nome_aba, tipo, uf, levantar_erros=False):
     """
     Processa uma aba específica e retorna DataFrame no formato longo
+    Retorna None se a aba não tem a estrutura esperada ou, com levantar_erros=False, se o processamento falha
     """
     print(f"  Processando: {nome_aba} (Tipo: {tipo}, UF: {uf})")
     
     try:
         # Passo 1: Lê primeiras linhas para encontrar cabeçalho
-        df_temp = pd.read_excel(xls, sheet_name=nome_aba, header=None, nrows=20)
+        with etapa('leitura'):
+            df_temp = pd.read_excel(xls, sheet_name=nome_aba, header=None, nrows=20)
         linha_cabecalho = encontrar_linha_cabecalho(df_temp)
         
         if linha_cabecalho == -1:
@@ -181,7 +191,8 @@ def processar_aba(xls, nome_aba, tipo, uf):
             return None
         
         # Passo 2: Lê aba com cabeçalho correto
-        df = pd.read_excel(xls, sheet_name=nome_aba, header=linha_cabecalho)
+        with etapa('leitura'):
+            df = pd.read_excel(xls, sheet_name=nome_aba, header=linha_cabecalho)
         df.columns = [limpar_nome_coluna(col) for col in df.columns]
         
         # Passo 3: Identifica coluna de município
@@ -202,11 +213,13 @@ def processar_aba(xls, nome_aba, tipo, uf):
         df = df[['Municipio'] + colunas_anos]
         
         # Passo 6: Converte de formato largo para longo
-        df_melted = df.melt(
-            id_vars=['Municipio'], 
-            var_name='Ano', 
-            value_name='Valor'
-        )
+        with etapa('melt', linhas_entrada=len(df)) as medida:
+            df_melted = df.melt(
+                id_vars=['Municipio'], 
+                var_name='Ano', 
+                value_name='Valor'
+            )
+            medida['linhas_saida'] = len(df_melted)
         
         # Passo 7: Limpeza dos dados
         df_melted['Valor'] = pd.to_numeric(df_melted['Valor'], errors='coerce').fillna(0).astype(int)
@@ -241,9 +254,12 @@ def processar_aba(xls, nome_aba, tipo, uf):
         return df_melted
         
     except Exception as e:
+        if levantar_erros:
+            raise
         print(f"     Erro ao processar aba: {str(e)}")
         return None
 
+@medir_etapa('salvar_json')
 def salvar_json(df, uf, tipo):
     """
     Salva DataFrame como JSON
@@ -289,7 +305,8 @@ def processar_planilha_individual(arquivo, planilha_tipo='CMI_MIL'):
     print(f"\n Processando: {nome_arquivo}")
     
     # Lê arquivo Excel
-    xls = pd.ExcelFile(arquivo)
+    with etapa('leitura'):
+        xls = pd.ExcelFile(arquivo)
     print(f" Total de abas encontradas: {len(xls.sheet_names)}\n")
     
     # Dicionários para agrupar dados por UF e tipo
@@ -315,6 +332,7 @@ def processar_planilha_individual(arquivo, planilha_tipo='CMI_MIL'):
     
     return dados_por_uf_tipo
 
+@registrar_execucao('converter_dados')
 def processar_planilha():
     """
     Função principal que processa todas as planilhas
@@ -371,6 +389,9 @@ def processar_planilha():
     print(f" Total de arquivos gerados: {total_arquivos}")
     print(f" Total de registros processados: {total_registros:,}")
     print("="*70)
+    
+    # Etapa de validação: bloqueia registros inconsistentes antes do dashboard
+    executar_validacao()
 
 if __name__ == "__main__":
     processar_planilha()
@@ -15,6 +15,14 @@ if sys.platform == 'win32':
 
 # Configuração de caminhos
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.busca_municipios import buscar, construir_indice, normalizar_busca
+from src.codigos_municipios import codigos_para_json, extrair_codigo_municipio, resolver_codigos
+from src.instrumentacao import etapa, medir_etapa, registrar_execucao
+from src.leitor_ods import ler_abas
+from src.validacao import executar_validacao
+
 ARQUIVO_CMI_MIL = BASE_DIR / 'data' / 'input' / 'CMI-Mil.ods'
 ARQUIVO_CMI = BASE_DIR / 'data' / 'input' / 'CMI.ods'
 OUTPUT_DIR_CMI_MIL = BASE_DIR / 'data' / 'output' / 'CMI_MIL'
@@ -91,10 +99,12 @@ def identificar_tipo_aba(nome_aba, tipo_arquivo='CMI_MIL'):
     
     return None
 
+@medir_etapa('encontrar_linha_cabecalho')
 def encontrar_linha_cabecalho(df_temp):
     """
     Procura a linha que contém o cabeçalho real (onde está 'Município' como coluna)
     Verifica se tem anos na mesma linha para confirmar que é o cabeçalho correto
+    Retorna a posição da linha ou None se não encontrar
     """
     for i, row in df_temp.iterrows():
         linha_texto = row.astype(str).tolist()
@@ -120,7 +130,7 @@ def encontrar_linha_cabecalho(df_temp):
             if tem_anos:
                 return i
     
-    return 0  # Retorna 0 se não encontrar
+    return None
 
 def identificar_coluna_municipio(df):
     """
@@ -133,6 +143,7 @@ def identificar_coluna_municipio(df):
     # Se não encontrar, assume que é a primeira coluna
     return df.columns[0]
 
+@medir_etapa('extrair_colunas_anos')
 def extrair_colunas_anos(df):
     """
     Extrai as colunas que representam anos (números de 1990 a 2030)
@@ -180,9 +191,11 @@ def limpar_nome_municipio(nome):
     
     return nome.strip()
 
-def processar_aba(df_ods, nome_aba, uf, tipo_cmi):
+@medir_etapa('processar_aba')
+def processar_aba(df_ods, nome_aba, uf, tipo_cmi, levantar_erros=False):
     """
     Processa uma aba específica e retorna DataFrame no formato longo
+    Retorna None se a aba não tem a estrutura esperada ou, com levantar_erros=False, se o processamento falha
     """
     print(f"  Processando: {nome_aba} (UF: {uf}, Tipo: {tipo_cmi})")
     
@@ -191,8 +204,8 @@ def processar_aba(df_ods, nome_aba, uf, tipo_cmi):
         df_temp = df_ods.head(20)
         linha_cabecalho = encontrar_linha_cabecalho(df_temp)
         
-        # Passo 2: Ajusta cabeçalho se necessário
-        if linha_cabecalho > 0:
+        # Passo 2: Ajusta cabeçalho se necessário (a linha encontrada pode ser a primeira da aba)
+        if linha_cabecalho is not None:
             df = df_ods.iloc[linha_cabecalho:].reset_index(drop=True)
             df.columns = df.iloc[0]
             df = df.drop(0).reset_index(drop=True)
@@ -224,7 +237,8 @@ def processar_aba(df_ods, nome_aba, uf, tipo_cmi):
         df = df[df['Municipio'].notna()]
         df = df[df['Municipio'].astype(str).str.strip() != '']
         
-        # Passo 7: Limpa nomes de municípios ANTES de converter para long
+        # Passo 7: Guarda o código IBGE e limpa nomes de municípios ANTES de converter para long
+        df['Codigo_Municipio'] = df['Municipio'].apply(extrair_codigo_municipio)
         df['Municipio'] = df['Municipio'].apply(limpar_nome_municipio)
         
         # Remove linhas que não são municípios (totais, notas, etc)
@@ -249,11 +263,13 @@ def processar_aba(df_ods, nome_aba, uf, tipo_cmi):
         df = df[df['Municipio'].str.strip() != '']
         
         # Passo 8: Converte de formato largo para longo
-        df_melted = df.melt(
-            id_vars=['Municipio'], 
-            var_name='Ano', 
-            value_name='Valor'
-        )
+        with etapa('melt', linhas_entrada=len(df)) as medida:
+            df_melted = df.melt(
+                id_vars=['Municipio', 'Codigo_Municipio'], 
+                var_name='Ano', 
+                value_name='Valor'
+            )
+            medida['linhas_saida'] = len(df_melted)
         
         # Passo 9: Limpeza dos dados
         df_melted['Valor'] = pd.to_numeric(df_melted['Valor'], errors='coerce').fillna(0).astype(float)
@@ -265,6 +281,12 @@ def processar_aba(df_ods, nome_aba, uf, tipo_cmi):
         df_melted = df_melted[df_melted['Municipio'].notna()]
         df_melted = df_melted[df_melted['Ano'] >= 1990]
         
+        # Passo 10: Resolve o código dos municípios sem código no nome (dicionário por UF)
+        df_melted = resolver_codigos(df_melted)
+        sem_codigo = df_melted['Codigo_Municipio'].isna().sum()
+        if sem_codigo:
+            print(f"      ⚠️  {sem_codigo} registros sem código IBGE resolvido")
+        
         print(f"    ✓ Processado: {len(df_melted)} registros | {len(df['Municipio'].unique())} municípios únicos")
         
         # Debug: mostra alguns nomes de municípios
@@ -275,11 +297,14 @@ def processar_aba(df_ods, nome_aba, uf, tipo_cmi):
         return df_melted
         
     except Exception as e:
+        if levantar_erros:
+            raise
         print(f"      ❌ Erro ao processar aba: {str(e)}")
         import traceback
         traceback.print_exc()
         return None
 
+@medir_etapa('salvar_json')
 def salvar_json(df, uf, tipo_cmi):
     """
     Salva DataFrame como JSON
@@ -295,7 +320,7 @@ def salvar_json(df, uf, tipo_cmi):
     arquivo_saida = output_dir / f"{uf}.json"
     
     # Converte para dicionário e salva
-    dados = df.to_dict(orient='records')
+    dados = codigos_para_json(df).to_dict(orient='records')
     
     with open(arquivo_saida, 'w', encoding='utf-8') as f:
         json.dump(dados, f, ensure_ascii=False, indent=2)
@@ -341,7 +366,8 @@ def processar_planilha_ods(arquivo, tipo_cmi):
     
     try:
         # Lê arquivo ODS - obtém lista de abas primeiro
-        xls = pd.read_excel(arquivo, sheet_name=None, engine='odf')
+        with etapa('leitura'):
+            xls = ler_abas(arquivo)
         nomes_abas = list(xls.keys())
         
         print(f"  📑 Total de abas encontradas: {len(nomes_abas)}\n")
@@ -377,6 +403,7 @@ def processar_planilha_ods(arquivo, tipo_cmi):
         traceback.print_exc()
         return {}
 
+@registrar_execucao('converter_ods')
 def processar_todas_planilhas():
     """
     Função principal que processa todas as planilhas ODS
@@ -431,6 +458,9 @@ def processar_todas_planilhas():
     
     # Análise de municípios
     analisar_municipios()
+    
+    # Etapa de validação: bloqueia registros inconsistentes antes do dashboard
+    executar_validacao()
 
 def analisar_municipios():
     """
@@ -471,17 +501,17 @@ def analisar_municipios():
     print("\n  🔎 Testando busca de municípios:")
     municipios_teste = ['FORTALEZA', 'SAO PAULO', 'RIO DE JANEIRO', 'CRATEUS', 'BRASILIA']
     
+    indice = construir_indice(sorted(todos_municipios))
+    
     for municipio_teste in municipios_teste:
-        encontrados = [m for m in todos_municipios if municipio_teste in m.upper()]
-        if encontrados:
-            print(f"    ✅ '{municipio_teste}': Encontrado(s) -> {', '.join(encontrados[:3])}")
+        sugestoes = buscar(indice, municipio_teste, limite=3)
+        exatos = [m for m in sugestoes if municipio_teste in normalizar_busca(m)]
+        if exatos:
+            print(f"    ✅ '{municipio_teste}': Encontrado(s) -> {', '.join(exatos)}")
+        elif sugestoes:
+            print(f"    ⚠️  '{municipio_teste}': Não encontrado exato, mas há similares -> {', '.join(sugestoes)}")
         else:
-            # Busca parcial
-            parciais = [m for m in todos_municipios if m.upper().startswith(municipio_teste[:4])]
-            if parciais:
-                print(f"    ⚠️  '{municipio_teste}': Não encontrado exato, mas há similares -> {', '.join(parciais[:3])}")
-            else:
-                print(f"    ❌ '{municipio_teste}': Não encontrado")
+            print(f"    ❌ '{municipio_teste}': Não encontrado")
     
     # Mostra exemplo de municípios de algumas UFs
     print("\n  📋 Exemplos de municípios por UF:")
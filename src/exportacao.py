@@ -0,0 +1,202 @@
+"""
+Exportação dos indicadores em CSV, Parquet e Excel (XLSX)
+Escopos: lista de municípios (seleção do dashboard), UF inteira ou tabela nacional
+
+O arquivo é escrito em partes: os municípios são percorridos em lotes de TAMANHO_LOTE, cada lote
+vira um bloco alinhado (obter_series) convertido em linhas
+(Codigo_Municipio, Municipio, UF, Ano, CMI, CMI_MIL, NV, OB) e gravado antes do próximo.
+A tabela nacional nunca é montada inteira em memória.
+
+Parquet depende de pyarrow (opcional, um row group por lote); XLSX usa openpyxl em modo write_only.
+"""
+import importlib.util
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.armazenamento import DIRETORIOS_INDICADORES, INDICADORES_CONTAGEM, obter_series
+
+TAMANHO_LOTE = 500  # Municípios por parte escrita
+MAX_LINHAS_XLSX = 1_048_575  # Limite de linhas de uma planilha do Excel (sem o cabeçalho)
+
+FORMATOS = {
+    'csv': {'rotulo': 'CSV', 'extensao': 'csv', 'mime': 'text/csv', 'modulo': None},
+    'parquet': {'rotulo': 'Parquet', 'extensao': 'parquet', 'mime': 'application/vnd.apache.parquet', 'modulo': 'pyarrow'},
+    'xlsx': {
+        'rotulo': 'Excel (XLSX)', 'extensao': 'xlsx', 'modulo': 'openpyxl',
+        'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    },
+}
+
+
+def formatos_disponiveis():
+    """Formatos cujas dependências estão instaladas (CSV sempre)"""
+    return [
+        formato for formato, info in FORMATOS.items()
+        if info['modulo'] is None or importlib.util.find_spec(info['modulo']) is not None
+    ]
+
+
+def codigos_do_escopo(catalogo, uf=None):
+    """Códigos de todos os municípios do catálogo (indexado por código), ou só os de uma UF"""
+    if uf is not None:
+        catalogo = catalogo[catalogo['UF'] == uf.upper()]
+    return sorted(int(codigo) for codigo in catalogo.index)
+
+
+def _parte(catalogo, indicadores, codigos_linhas, anos_linhas, valores):
+    """DataFrame de uma parte: Codigo_Municipio, Municipio, UF, Ano e uma coluna por indicador"""
+    parte = pd.DataFrame({
+        'Codigo_Municipio': codigos_linhas.astype(np.int32),
+        'Municipio': catalogo['Municipio'].reindex(codigos_linhas).array,
+        'UF': catalogo['UF'].reindex(codigos_linhas).array,
+        'Ano': anos_linhas.astype(np.int64),
+    })
+    for posicao, tipo in enumerate(indicadores):
+        coluna = pd.Series(valores[:, posicao], dtype=np.float64)
+        parte[tipo] = coluna.astype('Int64') if tipo in INDICADORES_CONTAGEM else coluna
+    return parte
+
+
+def partes_exportacao(dados, catalogo, codigos, indicadores=None, anos=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Gera um DataFrame por lote de municípios no formato largo (uma linha por município e ano)
+    Linhas sem nenhum indicador no ano são omitidas; NV e OB saem como inteiros (Int64)
+    Sem nenhuma linha, gera uma parte vazia com as colunas: o arquivo sai só com o cabeçalho (ou esquema)
+    """
+    indicadores = list(indicadores or DIRETORIOS_INDICADORES)
+    gerou = False
+
+    for inicio in range(0, len(codigos), tamanho_lote):
+        bloco = obter_series(dados, codigos[inicio:inicio + tamanho_lote], indicadores, anos)
+        total_municipios, total_anos = len(bloco['codigos']), len(bloco['anos'])
+        if total_municipios == 0 or total_anos == 0:
+            continue
+
+        # (indicador, município, ano) -> (município x ano, indicador)
+        valores = bloco['valores'].reshape(len(indicadores), -1).T
+        com_dado = ~np.isnan(valores).all(axis=1)
+        if not com_dado.any():
+            continue
+        gerou = True
+        yield _parte(
+            catalogo, indicadores, np.repeat(bloco['codigos'], total_anos)[com_dado],
+            np.tile(bloco['anos'], total_municipios)[com_dado], valores[com_dado]
+        )
+
+    if not gerou:
+        yield _parte(catalogo, indicadores, np.array([], dtype=np.int32), np.array([], dtype=np.int64),
+                     np.empty((0, len(indicadores))))
+
+
+def linhas_exportacao(dados, codigos, indicadores=None, anos=None):
+    """Linhas que partes_exportacao gera (pares município-ano com algum indicador), sem montar as partes"""
+    codigos = np.asarray(codigos, dtype=np.int32)
+    chaves = []
+    for tipo in list(indicadores or DIRETORIOS_INDICADORES):
+        df = dados[tipo]
+        if df.empty:
+            continue
+        selecionadas = df['Codigo_Municipio'].isin(codigos).to_numpy() & df['Valor'].notna().to_numpy()
+        if anos is not None:
+            ano = df['Ano'].to_numpy()
+            selecionadas &= (ano >= anos[0]) & (ano <= anos[1])
+        chaves.append(
+            df['Codigo_Municipio'].to_numpy(dtype=np.int64)[selecionadas] * 10_000 + df['Ano'].to_numpy()[selecionadas]
+        )
+    return len(np.unique(np.concatenate(chaves))) if chaves else 0
+
+
+def validar_exportacao(dados, formato, codigos, indicadores=None, anos=None):
+    """
+    ValueError se o formato é desconhecido, não está instalado ou não comporta a exportação
+    (XLSX com mais de MAX_LINHAS_XLSX linhas); chamada antes de começar a escrever ou enviar o arquivo
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+    if formato not in formatos_disponiveis():
+        raise ValueError(f"Formato {formato} indisponível: instale {FORMATOS[formato]['modulo']}")
+    if formato == 'xlsx':
+        linhas = linhas_exportacao(dados, codigos, indicadores, anos)
+        if linhas > MAX_LINHAS_XLSX:
+            raise ValueError(
+                f"Exportação com {linhas:,} linhas não cabe em XLSX (máximo {MAX_LINHAS_XLSX:,}); use CSV ou Parquet"
+            )
+
+
+def gerar_csv(partes):
+    """CSV (UTF-8, separador vírgula) em blocos de bytes, um por parte; o cabeçalho só vai no primeiro"""
+    cabecalho = True
+    for parte in partes:
+        yield parte.to_csv(index=False, header=cabecalho).encode('utf-8')
+        cabecalho = False
+
+
+def escrever_csv(partes, destino):
+    """CSV gravado parte a parte (gerar_csv)"""
+    for bloco in gerar_csv(partes):
+        destino.write(bloco)
+
+
+def escrever_parquet(partes, destino):
+    """Parquet com um row group por parte (requer pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for parte in partes:
+            if escritor is None:
+                tabela = pa.Table.from_pandas(parte, preserve_index=False)
+                escritor = pq.ParquetWriter(destino, tabela.schema)
+            else:
+                tabela = pa.Table.from_pandas(parte, schema=escritor.schema, preserve_index=False)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def escrever_xlsx(partes, destino):
+    """Planilha única 'Indicadores' escrita linha a linha (openpyxl write_only)"""
+    from openpyxl import Workbook
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet('Indicadores')
+    linhas = 0
+    cabecalho = True
+    for parte in partes:
+        if cabecalho:
+            planilha.append(list(parte.columns))
+            cabecalho = False
+
+        linhas += len(parte)
+        if linhas > MAX_LINHAS_XLSX:
+            raise ValueError(f"Exportação com mais de {MAX_LINHAS_XLSX:,} linhas não cabe em XLSX; use CSV ou Parquet")
+
+        for linha in parte.astype(object).where(parte.notna(), None).itertuples(index=False, name=None):
+            planilha.append(linha)
+    livro.save(destino)
+
+
+ESCRITORES = {'csv': escrever_csv, 'parquet': escrever_parquet, 'xlsx': escrever_xlsx}
+
+
+def exportar(dados, catalogo, formato, codigos, indicadores=None, anos=None, destino=None):
+    """
+    Escreve a exportação em `destino` (arquivo binário); sem destino, usa um arquivo temporário
+    Retorna o arquivo posicionado no início, pronto para leitura
+    """
+    validar_exportacao(dados, formato, codigos, indicadores, anos)
+    if destino is None:
+        destino = tempfile.TemporaryFile()
+    ESCRITORES[formato](partes_exportacao(dados, catalogo, list(codigos), indicadores, anos), destino)
+    destino.seek(0)
+    return destino
+
+
+def nome_arquivo(escopo, formato, anos=None):
+    """Nome sugerido do arquivo: indicadores_<escopo>[_<inicio>-<fim>].<extensão>"""
+    periodo = f"_{anos[0]}-{anos[1]}" if anos else ''
+    return f"indicadores_{escopo}{periodo}.{FORMATOS[formato]['extensao']}"
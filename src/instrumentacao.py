@@ -0,0 +1,244 @@
+"""
+Instrumentação dos conversores (planilhas -> JSON)
+Cada etapa medida registra tempo de parede, linhas de entrada/saída e pico de memória (tracemalloc),
+com a aba e a UF em que ocorreu:
+
+    @registrar_execucao('converter_ods')      # função principal do script
+    def processar_todas_planilhas(): ...
+
+    @medir_etapa('processar_aba')             # função de uma etapa
+    def processar_aba(df_ods, nome_aba, uf, tipo_cmi): ...
+
+    with etapa('melt', linhas_entrada=len(df)) as medida:   # trecho dentro de uma função
+        df_melted = df.melt(...)
+        medida['linhas_saida'] = len(df_melted)
+
+Ao final da execução, cada etapa vira uma linha JSON em data/output/execucoes_etl.jsonl e um resumo
+(por etapa e pelas abas mais lentas) é exibido. Os tempos são inclusivos: processar_aba inclui o melt.
+Fora de uma execução registrada as etapas não medem nada. ETL_INSTRUMENTACAO=0 desliga tudo.
+"""
+import functools
+import inspect
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from src.armazenamento import DIR_OUTPUT
+
+ARQUIVO_EXECUCOES = DIR_OUTPUT / 'execucoes_etl.jsonl'
+
+MAX_ABAS_RESUMO = 10
+ETAPAS_POR_ABA = ['leitura', 'encontrar_linha_cabecalho', 'extrair_colunas_anos', 'melt']
+
+_execucao = None  # {'script', 'id', 'registros', 'pilha', 'memoria'} da execução em andamento
+
+
+def instrumentacao_ativa():
+    """Desligada com a variável de ambiente ETL_INSTRUMENTACAO=0"""
+    return os.environ.get('ETL_INSTRUMENTACAO', '1') != '0'
+
+
+@contextmanager
+def etapa(nome, aba=None, uf=None, linhas_entrada=None):
+    """
+    Mede o trecho como uma etapa; o dicionário retornado aceita 'linhas_saida'
+    Aba e UF não informadas são herdadas da etapa externa (ex.: melt dentro de processar_aba)
+    """
+    if _execucao is None:
+        yield {}
+        return
+
+    pilha = _execucao['pilha']
+    if pilha:
+        aba = aba if aba is not None else pilha[-1]['aba']
+        uf = uf if uf is not None else pilha[-1]['uf']
+
+    medida = {
+        'etapa': nome, 'aba': aba, 'uf': uf,
+        'linhas_entrada': linhas_entrada, 'linhas_saida': None,
+    }
+
+    # reset_peak zera o pico global: o pico já atingido pela etapa externa é guardado antes
+    memoria = _execucao['memoria']
+    if memoria:
+        atual, pico = tracemalloc.get_traced_memory()
+        if pilha:
+            pilha[-1]['_pico'] = max(pilha[-1]['_pico'], pico)
+        tracemalloc.reset_peak()
+        medida['_base'] = medida['_pico'] = atual
+
+    pilha.append(medida)
+    inicio = time.perf_counter()
+    try:
+        yield medida
+    finally:
+        duracao = time.perf_counter() - inicio
+        pilha.pop()
+        registro = {
+            'execucao': _execucao['id'],
+            'script': _execucao['script'],
+            **{chave: valor for chave, valor in medida.items() if not chave.startswith('_')},
+            'duracao_s': round(duracao, 4),
+        }
+        if memoria:
+            pico = max(medida['_pico'], tracemalloc.get_traced_memory()[1])
+            registro['pico_memoria_mb'] = round((pico - medida['_base']) / (1024 * 1024), 2)
+            if pilha:
+                pilha[-1]['_pico'] = max(pilha[-1]['_pico'], pico)
+        _execucao['registros'].append(registro)
+
+
+def medir_etapa(nome):
+    """
+    Decorador: mede cada chamada como uma etapa
+    Linhas de entrada = primeiro DataFrame dos argumentos; de saída = retorno, se for DataFrame.
+    Argumentos chamados nome_aba e uf identificam a aba e a UF.
+    """
+    def decorador(funcao):
+        assinatura = inspect.signature(funcao)
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if _execucao is None:
+                return funcao(*args, **kwargs)
+
+            argumentos = assinatura.bind_partial(*args, **kwargs).arguments
+            df = next((valor for valor in argumentos.values() if isinstance(valor, pd.DataFrame)), None)
+            with etapa(
+                nome, aba=argumentos.get('nome_aba'), uf=argumentos.get('uf'),
+                linhas_entrada=None if df is None else len(df)
+            ) as registro:
+                resultado = funcao(*args, **kwargs)
+                if isinstance(resultado, pd.DataFrame):
+                    registro['linhas_saida'] = len(resultado)
+                return resultado
+
+        return medida
+    return decorador
+
+
+def registrar_execucao(script, memoria=True):
+    """
+    Decorador da função principal de um script: mede a execução inteira (etapa 'execucao'),
+    grava as etapas no log JSON-lines e exibe o resumo ao final
+    memoria=False dispensa o tracemalloc (mais rápido; sem pico de memória)
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            global _execucao
+            if _execucao is not None or not instrumentacao_ativa():
+                return funcao(*args, **kwargs)
+
+            iniciou_tracemalloc = memoria and not tracemalloc.is_tracing()
+            if iniciou_tracemalloc:
+                tracemalloc.start()
+            _execucao = {
+                'script': script,
+                'id': datetime.now().isoformat(timespec='seconds'),
+                'registros': [],
+                'pilha': [],
+                'memoria': memoria,
+            }
+            try:
+                with etapa('execucao'):
+                    return funcao(*args, **kwargs)
+            finally:
+                registros = _execucao['registros']
+                _execucao = None
+                if iniciou_tracemalloc:
+                    tracemalloc.stop()
+                salvar_registros(registros)
+                exibir_resumo(registros)
+
+        return executar
+    return decorador
+
+
+def salvar_registros(registros, arquivo=None):
+    """Acrescenta as etapas da execução ao log (uma linha JSON por etapa)"""
+    arquivo = arquivo or ARQUIVO_EXECUCOES
+    try:
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        with open(arquivo, 'a', encoding='utf-8') as f:
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+    except OSError as erro:
+        print(f"  ⚠️  Log de execução não gravado: {erro}")
+
+
+def resumir(registros):
+    """(tabela por etapa, tabela por aba) a partir dos registros de uma execução"""
+    df = pd.DataFrame(registros)
+    if 'pico_memoria_mb' not in df.columns:
+        df['pico_memoria_mb'] = float('nan')
+
+    por_etapa = df.groupby('etapa', sort=False).agg(
+        chamadas=('duracao_s', 'size'),
+        tempo_s=('duracao_s', 'sum'),
+        linhas_entrada=('linhas_entrada', 'sum'),
+        linhas_saida=('linhas_saida', 'sum'),
+        pico_memoria_mb=('pico_memoria_mb', 'max'),
+    )
+
+    abas = df[df['aba'].notna()]
+    if abas.empty:
+        return por_etapa, pd.DataFrame()
+    por_aba = abas.groupby(['aba', 'uf', 'etapa'])['duracao_s'].sum().unstack('etapa')
+    processamento = abas[abas['etapa'] == 'processar_aba'].groupby(['aba', 'uf']).agg(
+        linhas=('linhas_saida', 'sum'), pico_memoria_mb=('pico_memoria_mb', 'max')
+    )
+    por_aba = por_aba.join(processamento)
+    colunas_tempo = [coluna for coluna in ['processar_aba', *ETAPAS_POR_ABA] if coluna in por_aba.columns]
+    por_aba['tempo_s'] = por_aba[colunas_tempo].max(axis=1)
+    return por_etapa, por_aba.sort_values('tempo_s', ascending=False)
+
+
+def exibir_resumo(registros):
+    """Tabela por etapa e as abas mais lentas, no terminal"""
+    if not registros:
+        return
+    por_etapa, por_aba = resumir(registros)
+    total = por_etapa.loc['execucao', 'tempo_s'] if 'execucao' in por_etapa.index else por_etapa['tempo_s'].sum()
+
+    print("\n" + "="*70)
+    print(" ⏱️  INSTRUMENTAÇÃO - TEMPO E MEMÓRIA POR ETAPA")
+    print("="*70)
+    print(f"\n  {'Etapa':<27} {'Chamadas':>8} {'Tempo':>9} {'%':>6} {'Linhas saída':>13} {'Pico mem.':>10}")
+    print(f"  {'-'*27} {'-'*8} {'-'*9} {'-'*6} {'-'*13} {'-'*10}")
+    for nome, linha in por_etapa.iterrows():
+        pico = f"{linha['pico_memoria_mb']:.1f} MB" if pd.notna(linha['pico_memoria_mb']) else '-'
+        saida = f"{int(linha['linhas_saida']):,}" if linha['linhas_saida'] else '-'
+        percentual = linha['tempo_s'] / total * 100 if total else 0
+        print(
+            f"  {nome:<27} {int(linha['chamadas']):>8} {linha['tempo_s']:>8.2f}s {percentual:>5.1f}% "
+            f"{saida:>13} {pico:>10}"
+        )
+
+    if not por_aba.empty:
+        print(f"\n  🐢 Abas mais lentas (top {min(MAX_ABAS_RESUMO, len(por_aba))} de {len(por_aba)}):")
+        etapas = [nome for nome in ETAPAS_POR_ABA if nome in por_aba.columns]
+        rotulos = {'encontrar_linha_cabecalho': 'cabeçalho', 'extrair_colunas_anos': 'anos'}
+        print(
+            f"  {'Aba':<16} {'UF':<3} {'Tempo':>8} "
+            + ' '.join(f"{rotulos.get(nome, nome):>9}" for nome in etapas)
+            + f" {'Linhas':>8} {'Pico mem.':>10}"
+        )
+        for (aba, uf), linha in por_aba.head(MAX_ABAS_RESUMO).iterrows():
+            pico = f"{linha['pico_memoria_mb']:.1f} MB" if pd.notna(linha.get('pico_memoria_mb')) else '-'
+            linhas = f"{int(linha['linhas']):,}" if pd.notna(linha.get('linhas')) else '-'
+            print(
+                f"  {str(aba)[:16]:<16} {str(uf):<3} {linha['tempo_s']:>7.2f}s "
+                + ' '.join(
+                    f"{linha[nome]:>8.2f}s" if pd.notna(linha[nome]) else f"{'-':>9}" for nome in etapas
+                )
+                + f" {linhas:>8} {pico:>10}"
+            )
+
+    print(f"\n  📝 Log: {ARQUIVO_EXECUCOES.name} ({len(registros)} etapas)")
+    print("="*70)
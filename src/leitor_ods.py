@@ -0,0 +1,280 @@
+"""
+Leitor nativo de planilhas ODS, no lugar de pd.read_excel(..., engine='odf')
+O odfpy monta um objeto DOM por célula e o pandas devolve as colunas mistas como object; aqui o
+content.xml é lido em fluxo (iterparse), as repetições (number-columns-repeated / number-rows-repeated)
+são expandidas na hora e cada coluna é preenchida direto em um buffer float64:
+
+    abas = ler_abas(ARQUIVO_CMI_MIL)                  # {nome da aba: DataFrame}, como sheet_name=None
+    df = ler_abas(ARQUIVO_CMI_MIL, abas='CE NV')      # uma aba
+
+Colunas só com números (e vazios) saem float64, com NaN nas células vazias; colunas com texto ou datas
+saem object, com inteiros como int (como o odf do pandas). Como no pandas, linhas vazias no fim da aba
+são descartadas e a linha `cabecalho` (padrão 0) vira o nome das colunas (None mantém as colunas numeradas).
+LEITOR_ODS_NATIVO=0 volta para o pd.read_excel. As abas lidas ficam em cache, pelo conteúdo da
+planilha (src/cache_planilhas.py).
+"""
+import math
+import os
+import re
+import zipfile
+from array import array
+from datetime import time as hora
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+import pandas as pd
+
+from src.cache_planilhas import cache_ativo, ler_em_cache
+
+_TABELA = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+_OFFICE = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+_TEXTO = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+
+ABA = _TABELA + 'table'
+LINHA = _TABELA + 'table-row'
+CELULA = _TABELA + 'table-cell'
+CELULA_COBERTA = _TABELA + 'covered-table-cell'
+NOME_ABA = _TABELA + 'name'
+REPETE_COLUNAS = _TABELA + 'number-columns-repeated'
+REPETE_LINHAS = _TABELA + 'number-rows-repeated'
+TIPO_VALOR = _OFFICE + 'value-type'
+VALOR = _OFFICE + 'value'
+VALOR_DATA = _OFFICE + 'date-value'
+VALOR_HORA = _OFFICE + 'time-value'
+VALOR_LOGICO = _OFFICE + 'boolean-value'
+PARAGRAFO = _TEXTO + 'p'
+ESPACOS = _TEXTO + 's'
+TABULACAO = _TEXTO + 'tab'
+QUEBRA = _TEXTO + 'line-break'
+QUANTIDADE = _TEXTO + 'c'
+
+TIPOS_NUMERICOS = ('float', 'percentage', 'currency')
+
+_DURACAO = re.compile(r'^PT(\d+)H(\d+)M(\d+(?:\.\d+)?)S$')
+
+
+def leitor_nativo_ativo():
+    """Desligado com a variável de ambiente LEITOR_ODS_NATIVO=0"""
+    return os.environ.get('LEITOR_ODS_NATIVO', '1') != '0'
+
+
+def _texto_paragrafo(elemento):
+    """Texto de um text:p (ou de um trecho dentro dele), com text:s, text:tab e text:line-break"""
+    partes = [elemento.text or '']
+    for filho in elemento:
+        if filho.tag == ESPACOS:
+            partes.append(' ' * int(filho.get(QUANTIDADE, 1)))
+        elif filho.tag == TABULACAO:
+            partes.append('\t')
+        elif filho.tag == QUEBRA:
+            partes.append('\n')
+        else:
+            partes.append(_texto_paragrafo(filho))
+        partes.append(filho.tail or '')
+    return ''.join(partes)
+
+
+def valor_celula(celula):
+    """
+    Valor de uma célula: float para números, str/Timestamp/time/bool para os demais tipos;
+    None para células vazias (sem office:value-type) e para células cobertas por mesclagem
+    """
+    tipo = celula.get(TIPO_VALOR)
+    if tipo is None:
+        return None
+    if tipo in TIPOS_NUMERICOS:
+        return float(celula.get(VALOR))
+    if tipo == 'string':
+        return '\n'.join(_texto_paragrafo(filho) for filho in celula if filho.tag == PARAGRAFO)
+    if tipo == 'date':
+        return pd.Timestamp(celula.get(VALOR_DATA))
+    if tipo == 'boolean':
+        return celula.get(VALOR_LOGICO) == 'true'
+    if tipo == 'time':
+        encontrado = _DURACAO.match(celula.get(VALOR_HORA, ''))
+        if encontrado:
+            segundos = float(encontrado.group(3))
+            return hora(int(encontrado.group(1)) % 24, int(encontrado.group(2)), int(segundos),
+                        round(segundos % 1 * 1_000_000))
+        return celula.get(VALOR_HORA)
+    return None
+
+
+class _Aba:
+    """Buffers de uma aba: um array('d') por coluna e as células não numéricas à parte"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.linhas = 0
+        self.numeros = []  # coluna -> array('d'), NaN nas células vazias ou não numéricas
+        self.objetos = []  # coluna -> {linha: valor} das células de texto, data, hora ou lógico
+
+    def acrescentar(self, celulas, repeticoes):
+        """Grava uma linha (lista de (coluna, valor, repetições de coluna)) `repeticoes` vezes"""
+        for _ in range(repeticoes):
+            linha = self.linhas
+            for coluna, valor, repeticao_colunas in celulas:
+                for j in range(coluna, coluna + repeticao_colunas):
+                    while j >= len(self.numeros):
+                        self.numeros.append(array('d'))
+                        self.objetos.append({})
+                    buffer = self.numeros[j]
+                    if len(buffer) < linha:
+                        buffer.extend(array('d', [math.nan]) * (linha - len(buffer)))
+                    if isinstance(valor, float):
+                        buffer.append(valor)
+                    else:
+                        buffer.append(math.nan)
+                        self.objetos[j][linha] = valor
+            self.linhas += 1
+
+    def coluna(self, j, inicio=0):
+        """Coluna j a partir da linha `inicio`: float64 se só tem números, senão object (inteiros como int)"""
+        buffer = self.numeros[j]
+        if len(buffer) < self.linhas:
+            buffer.extend(array('d', [math.nan]) * (self.linhas - len(buffer)))
+        valores = np.frombuffer(buffer, dtype=np.float64)[inicio:].copy()
+        objetos = {linha - inicio: valor for linha, valor in self.objetos[j].items() if linha >= inicio}
+        if not objetos:
+            return valores
+        coluna = valores.astype(object)
+        for linha in np.flatnonzero(~np.isnan(valores)):
+            numero = valores[linha]
+            coluna[linha] = int(numero) if numero.is_integer() else float(numero)
+        for linha, valor in objetos.items():
+            coluna[linha] = valor
+        return coluna
+
+    def celula(self, linha, j):
+        if linha in self.objetos[j]:
+            return self.objetos[j][linha]
+        numero = self.numeros[j][linha] if linha < len(self.numeros[j]) else math.nan
+        return int(numero) if numero.is_integer() else numero
+
+
+def _nome_coluna(valor, j):
+    """Nome de coluna a partir da célula do cabeçalho (vazia -> 'Unnamed: j', como no pandas)"""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return f'Unnamed: {j}'
+    return valor
+
+
+def _nomes_unicos(nomes):
+    """Repetidos ganham sufixo .1, .2... (como no pandas)"""
+    vistos = {}
+    unicos = []
+    for nome in nomes:
+        if nome in vistos:
+            vistos[nome] += 1
+            novo = f'{nome}.{vistos[nome]}'
+            while novo in vistos:
+                vistos[nome] += 1
+                novo = f'{nome}.{vistos[nome]}'
+            vistos[novo] = 0
+            unicos.append(novo)
+        else:
+            vistos[nome] = 0
+            unicos.append(nome)
+    return unicos
+
+
+def montar_dataframe(aba, cabecalho=0):
+    """DataFrame a partir dos buffers; cabecalho é a linha com os nomes das colunas"""
+    largura = len(aba.numeros)
+    if cabecalho is None:
+        return pd.DataFrame({j: aba.coluna(j) for j in range(largura)}, index=pd.RangeIndex(aba.linhas))
+    if aba.linhas <= cabecalho:
+        return pd.DataFrame()
+
+    nomes = _nomes_unicos([_nome_coluna(aba.celula(cabecalho, j), j) for j in range(largura)])
+    df = pd.DataFrame(
+        {j: aba.coluna(j, cabecalho + 1) for j in range(largura)},
+        index=pd.RangeIndex(aba.linhas - cabecalho - 1)
+    )
+    df.columns = pd.Index(nomes, dtype=object)
+    return df
+
+
+def ler_buffers(arquivo, abas=None):
+    """
+    Percorre o content.xml e devolve {nome: _Aba} das abas pedidas (None: todas), na ordem do arquivo
+    Linhas vazias só ocupam espaço quando há dados depois delas (as do fim da aba são descartadas)
+    """
+    abas = None if abas is None else set(abas)
+    lidas = {}
+    aba = _Aba(None)
+    vazias = 0  # linhas vazias desde a última com dados
+    with zipfile.ZipFile(arquivo) as pacote, pacote.open('content.xml') as conteudo:
+        # Só eventos de fim: o nome da aba chega no fim dela, então as linhas vão para uma aba sem nome
+        for _, elemento in iterparse(conteudo, events=('end',)):
+            if elemento.tag == LINHA:
+                celulas = []
+                coluna = 0
+                for celula in elemento:
+                    repeticao = int(celula.get(REPETE_COLUNAS, 1))
+                    tipo = celula.get(TIPO_VALOR)
+                    if tipo is not None and celula.tag == CELULA:
+                        valor = float(celula.get(VALOR)) if tipo == 'float' else valor_celula(celula)
+                        if valor is not None and valor != '':
+                            celulas.append((coluna, valor, repeticao))
+                    coluna += repeticao
+                repeticoes = int(elemento.get(REPETE_LINHAS, 1))
+                if celulas:
+                    aba.linhas += vazias
+                    vazias = 0
+                    aba.acrescentar(celulas, repeticoes)
+                else:
+                    vazias += repeticoes
+                elemento.clear()
+            elif elemento.tag == ABA:
+                aba.nome = elemento.get(NOME_ABA)
+                if abas is None or aba.nome in abas:
+                    lidas[aba.nome] = aba
+                    if abas is not None and abas <= set(lidas):
+                        break
+                aba = _Aba(None)
+                vazias = 0
+                elemento.clear()
+    return lidas
+
+
+def _ler(arquivo, nomes, cabecalho):
+    """{nome: DataFrame} das abas `nomes` (None: todas) lidas da planilha"""
+    if not leitor_nativo_ativo():
+        return pd.read_excel(arquivo, sheet_name=nomes, header=cabecalho, engine='odf')
+
+    lidas = ler_buffers(arquivo, nomes)
+    if nomes is not None:
+        faltando = [nome for nome in nomes if nome not in lidas]
+        if faltando:
+            raise ValueError(f"Aba(s) não encontrada(s) em {os.path.basename(str(arquivo))}: {', '.join(faltando)}")
+        lidas = {nome: lidas[nome] for nome in nomes}
+    return {nome: montar_dataframe(aba, cabecalho) for nome, aba in lidas.items()}
+
+
+def ler_abas(arquivo, abas=None, cabecalho=0):
+    """
+    Lê as abas de uma planilha ODS: abas=None -> {nome: DataFrame} de todas; str -> um DataFrame;
+    lista -> {nome: DataFrame} dessas abas
+    As abas já lidas vêm do cache por conteúdo da planilha (src/cache_planilhas.py)
+    """
+    uma_aba = isinstance(abas, str)
+    nomes = [abas] if uma_aba else (None if abas is None else list(abas))
+    if cache_ativo():
+        variante = f"{'nativo' if leitor_nativo_ativo() else 'odf'}_{cabecalho}"
+        dados = ler_em_cache(arquivo, nomes, variante, lambda planilha, pedidas: _ler(planilha, pedidas, cabecalho))
+    else:
+        dados = _ler(arquivo, nomes, cabecalho)
+    return dados[abas] if uma_aba else dados
+
+
+def listar_abas(arquivo):
+    """Nomes das abas, na ordem do arquivo (sem ler as células)"""
+    nomes = []
+    with zipfile.ZipFile(arquivo) as pacote, pacote.open('content.xml') as conteudo:
+        for evento, elemento in iterparse(conteudo, events=('start', 'end')):
+            if evento == 'start' and elemento.tag == ABA:
+                nomes.append(elemento.get(NOME_ABA))
+            elif evento == 'end' and elemento.tag == LINHA:
+                elemento.clear()
+    return nomes
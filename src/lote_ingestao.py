@@ -0,0 +1,426 @@
+"""
+Ingestão em lote: qualquer número de planilhas ODS/XLSX descritas em um manifesto JSON
+
+    {
+      "paralelo": 2,
+      "planilhas": [
+        {"arquivo": "data/input/CMI-Mil.ods", "perfis": ["cmi_mil_ods", "nv_ob_ods"]},
+        {"arquivo": "data/input/CMI.ods", "perfis": ["cmi_ods"]}
+      ]
+    }
+
+Perfis (quais abas da planilha são lidas e por qual conversor):
+- cmi_mil_ods: abas "CMI-Mil UF" (converter_ods.py) -> CMI_MIL/
+- cmi_ods: abas "CMI UF" (converter_ods.py) -> CMI_puro/
+- nv_ob_ods: abas "UF NV" e "UF OB" (processar_nv_ob.py) -> nascidos_vivos/, obitos/ e, nas abas mensais, mensal/
+- cmi_mil_xlsx, cmi_puro_xlsx: abas das planilhas Excel (converter_dados.py)
+Caminhos relativos são relativos à raiz do projeto; "saida" (opcional) troca data/output por outro diretório.
+
+Cada aba concluída vira um arquivo intermediário em data/output/lotes/<manifesto>/<planilha>/, com o
+andamento em estado.json: uma execução interrompida retoma só as abas que faltam, e uma planilha
+inalterada (mesmo tamanho e data de modificação) não é relida. As planilhas são processadas em paralelo,
+um processo por planilha. Com todas concluídas, os registros são consolidados por destino e UF (se duas
+planilhas trazem o mesmo município e período, vale a que vem depois no manifesto), gravados no formato
+dos conversores e validados.
+
+Uso: python src/lote_ingestao.py [manifesto.json] [paralelo] [--reiniciar]
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src import converter_dados, converter_ods, processar_nv_ob
+from src.armazenamento import DIR_OUTPUT
+from src.codigos_municipios import codigos_para_json, reconstruir_dicionario
+from src.instrumentacao import etapa, registrar_execucao
+from src.leitor_ods import ler_abas
+from src.series_mensais import TIPOS_MENSAIS, salvar_indicador_mensal
+from src.validacao import executar_validacao
+
+MANIFESTO_PADRAO = BASE_DIR / 'data' / 'input' / 'manifesto.json'
+DIR_LOTES = DIR_OUTPUT / 'lotes'
+
+# Destino de cada aba processada: diretório dos JSONs por UF (os mesmos dos conversores)
+DESTINOS = {
+    'CMI_MIL': converter_ods.OUTPUT_DIR_CMI_MIL,
+    'CMI_puro': converter_ods.OUTPUT_DIR_CMI_PURO,
+    'NV': processar_nv_ob.OUTPUT_DIR_NV,
+    'OB': processar_nv_ob.OUTPUT_DIR_OB,
+}
+DIR_MENSAL = processar_nv_ob.OUTPUT_DIR_MENSAL
+
+
+# ============================================================================
+# PERFIS: identificar(nome_aba) -> (destino, UF) ou None; processar(xls, nome_aba, destino, uf) -> DataFrame
+# Os conversores levantam as exceções (levantar_erros=True) e retornam None para abas sem a estrutura esperada
+# ============================================================================
+
+def abrir_planilha(arquivo):
+    """ODS: {nome: DataFrame} de todas as abas (src/leitor_ods.py); XLSX: pd.ExcelFile, lido aba a aba"""
+    if Path(arquivo).suffix.lower() == '.ods':
+        return ler_abas(arquivo)
+    return pd.ExcelFile(arquivo)
+
+
+def _ler_aba(xls, nome_aba):
+    return xls[nome_aba] if isinstance(xls, dict) else xls.parse(nome_aba)
+
+
+def _identificar_cmi_mil_ods(nome_aba):
+    uf = converter_ods.identificar_tipo_aba(nome_aba, 'CMI_MIL')
+    return None if uf is None else ('CMI_MIL', uf)
+
+
+def _identificar_cmi_ods(nome_aba):
+    uf = converter_ods.identificar_tipo_aba(nome_aba, 'CMI_puro')
+    return None if uf is None else ('CMI_puro', uf)
+
+
+def _processar_ods(xls, nome_aba, destino, uf):
+    return converter_ods.processar_aba(_ler_aba(xls, nome_aba), nome_aba, uf, destino, levantar_erros=True)
+
+
+def _identificar_nv_ob(nome_aba):
+    # Formato: "TO NV" ou "TO OB"
+    partes = nome_aba.upper().split()
+    if len(partes) >= 2 and partes[0] in processar_nv_ob.UFS_BRASIL and partes[1] in TIPOS_MENSAIS:
+        return partes[1], partes[0]
+    return None
+
+
+def _processar_nv_ob(xls, nome_aba, destino, uf):
+    return processar_nv_ob.processar_aba_nv_ob(
+        _ler_aba(xls, nome_aba), nome_aba, uf, TIPOS_MENSAIS[destino], levantar_erros=True
+    )
+
+
+def _identificar_cmi_mil_xlsx(nome_aba):
+    tipo, uf = converter_dados.identificar_tipo_aba(nome_aba, 'CMI_MIL')
+    return None if tipo is None else (tipo, uf)
+
+
+def _identificar_cmi_puro_xlsx(nome_aba):
+    tipo, uf = converter_dados.identificar_tipo_aba(nome_aba, 'CMI_puro')
+    return None if tipo is None else (tipo, uf)
+
+
+def _processar_xlsx(xls, nome_aba, destino, uf):
+    return converter_dados.processar_aba(xls, nome_aba, destino, uf, levantar_erros=True)
+
+
+PERFIS = {
+    'cmi_mil_ods': (_identificar_cmi_mil_ods, _processar_ods),
+    'cmi_ods': (_identificar_cmi_ods, _processar_ods),
+    'nv_ob_ods': (_identificar_nv_ob, _processar_nv_ob),
+    'cmi_mil_xlsx': (_identificar_cmi_mil_xlsx, _processar_xlsx),
+    'cmi_puro_xlsx': (_identificar_cmi_puro_xlsx, _processar_xlsx),
+}
+
+
+# ============================================================================
+# MANIFESTO E ESTADO
+# ============================================================================
+
+def _caminho(valor):
+    caminho = Path(valor)
+    return caminho if caminho.is_absolute() else BASE_DIR / caminho
+
+
+def carregar_manifesto(arquivo=MANIFESTO_PADRAO):
+    """
+    Lê e valida o manifesto; retorna {'nome', 'paralelo', 'saida', 'planilhas': [{'id', 'arquivo', 'perfis'}]}
+    Erros de configuração (perfil desconhecido, planilha sem arquivo) levantam ValueError
+    """
+    arquivo = Path(arquivo)
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        manifesto = json.load(f)
+
+    planilhas = []
+    for i, entrada in enumerate(manifesto.get('planilhas', []), 1):
+        if 'arquivo' not in entrada:
+            raise ValueError(f"Planilha {i} do manifesto sem 'arquivo'")
+        perfis = entrada.get('perfis', entrada.get('perfil'))
+        perfis = [perfis] if isinstance(perfis, str) else list(perfis or [])
+        desconhecidos = [perfil for perfil in perfis if perfil not in PERFIS]
+        if not perfis or desconhecidos:
+            raise ValueError(
+                f"Planilha {i} ({entrada['arquivo']}): perfis inválidos {desconhecidos or perfis}; "
+                f"disponíveis: {', '.join(PERFIS)}"
+            )
+        caminho = _caminho(entrada['arquivo'])
+        # Identificador estável da planilha no lote (não muda se o manifesto for reordenado)
+        resumo = hashlib.sha1(f"{caminho.resolve()}|{'+'.join(perfis)}".encode('utf-8')).hexdigest()[:8]
+        planilhas.append({'id': f"{caminho.stem}_{resumo}", 'arquivo': str(caminho), 'perfis': perfis})
+
+    if not planilhas:
+        raise ValueError(f"Manifesto sem planilhas: {arquivo}")
+    return {
+        'nome': arquivo.stem,
+        'paralelo': int(manifesto.get('paralelo', min(len(planilhas), os.cpu_count() or 1))),
+        'saida': str(_caminho(manifesto['saida'])) if manifesto.get('saida') else None,
+        'planilhas': planilhas,
+    }
+
+
+def assinatura_arquivo(arquivo):
+    """(tamanho, mtime_ns): muda quando a planilha é substituída"""
+    status = os.stat(arquivo)
+    return [status.st_size, status.st_mtime_ns]
+
+
+def _gravar_json_atomico(dados, arquivo):
+    temporario = arquivo.with_name(arquivo.name + '.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, arquivo)
+
+
+def carregar_estado(diretorio, planilha):
+    """Estado salvo da planilha, ou um novo (descartando intermediários) se ela ou os perfis mudaram"""
+    arquivo_estado = diretorio / 'estado.json'
+    assinatura = assinatura_arquivo(planilha['arquivo'])
+    if arquivo_estado.exists():
+        with open(arquivo_estado, 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('assinatura') == assinatura and estado.get('perfis') == planilha['perfis']:
+            return estado
+        shutil.rmtree(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    return {'arquivo': planilha['arquivo'], 'perfis': planilha['perfis'], 'assinatura': assinatura,
+            'abas': {}, 'concluida': False}
+
+
+# ============================================================================
+# PROCESSAMENTO DE UMA PLANILHA (processo do pool)
+# ============================================================================
+
+def processar_planilha(planilha, diretorio):
+    """
+    Processa as abas pendentes de uma planilha, gravando cada aba concluída antes da próxima
+    Retorna o resumo {'id', 'arquivo', 'novas', 'retomadas', 'erros', 'concluida', 'duracao_s'}
+    """
+    inicio = time.perf_counter()
+    diretorio = Path(diretorio)
+    nome = Path(planilha['arquivo']).name
+    resumo = {'id': planilha['id'], 'arquivo': nome, 'novas': 0, 'retomadas': 0, 'erros': [], 'concluida': False}
+
+    try:
+        estado = carregar_estado(diretorio, planilha)
+        if estado['concluida']:
+            resumo.update(retomadas=len(estado['abas']), concluida=True, duracao_s=0.0)
+            print(f"\n⏭️  {nome}: inalterada desde a última execução")
+            return resumo
+        xls = abrir_planilha(planilha['arquivo'])
+        nomes_abas = list(xls) if isinstance(xls, dict) else xls.sheet_names
+    except (OSError, ValueError) as erro:
+        resumo['erros'].append(('(planilha)', str(erro)))
+        resumo['duracao_s'] = round(time.perf_counter() - inicio, 2)
+        print(f"\n❌ {nome}: {erro}")
+        return resumo
+
+    print(f"\n📊 {nome}: {len(nomes_abas)} abas ({', '.join(planilha['perfis'])})")
+    for posicao, nome_aba in enumerate(nomes_abas):
+        if estado['abas'].get(nome_aba, {}).get('status') in ('ok', 'vazia', 'ignorada'):
+            resumo['retomadas'] += 1
+            continue
+
+        alvo = None
+        for perfil in planilha['perfis']:
+            identificar, processar = PERFIS[perfil]
+            if (alvo := identificar(nome_aba)) is not None:
+                break
+        if alvo is None:
+            estado['abas'][nome_aba] = {'status': 'ignorada'}
+            continue
+
+        destino, uf = alvo
+        try:
+            df = processar(xls, nome_aba, destino, uf)
+            if df is None:
+                # A aba foi reconhecida pelo nome mas não tem cabeçalho/colunas de ano: não conta como concluída
+                raise ValueError("estrutura da aba não reconhecida (cabeçalho ou colunas de ano)")
+        except Exception as erro:
+            estado['abas'][nome_aba] = {'status': 'erro', 'erro': str(erro)}
+            resumo['erros'].append((nome_aba, str(erro)))
+            print(f"    ❌ {nome_aba}: {erro}")
+            _gravar_json_atomico(estado, diretorio / 'estado.json')
+            continue
+
+        if len(df) == 0:
+            estado['abas'][nome_aba] = {'status': 'vazia', 'destino': destino, 'uf': uf}
+        else:
+            arquivo_aba = f"{posicao:03d}.pkl"
+            df.to_pickle(diretorio / (arquivo_aba + '.tmp'))
+            os.replace(diretorio / (arquivo_aba + '.tmp'), diretorio / arquivo_aba)
+            estado['abas'][nome_aba] = {'status': 'ok', 'destino': destino, 'uf': uf,
+                                        'registros': len(df), 'arquivo': arquivo_aba}
+        resumo['novas'] += 1
+        _gravar_json_atomico(estado, diretorio / 'estado.json')
+
+    estado['concluida'] = not resumo['erros']
+    _gravar_json_atomico(estado, diretorio / 'estado.json')
+    resumo['concluida'] = estado['concluida']
+    resumo['duracao_s'] = round(time.perf_counter() - inicio, 2)
+    return resumo
+
+
+# ============================================================================
+# CONSOLIDAÇÃO
+# ============================================================================
+
+def _chave_municipio(df):
+    """
+    Identificação do município na consolidação: o código IBGE (grafias diferentes do nome em duas planilhas
+    são o mesmo município) e, sem código resolvido, o nome
+    """
+    nomes = 'nome:' + df['Municipio'].astype('string')
+    if 'Codigo_Municipio' not in df.columns:
+        return nomes.rename('municipio')
+    codigos = pd.to_numeric(df['Codigo_Municipio'], errors='coerce').astype('Int64').astype('string')
+    return codigos.fillna(nomes).rename('municipio')
+
+
+def consolidar(planilhas, dir_lote, saida=None):
+    """
+    Junta as abas concluídas de todas as planilhas por (destino, UF) e grava os JSONs
+    (e o armazenamento mensal de NV/OB); retorna {destino: registros gravados}
+    """
+    saida = Path(saida) if saida else None
+    partes = {}
+    for ordem, planilha in enumerate(planilhas):
+        diretorio = dir_lote / planilha['id']
+        with open(diretorio / 'estado.json', 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+        for aba in estado['abas'].values():
+            if aba['status'] == 'ok':
+                df = pd.read_pickle(diretorio / aba['arquivo']).assign(_ordem=ordem)
+                partes.setdefault((aba['destino'], aba['uf']), []).append(df)
+
+    totais = {}
+    mensais = {}
+    for (destino, uf), frames in sorted(partes.items()):
+        df = pd.concat(frames, ignore_index=True)
+        if df['_ordem'].nunique() > 1:
+            # Mesmo município e período em mais de uma planilha: vale a mais recente no manifesto
+            chave = [_chave_municipio(df), 'Ano'] + (['Mes'] if 'Mes' in df.columns else [])
+            df = df[df['_ordem'] == df.groupby(chave, dropna=False)['_ordem'].transform('max')]
+        df = df.drop(columns='_ordem').reset_index(drop=True)
+
+        if 'Mes' in df.columns:
+            mensais.setdefault(destino, []).append(df)
+            continue
+
+        diretorio = DESTINOS[destino] if saida is None else saida / DESTINOS[destino].name
+        diretorio.mkdir(parents=True, exist_ok=True)
+        with etapa('salvar_json', uf=uf, linhas_entrada=len(df)):
+            dados = (codigos_para_json(df) if 'Codigo_Municipio' in df.columns else df).to_dict(orient='records')
+            _gravar_json_atomico(dados, diretorio / f"{uf}.json")
+        totais[destino] = totais.get(destino, 0) + len(dados)
+        print(f"  ✓ {diretorio.name}/{uf}.json ({len(dados):,} registros)")
+
+    # Séries mensais: um arquivo colunar por indicador com todas as UFs
+    dir_mensal = DIR_MENSAL if saida is None else saida / DIR_MENSAL.name
+    for indicador, frames in mensais.items():
+        df_mensal = pd.concat(frames, ignore_index=True)
+        arquivo = dir_mensal / f"{indicador}.npz"
+        with etapa('salvar_mensal', linhas_entrada=len(df_mensal)):
+            total = salvar_indicador_mensal(df_mensal, indicador, arquivo)
+        totais[indicador] = totais.get(indicador, 0) + total
+        print(f"  ✓ {indicador} mensal: {arquivo.name} ({total:,} registros, {len(frames)} UFs)")
+    return totais
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+@registrar_execucao('lote_ingestao', memoria=False)
+def executar_lote(arquivo_manifesto=MANIFESTO_PADRAO, paralelo=None, reiniciar=False):
+    """
+    Processa (ou retoma) todas as planilhas do manifesto e consolida as saídas
+    Retorna True se o lote foi concluído; com falhas, uma nova execução retoma das abas pendentes
+    """
+    manifesto = carregar_manifesto(arquivo_manifesto)
+    planilhas = manifesto['planilhas']
+    paralelo = max(1, paralelo or manifesto['paralelo'])
+    dir_lote = DIR_LOTES / manifesto['nome']
+    if reiniciar and dir_lote.exists():
+        shutil.rmtree(dir_lote)
+
+    print("="*70)
+    print(f" 📦 INGESTÃO EM LOTE: {manifesto['nome']} ({len(planilhas)} planilhas, {paralelo} em paralelo)")
+    print("="*70)
+    print(f"📁 Andamento: {dir_lote.relative_to(BASE_DIR) if dir_lote.is_relative_to(BASE_DIR) else dir_lote}")
+
+    resumos = []
+    with etapa('processar_planilhas'):
+        with ProcessPoolExecutor(max_workers=min(paralelo, len(planilhas))) as executor:
+            futuros = {
+                executor.submit(processar_planilha, planilha, dir_lote / planilha['id']): planilha
+                for planilha in planilhas
+            }
+            for futuro in as_completed(futuros):
+                planilha = futuros[futuro]
+                try:
+                    resumos.append(futuro.result())
+                except Exception as erro:  # Processo interrompido (memória, sinal...)
+                    resumos.append({'id': planilha['id'], 'arquivo': Path(planilha['arquivo']).name,
+                                    'novas': 0, 'retomadas': 0, 'erros': [('(processo)', str(erro))],
+                                    'concluida': False, 'duracao_s': 0.0})
+
+    print("\n" + "="*70)
+    print(" 📋 PLANILHAS")
+    print("="*70)
+    print(f"  {'Planilha':<30} {'Novas':>6} {'Retomadas':>10} {'Tempo':>8}  Situação")
+    for resumo in sorted(resumos, key=lambda r: r['arquivo']):
+        situacao = '✅' if resumo['concluida'] else f"❌ {len(resumo['erros'])} erro(s)"
+        print(
+            f"  {resumo['arquivo'][:30]:<30} {resumo['novas']:>6} {resumo['retomadas']:>10} "
+            f"{resumo['duracao_s']:>7.1f}s  {situacao}"
+        )
+        for nome_aba, erro in resumo['erros']:
+            print(f"      {nome_aba}: {erro}")
+
+    if not all(resumo['concluida'] for resumo in resumos):
+        print("\n  ⚠️  Lote incompleto: as saídas não foram alteradas. Execute novamente para retomar.")
+        print("="*70)
+        return False
+
+    print("\n" + "="*70)
+    print(" 💾 CONSOLIDANDO SAÍDAS")
+    print("="*70)
+    with etapa('consolidar'):
+        totais = consolidar(planilhas, dir_lote, manifesto['saida'])
+    print(f"\n  📝 Total de registros: {sum(totais.values()):,}")
+    print("="*70)
+
+    if manifesto['saida']:
+        print(f"  ℹ️  Saída alternativa ({manifesto['saida']}): dicionário de códigos e validação não executados")
+        return True
+    if {'NV', 'OB'} & set(totais):
+        # NV e OB são a fonte dos códigos: atualiza o dicionário nome -> código por UF
+        reconstruir_dicionario()
+    executar_validacao()
+    return True
+
+
+if __name__ == "__main__":
+    argumentos = [valor for valor in sys.argv[1:] if not valor.startswith('--')]
+    manifesto = next((valor for valor in argumentos if not valor.isdigit()), MANIFESTO_PADRAO)
+    paralelo = next((int(valor) for valor in argumentos if valor.isdigit()), None)
+    concluido = executar_lote(manifesto, paralelo, reiniciar='--reiniciar' in sys.argv[1:])
+    sys.exit(0 if concluido else 1)
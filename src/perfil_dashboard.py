@@ -0,0 +1,176 @@
+"""
+Perfil do dashboard (app.py): tempo por seção e acertos de cache, acumulados no processo
+Desligado por padrão; liga com DASHBOARD_PERFIL=1:
+
+    with medir('filtro_anos'):              # trecho do script
+        bloco = obter_pacote(codigos, anos)
+
+    @medir('secao_cmi')                     # função (fragmento, construtor de gráfico...)
+    def secao_cmi(entradas): ...
+
+    @contar_cache('obter_lista_municipios') # função apoiada no cache do processo
+    def obter_lista_municipios(): ...
+
+Os tempos são inclusivos (secao_metricas inclui o tempo das abas e dos gráficos construídos nela).
+A memória dos indicadores em cache (antes e depois dos tipos compactos) vem de src/armazenamento.py.
+As medidas ficam disponíveis no painel de administração da sidebar (?admin=1 na URL) e em texto
+no formato do Prometheus (texto_prometheus), servido por iniciar_servidor_metricas em /metrics.
+"""
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.armazenamento import contar_faltas, memoria_indicadores
+
+PORTA_PADRAO = 9464  # DASHBOARD_PERFIL_PORTA muda a porta do endpoint /metrics
+
+_trava = threading.Lock()
+_secoes = {}  # seção -> {'chamadas', 'total_s', 'max_s', 'ultima_s'}
+_caches = {}  # função -> {'chamadas', 'faltas'}
+
+
+def perfil_ativo():
+    """Ligado com a variável de ambiente DASHBOARD_PERFIL=1"""
+    return os.environ.get('DASHBOARD_PERFIL', '0') == '1'
+
+
+def porta_metricas():
+    return int(os.environ.get('DASHBOARD_PERFIL_PORTA', PORTA_PADRAO))
+
+
+def registrar_tempo(secao, duracao):
+    """Acumula uma medida de `duracao` segundos na seção"""
+    with _trava:
+        medida = _secoes.setdefault(secao, {'chamadas': 0, 'total_s': 0.0, 'max_s': 0.0, 'ultima_s': 0.0})
+        medida['chamadas'] += 1
+        medida['total_s'] += duracao
+        medida['max_s'] = max(medida['max_s'], duracao)
+        medida['ultima_s'] = duracao
+
+
+@contextmanager
+def medir(secao, registrar=True):
+    """Mede o trecho (ou cada chamada, usado como decorador); registrar=False não mede (ex.: aba fechada)"""
+    if not registrar or not perfil_ativo():
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_tempo(secao, time.perf_counter() - inicio)
+
+
+def contar_cache(nome):
+    """
+    Decorador: conta chamadas e faltas de uma função apoiada em em_cache_do_processo
+    Falta = a chamada precisou carregar algum valor (nela ou nas threads que ela usou); senão foi um acerto
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def contada(*args, **kwargs):
+            if not perfil_ativo():
+                return funcao(*args, **kwargs)
+            with contar_faltas() as contagem_faltas:
+                resultado = funcao(*args, **kwargs)
+            falta = contagem_faltas['faltas'] > 0
+            with _trava:
+                contagem = _caches.setdefault(nome, {'chamadas': 0, 'faltas': 0})
+                contagem['chamadas'] += 1
+                contagem['faltas'] += falta
+            return resultado
+        return contada
+    return decorador
+
+
+def instantaneo():
+    """Cópia das medidas atuais: {'secoes': {...}, 'caches': {...}, 'memoria': {...}}"""
+    with _trava:
+        return {
+            'secoes': {secao: dict(medida) for secao, medida in _secoes.items()},
+            'caches': {nome: dict(contagem) for nome, contagem in _caches.items()},
+            'memoria': memoria_indicadores(),
+        }
+
+
+def zerar():
+    """Descarta todas as medidas acumuladas"""
+    with _trava:
+        _secoes.clear()
+        _caches.clear()
+
+
+def _rotulo(valor):
+    """Valor de rótulo do Prometheus (aspas, barras e quebras de linha escapadas)"""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def texto_prometheus():
+    """Medidas no formato de exposição em texto do Prometheus"""
+    medidas = instantaneo()
+    linhas = [
+        '# HELP dashboard_secao_segundos Tempo gasto em cada seção do dashboard',
+        '# TYPE dashboard_secao_segundos summary',
+    ]
+    for secao, medida in sorted(medidas['secoes'].items()):
+        linhas.append(f'dashboard_secao_segundos_sum{{secao="{_rotulo(secao)}"}} {medida["total_s"]:.6f}')
+        linhas.append(f'dashboard_secao_segundos_count{{secao="{_rotulo(secao)}"}} {medida["chamadas"]}')
+    linhas += [
+        '# HELP dashboard_secao_segundos_max Maior tempo de uma execução da seção',
+        '# TYPE dashboard_secao_segundos_max gauge',
+    ]
+    for secao, medida in sorted(medidas['secoes'].items()):
+        linhas.append(f'dashboard_secao_segundos_max{{secao="{_rotulo(secao)}"}} {medida["max_s"]:.6f}')
+    linhas += [
+        '# HELP dashboard_cache_total Chamadas das funções em cache, por resultado (acerto ou falta)',
+        '# TYPE dashboard_cache_total counter',
+    ]
+    for nome, contagem in sorted(medidas['caches'].items()):
+        acertos = contagem['chamadas'] - contagem['faltas']
+        linhas.append(f'dashboard_cache_total{{funcao="{_rotulo(nome)}",resultado="acerto"}} {acertos}')
+        linhas.append(f'dashboard_cache_total{{funcao="{_rotulo(nome)}",resultado="falta"}} {contagem["faltas"]}')
+    linhas += [
+        '# HELP dashboard_indicador_memoria_bytes Memória de cada indicador em cache, com os tipos originais e compactos',
+        '# TYPE dashboard_indicador_memoria_bytes gauge',
+    ]
+    for tipo, medida in sorted(medidas['memoria'].items()):
+        for tipos in ('original', 'compacto'):
+            linhas.append(
+                f'dashboard_indicador_memoria_bytes{{indicador="{_rotulo(tipo)}",tipos="{tipos}"}} {medida[f"{tipos}_bytes"]}'
+            )
+    return '\n'.join(linhas) + '\n'
+
+
+class _ManipuladorMetricas(BaseHTTPRequestHandler):
+    """GET /metrics -> texto_prometheus(); qualquer outra rota -> 404"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        corpo = texto_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass  # Sem uma linha no terminal a cada coleta
+
+
+def iniciar_servidor_metricas(porta=None, host='127.0.0.1'):
+    """Sobe o endpoint /metrics em uma thread daemon; retorna o servidor ou None se a porta estiver ocupada"""
+    porta = porta_metricas() if porta is None else porta
+    try:
+        servidor = ThreadingHTTPServer((host, porta), _ManipuladorMetricas)
+    except OSError as erro:
+        print(f"  ⚠️ Endpoint de métricas não iniciado na porta {porta}: {erro}")
+        return None
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas_dashboard", daemon=True).start()
+    print(f"  📈 Métricas do dashboard em http://{host}:{servidor.server_address[1]}/metrics")
+    return servidor
@@ -1,14 +1,26 @@
 """
 Script para extrair dados de Nascidos Vivos e Óbitos da planilha CMI-Mil.ods
+Abas anuais viram JSONs por UF; abas exportadas por mês (colunas "2020/Jan", ...) vão para o
+armazenamento colunar mensal (src/series_mensais.py), de onde a série anual é somada na leitura
 """
 import pandas as pd
 import json
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.codigos_municipios import codigos_para_json, extrair_codigo_municipio, resolver_codigos
+from src.instrumentacao import etapa, medir_etapa, registrar_execucao
+from src.leitor_ods import ler_abas
+from src.series_mensais import interpretar_periodo, salvar_indicador_mensal
+from src.validacao import executar_validacao
+
 ARQUIVO_CMI_MIL = BASE_DIR / 'data' / 'input' / 'CMI-Mil.ods'
 OUTPUT_DIR_NV = BASE_DIR / 'data' / 'output' / 'nascidos_vivos'
 OUTPUT_DIR_OB = BASE_DIR / 'data' / 'output' / 'obitos'
+OUTPUT_DIR_MENSAL = BASE_DIR / 'data' / 'output' / 'mensal'  # NV.npz e OB.npz (src/series_mensais.py)
 
 UFS_BRASIL = [
     'AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 
@@ -26,41 +38,47 @@ def limpar_nome_municipio(nome):
     nome = re.sub(r'\s+', ' ', nome)
     return nome.strip()
 
-def extrair_colunas_anos(df):
-    """Extrai as colunas que representam anos (números de 1990 a 2030)"""
-    colunas_anos = []
+@medir_etapa('extrair_colunas_anos')
+def extrair_colunas_periodos(df):
+    """
+    Colunas que representam períodos: {coluna: (ano, mês)}, anos de 1990 a 2030
+    Mês é None nas abas anuais; numa aba mensal, colunas só de ano (totais anuais) são descartadas
+    """
+    periodos = {}
     for col in df.columns:
         col_str = str(col).strip().upper()
         
-        # Ignorar colunas que não são anos
+        # Ignorar colunas que não são períodos
         if any(x in col_str for x in ['MUNIC', 'TOTAL', '#MUN', 'INIC', 'FIM', 'UNNAMED']):
             continue
-            
-        if isinstance(col, (int, float)):
-            if 1990 <= col <= 2030:
-                colunas_anos.append(col)
-        else:
-            try:
-                ano = float(col)
-                if 1990 <= ano <= 2030:
-                    colunas_anos.append(col)
-            except (ValueError, TypeError):
-                pass
+        
+        periodo = interpretar_periodo(col)
+        if periodo is not None:
+            periodos[col] = periodo
     
-    return sorted(colunas_anos)
+    if any(mes is not None for _, mes in periodos.values()):
+        periodos = {col: periodo for col, periodo in periodos.items() if periodo[1] is not None}
+    return dict(sorted(periodos.items(), key=lambda item: (item[1][0], item[1][1] or 0)))
+
+@medir_etapa('encontrar_linha_cabecalho')
+def encontrar_linha_cabecalho(df_aba):
+    """Primeira linha que contém 'Município' (cabeçalho da aba); None se não houver"""
+    for i, row in df_aba.iterrows():
+        linha_texto = row.astype(str).tolist()
+        if any('munic' in str(cell).lower() for cell in linha_texto):
+            return i
+    return None
 
-def processar_aba_nv_ob(df_aba, nome_aba, uf, tipo):
-    """Processa uma aba de nascidos vivos ou óbitos"""
+@medir_etapa('processar_aba')
+def processar_aba_nv_ob(df_aba, nome_aba, uf, tipo, levantar_erros=False):
+    """
+    Processa uma aba de nascidos vivos ou óbitos
+    Retorna None se a aba não tem a estrutura esperada ou, com levantar_erros=False, se o processamento falha
+    """
     print(f"  Processando: {nome_aba} (UF: {uf}, Tipo: {tipo})")
     
     try:
-        # Encontrar cabeçalho
-        linha_cabecalho = None
-        for i, row in df_aba.iterrows():
-            linha_texto = row.astype(str).tolist()
-            if any('munic' in str(cell).lower() for cell in linha_texto):
-                linha_cabecalho = i
-                break
+        linha_cabecalho = encontrar_linha_cabecalho(df_aba)
         
         if linha_cabecalho is None:
             print(f"    ⏭️  Cabeçalho não encontrado")
@@ -75,19 +93,21 @@ def processar_aba_nv_ob(df_aba, nome_aba, uf, tipo):
         col_municipio = df.columns[0]
         df = df.rename(columns={col_municipio: 'Municipio'})
         
-        # Extrair colunas de anos
-        colunas_anos = extrair_colunas_anos(df)
-        if not colunas_anos:
+        # Extrair colunas de anos (ou de ano/mês, nas abas mensais)
+        periodos = extrair_colunas_periodos(df)
+        if not periodos:
             print(f"    ⏭️  Nenhuma coluna de ano encontrada")
             return None
+        mensal = next(iter(periodos.values()))[1] is not None
         
         # Selecionar colunas
-        colunas_existentes = ['Municipio'] + [col for col in colunas_anos if col in df.columns]
+        colunas_existentes = ['Municipio'] + list(periodos)
         df = df[colunas_existentes]
         
         # Limpar dados
         df = df[df['Municipio'].notna()]
         df = df[df['Municipio'].astype(str).str.strip() != '']
+        df['Codigo_Municipio'] = df['Municipio'].apply(extrair_codigo_municipio)
         df['Municipio'] = df['Municipio'].apply(limpar_nome_municipio)
         
         # Remover linhas que não são municípios
@@ -96,30 +116,42 @@ def processar_aba_nv_ob(df_aba, nome_aba, uf, tipo):
             df = df[~df['Municipio'].str.upper().str.contains(texto, na=False, regex=False)]
         
         # Converter para formato longo
-        df_melted = df.melt(
-            id_vars=['Municipio'], 
-            var_name='Ano', 
-            value_name='Valor'
-        )
+        with etapa('melt', linhas_entrada=len(df)) as medida:
+            df_melted = df.melt(
+                id_vars=['Municipio', 'Codigo_Municipio'], 
+                var_name='Periodo', 
+                value_name='Valor'
+            )
+            medida['linhas_saida'] = len(df_melted)
         
         # Limpeza dos dados
         df_melted['Valor'] = pd.to_numeric(df_melted['Valor'], errors='coerce').fillna(0).astype(int)
-        df_melted['Ano'] = pd.to_numeric(df_melted['Ano'], errors='coerce').astype(int)
+        df_melted.insert(2, 'Ano', df_melted['Periodo'].map({col: ano for col, (ano, _) in periodos.items()}))
+        if mensal:
+            df_melted.insert(3, 'Mes', df_melted['Periodo'].map({col: mes for col, (_, mes) in periodos.items()}))
+        df_melted = df_melted.drop(columns='Periodo')
         df_melted['UF'] = uf
         df_melted['Tipo'] = tipo
         
         # Remover linhas inválidas
         df_melted = df_melted[df_melted['Municipio'].notna()]
         df_melted = df_melted[df_melted['Ano'] >= 1990]
+        df_melted = resolver_codigos(df_melted)
         
-        print(f"    ✓ Processado: {len(df_melted)} registros | {len(df['Municipio'].unique())} municípios")
+        print(
+            f"    ✓ Processado: {len(df_melted)} registros | {len(df['Municipio'].unique())} municípios"
+            + (" | mensal" if mensal else "")
+        )
         
         return df_melted
         
     except Exception as e:
+        if levantar_erros:
+            raise
         print(f"    ❌ Erro: {str(e)}")
         return None
 
+@registrar_execucao('processar_nv_ob')
 def processar_nv_ob():
     """Processa todas as abas de nascidos vivos e óbitos"""
     print("="*80)
@@ -131,7 +163,8 @@ def processar_nv_ob():
     OUTPUT_DIR_OB.mkdir(parents=True, exist_ok=True)
     
     # Ler planilha
-    xls = pd.read_excel(ARQUIVO_CMI_MIL, sheet_name=None, engine='odf')
+    with etapa('leitura'):
+        xls = ler_abas(ARQUIVO_CMI_MIL)
     
     dados_nv = {}
     dados_ob = {}
@@ -174,25 +207,47 @@ def processar_nv_ob():
     print("="*80)
     
     for uf, df in dados_nv.items():
+        if 'Mes' in df.columns:
+            continue
         arquivo = OUTPUT_DIR_NV / f"{uf}.json"
-        dados = df.to_dict(orient='records')
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
+        with etapa('salvar_json', uf=uf, linhas_entrada=len(df)):
+            dados = codigos_para_json(df).to_dict(orient='records')
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False, indent=2)
         print(f"  ✓ Nascidos Vivos: {uf}.json ({len(dados)} registros)")
     
     for uf, df in dados_ob.items():
+        if 'Mes' in df.columns:
+            continue
         arquivo = OUTPUT_DIR_OB / f"{uf}.json"
-        dados = df.to_dict(orient='records')
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
+        with etapa('salvar_json', uf=uf, linhas_entrada=len(df)):
+            dados = codigos_para_json(df).to_dict(orient='records')
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False, indent=2)
         print(f"  ✓ Óbitos: {uf}.json ({len(dados)} registros)")
     
+    # Abas mensais: um arquivo colunar por indicador com todas as UFs (substitui o da execução anterior)
+    for indicador, dados_uf in (('NV', dados_nv), ('OB', dados_ob)):
+        mensais = {uf: df for uf, df in dados_uf.items() if 'Mes' in df.columns}
+        arquivo = OUTPUT_DIR_MENSAL / f"{indicador}.npz"
+        if mensais:
+            df_mensal = pd.concat(mensais.values(), ignore_index=True)
+            with etapa('salvar_mensal', linhas_entrada=len(df_mensal)):
+                total = salvar_indicador_mensal(df_mensal, indicador, arquivo)
+            print(f"  ✓ {indicador} mensal: {arquivo.name} ({total} registros, {len(mensais)} UFs)")
+        elif arquivo.exists():
+            arquivo.unlink()
+            print(f"  🗑️  {indicador} mensal: {arquivo.name} removido (nenhuma aba mensal nesta planilha)")
+    
     print("\n" + "="*80)
     print("✅ PROCESSAMENTO CONCLUÍDO")
     print("="*80)
     print(f"  Nascidos Vivos: {len(dados_nv)} estados")
     print(f"  Óbitos: {len(dados_ob)} estados")
     print("="*80)
+    
+    # Etapa de validação: bloqueia registros inconsistentes antes do dashboard
+    executar_validacao()
 
 if __name__ == "__main__":
     processar_nv_ob()
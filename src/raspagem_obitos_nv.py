@@ -4,9 +4,19 @@ Padrão das abas: SIGLA_UF + NV ou SIGLA_UF + OB (ex: TO NV, TO OB, SP NV, SP OB
 """
 import pandas as pd
 import json
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.codigos_municipios import (
+    codigos_para_json, extrair_codigo_municipio, reconstruir_dicionario, resolver_codigos
+)
+from src.instrumentacao import etapa, medir_etapa, registrar_execucao
+from src.leitor_ods import ler_abas
+from src.validacao import executar_validacao
+
 ARQUIVO_CMI_MIL = BASE_DIR / 'data' / 'input' / 'CMI-Mil.ods'
 OUTPUT_DIR_NV = BASE_DIR / 'data' / 'output' / 'nascidos_vivos'
 OUTPUT_DIR_OB = BASE_DIR / 'data' / 'output' / 'obitos'
@@ -27,26 +37,22 @@ def limpar_nome_municipio(nome):
     nome = re.sub(r'\s+', ' ', nome)
     return nome.strip()
 
-def extrair_codigo_municipio(nome_original):
-    """Extrai o código do município (6 dígitos no início)"""
-    import re
-    if not isinstance(nome_original, str):
-        return None
-    match = re.match(r'^(\d{6})', nome_original.strip())
-    return match.group(1) if match else None
+@medir_etapa('encontrar_linha_cabecalho')
+def encontrar_linha_cabecalho(df_aba):
+    """Primeira linha que contém 'Município' (cabeçalho da aba); None se não houver"""
+    for i, row in df_aba.iterrows():
+        linha_texto = row.astype(str).tolist()
+        if any('munic' in str(cell).lower() for cell in linha_texto):
+            return i
+    return None
 
+@medir_etapa('processar_aba')
 def processar_aba(df_aba, nome_aba, uf, tipo):
     """Processa uma aba de nascidos vivos ou óbitos"""
     print(f"  📋 {nome_aba} ({tipo})")
     
     try:
-        # Encontrar linha do cabeçalho (linha que contém 'Município')
-        linha_cabecalho = None
-        for i, row in df_aba.iterrows():
-            linha_texto = row.astype(str).tolist()
-            if any('munic' in str(cell).lower() for cell in linha_texto):
-                linha_cabecalho = i
-                break
+        linha_cabecalho = encontrar_linha_cabecalho(df_aba)
         
         if linha_cabecalho is None:
             print(f"    ⏭️  Cabeçalho não encontrado")
@@ -101,12 +107,14 @@ def processar_aba(df_aba, nome_aba, uf, tipo):
         df = df[df['Codigo_Municipio'].notna()]
         
         # Converter para formato longo
-        df_melted = df.melt(
-            id_vars=['Municipio', 'Codigo_Municipio'], 
-            value_vars=colunas_anos,
-            var_name='Ano', 
-            value_name='Valor'
-        )
+        with etapa('melt', linhas_entrada=len(df)) as medida:
+            df_melted = df.melt(
+                id_vars=['Municipio', 'Codigo_Municipio'], 
+                value_vars=colunas_anos,
+                var_name='Ano', 
+                value_name='Valor'
+            )
+            medida['linhas_saida'] = len(df_melted)
         
         # Limpeza e conversão
         df_melted['Valor'] = pd.to_numeric(df_melted['Valor'], errors='coerce').fillna(0).astype(int)
@@ -117,6 +125,9 @@ def processar_aba(df_aba, nome_aba, uf, tipo):
         # Remover linhas inválidas
         df_melted = df_melted[df_melted['Ano'] >= 1990]
         
+        # Código IBGE como int32 (6 dígitos) e UF conferida pelo prefixo do código
+        df_melted = resolver_codigos(df_melted, {})
+        
         print(f"    ✅ {len(df_melted)} registros | {len(df['Municipio'].unique())} municípios | {len(colunas_anos)} anos")
         
         return df_melted
@@ -125,6 +136,7 @@ def processar_aba(df_aba, nome_aba, uf, tipo):
         print(f"    ❌ Erro: {str(e)}")
         return None
 
+@registrar_execucao('raspagem_obitos_nv')
 def processar_todas_abas():
     """Processa todas as abas de NV e OB"""
     print("="*80)
@@ -137,7 +149,8 @@ def processar_todas_abas():
     
     # Ler todas as abas da planilha
     print("\n📂 Carregando planilha CMI-Mil.ods...")
-    xls = pd.read_excel(ARQUIVO_CMI_MIL, sheet_name=None, engine='odf')
+    with etapa('leitura'):
+        xls = ler_abas(ARQUIVO_CMI_MIL)
     print(f"   ✓ {len(xls)} abas encontradas")
     
     dados_nv = {}
@@ -184,9 +197,10 @@ def processar_todas_abas():
     for uf in sorted(dados_nv.keys()):
         df = dados_nv[uf]
         arquivo = OUTPUT_DIR_NV / f"{uf}.json"
-        dados = df.to_dict(orient='records')
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
+        with etapa('salvar_json', uf=uf, linhas_entrada=len(df)):
+            dados = codigos_para_json(df).to_dict(orient='records')
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False, indent=2)
         total_registros_nv += len(dados)
         print(f"  ✓ {uf}.json - {len(dados):,} registros")
     
@@ -194,9 +208,10 @@ def processar_todas_abas():
     for uf in sorted(dados_ob.keys()):
         df = dados_ob[uf]
         arquivo = OUTPUT_DIR_OB / f"{uf}.json"
-        dados = df.to_dict(orient='records')
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
+        with etapa('salvar_json', uf=uf, linhas_entrada=len(df)):
+            dados = codigos_para_json(df).to_dict(orient='records')
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False, indent=2)
         total_registros_ob += len(dados)
         print(f"  ✓ {uf}.json - {len(dados):,} registros")
     
@@ -207,6 +222,12 @@ def processar_todas_abas():
     print(f"  💀 Óbitos: {len(dados_ob)} estados | {total_registros_ob:,} registros")
     print(f"  📁 Salvos em: {OUTPUT_DIR_NV.parent}")
     print("="*80)
+    
+    # NV e OB são a fonte dos códigos: atualiza o dicionário nome -> código por UF
+    reconstruir_dicionario()
+    
+    # Etapa de validação: bloqueia registros inconsistentes antes do dashboard
+    executar_validacao()
 
 if __name__ == "__main__":
     processar_todas_abas()
@@ -0,0 +1,129 @@
+"""
+Municípios com trajetórias semelhantes ("municípios parecidos com este")
+O índice guarda as séries de CMI e CMI-Mil de todos os municípios em uma matriz
+(indicador × município × ano); cada consulta compara o município de referência com todos os
+outros de uma vez, em operações vetorizadas sobre a matriz, e devolve os K mais próximos:
+- euclidiana: distância média (RMS) entre as séries, com cada indicador dividido pelo seu desvio padrão
+  no período (nível e forma da trajetória)
+- correlacao: 1 - correlação de Pearson entre as séries (só a forma: tendência e oscilações)
+
+Só entram os anos em que os dois municípios têm dado, e um indicador só conta com pelo menos
+MIN_ANOS_COMUNS anos em comum. Com os dois indicadores válidos, a distância combina os dois.
+"""
+import numpy as np
+import pandas as pd
+
+INDICADORES_SEMELHANCA = ('CMI', 'CMI_MIL')
+METRICAS = {
+    'euclidiana': 'Euclidiana (nível e forma)',
+    'correlacao': 'Correlação (forma)',
+}
+MIN_ANOS_COMUNS = 5
+TOLERANCIA_VARIANCIA = 1e-12  # Variância abaixo disso: série constante (sem correlação definida)
+K_PADRAO = 5
+
+
+def construir_indice(bloco):
+    """
+    Índice de semelhança a partir de um bloco de obter_series (src/armazenamento.py) com todos os municípios
+    Retorna um dicionário com os códigos (ordenados), indicadores, anos, valores e anos presentes
+    """
+    ordem = np.argsort(bloco['codigos'], kind='stable')
+    valores = bloco['valores'][:, ordem, :]
+    return {
+        'codigos': bloco['codigos'][ordem],
+        'indicadores': list(bloco['indicadores']),
+        'anos': bloco['anos'],
+        'valores': valores,
+        'presentes': ~np.isnan(valores),
+    }
+
+
+def _posicao(indice, codigo):
+    """Posição do município no índice ou None se ele não está lá"""
+    posicao = int(np.searchsorted(indice['codigos'], codigo))
+    if posicao < len(indice['codigos']) and indice['codigos'][posicao] == codigo:
+        return posicao
+    return None
+
+
+def _quadrados_euclidianos(valores, presentes, referencia, comuns):
+    """Soma dos quadrados das diferenças nos anos em comum, por indicador e município, em desvios padrão"""
+    # Desvio de cada indicador só sobre os valores presentes (1 se não há nenhum ou a série é constante)
+    desvios = np.array([
+        valores[i][presentes[i]].std() if presentes[i].any() else 1.0 for i in range(len(valores))
+    ])
+    desvios[~(desvios > 0)] = 1.0
+    diferencas = np.where(comuns, (valores - referencia[:, None, :]) / desvios[:, None, None], 0.0)
+    return (diferencas ** 2).sum(axis=2)
+
+
+def _distancias_correlacao(valores, referencia, comuns, anos_comuns):
+    """1 - correlação de Pearson por indicador e município (NaN se uma das séries é constante nos anos em comum)"""
+    referencias = np.broadcast_to(referencia[:, None, :], valores.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_x = np.where(comuns, valores, 0.0).sum(axis=2) / anos_comuns
+        media_y = np.where(comuns, referencias, 0.0).sum(axis=2) / anos_comuns
+        x = np.where(comuns, valores - media_x[:, :, None], 0.0)
+        y = np.where(comuns, referencias - media_y[:, :, None], 0.0)
+        soma_xx, soma_yy = (x * x).sum(axis=2), (y * y).sum(axis=2)
+        variavel = (soma_xx > TOLERANCIA_VARIANCIA * anos_comuns) & (soma_yy > TOLERANCIA_VARIANCIA * anos_comuns)
+        correlacao = np.where(variavel, (x * y).sum(axis=2) / np.sqrt(soma_xx * soma_yy), np.nan)
+    return 1.0 - np.clip(correlacao, -1.0, 1.0)
+
+
+def municipios_semelhantes(indice, codigo, k=K_PADRAO, metrica='euclidiana', anos=None):
+    """
+    Os k municípios mais próximos de `codigo` no período `anos` (inicio, fim) ou em todos os anos
+    Retorna DataFrame (Codigo_Municipio, Distancia, Anos_Comuns) do mais próximo ao mais distante;
+    vazio se o município não está no índice, se o período tem menos de MIN_ANOS_COMUNS anos
+    ou se não há outro comparável
+    """
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconhecida: {metrica!r} (use {', '.join(METRICAS)})")
+    vazio = pd.DataFrame({
+        'Codigo_Municipio': pd.Series(dtype=np.int32),
+        'Distancia': pd.Series(dtype=np.float64),
+        'Anos_Comuns': pd.Series(dtype=np.int64),
+    })
+    posicao = _posicao(indice, codigo)
+    if posicao is None or k <= 0:
+        return vazio
+
+    periodo = slice(None)
+    if anos is not None:
+        periodo = (indice['anos'] >= anos[0]) & (indice['anos'] <= anos[1])
+    valores = indice['valores'][:, :, periodo]
+    presentes = indice['presentes'][:, :, periodo]
+    if valores.shape[2] < MIN_ANOS_COMUNS:
+        return vazio
+
+    referencia = valores[:, posicao, :]
+    comuns = presentes & presentes[:, posicao, :][:, None, :]
+    anos_comuns = comuns.sum(axis=2)  # indicador × município
+    validos = anos_comuns >= MIN_ANOS_COMUNS
+
+    if metrica == 'euclidiana':
+        quadrados = _quadrados_euclidianos(valores, presentes, referencia, comuns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distancias = np.sqrt(
+                np.where(validos, quadrados, 0.0).sum(axis=0) / np.where(validos, anos_comuns, 0).sum(axis=0)
+            )
+    else:
+        por_indicador = _distancias_correlacao(valores, referencia, comuns, anos_comuns)
+        validos &= ~np.isnan(por_indicador)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distancias = np.where(validos, por_indicador, 0.0).sum(axis=0) / validos.sum(axis=0)
+
+    distancias[posicao] = np.nan
+    candidatos = np.flatnonzero(~np.isnan(distancias))
+    if not len(candidatos):
+        return vazio
+    # Ordem total (distância, código) antes do corte: empates no k-ésimo lugar ficam com os menores códigos
+    candidatos = candidatos[np.lexsort((indice['codigos'][candidatos], distancias[candidatos]))][:k]
+
+    return pd.DataFrame({
+        'Codigo_Municipio': indice['codigos'][candidatos].astype(np.int32),
+        'Distancia': distancias[candidatos],
+        'Anos_Comuns': np.where(validos[:, candidatos], anos_comuns[:, candidatos], 0).max(axis=0),
+    })
@@ -0,0 +1,183 @@
+"""
+Séries mensais de Nascidos Vivos e Óbitos (abas exportadas por mês do SINASC/SIM)
+Com 12× o volume das séries anuais, ficam em um armazenamento colunar (.npz) em vez de registros JSON:
+
+    data/output/mensal/NV.npz, data/output/mensal/OB.npz
+      codigos   int32  código IBGE de cada registro      } ordenados por (código, período)
+      periodos  int16  ano * 12 + (mês - 1)              }
+      valores   int32  contagem do mês                   }
+      municipios int32, inicios int64, nomes, ufs   índice: registros do município i em inicios[i]:inicios[i + 1]
+
+O período em int16 cobre até o ano 2730. A série anual (soma dos meses) é calculada na leitura
+(agregar_anual); src/armazenamento.py a usa no lugar dos JSONs das UFs presentes no arquivo mensal.
+"""
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+DIR_MENSAL = BASE_DIR / 'data' / 'output' / 'mensal'
+
+# Indicadores com série mensal: sigla do armazenamento -> Tipo gravado nos registros
+TIPOS_MENSAIS = {'NV': 'Nascidos_Vivos', 'OB': 'Obitos'}
+
+MESES = ['JAN', 'FEV', 'MAR', 'ABR', 'MAI', 'JUN', 'JUL', 'AGO', 'SET', 'OUT', 'NOV', 'DEZ']
+NUMERO_DO_MES = {abreviacao: numero for numero, abreviacao in enumerate(MESES, start=1)}
+NUMERO_DO_MES.update({'FEB': 2, 'APR': 4, 'MAY': 5, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'DEC': 12})
+
+ANO_MINIMO, ANO_MAXIMO = 1990, 2030
+
+_ANO = re.compile(r'^\d{4}(\.0+)?$')
+# Cabeçalhos mensais do TabNet e variações: "2020/Jan", "Jan/2020", "2020-01", "01/2020"
+_ANO_MES = re.compile(r'^(\d{4})\s*[/\-. ]\s*([A-Za-zÇç]{3,}|\d{1,2})$')
+_MES_ANO = re.compile(r'^([A-Za-zÇç]{3,}|\d{1,2})\s*[/\-. ]\s*(\d{4})$')
+
+
+def codificar_periodo(anos, meses):
+    """(ano, mês) -> período int16 (ano * 12 + mês - 1); aceita escalares ou arrays"""
+    return (np.asarray(anos, dtype=np.int32) * 12 + np.asarray(meses, dtype=np.int32) - 1).astype(np.int16)
+
+
+def decodificar_periodo(periodos):
+    """Período int16 -> (anos, meses)"""
+    periodos = np.asarray(periodos, dtype=np.int32)
+    return periodos // 12, periodos % 12 + 1
+
+
+def _numero_do_mes(texto):
+    texto = str(texto).strip().upper()
+    if texto.isdigit():
+        return int(texto) if 1 <= int(texto) <= 12 else None
+    return NUMERO_DO_MES.get(texto[:3])
+
+
+def interpretar_periodo(coluna):
+    """
+    Cabeçalho de coluna -> (ano, mês), com mês None para colunas anuais; None se não for período
+    Aceita anos (2020, 2020.0, "2020"), datas (células de data do ODS) e "2020/Jan", "Jan/2020", "2020-01"
+    """
+    if isinstance(coluna, (datetime, date)):
+        ano, mes = coluna.year, coluna.month
+    elif isinstance(coluna, (int, float, np.integer, np.floating)) and not isinstance(coluna, bool):
+        if not float(coluna).is_integer():
+            return None  # NaN (coluna sem cabeçalho) ou fração
+        ano, mes = int(coluna), None
+    else:
+        texto = str(coluna).strip()
+        if _ANO.match(texto):
+            ano, mes = int(float(texto)), None
+        else:
+            if (encontrado := _ANO_MES.match(texto)):
+                ano, mes = int(encontrado.group(1)), _numero_do_mes(encontrado.group(2))
+            elif (encontrado := _MES_ANO.match(texto)):
+                ano, mes = int(encontrado.group(2)), _numero_do_mes(encontrado.group(1))
+            else:
+                return None
+            if mes is None:
+                return None  # Ex.: "2020/Total"
+
+    if not ANO_MINIMO <= ano <= ANO_MAXIMO:
+        return None
+    return int(ano), mes
+
+
+def arquivo_mensal(indicador):
+    """Arquivo colunar de um indicador (NV ou OB)"""
+    return DIR_MENSAL / f'{indicador}.npz'
+
+
+def salvar_indicador_mensal(df, indicador, arquivo=None):
+    """
+    Grava o armazenamento colunar a partir de um DataFrame longo
+    (Municipio, Codigo_Municipio, Ano, Mes, Valor, UF); registros sem código são descartados
+    Retorna a quantidade de registros gravados
+    """
+    arquivo = Path(arquivo or arquivo_mensal(indicador))
+    df = df[df['Codigo_Municipio'].notna()]
+    codigos = df['Codigo_Municipio'].to_numpy(dtype=np.int32)
+    periodos = codificar_periodo(df['Ano'].to_numpy(), df['Mes'].to_numpy())
+    ordem = np.lexsort((periodos, codigos))
+    codigos, periodos = codigos[ordem], periodos[ordem]
+    valores = df['Valor'].to_numpy(dtype=np.int32)[ordem]
+
+    municipios, inicios = np.unique(codigos, return_index=True)
+    primeiros = ordem[inicios]
+    nomes = df['Municipio'].astype(str).to_numpy()[primeiros]
+    ufs = df['UF'].astype(str).to_numpy()[primeiros]
+
+    # Grava em um temporário e troca: leitores nunca veem um arquivo pela metade
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    temporario = arquivo.with_name(arquivo.stem + '.tmp.npz')
+    np.savez(
+        temporario, codigos=codigos, periodos=periodos, valores=valores, municipios=municipios,
+        inicios=np.append(inicios, len(codigos)).astype(np.int64), nomes=nomes.astype(str), ufs=ufs.astype(str)
+    )
+    os.replace(temporario, arquivo)
+    return len(codigos)
+
+
+def carregar_indicador_mensal(indicador, arquivo=None):
+    """Arrays do armazenamento colunar ({nome: array}) ou None se o indicador não tem série mensal"""
+    arquivo = Path(arquivo or arquivo_mensal(indicador))
+    if not arquivo.exists():
+        return None
+    with np.load(arquivo, allow_pickle=False) as npz:
+        return {nome: npz[nome] for nome in npz.files}
+
+
+def ufs_mensais(armazem):
+    """UFs presentes no armazenamento (os JSONs anuais dessas UFs deixam de ser lidos)"""
+    return set(np.unique(armazem['ufs']).tolist()) if armazem is not None else set()
+
+
+def agregar_anual(armazem, indicador):
+    """
+    Série anual (soma dos meses) no formato de carregar_indicador:
+    Municipio, Codigo_Municipio (Int32), Ano, Valor, UF, Tipo
+    """
+    codigos, valores = armazem['codigos'], armazem['valores']
+    if len(codigos) == 0:
+        return pd.DataFrame()
+    anos = armazem['periodos'].astype(np.int32) // 12
+
+    # Ordenado por (código, período): cada (código, ano) é um trecho contíguo
+    novo_grupo = np.ones(len(codigos), dtype=bool)
+    novo_grupo[1:] = (codigos[1:] != codigos[:-1]) | (anos[1:] != anos[:-1])
+    inicios = np.flatnonzero(novo_grupo)
+    codigos_anuais = codigos[inicios]
+    posicao = np.searchsorted(armazem['municipios'], codigos_anuais)
+
+    return pd.DataFrame({
+        'Municipio': armazem['nomes'][posicao].astype(object),
+        'Codigo_Municipio': pd.array(codigos_anuais, dtype='Int32'),
+        'Ano': anos[inicios].astype(np.int64),
+        'Valor': np.add.reduceat(valores.astype(np.int64), inicios),
+        'UF': armazem['ufs'][posicao].astype(object),
+        'Tipo': TIPOS_MENSAIS.get(indicador, indicador),
+    })
+
+
+def serie_mensal(armazem, codigo, anos=None):
+    """DataFrame (Data, Ano, Mes, Valor) de um município, opcionalmente no período (inicio, fim) de anos"""
+    posicao = np.searchsorted(armazem['municipios'], codigo)
+    if posicao >= len(armazem['municipios']) or armazem['municipios'][posicao] != codigo:
+        return pd.DataFrame(columns=['Data', 'Ano', 'Mes', 'Valor'])
+
+    trecho = slice(armazem['inicios'][posicao], armazem['inicios'][posicao + 1])
+    periodos = armazem['periodos'][trecho]
+    valores = armazem['valores'][trecho]
+    if anos is not None:
+        dentro = (periodos >= codificar_periodo(anos[0], 1)) & (periodos <= codificar_periodo(anos[1], 12))
+        periodos, valores = periodos[dentro], valores[dentro]
+
+    anos_serie, meses = decodificar_periodo(periodos)
+    return pd.DataFrame({
+        'Data': pd.to_datetime({'year': anos_serie, 'month': meses, 'day': 1}),
+        'Ano': anos_serie,
+        'Mes': meses,
+        'Valor': valores.astype(np.int64),
+    })
@@ -0,0 +1,281 @@
+"""
+Etapa de validação dos dados processados (qualidade dos JSONs de saída)
+Substitui as verificações avulsas de temporaria/ (duplicatas, Abreulandia, CMI vs CMI-Mil)
+
+As regras são declarativas (lista REGRAS) e vetorizadas: todos os indicadores são
+carregados uma única vez em formato longo e pivotados para o formato largo
+(Codigo_Municipio, Ano) x (CMI, CMI_MIL, NV, OB). Cada regra devolve as linhas que a violam.
+
+Regras com severidade 'erro' reprovam a validação e seus registros são bloqueados:
+o dashboard descarta as chaves listadas em 'bloqueios' no relatório.
+
+Uso: python src/validacao.py  (código de saída 1 se a validação for reprovada)
+"""
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Permite executar como script (python src/validacao.py) e importar como src.validacao
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.armazenamento import DIR_OUTPUT, DIRETORIOS_INDICADORES, carregar_todos_indicadores
+
+# Garante encoding UTF-8 no terminal Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+ARQUIVO_RELATORIO = DIR_OUTPUT / 'validacao.json'
+
+CHAVE_SERIE = ['Codigo_Municipio']
+CHAVE = CHAVE_SERIE + ['Ano']
+
+TOLERANCIA_CMI = 0.5  # Diferença aceitável entre CMI e (OB / NV) × 1000
+TOLERANCIA_CMI_MIL = 0.05  # CMI e CMI-Mil arredondados para 1 casa são considerados iguais
+LIMITE_NV_JANELA_CURTA = 1000  # Acima disso (NV/ano) a janela do CMI-Mil tem menos de 1 ano
+MAX_EXEMPLOS = 10
+
+
+def _codigo_nao_resolvido(bruta):
+    """Registros cujo código IBGE não foi resolvido (ficam fora do dashboard)"""
+    sem_codigo = bruta[bruta['Codigo_Municipio'].isna()]
+    return sem_codigo.drop_duplicates(['Indicador', 'UF', 'Municipio'])[['Indicador', 'UF', 'Municipio']]
+
+
+def _chave_duplicada(longo):
+    """Mais de um registro para a mesma chave (indicador, código, ano)"""
+    colunas = ['Indicador'] + CHAVE
+    duplicados = longo[longo.duplicated(colunas, keep=False)]
+    return duplicados[colunas + ['UF', 'Municipio', 'Valor']]
+
+
+def _obitos_maior_que_nascidos(largo):
+    """Óbitos infantis maiores que o número de nascidos vivos no mesmo ano"""
+    return largo[largo['OB'] > largo['NV']][CHAVE + ['UF', 'Municipio', 'NV', 'OB']]
+
+
+def _cmi_inconsistente(largo):
+    """
+    CMI diferente de (OB / NV) × 1000 além da tolerância
+    Com NV = 0 o CMI calculado não existe (fica NaN no relatório): só um CMI diferente de zero é violação
+    """
+    com_dados = largo['CMI'].notna() & largo['NV'].notna() & largo['OB'].notna()
+    nv = largo['NV'].where(largo['NV'] > 0)
+    cmi_calculado = largo['OB'] / nv * 1000
+    divergente = (largo['CMI'] - cmi_calculado).abs() > TOLERANCIA_CMI
+    sem_nascidos = (largo['NV'] == 0) & (largo['CMI'].abs() > TOLERANCIA_CMI)
+    violacoes = largo[com_dados & (divergente | sem_nascidos)][CHAVE + ['UF', 'Municipio', 'CMI', 'NV', 'OB']]
+    return violacoes.assign(CMI_calculado=cmi_calculado[violacoes.index].round(2))
+
+
+def _anos_faltantes(longo):
+    """Séries com anos ausentes dentro do intervalo coberto pela UF no indicador"""
+    series = (
+        longo.groupby(['Indicador', 'UF'] + CHAVE_SERIE)['Ano'].nunique()
+        .rename('anos_presentes').reset_index()
+    )
+    intervalo = longo.groupby(['Indicador', 'UF'])['Ano'].agg(['min', 'max'])
+    esperado = (intervalo['max'] - intervalo['min'] + 1).rename('anos_esperados')
+    series = series.merge(esperado.reset_index(), on=['Indicador', 'UF'])
+    return series[series['anos_presentes'] < series['anos_esperados']]
+
+
+def _cmi_igual_cmi_mil(largo):
+    """
+    CMI idêntico ao CMI-Mil em todos os anos de um município pequeno
+    Em municípios com menos de 1000 NV/ano a janela do CMI-Mil cobre vários anos,
+    então a igualdade total indica coluna copiada de uma planilha para a outra
+    """
+    pares = largo[largo['CMI'].notna() & largo['CMI_MIL'].notna()]
+    pares = pares.assign(
+        igual=(pares['CMI'] - pares['CMI_MIL']).abs() <= TOLERANCIA_CMI_MIL,
+        nao_zero=pares['CMI'] != 0,
+    )
+    series = pares.groupby(CHAVE_SERIE).agg(
+        UF=('UF', 'first'),
+        Municipio=('Municipio', 'first'),
+        igual=('igual', 'all'),
+        nao_zero=('nao_zero', 'any'),
+        media_nv=('NV', 'mean'),
+        anos=('Ano', 'size'),
+    )
+    suspeitas = series['igual'] & series['nao_zero'] & (series['media_nv'] < LIMITE_NV_JANELA_CURTA)
+    return series[suspeitas].reset_index()[CHAVE_SERIE + ['UF', 'Municipio', 'media_nv', 'anos']]
+
+
+# Regras declarativas: 'tabela' indica se a verificação roda sobre todos os registros ('bruta'),
+# sobre os registros com código no formato longo ('longa') ou no formato largo ('larga')
+# 'bloquear' lista os indicadores descartados quando a violação não traz a coluna 'Indicador'
+REGRAS = [
+    {
+        'id': 'codigo_nao_resolvido',
+        'descricao': 'Município sem código IBGE resolvido (nome fora do dicionário da UF)',
+        'severidade': 'aviso',
+        'tabela': 'bruta',
+        'verificar': _codigo_nao_resolvido,
+    },
+    {
+        'id': 'chave_duplicada',
+        'descricao': 'Registro duplicado para a mesma chave (código, ano) no indicador',
+        'severidade': 'erro',
+        'tabela': 'longa',
+        'verificar': _chave_duplicada,
+    },
+    {
+        'id': 'obitos_maior_que_nascidos',
+        'descricao': 'Óbitos infantis (OB) maiores que nascidos vivos (NV)',
+        'severidade': 'erro',
+        'tabela': 'larga',
+        'bloquear': ['NV', 'OB'],
+        'verificar': _obitos_maior_que_nascidos,
+    },
+    {
+        'id': 'cmi_inconsistente',
+        'descricao': f'CMI difere de (OB / NV) × 1000 em mais de {TOLERANCIA_CMI}',
+        'severidade': 'aviso',
+        'tabela': 'larga',
+        'verificar': _cmi_inconsistente,
+    },
+    {
+        'id': 'anos_faltantes',
+        'descricao': 'Série municipal com anos ausentes no intervalo da UF',
+        'severidade': 'aviso',
+        'tabela': 'longa',
+        'verificar': _anos_faltantes,
+    },
+    {
+        'id': 'cmi_igual_cmi_mil',
+        'descricao': 'CMI idêntico ao CMI-Mil em todos os anos de um município pequeno',
+        'severidade': 'aviso',
+        'tabela': 'larga',
+        'verificar': _cmi_igual_cmi_mil,
+    },
+]
+
+
+def montar_tabela_larga(longo):
+    """
+    Pivota o formato longo para (Codigo_Municipio, Ano) x indicadores, uma coluna por indicador
+    UF e Municipio acompanham cada linha apenas para identificação nos relatórios
+    """
+    largo = (
+        longo.drop_duplicates(['Indicador'] + CHAVE)
+        .set_index(['Indicador'] + CHAVE)['Valor']
+        .unstack('Indicador')
+        .reindex(columns=list(DIRETORIOS_INDICADORES))
+    )
+    largo.columns.name = None
+    nomes = longo.drop_duplicates('Codigo_Municipio').set_index('Codigo_Municipio')[['UF', 'Municipio']]
+    return largo.reset_index().join(nomes, on='Codigo_Municipio')
+
+
+def _chaves_bloqueadas(violacoes, regra):
+    """Converte as violações de uma regra de erro em {indicador: [[codigo, ano], ...]}"""
+    if 'Indicador' in violacoes.columns:
+        grupos = violacoes.groupby('Indicador')
+    else:
+        grupos = [(indicador, violacoes) for indicador in regra.get('bloquear', [])]
+
+    return {
+        indicador: df[CHAVE].drop_duplicates().astype(int).values.tolist()
+        for indicador, df in grupos
+    }
+
+
+def validar(longo):
+    """
+    Executa todas as REGRAS sobre o DataFrame longo (saída de carregar_todos_indicadores)
+    Retorna o relatório em formato de dicionário (serializável em JSON)
+    """
+    com_codigo = longo[longo['Codigo_Municipio'].notna()]
+    tabelas = {'bruta': longo, 'longa': com_codigo, 'larga': montar_tabela_larga(com_codigo)}
+
+    resultados = []
+    bloqueios = {}
+    for regra in REGRAS:
+        violacoes = regra['verificar'](tabelas[regra['tabela']])
+
+        resultados.append({
+            'id': regra['id'],
+            'descricao': regra['descricao'],
+            'severidade': regra['severidade'],
+            'violacoes': int(len(violacoes)),
+            'exemplos': violacoes.head(MAX_EXEMPLOS).to_dict(orient='records'),
+        })
+
+        if regra['severidade'] == 'erro' and len(violacoes) > 0:
+            for indicador, chaves in _chaves_bloqueadas(violacoes, regra).items():
+                bloqueios.setdefault(indicador, []).extend(chaves)
+
+    reprovado = any(r['severidade'] == 'erro' and r['violacoes'] > 0 for r in resultados)
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'status': 'reprovado' if reprovado else 'aprovado',
+        'total_registros': int(len(longo)),
+        'regras': resultados,
+        'bloqueios': bloqueios,
+    }
+
+
+def salvar_relatorio(relatorio, arquivo=ARQUIVO_RELATORIO):
+    """Salva o relatório de validação em JSON"""
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2, default=str)
+
+
+def carregar_relatorio(arquivo=ARQUIVO_RELATORIO):
+    """Lê o último relatório de validação (None se a validação nunca foi executada)"""
+    if not arquivo.exists():
+        return None
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def aplicar_bloqueios(df, tipo, relatorio):
+    """Remove do DataFrame de um indicador as chaves bloqueadas pela validação"""
+    if df.empty or not relatorio:
+        return df
+
+    chaves = relatorio.get('bloqueios', {}).get(tipo)
+    if not chaves:
+        return df
+
+    bloqueadas = pd.MultiIndex.from_tuples([tuple(c) for c in chaves], names=CHAVE)
+    return df[~pd.MultiIndex.from_frame(df[CHAVE]).isin(bloqueadas)]
+
+
+def executar_validacao():
+    """Carrega os dados processados, valida, salva o relatório e exibe o resumo"""
+    print("\n" + "="*70)
+    print(" 🔎 VALIDAÇÃO DOS DADOS PROCESSADOS")
+    print("="*70)
+
+    longo = carregar_todos_indicadores()
+    relatorio = validar(longo)
+    salvar_relatorio(relatorio)
+
+    print(f"\n  📝 Registros verificados: {relatorio['total_registros']:,}")
+    for regra in relatorio['regras']:
+        if regra['violacoes'] == 0:
+            marcador = '✅'
+        elif regra['severidade'] == 'erro':
+            marcador = '❌'
+        else:
+            marcador = '⚠️ '
+        print(f"  {marcador} {regra['id']}: {regra['violacoes']:,} violação(ões)")
+
+    total_bloqueados = sum(len(chaves) for chaves in relatorio['bloqueios'].values())
+    print(f"\n  🚫 Registros bloqueados para o dashboard: {total_bloqueados:,}")
+    print(f"  💾 Relatório: {ARQUIVO_RELATORIO.relative_to(Path(__file__).parent.parent)}")
+    print(f"  Status: {relatorio['status'].upper()}")
+    print("="*70)
+
+    return relatorio
+
+
+if __name__ == "__main__":
+    relatorio = executar_validacao()
+    sys.exit(1 if relatorio['status'] == 'reprovado' else 0)
@@ -1,10 +1,14 @@
 """
 Script para analisar a planilha CMI-Mil.ods - aba TO
 """
-import pandas as pd
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.leitor_ods import ler_abas
+
 ARQUIVO_CMI_MIL = BASE_DIR / 'data' / 'input' / 'CMI-Mil.ods'
 
 print("="*80)
@@ -12,7 +16,7 @@ print("ANÁLISE DA PLANILHA CMI-Mil.ods")
 print("="*80)
 
 # Listar abas relacionadas a TO
-xls = pd.read_excel(ARQUIVO_CMI_MIL, sheet_name=None, engine='odf')
+xls = ler_abas(ARQUIVO_CMI_MIL)
 abas_to = [nome for nome in xls.keys() if 'TO' in nome.upper()]
 
 print(f"\nAbas relacionadas a TO: {abas_to}")
@@ -1,11 +1,17 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.leitor_ods import ler_abas
 
 # Verificar TO NV
 print("="*60)
 print("VERIFICANDO TO NV")
 print("="*60)
 
-xls = pd.read_excel('data/input/CMI-Mil.ods', sheet_name='TO NV', engine='odf')
+xls = ler_abas(BASE_DIR / 'data' / 'input' / 'CMI-Mil.ods', 'TO NV')
 
 for i in range(5):
     print(f"\nLinha {i}:")
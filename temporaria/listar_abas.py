@@ -1,10 +1,14 @@
 """
 Script para listar todas as abas das planilhas ODS
 """
-import pandas as pd
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.leitor_ods import ler_abas
+
 ARQUIVO_CMI = BASE_DIR / 'data' / 'input' / 'CMI.ods'
 ARQUIVO_CMI_MIL = BASE_DIR / 'data' / 'input' / 'CMI-Mil.ods'
 
@@ -15,7 +19,7 @@ print("="*80)
 # 1. CMI.ods
 print("\n1. Abas em CMI.ods:")
 try:
-    xls = pd.read_excel(ARQUIVO_CMI, sheet_name=None, engine='odf')
+    xls = ler_abas(ARQUIVO_CMI)
     abas = list(xls.keys())
     print(f"   Total de abas: {len(abas)}")
     for i, aba in enumerate(abas, 1):
@@ -26,7 +30,7 @@ except Exception as e:
 # 2. CMI-Mil.ods
 print("\n2. Abas em CMI-Mil.ods:")
 try:
-    xls_mil = pd.read_excel(ARQUIVO_CMI_MIL, sheet_name=None, engine='odf')
+    xls_mil = ler_abas(ARQUIVO_CMI_MIL)
     abas_mil = list(xls_mil.keys())
     print(f"   Total de abas: {len(abas_mil)}")
     for i, aba in enumerate(abas_mil, 1):
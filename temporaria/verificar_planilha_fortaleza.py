@@ -1,7 +1,11 @@
-import pandas as pd
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from src.leitor_ods import ler_abas
+
 ARQUIVO_CMI = BASE_DIR / 'data' / 'input' / 'CMI.ods'
 ARQUIVO_CMI_MIL = BASE_DIR / 'data' / 'input' / 'CMI-Mil.ods'
 
@@ -12,7 +16,7 @@ print("="*80)
 # Verificar CMI.ods
 print("\n📄 CMI.ods - Aba CE:")
 try:
-    df_cmi = pd.read_excel(ARQUIVO_CMI, sheet_name='CMI CE', engine='odf')
+    df_cmi = ler_abas(ARQUIVO_CMI, 'CMI CE')
     print(f"Total de linhas: {len(df_cmi)}")
     print(f"Colunas: {df_cmi.columns.tolist()[:10]}")
     
@@ -28,7 +32,7 @@ except Exception as e:
 # Verificar CMI-Mil.ods
 print("\n📄 CMI-Mil.ods - Aba CMI-Mil CE:")
 try:
-    df_cmi_mil = pd.read_excel(ARQUIVO_CMI_MIL, sheet_name='CMI-Mil CE', engine='odf')
+    df_cmi_mil = ler_abas(ARQUIVO_CMI_MIL, 'CMI-Mil CE')
     print(f"Total de linhas: {len(df_cmi_mil)}")
     print(f"Colunas: {df_cmi_mil.columns.tolist()[:10]}")
     
@@ -0,0 +1,8 @@
+"""
+Configuração dos testes: python -m pytest (na raiz do projeto)
+Os testes usam DataFrames e arquivos montados à mão (tmp_path), nunca os dados de data/output/
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
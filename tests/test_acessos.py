@@ -0,0 +1,44 @@
+"""Estado na URL e registro de acessos (src/acessos.py)"""
+from src import acessos
+
+
+def test_estado_ida_e_volta():
+    parametros = acessos.codificar_estado([2304400, 355030], (2000, 2010), 'Comparativo')
+    assert parametros == {'municipios': '2304400,355030', 'anos': '2000-2010', 'modo': 'comparativo'}
+    assert acessos.decodificar_estado(parametros) == {
+        'codigos': [230440, 355030], 'anos': (2000, 2010), 'modo': 'Comparativo',
+    }
+    assert acessos.decodificar_estado({'municipios': 'x,,12', 'anos': '2010-', 'modo': '?'}) == {
+        'codigos': [12], 'anos': None, 'modo': None,
+    }
+
+
+def test_estados_populares_em_ordem_de_acessos(tmp_path):
+    arquivo = tmp_path / 'acessos.jsonl'
+    for _ in range(3):
+        acessos.registrar_acesso([230440], (2000, 2010), 'Individual', arquivo)
+    acessos.registrar_acesso([355030, 230440], (2001, 2002), 'Comparativo', arquivo)
+    with open(arquivo, 'a', encoding='utf-8') as f:
+        f.write('linha corrompida\n')
+
+    assert acessos.estados_populares(arquivo=arquivo) == [
+        ((230440,), (2000, 2010), 'Individual'),
+        ((355030, 230440), (2001, 2002), 'Comparativo'),
+    ]
+
+
+def test_registro_rotaciona_e_continua_contando(tmp_path, monkeypatch):
+    arquivo = tmp_path / 'acessos.jsonl'
+    monkeypatch.setattr(acessos, 'TAMANHO_MAX_REGISTRO', 300)
+    for _ in range(10):
+        acessos.registrar_acesso([230440], (2000, 2010), 'Individual', arquivo)
+
+    anterior = acessos.arquivo_anterior(arquivo)
+    assert anterior.exists()
+    assert anterior.stat().st_size <= 300 + 100 and arquivo.stat().st_size <= 300
+
+    # Só o registro atual e uma geração anterior ficam em disco
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['acessos.jsonl', 'acessos.jsonl.1']
+    total = sum(1 for origem in (anterior, arquivo) for _ in open(origem, encoding='utf-8'))
+    assert acessos.estados_populares(arquivo=arquivo) == [((230440,), (2000, 2010), 'Individual')]
+    assert 0 < total < 10
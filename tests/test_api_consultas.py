@@ -0,0 +1,217 @@
+"""Rotas e erros de src/api_consultas.py sobre uma base montada à mão"""
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from src import api_consultas, exportacao
+from src.armazenamento import compactar_indicador, indexar_por_codigo
+
+FORTALEZA, CRATEUS, SAO_PAULO = 230440, 230410, 355030
+
+
+def indicador(tipo, linhas):
+    """linhas: (codigo, municipio, uf, ano, valor)"""
+    df = pd.DataFrame(linhas, columns=['Codigo_Municipio', 'Municipio', 'UF', 'Ano', 'Valor'])
+    return compactar_indicador(indexar_por_codigo(df), tipo)
+
+
+@pytest.fixture
+def base():
+    municipios = [(FORTALEZA, 'FORTALEZA', 'CE'), (CRATEUS, 'CRATEUS', 'CE'), (SAO_PAULO, 'SAO PAULO', 'SP')]
+    anos = range(2000, 2003)
+    nv = [(c, m, uf, ano, 1000 * (i + 1)) for i, (c, m, uf) in enumerate(municipios) for ano in anos]
+    ob = [(c, m, uf, ano, 12 * (i + 1) + ano - 2000) for i, (c, m, uf) in enumerate(municipios) for ano in anos]
+    cmi = [(c, m, uf, ano, round(ob_ * 1000 / nv_, 2)) for (c, m, uf, ano, nv_), (*_, ob_) in zip(nv, ob)]
+    dados = {
+        'CMI': indicador('CMI', cmi),
+        'CMI_MIL': indicador('CMI_MIL', cmi),
+        'NV': indicador('NV', nv),
+        'OB': indicador('OB', ob),
+    }
+    return api_consultas.montar_base(dados, versao='teste')
+
+
+@pytest.fixture
+def servidor(base, monkeypatch):
+    """Consultas pelo caminho HTTP (executar_consulta e /lote) usando a base de teste"""
+    monkeypatch.setattr(api_consultas, 'obter_base', lambda: base)
+    return base
+
+
+def consultar(caminho, parametros=None):
+    status, corpo = api_consultas.executar_consulta(caminho, parametros or {})
+    return status, json.loads(corpo)
+
+
+def lote(consultas):
+    corpo = json.dumps(consultas).encode('utf-8')
+    status, resposta = asyncio.run(api_consultas._atender_lote(corpo))
+    return status, json.loads(resposta)
+
+
+# ============================================================================
+# ROTAS
+# ============================================================================
+
+def test_series_por_codigo_com_periodo(servidor):
+    status, corpo = consultar('/series', {'codigos': f'{FORTALEZA},2304400', 'indicadores': 'CMI,NV', 'inicio': '2001'})
+    assert status == 200
+    [municipio] = corpo['municipios']  # 2304400 (7 dígitos) é o mesmo município
+    assert municipio['municipio'] == 'FORTALEZA'
+    assert municipio['series']['NV'] == {'anos': [2001, 2002], 'valores': [1000, 1000]}
+    assert municipio['series']['CMI'] == {'anos': [2001, 2002], 'valores': [13.0, 14.0]}
+
+
+def test_ranking_do_ano(servidor):
+    status, corpo = consultar('/ranking', {'indicador': 'OB', 'ano': '2000', 'ordem': 'asc', 'limite': '2'})
+    assert status == 200
+    assert [(item['codigo'], item['valor']) for item in corpo['ranking']] == [(FORTALEZA, 12), (CRATEUS, 24)]
+
+
+def test_uf_agrega_contagens_e_taxas(servidor):
+    status, corpo = consultar('/uf/ce', {'indicadores': 'NV,CMI', 'fim': '2000'})
+    assert status == 200
+    assert corpo['indicadores']['NV'] == {'agregacao': 'soma', 'anos': [2000], 'valores': [3000], 'municipios': [2]}
+    assert corpo['indicadores']['CMI']['valores'] == [12.0]
+
+
+def test_bloco_alinha_municipios_e_anos(servidor):
+    status, corpo = consultar('/bloco', {'codigos': f'{SAO_PAULO},{FORTALEZA}', 'indicadores': 'NV'})
+    assert status == 200
+    assert corpo['codigos'] == [SAO_PAULO, FORTALEZA]
+    assert corpo['anos'] == [2000, 2001, 2002]
+    assert corpo['valores'] == [[[3000, 3000, 3000], [1000, 1000, 1000]]]
+
+
+def test_bloco_limita_o_periodo_aos_anos_da_base(servidor):
+    status, corpo = consultar('/bloco', {'codigos': str(FORTALEZA), 'indicadores': 'NV', 'inicio': '0', 'fim': '100000000'})
+    assert status == 200
+    assert corpo['anos'] == [2000, 2001, 2002]
+
+    for periodo in ({'inicio': '3000'}, {'fim': '1000'}, {'inicio': '2002', 'fim': '2000'}):
+        status, corpo = consultar('/bloco', {'codigos': str(FORTALEZA), 'indicadores': 'NV', **periodo})
+        assert status == 200
+        assert corpo['anos'] == [] and corpo['valores'] == [[[]]]
+
+
+def test_comparacao_limita_o_periodo_aos_anos_da_base(servidor):
+    status, corpo = consultar('/comparacao', {'codigos': str(CRATEUS), 'indicador': 'OB', 'fim': '3000000'})
+    assert status == 200
+    assert corpo['anos'] == [2000, 2001, 2002]
+    assert corpo['municipios'][0]['valores'] == [24, 25, 26]
+
+
+@pytest.mark.parametrize('caminho, parametros, status', [
+    ('/inexistente', {}, 404),
+    ('/series', {}, 400),
+    ('/series', {'codigos': 'abc'}, 400),
+    ('/series', {'codigos': '999999'}, 404),
+    ('/series', {'codigos': str(FORTALEZA), 'indicadores': 'XYZ'}, 400),
+    ('/ranking', {}, 400),
+    ('/ranking', {'indicador': 'CMI', 'ordem': 'lado'}, 400),
+    ('/uf/XX', {}, 404),
+])
+def test_erros_das_rotas(servidor, caminho, parametros, status):
+    recebido, corpo = consultar(caminho, parametros)
+    assert recebido == status
+    assert 'erro' in corpo
+
+
+def test_resposta_fica_no_cache_da_base_consultada(base):
+    chave = api_consultas._chave_parametros({'codigos': str(FORTALEZA)})
+    corpo = api_consultas._consultar_em_cache(base, '/series', chave)
+    assert base['respostas'][('/series', chave)] is corpo
+    assert api_consultas._consultar_em_cache(base, '/series', chave) is corpo
+
+    outra = api_consultas.montar_base({tipo: df.iloc[:0] for tipo, df in base['dados'].items()}, versao='vazia')
+    with pytest.raises(LookupError):
+        api_consultas._consultar_em_cache(outra, '/series', chave)
+
+
+# ============================================================================
+# LOTE
+# ============================================================================
+
+def test_lote_responde_na_ordem(servidor):
+    status, respostas = lote([
+        {'rota': '/ranking', 'parametros': {'indicador': 'NV', 'limite': 1}},
+        {'rota': '/series', 'parametros': {'codigos': [999999]}},
+        {'rota': '/versao'},
+    ])
+    assert status == 200
+    assert [resposta['status'] for resposta in respostas] == [200, 404, 200]
+    assert respostas[0]['corpo']['ranking'][0]['codigo'] == SAO_PAULO
+    assert respostas[2]['corpo']['versao'] == 'teste'
+
+
+@pytest.mark.parametrize('consultas', [
+    {'rota': '/versao'},
+    [1],
+    [{'parametros': {}}],
+    [{'rota': '/series', 'parametros': [1]}],
+    [{'rota': '/series', 'parametros': {'codigos': {'a': 1}}}],
+    [{'rota': '/series', 'parametros': {}, 'extra': 1}],
+    [{'rota': '/versao'}] * (api_consultas.MAX_LOTE + 1),
+])
+def test_lote_invalido_responde_400(servidor, consultas):
+    status, corpo = lote(consultas)
+    assert status == 400
+    assert 'erro' in corpo
+
+
+# ============================================================================
+# VERSÃO DOS DADOS E HTTP
+# ============================================================================
+
+def test_etag_e_resposta_da_mesma_versao(base, monkeypatch):
+    # A base muda entre uma chamada de obter_base e a seguinte
+    bases = iter([base, api_consultas.montar_base(base['dados'], versao='nova')])
+    monkeypatch.setattr(api_consultas, 'obter_base', lambda: next(bases))
+    status, corpo, etag = asyncio.run(api_consultas.responder('GET', '/versao', {}, b''))
+    assert status == 200
+    assert json.loads(corpo)['versao'] == 'teste' and etag.startswith('"teste-')
+
+
+def test_versao_muda_com_o_dicionario_de_codigos(tmp_path, monkeypatch):
+    from src import armazenamento
+
+    dicionario = tmp_path / 'codigos_municipios.json'
+    dicionario.write_text('{}', encoding='utf-8')
+    monkeypatch.setattr(armazenamento, '_arquivos_extras_preparados', lambda: [dicionario])
+    antes = armazenamento.versao_dados_preparados()
+    dicionario.write_text('{"CE": {"FORTALEZA": 230440}}', encoding='utf-8')
+    assert armazenamento.versao_dados_preparados() != antes
+
+
+def test_corpo_acima_do_limite_responde_413(servidor):
+    async def enviar(requisicao):
+        servidor_http = await asyncio.start_server(api_consultas.atender_conexao, '127.0.0.1', 0)
+        porta = servidor_http.sockets[0].getsockname()[1]
+        async with servidor_http:
+            leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+            escritor.write(requisicao)
+            await escritor.drain()
+            resposta = await leitor.read()
+            escritor.close()
+        return resposta
+
+    grande = f"POST /lote HTTP/1.1\r\nContent-Length: {api_consultas.MAX_CORPO + 1}\r\n\r\n".encode()
+    resposta = asyncio.run(enviar(grande))
+    assert resposta.startswith(b'HTTP/1.1 413 ') and b'Connection: close' in resposta
+
+    corpo = json.dumps([{'rota': '/versao'}]).encode()
+    pequeno = b"POST /lote HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s" % (len(corpo), corpo)
+    resposta = asyncio.run(enviar(pequeno))
+    assert resposta.startswith(b'HTTP/1.1 200 ')
+    assert json.loads(resposta.partition(b'\r\n\r\n')[2])[0]['corpo']['versao'] == 'teste'
+
+
+def test_exportar_xlsx_acima_do_limite_responde_400(servidor, monkeypatch):
+    pytest.importorskip('openpyxl')
+    monkeypatch.setattr(exportacao, 'MAX_LINHAS_XLSX', 5)
+    status, corpo = api_consultas.preparar_exportacao({'formato': 'xlsx', 'uf': 'CE'})  # 2 municípios x 3 anos
+    assert status == 400 and 'CSV ou Parquet' in json.loads(corpo)['erro']
+    status, resposta = api_consultas.preparar_exportacao({'formato': 'xlsx', 'uf': 'CE', 'inicio': '2001'})
+    assert status == 200 and isinstance(resposta, api_consultas.RespostaArquivo)
@@ -0,0 +1,73 @@
+"""Indicadores preparados em memória (src/armazenamento.py)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import armazenamento
+
+
+def indicador(linhas):
+    """linhas: (codigo, municipio, uf, ano, valor)"""
+    df = pd.DataFrame(linhas, columns=['Codigo_Municipio', 'Municipio', 'UF', 'Ano', 'Valor'])
+    return armazenamento.indexar_por_codigo(df.assign(Tipo='x'))
+
+
+def test_compactar_mantem_as_taxas_como_gravadas():
+    df = indicador([(230440, 'FORTALEZA', 'CE', 2000, 12.3), (230440, 'FORTALEZA', 'CE', 2001, 11333.33)])
+    compacto = armazenamento.compactar_indicador(df, 'CMI')
+    assert compacto['Valor'].dtype == np.float64
+    assert compacto['Valor'].tolist() == [12.3, 11333.33]
+    assert compacto['Ano'].dtype == armazenamento.TIPO_ANO
+    assert isinstance(compacto['UF'].dtype, pd.CategoricalDtype)
+    assert 'Tipo' not in compacto.columns
+
+
+def test_compactar_contagens():
+    df = indicador([(230440, 'FORTALEZA', 'CE', 2000, 100.0), (230410, 'CRATEUS', 'CE', 2000, 7.0)])
+    assert armazenamento.compactar_indicador(df, 'NV')['Valor'].dtype == armazenamento.TIPO_CONTAGEM
+    # Contagem com lacunas não cabe em int32: fica com o tipo das taxas
+    lacuna = df.assign(Valor=[100.0, np.nan])
+    assert armazenamento.compactar_indicador(lacuna, 'NV')['Valor'].dtype == armazenamento.TIPO_TAXA
+
+
+def test_ler_jsons_na_ordem_e_pulando_arquivo_com_erro(tmp_path):
+    arquivos = []
+    for uf, valor in (('PI', 1), ('AC', 2)):
+        arquivo = tmp_path / f'{uf}.json'
+        arquivo.write_text(f'[{{"UF": "{uf}", "Ano": 2000, "Valor": {valor}}}]', encoding='utf-8')
+        arquivos.append(arquivo)
+    quebrado = tmp_path / 'CE.json'
+    quebrado.write_text('[{"UF": ', encoding='utf-8')
+
+    falhas = []
+    df = armazenamento.ler_jsons([arquivos[0], quebrado, arquivos[1]], lambda arquivo, erro: falhas.append(arquivo))
+    assert df['UF'].tolist() == ['PI', 'AC'] and df['Valor'].tolist() == [1, 2]
+    assert falhas == [quebrado]
+
+    with pytest.raises(ValueError):
+        armazenamento.ler_jsons([quebrado])
+
+
+def test_obter_series_alinha_municipios_indicadores_e_anos():
+    dados = {
+        'CMI': armazenamento.compactar_indicador(indicador([
+            (230440, 'FORTALEZA', 'CE', 2000, 12.3), (230440, 'FORTALEZA', 'CE', 2002, 11.1),
+            (355030, 'SAO PAULO', 'SP', 2001, 9.5),
+        ]), 'CMI'),
+        'NV': armazenamento.compactar_indicador(indicador([(230440, 'FORTALEZA', 'CE', 2001, 100.0)]), 'NV'),
+    }
+    bloco = armazenamento.obter_series(dados, [355030, 999999, 230440])
+    assert bloco['codigos'].tolist() == [355030, 999999, 230440]
+    assert bloco['indicadores'] == ['CMI', 'NV'] and bloco['anos'].tolist() == [2000, 2001, 2002]
+    np.testing.assert_array_equal(bloco['valores'], [
+        [[np.nan, 9.5, np.nan], [np.nan] * 3, [12.3, np.nan, 11.1]],
+        [[np.nan] * 3, [np.nan] * 3, [np.nan, 100.0, np.nan]],
+    ])
+
+    recorte = armazenamento.obter_series(dados, [230440], ['CMI'], anos=(2001, 2003))
+    assert recorte['anos'].tolist() == [2001, 2002, 2003]
+    np.testing.assert_array_equal(recorte['valores'], [[[np.nan, 11.1, np.nan]]])
+    serie = armazenamento.serie_do_bloco(bloco, 'NV', 2)
+    assert serie.to_dict('list') == {'Ano': [2001], 'Valor': [100]}
+
+    assert armazenamento.obter_series(dados, [999999])['anos'].tolist() == []
@@ -0,0 +1,28 @@
+"""Busca de municípios sem acentos, por prefixo e aproximada (src/busca_municipios.py)"""
+import pytest
+
+from src import busca_municipios
+
+ROTULOS = ['SÃO PAULO - SP', 'SÃO PAULO DO POTENGI - RN', 'PAULO AFONSO - BA', 'CRATEÚS - CE',
+           'FORTALEZA - CE', 'ALTO PARAÍSO DE GOIÁS - GO']
+
+
+@pytest.fixture
+def indice():
+    return busca_municipios.construir_indice(ROTULOS)
+
+
+def test_prefixo_antes_de_palavra_e_trecho(indice):
+    assert busca_municipios.buscar(indice, 'sao paulo') == ['SÃO PAULO - SP', 'SÃO PAULO DO POTENGI - RN']
+    assert busca_municipios.buscar(indice, 'paulo') == [
+        'PAULO AFONSO - BA', 'SÃO PAULO - SP', 'SÃO PAULO DO POTENGI - RN',
+    ]
+    assert busca_municipios.buscar(indice, 'PARAISO') == ['ALTO PARAÍSO DE GOIÁS - GO']
+
+
+def test_busca_aproximada_limite_e_consulta_vazia(indice):
+    assert busca_municipios.buscar(indice, 'crateus')[0] == 'CRATEÚS - CE'
+    assert busca_municipios.buscar(indice, 'fortaleez')[0] == 'FORTALEZA - CE'
+    assert busca_municipios.buscar(indice, 's', limite=1) == ['SÃO PAULO - SP']  # o nome mais curto antes
+    assert busca_municipios.buscar(indice, ' - ') == []
+    assert busca_municipios.buscar(indice, 'xyzw') == []
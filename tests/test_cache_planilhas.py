@@ -0,0 +1,58 @@
+"""Cache das abas lidas das planilhas (src/cache_planilhas.py)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import cache_planilhas
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_planilhas, 'DIR_CACHE', tmp_path / 'cache')
+    return tmp_path / 'cache'
+
+
+def aba(ano_extra='#VALOR!'):
+    return pd.DataFrame({
+        'Municipio': np.array(['FORTALEZA', 'CRATEUS'], dtype=object),
+        'Ano': np.array([2000, ano_extra], dtype=object),
+        'Valor': [12.5, np.nan],
+    })
+
+
+def test_segunda_leitura_vem_do_cache(tmp_path, cache):
+    planilha = tmp_path / 'planilha.ods'
+    planilha.write_bytes(b'conteudo')
+    abas = {'CE NV': aba(), 'PI NV': aba(2001)}
+    pedidas = []
+
+    def ler(arquivo, nomes):
+        pedidas.append(nomes)
+        return {nome: abas[nome] for nome in (nomes or abas)}
+
+    # Uma aba, depois todas: só as que faltam são lidas da planilha
+    assert list(cache_planilhas.ler_em_cache(planilha, ['PI NV'], 'v', ler)) == ['PI NV']
+    todas = cache_planilhas.ler_em_cache(planilha, None, 'v', ler)
+    assert list(todas) == ['CE NV', 'PI NV'] and pedidas == [['PI NV'], None]
+
+    pedidas.clear()
+    lidas = cache_planilhas.ler_em_cache(planilha, None, 'v', ler)
+    assert pedidas == []
+    for nome, df in abas.items():
+        pd.testing.assert_frame_equal(lidas[nome], df)
+
+    # Outra variante ou outro conteúdo não aproveitam o cache
+    cache_planilhas.ler_em_cache(planilha, ['CE NV'], 'outra', ler)
+    planilha.write_bytes(b'conteudo novo')
+    cache_planilhas.ler_em_cache(planilha, ['CE NV'], 'v', ler)
+    assert pedidas == [['CE NV'], ['CE NV']]
+
+
+def test_aba_volta_identica_em_feather_ou_pickle(cache):
+    com_data = aba().assign(Ano=np.array([2000, pd.Timestamp('2001-01-01')], dtype=object))
+    for df, extensao in ((aba(), '.feather' if cache_planilhas.pa else '.pkl'), (com_data, '.pkl')):
+        arquivo = cache_planilhas.salvar_aba(df, cache, 'CE/NV')
+        assert arquivo.suffix == extensao
+        pd.testing.assert_frame_equal(cache_planilhas.carregar_aba(cache, 'CE/NV'), df)
+        arquivo.unlink()
+    assert cache_planilhas.carregar_aba(cache, 'CE/NV') is None
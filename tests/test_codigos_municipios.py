@@ -0,0 +1,32 @@
+"""Resolução do código IBGE dos municípios (src/codigos_municipios.py)"""
+import pandas as pd
+
+from src import codigos_municipios
+
+
+def test_resolver_codigos_pelo_nome_pelo_registro_e_pelo_dicionario():
+    df = pd.DataFrame({
+        'Municipio': ['2304400 FORTALEZA', 'Crateús', 'SAO PAULO', 'SEM CODIGO', '110001 ALTA FLORESTA D OESTE'],
+        'UF': ['CE', 'CE', 'SP', 'CE', 'RD'],
+        'Codigo_Municipio': [None, None, 3550308, None, None],
+    })
+    dicionario = {'CE': {'CRATEUS': 230410}}
+    resolvido = codigos_municipios.resolver_codigos(df, dicionario)
+
+    assert resolvido['Codigo_Municipio'].dtype == 'Int32'
+    assert resolvido['Codigo_Municipio'].tolist() == [230440, 230410, 355030, pd.NA, 110001]
+    assert resolvido['Municipio'].tolist() == [
+        'FORTALEZA', 'Crateús', 'SAO PAULO', 'SEM CODIGO', 'ALTA FLORESTA D OESTE',
+    ]
+    # A UF vem do prefixo IBGE quando o código é conhecido ('RD' -> 'RO')
+    assert resolvido['UF'].tolist() == ['CE', 'CE', 'SP', 'CE', 'RO']
+    assert df['Municipio'].iloc[0] == '2304400 FORTALEZA'  # o original não é alterado
+
+
+def test_dicionario_descarta_nomes_ambiguos_na_uf():
+    df = pd.DataFrame({
+        'Municipio': ['BOM JESUS', 'Bom Jesus', 'CRATEUS', 'BOM JESUS'],
+        'UF': ['PI', 'PI', 'CE', 'RN'],
+        'Codigo_Municipio': pd.array([220190, 220191, 230410, 240160], dtype='Int32'),
+    })
+    assert codigos_municipios.construir_dicionario(df) == {'CE': {'CRATEUS': 230410}, 'RN': {'BOM JESUS': 240160}}
@@ -0,0 +1,111 @@
+"""Exportação dos indicadores em partes (src/exportacao.py)"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import exportacao
+from src.armazenamento import catalogo_de_indicadores, compactar_indicador, indexar_por_codigo
+
+FORTALEZA, CRATEUS, SAO_PAULO = 230440, 230410, 355030
+
+
+def indicador(tipo, linhas):
+    """linhas: (codigo, municipio, uf, ano, valor)"""
+    df = pd.DataFrame(linhas, columns=['Codigo_Municipio', 'Municipio', 'UF', 'Ano', 'Valor'])
+    return compactar_indicador(indexar_por_codigo(df), tipo)
+
+
+@pytest.fixture
+def dados():
+    municipios = [(FORTALEZA, 'FORTALEZA', 'CE'), (CRATEUS, 'CRATEUS', 'CE'), (SAO_PAULO, 'SAO PAULO', 'SP')]
+    nv = [(c, m, uf, ano, 1000 * (i + 1)) for i, (c, m, uf) in enumerate(municipios) for ano in (2000, 2001)]
+    ob = [(SAO_PAULO, 'SAO PAULO', 'SP', 2001, 40)]
+    cmi = [(FORTALEZA, 'FORTALEZA', 'CE', 2002, 12.5)]  # ano sem NV
+    return {
+        'CMI': indicador('CMI', cmi), 'CMI_MIL': indicador('CMI_MIL', cmi),
+        'NV': indicador('NV', nv), 'OB': indicador('OB', ob),
+    }
+
+
+def test_partes_por_lote_no_formato_largo(dados):
+    catalogo = catalogo_de_indicadores(dados)
+    codigos = exportacao.codigos_do_escopo(catalogo, 'ce')
+    assert codigos == [CRATEUS, FORTALEZA]
+
+    partes = list(exportacao.partes_exportacao(dados, catalogo, codigos, tamanho_lote=1))
+    assert [parte['Codigo_Municipio'].unique().tolist() for parte in partes] == [[CRATEUS], [FORTALEZA]]
+    fortaleza = partes[1]
+    assert list(fortaleza.columns) == ['Codigo_Municipio', 'Municipio', 'UF', 'Ano', 'CMI', 'CMI_MIL', 'NV', 'OB']
+    assert fortaleza['Ano'].tolist() == [2000, 2001, 2002]
+    assert fortaleza['NV'].dtype == 'Int64' and fortaleza['NV'].tolist() == [1000, 1000, pd.NA]
+    assert fortaleza['CMI'].isna().tolist() == [True, True, False]
+
+    # Linhas sem nenhum indicador no período não saem
+    partes = list(exportacao.partes_exportacao(dados, catalogo, codigos, indicadores=['CMI'], anos=(2000, 2002)))
+    assert [len(parte) for parte in partes] == [1]
+
+
+def test_csv_com_um_cabecalho_e_mesmo_conteudo_em_todos_os_formatos(dados):
+    catalogo = catalogo_de_indicadores(dados)
+    codigos = exportacao.codigos_do_escopo(catalogo)
+    blocos = list(exportacao.gerar_csv(exportacao.partes_exportacao(dados, catalogo, codigos, tamanho_lote=2)))
+    assert len(blocos) == 2 and sum(bloco.count(b'Codigo_Municipio') for bloco in blocos) == 1
+
+    esperado = pd.read_csv(io.BytesIO(b''.join(blocos)))
+    assert len(esperado) == 7
+    for formato in exportacao.formatos_disponiveis():
+        arquivo = exportacao.exportar(dados, catalogo, formato, codigos)
+        if formato == 'csv':
+            lido = pd.read_csv(arquivo)
+        elif formato == 'parquet':
+            lido = pd.read_parquet(arquivo)
+        else:
+            lido = pd.read_excel(arquivo, sheet_name='Indicadores')
+        np.testing.assert_array_equal(lido['Codigo_Municipio'], esperado['Codigo_Municipio'])
+        np.testing.assert_array_equal(lido['NV'].astype('Float64'), esperado['NV'].astype('Float64'))
+        np.testing.assert_array_equal(lido['CMI'].astype('Float64'), esperado['CMI'].astype('Float64'))
+
+
+def test_formato_desconhecido_e_nome_do_arquivo(dados):
+    with pytest.raises(ValueError):
+        exportacao.exportar(dados, catalogo_de_indicadores(dados), 'ods', [FORTALEZA])
+    assert exportacao.nome_arquivo('CE', 'xlsx', (2000, 2010)) == 'indicadores_CE_2000-2010.xlsx'
+    assert exportacao.nome_arquivo('brasil', 'csv') == 'indicadores_brasil.csv'
+
+
+def test_exportacao_vazia_sai_com_as_colunas(dados, tmp_path):
+    catalogo = catalogo_de_indicadores(dados)
+    assert exportacao.linhas_exportacao(dados, [CRATEUS], anos=(2010, 2011)) == 0
+    for formato in exportacao.formatos_disponiveis():
+        destino = tmp_path / f'vazio.{formato}'
+        with open(destino, 'wb') as arquivo:
+            exportacao.exportar(dados, catalogo, formato, [CRATEUS], anos=(2010, 2011), destino=arquivo)
+        if formato == 'csv':
+            lido = pd.read_csv(destino)
+        elif formato == 'parquet':
+            lido = pd.read_parquet(destino)
+            # Mesmo esquema de uma exportação com linhas
+            cheio = tmp_path / 'cheio.parquet'
+            with open(cheio, 'wb') as arquivo:
+                exportacao.exportar(dados, catalogo, formato, [CRATEUS], destino=arquivo)
+            assert lido.dtypes.to_dict() == pd.read_parquet(cheio).dtypes.to_dict()
+        else:
+            lido = pd.read_excel(destino, sheet_name='Indicadores')
+        assert len(lido) == 0
+        assert list(lido.columns) == ['Codigo_Municipio', 'Municipio', 'UF', 'Ano', 'CMI', 'CMI_MIL', 'NV', 'OB']
+
+
+def test_xlsx_acima_do_limite_recusado_antes_de_escrever(dados, monkeypatch):
+    catalogo = catalogo_de_indicadores(dados)
+    codigos = exportacao.codigos_do_escopo(catalogo)
+    assert exportacao.linhas_exportacao(dados, codigos) == 7
+    assert exportacao.linhas_exportacao(dados, codigos, indicadores=['CMI', 'OB'], anos=(2001, 2002)) == 2
+
+    monkeypatch.setattr(exportacao, 'MAX_LINHAS_XLSX', 6)
+    destino = io.BytesIO()
+    with pytest.raises(ValueError, match='CSV ou Parquet'):
+        exportacao.exportar(dados, catalogo, 'xlsx', codigos, destino=destino)
+    assert destino.getvalue() == b''
+    exportacao.validar_exportacao(dados, 'xlsx', codigos, anos=(2001, 2002))  # 4 linhas: cabe
@@ -0,0 +1,75 @@
+"""Instrumentação dos conversores (src/instrumentacao.py): etapas aninhadas e log JSON-lines"""
+import json
+
+import pandas as pd
+import pytest
+
+from src import instrumentacao
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    monkeypatch.setenv('ETL_INSTRUMENTACAO', '1')
+    arquivo = tmp_path / 'execucoes_etl.jsonl'
+    monkeypatch.setattr(instrumentacao, 'ARQUIVO_EXECUCOES', arquivo)
+    return arquivo
+
+
+@instrumentacao.medir_etapa('processar_aba')
+def processar_aba(df, nome_aba, uf):
+    with instrumentacao.etapa('melt', linhas_entrada=len(df)) as medida:
+        longo = df.melt(id_vars='Municipio', var_name='Ano', value_name='Valor')
+        medida['linhas_saida'] = len(longo)
+    with instrumentacao.etapa('outra_aba', aba='Notas'):
+        pass
+    return longo
+
+
+def test_etapas_aninhadas_herdam_a_aba_e_vao_para_o_log(log):
+    df = pd.DataFrame({'Municipio': ['A', 'B'], '2000': [1, 2], '2001': [3, 4]})
+
+    @instrumentacao.registrar_execucao('teste', memoria=False)
+    def executar():
+        processar_aba(df, 'CE NV', 'CE')
+        processar_aba(df, nome_aba='PI NV', uf='PI')
+
+    executar()
+    registros = [json.loads(linha) for linha in log.read_text(encoding='utf-8').splitlines()]
+    # Cada etapa é registrada ao terminar: as internas antes das externas, a execução por último
+    assert [(r['etapa'], r['aba'], r['uf']) for r in registros] == [
+        ('melt', 'CE NV', 'CE'), ('outra_aba', 'Notas', 'CE'), ('processar_aba', 'CE NV', 'CE'),
+        ('melt', 'PI NV', 'PI'), ('outra_aba', 'Notas', 'PI'), ('processar_aba', 'PI NV', 'PI'),
+        ('execucao', None, None),
+    ]
+    assert {r['script'] for r in registros} == {'teste'} and len({r['execucao'] for r in registros}) == 1
+    melt, processar = registros[0], registros[2]
+    assert (melt['linhas_entrada'], melt['linhas_saida']) == (2, 4)
+    assert (processar['linhas_entrada'], processar['linhas_saida']) == (2, 4)
+    assert all(r['duracao_s'] >= 0 and 'pico_memoria_mb' not in r for r in registros)
+
+    por_etapa, por_aba = instrumentacao.resumir(registros)
+    assert por_etapa.loc['melt', 'chamadas'] == 2 and por_etapa.loc['melt', 'linhas_saida'] == 8
+    assert sorted(por_aba.index) == [('CE NV', 'CE'), ('Notas', 'CE'), ('Notas', 'PI'), ('PI NV', 'PI')]
+
+
+def test_pico_de_memoria_e_fora_de_execucao(log):
+    @instrumentacao.registrar_execucao('teste')
+    def executar():
+        with instrumentacao.etapa('alocar'):
+            bytes(4 * 1024 * 1024)
+
+    executar()
+    alocar = json.loads(log.read_text(encoding='utf-8').splitlines()[0])
+    assert alocar['etapa'] == 'alocar' and alocar['pico_memoria_mb'] >= 3.9
+
+    # Fora de uma execução registrada nada é medido nem gravado
+    with instrumentacao.etapa('solta') as medida:
+        medida['linhas_saida'] = 1
+    processar_aba(pd.DataFrame({'Municipio': ['A'], '2000': [1]}), 'CE NV', 'CE')
+    assert len(log.read_text(encoding='utf-8').splitlines()) == 2
+
+
+def test_desligada_nao_grava(log, monkeypatch):
+    monkeypatch.setenv('ETL_INSTRUMENTACAO', '0')
+    assert instrumentacao.registrar_execucao('teste')(lambda: 42)() == 42
+    assert not log.exists()
@@ -0,0 +1,45 @@
+"""Leitor nativo de ODS (src/leitor_ods.py) contra pd.read_excel(engine='odf')"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import leitor_ods
+
+pytest.importorskip('odf')
+
+
+@pytest.fixture
+def planilha(tmp_path, monkeypatch):
+    """ODS com uma aba de texto, números, vazios e um erro numa coluna de anos, e outra só com inteiros"""
+    monkeypatch.setenv('PLANILHAS_CACHE', '0')
+    arquivo = tmp_path / 'teste.ods'
+    with pd.ExcelWriter(arquivo, engine='odf') as escritor:
+        pd.DataFrame({
+            'Municipio': ['FORTALEZA', 'CRATEUS', 'SAO PAULO', None],
+            'Ano': [2000, 2001, '#VALOR!', 2003],
+            'Valor': [12.5, np.nan, 3.0, 4.25],
+            'Obs': [None, 'x', None, None],
+        }).to_excel(escritor, sheet_name='CE NV', index=False)
+        pd.DataFrame({'Total': [1, 2, 3]}).to_excel(escritor, sheet_name='PI NV', index=False)
+    return arquivo
+
+
+@pytest.mark.parametrize('cabecalho', [0, None])
+def test_mesmo_conteudo_do_odf_do_pandas(planilha, cabecalho):
+    nativo = leitor_ods.ler_abas(planilha, cabecalho=cabecalho)
+    odf = pd.read_excel(planilha, sheet_name=None, header=cabecalho, engine='odf')
+    assert list(nativo) == list(odf) == leitor_ods.listar_abas(planilha)
+    for nome in odf:
+        # Diferenças documentadas: colunas só numéricas saem float64 e o índice das colunas é object
+        pd.testing.assert_frame_equal(nativo[nome], odf[nome], check_dtype=False, check_column_type=False)
+    if cabecalho == 0:
+        assert nativo['CE NV']['Ano'].tolist() == [2000, 2001, '#VALOR!', 2003]
+        assert nativo['PI NV']['Total'].dtype == np.float64
+
+
+def test_uma_aba_ou_aba_inexistente(planilha):
+    df = leitor_ods.ler_abas(planilha, abas='PI NV')
+    assert df['Total'].tolist() == [1.0, 2.0, 3.0]
+    assert list(leitor_ods.ler_abas(planilha, abas=['PI NV', 'CE NV'])) == ['PI NV', 'CE NV']
+    with pytest.raises(ValueError, match='Notas'):
+        leitor_ods.ler_abas(planilha, abas=['Notas'])
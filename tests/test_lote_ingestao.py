@@ -0,0 +1,95 @@
+"""Retomada e consolidação da ingestão em lote (src/lote_ingestao.py) com um perfil de teste"""
+import json
+
+import pandas as pd
+import pytest
+
+from src import lote_ingestao
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    """Planilha XLSX com três abas: duas de UFs e uma que nenhum perfil reconhece"""
+    arquivo = tmp_path / 'teste.xlsx'
+    with pd.ExcelWriter(arquivo) as escritor:
+        for aba in ('CE NV', 'PI NV', 'Notas'):
+            pd.DataFrame({'Municipio': ['A'], 'Valor': [1]}).to_excel(escritor, sheet_name=aba, index=False)
+    return {'id': 'teste', 'arquivo': str(arquivo), 'perfis': ['teste']}
+
+
+def usar_perfil(monkeypatch, resultados):
+    """Perfil 'teste': abas '<UF> NV'; processar devolve resultados[aba] (ou levanta, se for exceção)"""
+    processadas = []
+
+    def identificar(nome_aba):
+        uf, _, tipo = nome_aba.partition(' ')
+        return ('NV', uf) if tipo == 'NV' else None
+
+    def processar(xls, nome_aba, destino, uf):
+        processadas.append(nome_aba)
+        resultado = resultados[nome_aba]
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    monkeypatch.setattr(lote_ingestao, 'PERFIS', {'teste': (identificar, processar)})
+    return processadas
+
+
+def registros(codigo, municipio, ano, valor, uf='CE'):
+    return pd.DataFrame({
+        'Codigo_Municipio': pd.array([codigo], dtype='Int32'), 'Municipio': [municipio], 'UF': [uf],
+        'Ano': [ano], 'Valor': [valor],
+    })
+
+
+def test_aba_sem_estrutura_ou_com_falha_e_reprocessada(planilha, tmp_path, monkeypatch):
+    diretorio = tmp_path / 'lote' / planilha['id']
+
+    # 1ª execução: PI não tem a estrutura esperada (None) e CE falha
+    usar_perfil(monkeypatch, {'CE NV': RuntimeError('falhou'), 'PI NV': None})
+    resumo = lote_ingestao.processar_planilha(planilha, diretorio)
+    assert not resumo['concluida']
+    assert sorted(aba for aba, _ in resumo['erros']) == ['CE NV', 'PI NV']
+    estado = json.loads((diretorio / 'estado.json').read_text(encoding='utf-8'))
+    assert {aba: dados['status'] for aba, dados in estado['abas'].items()} == {
+        'CE NV': 'erro', 'PI NV': 'erro', 'Notas': 'ignorada',
+    }
+
+    # 2ª execução: CE vazia de verdade e PI com dados; só as abas com erro são processadas de novo
+    processadas = usar_perfil(monkeypatch, {'CE NV': registros(230440, 'X', 2000, 1).iloc[:0],
+                                            'PI NV': registros(220040, 'Y', 2000, 5, 'PI')})
+    resumo = lote_ingestao.processar_planilha(planilha, diretorio)
+    assert resumo['concluida'] and resumo['novas'] == 2 and resumo['retomadas'] == 1
+    assert sorted(processadas) == ['CE NV', 'PI NV']
+    estado = json.loads((diretorio / 'estado.json').read_text(encoding='utf-8'))
+    assert estado['abas']['CE NV']['status'] == 'vazia'
+    assert estado['abas']['PI NV']['status'] == 'ok'
+
+    # 3ª execução: planilha inalterada, nada é relido
+    processadas = usar_perfil(monkeypatch, {})
+    resumo = lote_ingestao.processar_planilha(planilha, diretorio)
+    assert resumo['concluida'] and processadas == []
+
+
+def test_consolidar_pelo_codigo_vale_a_ultima_planilha(tmp_path, monkeypatch):
+    dir_lote = tmp_path / 'lote'
+    partes = {
+        'primeira': [registros(230440, 'FORTALEZA', 2000, 10), registros(230410, 'CRATEUS', 2000, 7)],
+        'segunda': [registros(230440, 'FORTALEZA (CE)', 2000, 12)],  # mesmo código com outra grafia
+    }
+    planilhas = []
+    for id_planilha, frames in partes.items():
+        diretorio = dir_lote / id_planilha
+        diretorio.mkdir(parents=True)
+        pd.concat(frames, ignore_index=True).to_pickle(diretorio / '000.pkl')
+        estado = {'abas': {'CE NV': {'status': 'ok', 'destino': 'NV', 'uf': 'CE', 'arquivo': '000.pkl'}}}
+        (diretorio / 'estado.json').write_text(json.dumps(estado), encoding='utf-8')
+        planilhas.append({'id': id_planilha})
+
+    saida = tmp_path / 'saida'
+    assert lote_ingestao.consolidar(planilhas, dir_lote, saida) == {'NV': 2}
+    gravados = json.loads((saida / lote_ingestao.DESTINOS['NV'].name / 'CE.json').read_text(encoding='utf-8'))
+    assert sorted((r['Codigo_Municipio'], r['Municipio'], r['Valor']) for r in gravados) == [
+        (230410, 'CRATEUS', 7), (230440, 'FORTALEZA (CE)', 12),
+    ]
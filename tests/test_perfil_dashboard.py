@@ -0,0 +1,73 @@
+"""Perfil do dashboard (src/perfil_dashboard.py): tempos, acertos/faltas de cache e texto do Prometheus"""
+import pandas as pd
+import pytest
+
+from src import armazenamento, perfil_dashboard, validacao
+
+
+@pytest.fixture
+def perfil(monkeypatch):
+    monkeypatch.setenv('DASHBOARD_PERFIL', '1')
+    perfil_dashboard.zerar()
+    yield
+    perfil_dashboard.zerar()
+
+
+@pytest.fixture
+def indicadores(tmp_path, monkeypatch):
+    """Indicadores preparados a partir de um frame fixo, com um arquivo de origem em tmp_path"""
+    origem = tmp_path / 'CE.json'
+    origem.write_text('[]', encoding='utf-8')
+    linhas = pd.DataFrame({
+        'Codigo_Municipio': [230440], 'Municipio': ['FORTALEZA'], 'UF': ['CE'], 'Ano': [2000], 'Valor': [12.5],
+    })
+    monkeypatch.setattr(armazenamento, '_cache_processo', {})
+    monkeypatch.setattr(armazenamento, '_arquivos_preparado', lambda tipo: [origem])
+    monkeypatch.setattr(armazenamento, 'carregar_indicador', lambda tipo: linhas.copy())
+    monkeypatch.setattr(validacao, 'carregar_relatorio', lambda: None)
+    return origem
+
+
+def test_falta_nas_threads_do_carregamento_conta_para_a_chamada(perfil, indicadores):
+    carregar = perfil_dashboard.contar_cache('indicadores')(armazenamento.carregar_indicadores_preparados)
+
+    dados = carregar(['CMI', 'NV'])
+    assert list(dados) == ['CMI', 'NV'] and len(dados['CMI']) == 1
+    carregar(['CMI', 'NV'])
+    assert perfil_dashboard.instantaneo()['caches'] == {'indicadores': {'chamadas': 2, 'faltas': 1}}
+
+    # Arquivo de origem alterado: nova carga, de novo nas threads
+    indicadores.write_text('[ ]', encoding='utf-8')
+    carregar(['CMI'])
+    texto = perfil_dashboard.texto_prometheus()
+    assert 'dashboard_cache_total{funcao="indicadores",resultado="acerto"} 1' in texto
+    assert 'dashboard_cache_total{funcao="indicadores",resultado="falta"} 2' in texto
+
+
+def test_secoes_e_texto_prometheus(perfil):
+    with perfil_dashboard.medir('filtro "anos"'):
+        pass
+    with perfil_dashboard.medir('aba_fechada', registrar=False):
+        pass
+    perfil_dashboard.registrar_tempo('secao_cmi', 0.5)
+    perfil_dashboard.registrar_tempo('secao_cmi', 0.25)
+
+    secoes = perfil_dashboard.instantaneo()['secoes']
+    assert sorted(secoes) == ['filtro "anos"', 'secao_cmi']
+    assert secoes['secao_cmi'] == {'chamadas': 2, 'total_s': 0.75, 'max_s': 0.5, 'ultima_s': 0.25}
+
+    linhas = perfil_dashboard.texto_prometheus().splitlines()
+    assert '# TYPE dashboard_secao_segundos summary' in linhas
+    assert 'dashboard_secao_segundos_sum{secao="secao_cmi"} 0.750000' in linhas
+    assert 'dashboard_secao_segundos_count{secao="secao_cmi"} 2' in linhas
+    assert 'dashboard_secao_segundos_max{secao="secao_cmi"} 0.500000' in linhas
+    assert 'dashboard_secao_segundos_count{secao="filtro \\"anos\\""} 1' in linhas
+
+
+def test_desligado_nao_mede(monkeypatch):
+    monkeypatch.setenv('DASHBOARD_PERFIL', '0')
+    perfil_dashboard.zerar()
+    with perfil_dashboard.medir('secao'):
+        pass
+    assert perfil_dashboard.contar_cache('funcao')(lambda: 1)() == 1
+    assert perfil_dashboard.instantaneo()['secoes'] == {} and perfil_dashboard.instantaneo()['caches'] == {}
@@ -0,0 +1,71 @@
+"""Municípios com trajetórias semelhantes (src/semelhanca.py)"""
+import warnings
+
+import numpy as np
+import pytest
+
+from src import semelhanca
+
+ANOS = np.arange(2000, 2010)
+
+
+def indice(series):
+    """series: {codigo: (valores de CMI, valores de CMI_MIL)} nos ANOS"""
+    codigos = np.array(list(series), dtype=np.int64)
+    valores = np.array(list(series.values()), dtype=np.float64).transpose(1, 0, 2)
+    return semelhanca.construir_indice({
+        'codigos': codigos, 'indicadores': list(semelhanca.INDICADORES_SEMELHANCA), 'anos': ANOS, 'valores': valores,
+    })
+
+
+@pytest.fixture
+def base():
+    queda = np.linspace(30, 10, len(ANOS))
+    return indice({
+        300: (queda + 50, queda + 50),  # mesma forma, nível bem mais alto
+        100: (queda, queda),
+        200: (queda + 1, queda + 1),  # mesma forma, nível próximo
+        400: (queda[::-1], queda[::-1]),  # tendência oposta
+        500: (np.full(len(ANOS), np.nan), np.full(len(ANOS), np.nan)),  # sem dados
+    })
+
+
+def test_euclidiana_ordena_pelo_nivel_e_forma(base):
+    resultado = semelhanca.municipios_semelhantes(base, 100)
+    assert resultado['Codigo_Municipio'].tolist() == [200, 400, 300]
+    assert resultado['Anos_Comuns'].tolist() == [len(ANOS)] * 3
+    assert resultado['Distancia'].is_monotonic_increasing
+
+
+def test_correlacao_so_olha_a_forma(base):
+    resultado = semelhanca.municipios_semelhantes(base, 100, k=2, metrica='correlacao')
+    assert resultado['Codigo_Municipio'].tolist() == [200, 300]
+    assert np.allclose(resultado['Distancia'], 0.0)
+
+
+@pytest.mark.parametrize('metrica', list(semelhanca.METRICAS))
+def test_periodo_sem_anos_suficientes_nao_sugere_nada(base, metrica):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        for anos in ((3000, 3001), (2005, 2001), (2000, 2000 + semelhanca.MIN_ANOS_COMUNS - 2)):
+            assert semelhanca.municipios_semelhantes(base, 100, metrica=metrica, anos=anos).empty
+        # Com anos suficientes o município sem dados fica de fora, sem avisos
+        resultado = semelhanca.municipios_semelhantes(base, 100, metrica=metrica, anos=(2000, 2004))
+    assert 500 not in resultado['Codigo_Municipio'].tolist()
+    assert not resultado['Distancia'].isna().any()
+
+
+def test_municipio_fora_do_indice_ou_metrica_invalida(base):
+    assert semelhanca.municipios_semelhantes(base, 999).empty
+    assert semelhanca.municipios_semelhantes(base, 500).empty
+    with pytest.raises(ValueError):
+        semelhanca.municipios_semelhantes(base, 100, metrica='manhattan')
+
+
+def test_empates_ficam_com_os_menores_codigos():
+    queda = np.linspace(30, 10, len(ANOS))
+    # Centenas de municípios à mesma distância da referência: o argpartition sozinho escolheria qualquer um
+    series = {codigo: (queda + 1, queda + 1) for codigo in range(3100, 100, -10)}
+    series[50] = (queda, queda)
+    resultado = semelhanca.municipios_semelhantes(indice(series), 50, k=3)
+    assert resultado['Codigo_Municipio'].tolist() == [110, 120, 130]
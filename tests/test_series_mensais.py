@@ -0,0 +1,89 @@
+"""Séries mensais de NV e OB em armazenamento colunar (src/series_mensais.py)"""
+import json
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import armazenamento, series_mensais
+
+
+def registros_mensais(linhas):
+    """linhas: (codigo, municipio, uf, ano, mes, valor)"""
+    return pd.DataFrame(linhas, columns=['Codigo_Municipio', 'Municipio', 'UF', 'Ano', 'Mes', 'Valor'])
+
+
+def test_periodo_int16_ida_e_volta():
+    anos = np.array([1990, 2020, 2020, 2030])
+    meses = np.array([1, 1, 12, 12])
+    periodos = series_mensais.codificar_periodo(anos, meses)
+    assert periodos.dtype == np.int16
+    assert periodos.tolist() == [23880, 24240, 24251, 24371]
+    assert np.all(np.diff(periodos) > 0)  # ordem cronológica
+    decodificados = series_mensais.decodificar_periodo(periodos)
+    assert decodificados[0].tolist() == anos.tolist() and decodificados[1].tolist() == meses.tolist()
+
+
+@pytest.mark.parametrize('coluna, periodo', [
+    (2020, (2020, None)), (2020.0, (2020, None)), ('2020', (2020, None)), ('2020.0', (2020, None)),
+    (np.int64(2001), (2001, None)), (datetime(2020, 3, 1), (2020, 3)), (date(2019, 12, 1), (2019, 12)),
+    ('2020/Jan', (2020, 1)), ('Fev/2020', (2020, 2)), ('2020-03', (2020, 3)), ('04/2020', (2020, 4)),
+    ('2020/Dec', (2020, 12)), (' mar / 2021 ', (2021, 3)),
+    ('2020/Total', None), ('13/2020', None), ('Municipio', None), (float('nan'), None), (2020.5, None),
+    (True, None), (1850, None), ('2031/Jan', None),
+])
+def test_interpretar_periodo(coluna, periodo):
+    assert series_mensais.interpretar_periodo(coluna) == periodo
+
+
+def test_gravar_ler_e_agregar_com_meses_faltando(tmp_path):
+    df = registros_mensais([
+        (230440, 'FORTALEZA', 'CE', 2001, 2, 7),
+        (230440, 'FORTALEZA', 'CE', 2000, 12, 5),
+        (230440, 'FORTALEZA', 'CE', 2000, 1, 10),  # 2000 só com dois meses
+        (None, 'SEM CODIGO', 'CE', 2000, 1, 99),
+        (220040, 'TERESINA', 'PI', 2000, 6, 3),
+    ])
+    arquivo = tmp_path / 'NV.npz'
+    assert series_mensais.salvar_indicador_mensal(df, 'NV', arquivo) == 4
+    assert not list(tmp_path.glob('*.tmp.npz'))
+
+    armazem = series_mensais.carregar_indicador_mensal('NV', arquivo)
+    assert armazem['periodos'].dtype == np.int16 and armazem['valores'].dtype == np.int32
+    assert armazem['codigos'].tolist() == [220040, 230440, 230440, 230440]
+    assert armazem['municipios'].tolist() == [220040, 230440] and armazem['inicios'].tolist() == [0, 1, 4]
+    assert series_mensais.ufs_mensais(armazem) == {'CE', 'PI'}
+    assert series_mensais.carregar_indicador_mensal('NV', tmp_path / 'OB.npz') is None
+
+    anual = series_mensais.agregar_anual(armazem, 'NV')
+    assert anual.to_dict('list') == {
+        'Municipio': ['TERESINA', 'FORTALEZA', 'FORTALEZA'],
+        'Codigo_Municipio': [220040, 230440, 230440],
+        'Ano': [2000, 2000, 2001],
+        'Valor': [3, 15, 7],
+        'UF': ['PI', 'CE', 'CE'],
+        'Tipo': ['Nascidos_Vivos'] * 3,
+    }
+    assert anual['Codigo_Municipio'].dtype == 'Int32'
+
+    serie = series_mensais.serie_mensal(armazem, 230440, anos=(2000, 2000))
+    assert serie[['Ano', 'Mes', 'Valor']].values.tolist() == [[2000, 1, 10], [2000, 12, 5]]
+    assert serie['Data'].tolist() == [pd.Timestamp('2000-01-01'), pd.Timestamp('2000-12-01')]
+    assert series_mensais.serie_mensal(armazem, 999999).empty
+
+
+def test_ufs_do_arquivo_mensal_substituem_os_jsons_anuais(tmp_path, monkeypatch):
+    diretorio = tmp_path / 'NV'
+    diretorio.mkdir()
+    for uf, codigo, valor in (('CE', 230440, 999), ('PI', 220040, 8)):
+        registro = {'Municipio': f'{codigo} X', 'UF': uf, 'Ano': 2000, 'Valor': valor, 'Tipo': 'Nascidos_Vivos'}
+        (diretorio / f'{uf}.json').write_text(json.dumps([registro]), encoding='utf-8')
+    monkeypatch.setitem(armazenamento.DIRETORIOS_INDICADORES, 'NV', diretorio)
+    monkeypatch.setattr(series_mensais, 'DIR_MENSAL', tmp_path / 'mensal')
+    series_mensais.salvar_indicador_mensal(registros_mensais([
+        (230440, 'FORTALEZA', 'CE', 2000, 1, 10), (230440, 'FORTALEZA', 'CE', 2000, 2, 5),
+    ]), 'NV')
+
+    df = armazenamento.carregar_indicador('NV', {})
+    assert sorted(zip(df['Codigo_Municipio'], df['Ano'], df['Valor'])) == [(220040, 2000, 8), (230440, 2000, 15)]
@@ -0,0 +1,145 @@
+"""Regras de src/validacao.py sobre tabelas montadas à mão"""
+import numpy as np
+import pandas as pd
+
+from src import validacao
+
+
+def registro(indicador, codigo, ano, valor, uf='CE', municipio='FORTALEZA'):
+    return {
+        'Indicador': indicador, 'Codigo_Municipio': codigo, 'Ano': ano, 'Valor': valor,
+        'UF': uf, 'Municipio': municipio,
+    }
+
+
+def longo(*registros):
+    return pd.DataFrame(list(registros), columns=['Indicador', 'Codigo_Municipio', 'Ano', 'Valor', 'UF', 'Municipio'])
+
+
+def largo(*linhas):
+    """Formato largo: (codigo, ano, CMI, CMI_MIL, NV, OB)"""
+    df = pd.DataFrame(linhas, columns=['Codigo_Municipio', 'Ano', 'CMI', 'CMI_MIL', 'NV', 'OB'])
+    return df.assign(UF='CE', Municipio='FORTALEZA')
+
+
+# ============================================================================
+# REGRAS
+# ============================================================================
+
+def test_codigo_nao_resolvido_lista_cada_municipio_uma_vez():
+    bruta = longo(
+        registro('CMI', np.nan, 2000, 10.0, municipio='SEM CODIGO'),
+        registro('CMI', np.nan, 2001, 11.0, municipio='SEM CODIGO'),
+        registro('CMI', 230440, 2000, 12.0),
+    )
+    violacoes = validacao._codigo_nao_resolvido(bruta)
+    assert violacoes.to_dict(orient='records') == [{'Indicador': 'CMI', 'UF': 'CE', 'Municipio': 'SEM CODIGO'}]
+
+
+def test_chave_duplicada_por_indicador_codigo_e_ano():
+    df = longo(
+        registro('OB', 230440, 2000, 2),
+        registro('OB', 230440, 2000, 3),
+        registro('NV', 230440, 2000, 100),  # mesma chave em outro indicador: não é duplicata
+        registro('OB', 230440, 2001, 2),
+    )
+    violacoes = validacao._chave_duplicada(df)
+    assert len(violacoes) == 2
+    assert set(violacoes['Valor']) == {2, 3}
+    assert (violacoes['Indicador'] == 'OB').all()
+
+
+def test_obitos_maior_que_nascidos():
+    df = largo(
+        (230440, 2000, 10.0, 10.0, 100, 101),
+        (230440, 2001, 10.0, 10.0, 100, 100),  # igual não viola
+        (230440, 2002, 10.0, 10.0, np.nan, 5),  # ano sem NV não viola
+    )
+    violacoes = validacao._obitos_maior_que_nascidos(df)
+    assert violacoes['Ano'].tolist() == [2000]
+
+
+def test_cmi_inconsistente_tolerancia():
+    df = largo(
+        (230440, 2000, 20.0, 20.0, 1000, 20),  # 20,0 exato
+        (230440, 2001, 20.4, 20.0, 1000, 20),  # dentro da tolerância
+        (230440, 2002, 25.0, 20.0, 1000, 20),  # fora
+    )
+    violacoes = validacao._cmi_inconsistente(df)
+    assert violacoes['Ano'].tolist() == [2002]
+    assert violacoes['CMI_calculado'].tolist() == [20.0]
+
+
+def test_cmi_inconsistente_com_nv_zero():
+    df = largo(
+        (230440, 2000, 0.0, 0.0, 0, 0),  # sem nascidos e CMI zero: coerente
+        (230440, 2001, 15.0, 0.0, 0, 0),  # CMI sem nascidos: violação
+    )
+    violacoes = validacao._cmi_inconsistente(df)
+    assert violacoes['Ano'].tolist() == [2001]
+    assert violacoes['CMI_calculado'].isna().all()
+
+
+def test_cmi_inconsistente_ignora_ano_sem_nv_ou_ob():
+    df = largo(
+        (230440, 2000, 99.0, 99.0, np.nan, 5),
+        (230440, 2001, 99.0, 99.0, 100, np.nan),
+    )
+    assert validacao._cmi_inconsistente(df).empty
+
+
+def test_anos_faltantes_no_intervalo_da_uf():
+    df = longo(
+        registro('CMI', 230440, 2000, 10.0),
+        registro('CMI', 230440, 2002, 10.0),  # falta 2001
+        registro('CMI', 230410, 2000, 10.0, municipio='CRATEUS'),
+        registro('CMI', 230410, 2001, 10.0, municipio='CRATEUS'),
+        registro('CMI', 230410, 2002, 10.0, municipio='CRATEUS'),
+    )
+    violacoes = validacao._anos_faltantes(df)
+    assert violacoes['Codigo_Municipio'].tolist() == [230440]
+    assert violacoes[['anos_presentes', 'anos_esperados']].values.tolist() == [[2, 3]]
+
+
+def test_cmi_igual_cmi_mil_so_em_municipio_pequeno():
+    pequeno = [(230410, ano, 12.3, 12.3, 300, 4) for ano in (2000, 2001, 2002)]
+    grande = [(230440, ano, 12.3, 12.3, 40000, 490) for ano in (2000, 2001, 2002)]
+    diferente = [(230420, 2000, 12.3, 12.3, 300, 4), (230420, 2001, 12.3, 15.0, 300, 4)]
+    violacoes = validacao._cmi_igual_cmi_mil(largo(*pequeno, *grande, *diferente))
+    assert violacoes['Codigo_Municipio'].tolist() == [230410]
+
+
+# ============================================================================
+# VALIDAÇÃO COMPLETA E BLOQUEIOS
+# ============================================================================
+
+def test_validar_reprova_e_bloqueia_as_chaves_das_regras_de_erro():
+    df = longo(
+        registro('NV', 230440, 2000, 100),
+        registro('OB', 230440, 2000, 150),  # OB > NV: bloqueia NV e OB
+        registro('NV', 230440, 2001, 100),
+        registro('OB', 230440, 2001, 1),
+        registro('OB', 230440, 2001, 1),  # duplicata: bloqueia só OB
+        registro('CMI', 230440, 2000, 10.0),
+        registro('CMI', 230440, 2001, 10.0),
+    )
+    relatorio = validacao.validar(df)
+    assert relatorio['status'] == 'reprovado'
+    assert sorted(relatorio['bloqueios']['OB']) == [[230440, 2000], [230440, 2001]]
+    assert relatorio['bloqueios']['NV'] == [[230440, 2000]]
+
+    nv = pd.DataFrame({'Codigo_Municipio': [230440, 230440], 'Ano': [2000, 2001], 'Valor': [100, 100]})
+    assert validacao.aplicar_bloqueios(nv, 'NV', relatorio)['Ano'].tolist() == [2001]
+
+
+def test_validar_aprova_dados_coerentes():
+    df = longo(
+        registro('NV', 230440, 2000, 1000),
+        registro('OB', 230440, 2000, 20),
+        registro('CMI', 230440, 2000, 20.0),
+        registro('CMI_MIL', 230440, 2000, 19.5),
+    )
+    relatorio = validacao.validar(df)
+    assert relatorio['status'] == 'aprovado'
+    assert relatorio['bloqueios'] == {}
+    assert all(regra['violacoes'] == 0 for regra in relatorio['regras'])